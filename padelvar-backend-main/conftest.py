@@ -0,0 +1,68 @@
+"""
+Fixtures communes des scripts de test (pytest)
+- app_config : surcharges de TestingConfig, à redéfinir dans un module de test
+- app : application 'testing' (base en mémoire, tables créées) ; les
+  surcharges sont posées avant create_app, chaque service les lit dans init_app
+- password_hash : hachage de PASSWORD, calculé une fois par session
+- seed : un club, un terrain et un joueur (mot de passe PASSWORD)
+- login : client de test connecté pour un email
+"""
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+PASSWORD = 'password123'
+
+
+@pytest.fixture
+def app_config():
+    """Aucune surcharge par défaut"""
+    return {}
+
+
+@pytest.fixture
+def app(app_config, monkeypatch):
+    from src.config import TestingConfig
+    from src.main import create_app
+    from src.models.database import db
+
+    for key, value in app_config.items():
+        monkeypatch.setattr(TestingConfig, key, value, raising=False)
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+@pytest.fixture(scope='session')
+def password_hash():
+    return generate_password_hash(PASSWORD)
+
+
+@pytest.fixture
+def seed(app, password_hash):
+    """Club, terrain et joueur (10 crédits) ; retourne leurs identifiants"""
+    from src.models.database import db
+    from src.models.user import User, Club, Court, UserRole
+
+    with app.app_context():
+        club = Club(name='Club Test', email='club@test.com')
+        db.session.add(club)
+        db.session.flush()
+        court = Court(name='Terrain 1', qr_code='QR_TEST', camera_url='http://localhost/cam', club_id=club.id)
+        player = User(email='joueur@test.com', name='Joueur Test', role=UserRole.PLAYER,
+                      password_hash=password_hash, credits_balance=10)
+        db.session.add_all([court, player])
+        db.session.commit()
+        return {'club': club.id, 'court': court.id, 'player': player.id}
+
+
+@pytest.fixture
+def login(app):
+    """login(email) : client de test connecté avec PASSWORD"""
+    def _login(email):
+        client = app.test_client()
+        response = client.post('/api/auth/login', json={'email': email, 'password': PASSWORD})
+        assert response.status_code == 200, response.get_json()
+        return client
+    return _login
@@ -0,0 +1,43 @@
+"""Timeline des échanges par vidéo (analyse de mouvement)
+
+Revision ID: 6b7c8d9e0f1a
+Revises: 5a6b7c8d9e0f
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6b7c8d9e0f1a'
+down_revision = '5a6b7c8d9e0f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('video_highlights',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('video_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(20), nullable=True),
+        sa.Column('segments', sa.Text(), nullable=True),
+        sa.Column('energy', sa.Text(), nullable=True),
+        sa.Column('duration', sa.Float(), nullable=True),
+        sa.Column('rally_seconds', sa.Float(), nullable=True),
+        sa.Column('sample_fps', sa.Float(), nullable=True),
+        sa.Column('decoder', sa.String(20), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('clip_status', sa.String(20), nullable=True),
+        sa.Column('clip_url', sa.String(255), nullable=True),
+        sa.Column('clip_size', sa.Integer(), nullable=True),
+        sa.Column('analyzed_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['video_id'], ['video.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('video_id')
+    )
+
+
+def downgrade():
+    op.drop_table('video_highlights')
@@ -0,0 +1,43 @@
+"""File des encodages de l'échelle de qualités (HLS)
+
+Revision ID: 7c8d9e0f1a2b
+Revises: 6b7c8d9e0f1a
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c8d9e0f1a2b'
+down_revision = '6b7c8d9e0f1a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('transcode_job',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('video_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(20), nullable=True),
+        sa.Column('reason', sa.String(20), nullable=True),
+        sa.Column('priority', sa.Float(), nullable=True),
+        sa.Column('renditions', sa.Text(), nullable=True),
+        sa.Column('master_url', sa.String(255), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('encode_seconds', sa.Float(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['video_id'], ['video.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('video_id')
+    )
+    op.create_index('ix_transcode_job_status_priority', 'transcode_job', ['status', 'priority'])
+
+
+def downgrade():
+    op.drop_index('ix_transcode_job_status_priority', table_name='transcode_job')
+    op.drop_table('transcode_job')
@@ -0,0 +1,42 @@
+"""Index des fichiers stockés (niveaux chaud / froid, dernier accès)
+
+Revision ID: 8d9e0f1a2b3c
+Revises: 7c8d9e0f1a2b
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d9e0f1a2b3c'
+down_revision = '7c8d9e0f1a2b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('stored_file',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('path', sa.String(500), nullable=False),
+        sa.Column('kind', sa.String(20), nullable=True),
+        sa.Column('tier', sa.String(10), nullable=True),
+        sa.Column('size', sa.BigInteger(), nullable=True),
+        sa.Column('video_id', sa.Integer(), nullable=True),
+        sa.Column('club_id', sa.Integer(), nullable=True),
+        sa.Column('last_access', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('path')
+    )
+    op.create_index('ix_stored_file_tier_last_access', 'stored_file', ['tier', 'last_access'])
+    op.create_index('ix_stored_file_video_id', 'stored_file', ['video_id'])
+    op.create_index('ix_stored_file_club_id', 'stored_file', ['club_id'])
+
+
+def downgrade():
+    op.drop_index('ix_stored_file_club_id', table_name='stored_file')
+    op.drop_index('ix_stored_file_video_id', table_name='stored_file')
+    op.drop_index('ix_stored_file_tier_last_access', table_name='stored_file')
+    op.drop_table('stored_file')
@@ -0,0 +1,43 @@
+"""Métadonnées mesurées des fichiers vidéo (durée, résolution, codecs, images clés)
+
+Revision ID: 9e0f1a2b3c4d
+Revises: 8d9e0f1a2b3c
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e0f1a2b3c4d'
+down_revision = '8d9e0f1a2b3c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('video_metadata',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('video_id', sa.Integer(), nullable=False),
+        sa.Column('file_size', sa.BigInteger(), nullable=True),
+        sa.Column('file_mtime_ns', sa.BigInteger(), nullable=True),
+        sa.Column('duration', sa.Float(), nullable=True),
+        sa.Column('width', sa.Integer(), nullable=True),
+        sa.Column('height', sa.Integer(), nullable=True),
+        sa.Column('fps', sa.Float(), nullable=True),
+        sa.Column('video_codec', sa.String(20), nullable=True),
+        sa.Column('audio_codec', sa.String(20), nullable=True),
+        sa.Column('bitrate', sa.Integer(), nullable=True),
+        sa.Column('keyframe_count', sa.Integer(), nullable=True),
+        sa.Column('keyframes', sa.Text(), nullable=True),
+        sa.Column('source', sa.String(10), nullable=True),
+        sa.Column('probed_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['video_id'], ['video.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('video_id')
+    )
+
+
+def downgrade():
+    op.drop_table('video_metadata')
@@ -0,0 +1,30 @@
+"""Index de la bibliothèque vidéo : (user_id, recorded_at) et (court_id, recorded_at)
+
+Revision ID: af0a1b2c3d4e
+Revises: 9e0f1a2b3c4d
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'af0a1b2c3d4e'
+down_revision = '9e0f1a2b3c4d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # La pagination par curseur suppose une date d'enregistrement renseignée
+    op.execute("UPDATE video SET recorded_at = COALESCE(created_at, CURRENT_TIMESTAMP) WHERE recorded_at IS NULL")
+    with op.batch_alter_table('video', schema=None) as batch_op:
+        batch_op.create_index('ix_video_user_recorded_at', ['user_id', 'recorded_at'], unique=False)
+        batch_op.create_index('ix_video_court_recorded_at', ['court_id', 'recorded_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('video', schema=None) as batch_op:
+        batch_op.drop_index('ix_video_court_recorded_at')
+        batch_op.drop_index('ix_video_user_recorded_at')
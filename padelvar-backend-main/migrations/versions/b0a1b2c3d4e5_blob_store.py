@@ -0,0 +1,39 @@
+"""Stockage adressé par contenu : table blob (empreinte, taille, compteur de références)
+
+Revision ID: b0a1b2c3d4e5
+Revises: af0a1b2c3d4e
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b0a1b2c3d4e5'
+down_revision = 'af0a1b2c3d4e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('blob',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('sha256', sa.String(64), nullable=False),
+        sa.Column('extension', sa.String(10), nullable=True),
+        sa.Column('kind', sa.String(20), nullable=True),
+        sa.Column('size', sa.BigInteger(), nullable=True),
+        sa.Column('ref_count', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('released_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('sha256')
+    )
+    with op.batch_alter_table('blob', schema=None) as batch_op:
+        batch_op.create_index('ix_blob_ref_count_released_at', ['ref_count', 'released_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('blob', schema=None) as batch_op:
+        batch_op.drop_index('ix_blob_ref_count_released_at')
+    op.drop_table('blob')
@@ -0,0 +1,48 @@
+"""Graphe d'abonnements : index (club_id, player_id) et compteurs dénormalisés
+
+Revision ID: c0b1c2d3e4f5
+Revises: b0a1b2c3d4e5
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c0b1c2d3e4f5'
+down_revision = 'b0a1b2c3d4e5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('player_club_follows', schema=None) as batch_op:
+        batch_op.create_index('ix_player_club_follows_club_player', ['club_id', 'player_id'], unique=False)
+
+    with op.batch_alter_table('club', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('followers_count', sa.Integer(), nullable=False, server_default='0'))
+
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('followed_clubs_count', sa.Integer(), nullable=False, server_default='0'))
+
+    # Compteurs initiaux depuis les abonnements existants
+    op.execute(
+        "UPDATE club SET followers_count = "
+        "(SELECT COUNT(*) FROM player_club_follows WHERE player_club_follows.club_id = club.id)"
+    )
+    op.execute(
+        'UPDATE "user" SET followed_clubs_count = '
+        '(SELECT COUNT(*) FROM player_club_follows WHERE player_club_follows.player_id = "user".id)'
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('followed_clubs_count')
+
+    with op.batch_alter_table('club', schema=None) as batch_op:
+        batch_op.drop_column('followers_count')
+
+    with op.batch_alter_table('player_club_follows', schema=None) as batch_op:
+        batch_op.drop_index('ix_player_club_follows_club_player')
@@ -0,0 +1,28 @@
+"""Index de l'historique d'actions : (user_id, performed_at) et (club_id, action_type, performed_at)
+
+Revision ID: d0c1d2e3f4a5
+Revises: c0b1c2d3e4f5
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd0c1d2e3f4a5'
+down_revision = 'c0b1c2d3e4f5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('club_action_history', schema=None) as batch_op:
+        batch_op.create_index('ix_club_action_history_user_performed_at', ['user_id', 'performed_at'], unique=False)
+        batch_op.create_index('ix_club_action_history_club_type_performed_at', ['club_id', 'action_type', 'performed_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('club_action_history', schema=None) as batch_op:
+        batch_op.drop_index('ix_club_action_history_club_type_performed_at')
+        batch_op.drop_index('ix_club_action_history_user_performed_at')
@@ -0,0 +1,49 @@
+"""Sessions d'enregistrement : échéance expires_at et index (status, expires_at)
+
+Revision ID: e0d1e2f3a4b5
+Revises: d0c1d2e3f4a5
+Create Date: 2026-10-19 23:00:00.000000
+
+"""
+from datetime import timedelta
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e0d1e2f3a4b5'
+down_revision = 'd0c1d2e3f4a5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('recording_session', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('expires_at', sa.DateTime(), nullable=True))
+        batch_op.create_index('ix_recording_session_status_expires_at', ['status', 'expires_at'], unique=False)
+
+    # Échéance des sessions actives : début + min(durée prévue, durée max)
+    sessions = sa.table(
+        'recording_session',
+        sa.column('id', sa.Integer), sa.column('status', sa.String),
+        sa.column('start_time', sa.DateTime), sa.column('planned_duration', sa.Integer),
+        sa.column('max_duration', sa.Integer), sa.column('expires_at', sa.DateTime)
+    )
+    connection = op.get_bind()
+    active = connection.execute(
+        sa.select(sessions.c.id, sessions.c.start_time, sessions.c.planned_duration, sessions.c.max_duration)
+        .where(sessions.c.status == 'active')
+    ).all()
+    for session_id, start_time, planned_duration, max_duration in active:
+        minutes = min(planned_duration, max_duration or 200)
+        connection.execute(
+            sessions.update().where(sessions.c.id == session_id)
+            .values(expires_at=start_time + timedelta(minutes=minutes))
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('recording_session', schema=None) as batch_op:
+        batch_op.drop_index('ix_recording_session_status_expires_at')
+        batch_op.drop_column('expires_at')
@@ -0,0 +1,39 @@
+"""Réservations d'espace des captures en cours (partagées entre processus)
+
+Revision ID: f0e1f2a3b4c5
+Revises: e0d1e2f3a4b5
+Create Date: 2026-10-20 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f0e1f2a3b4c5'
+down_revision = 'e0d1e2f3a4b5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('storage_reservation',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('key', sa.String(100), nullable=False),
+        sa.Column('club_id', sa.Integer(), nullable=True),
+        sa.Column('tier', sa.String(10), nullable=True),
+        sa.Column('path', sa.String(500), nullable=True),
+        sa.Column('bytes', sa.BigInteger(), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('key')
+    )
+    op.create_index('ix_storage_reservation_club_id', 'storage_reservation', ['club_id'])
+    op.create_index('ix_storage_reservation_expires_at', 'storage_reservation', ['expires_at'])
+
+
+def downgrade():
+    op.drop_index('ix_storage_reservation_expires_at', table_name='storage_reservation')
+    op.drop_index('ix_storage_reservation_club_id', table_name='storage_reservation')
+    op.drop_table('storage_reservation')
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Analyse de mouvement d'un match enregistré
+Usage: python scripts/analyze_highlights.py static/videos/match.mp4 [--export resume.mp4]
+
+Même analyse que le pool de fond (src/services/highlight_analysis.py), lancée
+directement sur un fichier : échanges détectés, temps de calcul et part du
+match retirée par la lecture « sans temps morts ». Nécessite numpy, et
+FFmpeg ou OpenCV pour le décodage.
+"""
+import sys
+import argparse
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.absolute()
+sys.path.insert(0, str(project_root))
+
+from src.services.highlight_analysis import DEFAULT_OPTIONS, analyze_video, export_highlight_clip
+
+
+def format_time(seconds):
+    minutes, seconds = divmod(seconds, 60)
+    return f"{int(minutes):02d}:{seconds:04.1f}"
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description='Détecte les échanges d\'un match enregistré')
+    parser.add_argument('video', help='Fichier vidéo à analyser')
+    parser.add_argument('--sample-fps', type=float, default=DEFAULT_OPTIONS['sample_fps'])
+    parser.add_argument('--width', type=int, default=DEFAULT_OPTIONS['frame_width'])
+    parser.add_argument('--height', type=int, default=DEFAULT_OPTIONS['frame_height'])
+    parser.add_argument('--min-rally', type=float, default=DEFAULT_OPTIONS['min_rally'])
+    parser.add_argument('--max-gap', type=float, default=DEFAULT_OPTIONS['max_gap'])
+    parser.add_argument('--export', help='Écrire la vidéo résumé dans ce fichier')
+    args = parser.parse_args()
+
+    options = {'sample_fps': args.sample_fps, 'frame_width': args.width, 'frame_height': args.height,
+               'min_rally': args.min_rally, 'max_gap': args.max_gap}
+
+    print(f"🔍 Analyse de {args.video} ({args.sample_fps:g} img/s, {args.width}x{args.height})...")
+    result = analyze_video(args.video, options)
+    duration = result['duration']
+    print(f"   {result['frames_analyzed']} images en {result['elapsed_seconds']}s "
+          f"(décodeur {result['decoder']}), soit {duration / max(result['elapsed_seconds'], 0.01):.0f}x le temps réel\n")
+
+    for index, (start, end, score) in enumerate(result['segments'], start=1):
+        print(f"   🎾 {index:>3}  {format_time(start)} → {format_time(end)}  "
+              f"{end - start:5.1f}s  intensité {score:.2f}")
+
+    rally = result['rally_seconds']
+    if not result['segments']:
+        print("⚠️  Aucun échange détecté")
+        return
+    print(f"\n✅ {len(result['segments'])} échanges : {format_time(rally)} de jeu sur {format_time(duration)} "
+          f"({(1 - rally / duration) * 100:.0f}% de temps mort retiré)")
+
+    if args.export:
+        print(f"\n✂️  Export du résumé vers {args.export}...")
+        export = export_highlight_clip(args.video, result['segments'], args.export)
+        print(f"   {export['file_size'] / 1e6:.1f} Mo au lieu de {export['source_size'] / 1e6:.1f} Mo "
+              f"en {export['elapsed_seconds']}s ({export['method']})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark du temps de démarrage de l'application PadelVar
+Usage: python scripts/benchmark_import_time.py [--runs N] [--budget-ms MS]
+
+Mesure, dans un interpréteur neuf à chaque essai :
+- le temps d'import de src.main
+- le temps de create_app('testing')
+- les modules lourds chargés (cv2, numpy) et les threads démarrés
+
+Code de sortie 1 si le budget est dépassé, si un module lourd est importé
+ou si un thread d'arrière-plan est lancé au démarrage.
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+from pathlib import Path
+from statistics import median
+
+project_root = Path(__file__).parent.parent.absolute()
+
+HEAVY_MODULES = ('cv2', 'numpy')
+
+# Code exécuté dans un sous-processus pour partir d'un cache de modules vide
+PROBE = """
+import json, sys, threading, time
+threads_before = threading.active_count()
+t0 = time.perf_counter()
+import src.main
+t1 = time.perf_counter()
+app = src.main.create_app('testing')
+t2 = time.perf_counter()
+print(json.dumps({
+    'import_ms': (t1 - t0) * 1000,
+    'create_app_ms': (t2 - t1) * 1000,
+    'heavy_modules': [m for m in %r if m in sys.modules],
+    'threads_started': threading.active_count() - threads_before,
+}))
+""" % (HEAVY_MODULES,)
+
+
+def run_probe():
+    """Lance une mesure dans un interpréteur neuf"""
+    result = subprocess.run(
+        [sys.executable, '-c', PROBE],
+        cwd=str(project_root),
+        capture_output=True,
+        text=True,
+        env=dict(os.environ, FLASK_ENV='testing')
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip())
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description='Benchmark du démarrage de PadelVar')
+    parser.add_argument('--runs', type=int, default=5, help='Nombre de mesures')
+    parser.add_argument('--budget-ms', type=float, default=1500.0,
+                        help='Budget médian import + create_app en millisecondes')
+    args = parser.parse_args()
+
+    print(f"⏱️  Benchmark du démarrage ({args.runs} essais)")
+
+    samples = []
+    for i in range(args.runs):
+        sample = run_probe()
+        samples.append(sample)
+        print(f"   #{i + 1}: import={sample['import_ms']:.0f}ms "
+              f"create_app={sample['create_app_ms']:.0f}ms")
+
+    import_ms = median(s['import_ms'] for s in samples)
+    create_ms = median(s['create_app_ms'] for s in samples)
+    total_ms = import_ms + create_ms
+    heavy = sorted({m for s in samples for m in s['heavy_modules']})
+    threads = max(s['threads_started'] for s in samples)
+
+    print(f"📊 Médiane: import={import_ms:.0f}ms create_app={create_ms:.0f}ms total={total_ms:.0f}ms")
+
+    failures = []
+    if total_ms > args.budget_ms:
+        failures.append(f"budget dépassé ({total_ms:.0f}ms > {args.budget_ms:.0f}ms)")
+    if heavy:
+        failures.append(f"modules lourds importés au démarrage: {', '.join(heavy)}")
+    if threads > 0:
+        failures.append(f"{threads} thread(s) démarré(s) au démarrage")
+
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+
+    print("✅ Démarrage dans le budget, sans dépendance média ni thread")
+
+
+if __name__ == '__main__':
+    main()
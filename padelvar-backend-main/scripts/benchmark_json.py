@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Benchmark des plus grosses réponses JSON de l'API
+Usage: python scripts/benchmark_json.py [--profile small] [--repeat N] [--output resultats.json]
+
+- génère un jeu de données synthétique dans une base SQLite temporaire
+- appelle les endpoints les plus volumineux (dashboard club, utilisateurs,
+  vidéos et historiques admin) via WSGI
+- mesure pour chaque charge utile : taille brute, gzip et brotli (si installé),
+  temps d'encodage json (stdlib) et orjson (si installé), temps de compression
+"""
+import io
+import os
+import sys
+import json
+import time
+import gzip
+import shutil
+import logging
+import argparse
+import tempfile
+from pathlib import Path
+from contextlib import redirect_stdout
+from statistics import median
+
+project_root = Path(__file__).parent.parent.absolute()
+sys.path.insert(0, str(project_root))
+
+PASSWORD = 'benchmark123'
+ADMIN_EMAIL = 'admin@synthetic.padelvar.local'
+
+# (libellé, rôle du client, URL)
+ENDPOINTS = (
+    ('clubs.get_club_dashboard', 'club', '/api/clubs/dashboard'),
+    ('clubs.get_club_history', 'club', '/api/clubs/history'),
+    ('admin.get_all_users', 'admin', '/api/admin/users'),
+    ('admin.get_all_clubs_videos', 'admin', '/api/admin/videos'),
+    ('admin.get_all_clubs_history', 'admin', '/api/admin/clubs/history/all'),
+)
+
+
+def timed(fn, repeat):
+    """Médiane (ms) de repeat exécutions de fn"""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        durations.append((time.perf_counter() - start) * 1000)
+    return median(durations)
+
+
+def seed(app, args):
+    """Jeu de données synthétique + un super admin ; retourne l'email du club le plus suivi"""
+    from werkzeug.security import generate_password_hash
+    from src.models.database import db
+    from src.models.user import User, UserRole
+    from src.services.synthetic_data import SyntheticDataGenerator, DATASET_PROFILES
+
+    sizes = dict(DATASET_PROFILES[args.profile])
+    for key in ('clubs', 'players', 'history'):
+        if getattr(args, key) is not None:
+            sizes[key] = getattr(args, key)
+
+    with app.app_context():
+        db.create_all()
+        result = SyntheticDataGenerator(sizes, seed=args.seed, password=PASSWORD).generate()
+        db.session.add(User(email=ADMIN_EMAIL, name='Benchmark Admin', role=UserRole.SUPER_ADMIN,
+                            password_hash=generate_password_hash(PASSWORD), credits_balance=0))
+        db.session.commit()
+    # Le premier club est le plus populaire (loi de Zipf)
+    return result, f"club{result['club_ids'][0]}@synthetic.padelvar.local"
+
+
+def measure_payload(app, payload, repeat):
+    """Tailles et temps d'encodage / compression d'une charge utile"""
+    from src.services import json_provider
+
+    stdlib_ms = timed(lambda: json.dumps(payload, default=json_provider.default_encoder,
+                                         ensure_ascii=False, separators=(',', ':')), repeat)
+    body = app.json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    stats = {
+        'bytes': len(body),
+        'encode_stdlib_ms': round(stdlib_ms, 3),
+        'encode_orjson_ms': None,
+        'gzip_bytes': len(gzip.compress(body, compresslevel=6)),
+        'gzip_ms': round(timed(lambda: gzip.compress(body, compresslevel=6), repeat), 3),
+        'brotli_bytes': None,
+        'brotli_ms': None
+    }
+    if json_provider.orjson is not None:
+        orjson = json_provider.orjson
+        stats['encode_orjson_ms'] = round(timed(
+            lambda: orjson.dumps(payload, default=json_provider.default_encoder,
+                                 option=orjson.OPT_NON_STR_KEYS), repeat), 3)
+    try:
+        import brotli
+        stats['brotli_bytes'] = len(brotli.compress(body, quality=4))
+        stats['brotli_ms'] = round(timed(lambda: brotli.compress(body, quality=4), repeat), 3)
+    except ImportError:
+        pass
+    return stats
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description='Benchmark des réponses JSON volumineuses')
+    parser.add_argument('--profile', default='small', help='Profil du jeu de données synthétique')
+    parser.add_argument('--clubs', type=int, help='Surcharge du nombre de clubs')
+    parser.add_argument('--players', type=int, help='Surcharge du nombre de joueurs')
+    parser.add_argument('--history', type=int, help="Surcharge du nombre de lignes d'historique")
+    parser.add_argument('--seed', type=int, default=42, help='Graine du jeu de données')
+    parser.add_argument('--repeat', type=int, default=5, help='Mesures par charge utile')
+    parser.add_argument('--output', help='Fichier JSON de résultats')
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix='padelvar_json_')
+    os.environ['TEST_DATABASE_URL'] = 'sqlite:///' + os.path.join(tmp_dir, 'benchmark.db')
+
+    from src.main import create_app
+    from src.services import json_provider, response_compression
+
+    app = create_app('testing')
+    app.config['QUERY_BUDGET_STRICT'] = False
+    logging.disable(logging.INFO)
+
+    results = {}
+    try:
+        print(f"🌱 Génération du jeu de données ({args.profile})...")
+        dataset, club_email = seed(app, args)
+        print(f"   {dataset['rows']['video']} vidéos, {dataset['rows']['club_action_history']} historiques "
+              f"({dataset['duration_seconds']:.1f}s)")
+
+        clients = {}
+        for role, email in (('club', club_email), ('admin', ADMIN_EMAIL)):
+            clients[role] = app.test_client()
+            response = clients[role].post('/api/auth/login', json={'email': email, 'password': PASSWORD})
+            if response.status_code != 200:
+                raise RuntimeError(f"Connexion impossible pour {email}")
+
+        print(f"📦 Encodeur actif: {app.json.backend} | orjson: {'oui' if json_provider.orjson else 'non'} | "
+              f"brotli: {'oui' if response_compression.brotli else 'non'}")
+        print(f"   {'endpoint':<30} {'brut':>10} {'gzip':>10} {'br':>10} {'json':>9} {'orjson':>9} {'requête':>9}")
+        for label, role, url in ENDPOINTS:
+            client = clients[role]
+            start = time.perf_counter()
+            with redirect_stdout(io.StringIO()):  # traces de debug des routes
+                response = client.get(url)
+            request_ms = (time.perf_counter() - start) * 1000
+            if response.status_code != 200:
+                print(f"⚠️  {label}: HTTP {response.status_code}")
+                continue
+
+            stats = measure_payload(app, response.get_json(), args.repeat)
+            stats['request_ms'] = round(request_ms, 2)
+            results[label] = stats
+
+            def fmt_ms(value):
+                return f"{value:>7.2f}ms" if value is not None else f"{'-':>9}"
+
+            def fmt_kb(value):
+                return f"{value / 1024:>8.1f}Ko" if value is not None else f"{'-':>10}"
+
+            print(f"   {label:<30} {fmt_kb(stats['bytes'])} {fmt_kb(stats['gzip_bytes'])} "
+                  f"{fmt_kb(stats['brotli_bytes'])} {fmt_ms(stats['encode_stdlib_ms'])} "
+                  f"{fmt_ms(stats['encode_orjson_ms'])} {fmt_ms(stats['request_ms'])}")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'profile': args.profile, 'encoder': app.json.backend, 'endpoints': results},
+                      f, indent=2, ensure_ascii=False)
+        print(f"💾 Résultats écrits dans {args.output}")
+    print("✅ Benchmark terminé")
+
+
+if __name__ == '__main__':
+    main()
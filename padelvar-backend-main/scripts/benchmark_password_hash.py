@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark du hachage des mots de passe
+Usage: python scripts/benchmark_password_hash.py [--budget-ms MS] [--concurrency N]
+
+Mesure chaque méthode candidate (scrypt, pbkdf2) seule puis avec N hachages
+simultanés sur le pool borné, et recommande la méthode la plus coûteuse dont
+le p95 sous charge respecte le budget de latence de connexion.
+"""
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+from statistics import median
+from concurrent.futures import ThreadPoolExecutor
+
+project_root = Path(__file__).parent.parent.absolute()
+sys.path.insert(0, str(project_root))
+
+from werkzeug.security import generate_password_hash
+
+# Du moins coûteux au plus coûteux, par famille
+CANDIDATES = (
+    'pbkdf2:sha256:260000',
+    'pbkdf2:sha256:600000',
+    'pbkdf2:sha256:1000000',
+    'scrypt:16384:8:1',
+    'scrypt:32768:8:1',
+    'scrypt:65536:8:1',
+)
+
+
+def measure(method, samples, concurrency):
+    """Latences (ms) d'un hachage seul puis de hachages concurrents"""
+    def one(_):
+        start = time.perf_counter()
+        generate_password_hash('benchmark-password', method)
+        return (time.perf_counter() - start) * 1000
+
+    sequential = [one(i) for i in range(samples)]
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        start = time.perf_counter()
+        concurrent = list(executor.map(one, range(samples * concurrency)))
+        wall = time.perf_counter() - start
+
+    concurrent.sort()
+    return {
+        'single_ms': median(sequential),
+        'p95_ms': concurrent[max(0, int(len(concurrent) * 0.95) - 1)],
+        'per_second': len(concurrent) / wall
+    }
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description='Benchmark du hachage des mots de passe')
+    parser.add_argument('--budget-ms', type=float, default=250.0,
+                        help='Latence p95 maximale acceptable sous charge')
+    parser.add_argument('--concurrency', type=int, default=min(4, os.cpu_count() or 1),
+                        help='Hachages simultanés (PASSWORD_HASH_WORKERS)')
+    parser.add_argument('--samples', type=int, default=5, help='Mesures par méthode et par worker')
+    parser.add_argument('--methods', nargs='*', default=list(CANDIDATES), help='Méthodes à mesurer')
+    args = parser.parse_args()
+
+    print(f"🔐 Benchmark du hachage ({args.concurrency} workers, budget p95 {args.budget_ms:.0f}ms)")
+    print(f"   {'méthode':<24} {'seul':>9} {'p95 charge':>11} {'hach/s':>8}")
+
+    recommended = None
+    for method in args.methods:
+        stats = measure(method, args.samples, args.concurrency)
+        within = stats['p95_ms'] <= args.budget_ms
+        marker = '✅' if within else '❌'
+        print(f"{marker} {method:<24} {stats['single_ms']:>7.1f}ms {stats['p95_ms']:>9.1f}ms "
+              f"{stats['per_second']:>8.1f}")
+        if within:
+            # Le plus coûteux qui tient le budget (scrypt préféré : résistant aux GPU)
+            recommended = method
+
+    if recommended is None:
+        print("❌ Aucune méthode ne respecte le budget : augmenter PASSWORD_HASH_WORKERS ou le budget")
+        sys.exit(1)
+
+    print(f"\n👉 Recommandation : PASSWORD_HASH_METHOD={recommended} "
+          f"PASSWORD_HASH_WORKERS={args.concurrency}")
+
+
+if __name__ == '__main__':
+    main()
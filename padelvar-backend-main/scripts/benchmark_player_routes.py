@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Banc de non-régression des routes joueurs (/api/players)
+Usage: python scripts/benchmark_player_routes.py [--players N] [--runs N] [--output avant.json] [--baseline avant.json]
+
+- crée une base jetable et y insère le jeu de données synthétique
+  déterministe (voir src/services/synthetic_data.py)
+- appelle chaque route GET du blueprint joueurs pour un échantillon de
+  joueurs, séquentiellement, et mesure par route le nombre de requêtes SQL
+  (profileur, voir src/services/query_profiler.py) et la latence p50/p95
+- compare avec un résultat précédent (--baseline) : une route qui exécute
+  plus de requêtes SQL, ou dont la latence médiane se dégrade au-delà de
+  --max-regression, fait échouer le banc (le p95 d'un banc séquentiel est
+  trop bruité pour servir de seuil)
+
+Pour mesurer une optimisation : lancer le banc avec --output avant le
+changement, puis avec --baseline après.
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import logging
+import argparse
+import platform
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.absolute()
+sys.path.insert(0, str(project_root))
+
+PASSWORD = 'benchmark123'
+
+# Routes GET mesurées : libellé -> URL
+ROUTES = {
+    'dashboard': '/api/players/dashboard',
+    'videos': '/api/players/videos?limit=20',
+    'clubs_available': '/api/players/clubs/available',
+    'clubs_followed': '/api/players/clubs/followed',
+    'credits_history': '/api/players/credits/history',
+    'credits_balance': '/api/players/credits/balance',
+    'statistics': '/api/players/statistics',
+    'profile': '/api/players/profile',
+    'search_text': '/api/players/search/clubs?q=Padel',
+    'search_courts': '/api/players/search/clubs?min_courts=4&sort_by=name',
+    'leaderboard': '/api/players/social/leaderboard?limit=20',
+    'leaderboard_videos': '/api/players/social/leaderboard?sort_by=videos&limit=20',
+    'leaderboard_activity': '/api/players/social/leaderboard?sort_by=activity&limit=20',
+    'activity_feed': '/api/players/social/activity_feed',
+    'health': '/api/players/diagnostics/health',
+    'analytics': '/api/players/advanced/analytics?period=1y',
+    'preferences': '/api/players/advanced/preferences',
+}
+
+
+def percentile(sorted_values, pct):
+    """Percentile au rang le plus proche sur une liste triée"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def seed_dataset(app, args):
+    """Insère le jeu de données synthétique et retourne (lignes par table, emails des joueurs)"""
+    from src.models.database import db
+    from src.services.synthetic_data import SyntheticDataGenerator, player_email
+
+    sizes = {
+        'clubs': args.clubs,
+        'courts_per_club': args.courts_per_club,
+        'players': args.players,
+        'follows_per_player': args.follows_per_player,
+        'videos_per_player': args.videos_per_player,
+        'history': args.history
+    }
+    with app.app_context():
+        db.create_all()
+        result = SyntheticDataGenerator(sizes, seed=args.seed, password=PASSWORD).generate()
+    return result['rows'], [player_email(player_id) for player_id in result['player_ids']]
+
+
+def measure(app, emails, args):
+    """Appelle chaque route pour chaque joueur échantillonné ; retourne les mesures par route"""
+    from src.services.query_profiler import query_profiler
+
+    samples = {label: {'ms': [], 'queries': [], 'errors': 0} for label in ROUTES}
+    for email in emails:
+        client = app.test_client()
+        response = client.post('/api/auth/login', json={'email': email, 'password': PASSWORD})
+        if response.status_code != 200:
+            raise RuntimeError(f"Connexion impossible pour {email}")
+
+        for label, url in ROUTES.items():
+            # Chauffe : caches et plans de requête hors mesures
+            for _ in range(args.warmup):
+                client.get(url)
+            for _ in range(args.runs):
+                with query_profiler.budget(10 ** 6, label=label) as counter:
+                    started = time.perf_counter()
+                    response = client.get(url)
+                    duration_ms = (time.perf_counter() - started) * 1000
+                samples[label]['ms'].append(duration_ms)
+                samples[label]['queries'].append(counter['count'])
+                if response.status_code >= 400:
+                    samples[label]['errors'] += 1
+
+    routes = {}
+    for label, sample in samples.items():
+        values = sorted(sample['ms'])
+        routes[label] = {
+            'url': ROUTES[label],
+            'requests': len(values),
+            'errors': sample['errors'],
+            'avg_queries': round(sum(sample['queries']) / len(sample['queries']), 2),
+            'max_queries': max(sample['queries']),
+            'p50_ms': round(percentile(values, 50), 2),
+            'p95_ms': round(percentile(values, 95), 2),
+            'mean_ms': round(sum(values) / len(values), 2)
+        }
+    return routes
+
+
+def compare_with_baseline(routes, baseline_path, max_regression_pct):
+    """Affiche requêtes SQL et latence médiane avant/après par route ; retourne les régressions"""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+
+    regressions = []
+    print(f"\n📈 Comparaison avec {baseline_path}")
+    print(f"   {'route':<22} {'requêtes SQL':>16} {'p50':>26}")
+    for label, current in routes.items():
+        previous = baseline.get('routes', {}).get(label)
+        if not previous:
+            print(f"   {label:<22} nouvelle route")
+            continue
+        if previous['errors'] == previous['requests']:
+            # Route en échec dans la référence : rien à comparer
+            print(f"   🔧 {label:<20} en échec dans la référence, {current['errors']} erreur(s) maintenant")
+            continue
+
+        delta = ((current['p50_ms'] - previous['p50_ms']) / previous['p50_ms'] * 100) if previous['p50_ms'] else 0.0
+        reasons = []
+        if current['max_queries'] > previous['max_queries']:
+            reasons.append('requêtes SQL')
+        if delta > max_regression_pct:
+            reasons.append('p50')
+        if current['errors'] > previous['errors']:
+            reasons.append('erreurs')
+
+        marker = '❌' if reasons else '✅'
+        print(f"   {marker} {label:<20} {previous['max_queries']:>6} → {current['max_queries']:<6} "
+              f"{previous['p50_ms']:>9.2f}ms → {current['p50_ms']:>8.2f}ms ({delta:+.1f}%)")
+        if reasons:
+            regressions.append(f"{label} ({', '.join(reasons)})")
+    return regressions
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description='Banc de non-régression des routes joueurs')
+    parser.add_argument('--sample', type=int, default=10, help='Joueurs échantillonnés')
+    parser.add_argument('--runs', type=int, default=5, help='Appels mesurés par route et par joueur')
+    parser.add_argument('--warmup', type=int, default=1, help='Appels de chauffe non mesurés')
+    parser.add_argument('--clubs', type=int, default=50)
+    parser.add_argument('--courts-per-club', type=int, default=4)
+    parser.add_argument('--players', type=int, default=500)
+    parser.add_argument('--videos-per-player', type=int, default=20)
+    parser.add_argument('--history', type=int, default=20000, help='Lignes d\'historique')
+    parser.add_argument('--follows-per-player', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42, help='Graine du jeu de données')
+    parser.add_argument('--database-url', help='Base jetable (défaut : fichier SQLite temporaire)')
+    parser.add_argument('--output', help='Fichier JSON de résultats')
+    parser.add_argument('--baseline', help='Résultats JSON de référence à comparer')
+    parser.add_argument('--max-regression', type=float, default=25.0,
+                        help='Régression de latence médiane tolérée en pourcentage (avec --baseline)')
+    args = parser.parse_args()
+
+    if args.sample > args.players:
+        parser.error('--sample ne peut pas dépasser --players')
+
+    tmp_dir = None
+    if args.database_url:
+        database_url = args.database_url
+    else:
+        tmp_dir = tempfile.mkdtemp(prefix='padelvar_bench_')
+        database_url = 'sqlite:///' + os.path.join(tmp_dir, 'benchmark.db')
+    os.environ['TEST_DATABASE_URL'] = database_url
+
+    from src.main import create_app
+
+    app = create_app('testing')
+    logging.disable(logging.ERROR)
+
+    try:
+        print(f"🌱 Génération du jeu de données (graine {args.seed})...")
+        rows, emails = seed_dataset(app, args)
+        print(f"   {rows['club']} clubs, {rows['user']} comptes, {rows['video']} vidéos, "
+              f"{rows['club_action_history']} historiques")
+
+        # Échantillon déterministe : les joueurs les plus actifs (historique Zipf) en font partie
+        sample = emails[:max(1, args.sample // 2)] + \
+            random.Random(args.seed).sample(emails[args.sample // 2:], args.sample - max(1, args.sample // 2))
+        print(f"⏱️  {len(ROUTES)} routes × {len(sample)} joueurs × {args.runs} appels...")
+        started = time.perf_counter()
+        routes = measure(app, sample, args)
+        elapsed = time.perf_counter() - started
+    finally:
+        if tmp_dir:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    results = {
+        'generated_at': datetime.utcnow().isoformat(),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'database': database_url.split(':', 1)[0]
+        },
+        'configuration': {
+            key: value for key, value in vars(args).items()
+            if key not in ('output', 'baseline', 'database_url')
+        },
+        'dataset': rows,
+        'routes': routes
+    }
+
+    print(f"\n📊 {sum(r['requests'] for r in routes.values())} appels en {elapsed:.1f}s")
+    print(f"   {'route':<22} {'err':>4} {'SQL moy':>8} {'SQL max':>8} {'p50':>10} {'p95':>10}")
+    for label, stats in routes.items():
+        print(f"   {label:<22} {stats['errors']:>4} {stats['avg_queries']:>8.1f} {stats['max_queries']:>8} "
+              f"{stats['p50_ms']:>8.2f}ms {stats['p95_ms']:>8.2f}ms")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"💾 Résultats écrits dans {args.output}")
+
+    if args.baseline:
+        regressions = compare_with_baseline(routes, args.baseline, args.max_regression)
+        if regressions:
+            print(f"❌ Régressions : {', '.join(regressions)}")
+            sys.exit(1)
+    print("✅ Banc des routes joueurs terminé")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Range les fichiers existants dans le stockage adressé par contenu
+Usage: python scripts/dedup_storage.py [--env development] [--adopt] [--collect] [--grace-hours 24]
+
+--adopt parcourt les vidéos dont le fichier ou la miniature est encore sous
+static/videos ou static/thumbnails, les range sous leur empreinte SHA-256
+(src/services/blob_store.py) et réécrit leurs URL : les doublons sont
+supprimés au passage. --collect lance le ramasse-miettes (marquage des
+références en base, puis suppression des fichiers orphelins).
+"""
+import sys
+import time
+import argparse
+from datetime import timedelta
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.absolute()
+sys.path.insert(0, str(project_root))
+
+from src.main import create_app
+from src.services.blob_store import blob_store
+
+BATCH_SIZE = 200
+
+
+def adopt_all(limit):
+    """Vidéos parcourues par lots (ordre des id) ; retourne (vidéos vues, fichiers rangés)"""
+    from src.models.user import db, Video
+
+    after_id, seen, adopted = 0, 0, 0
+    while limit is None or seen < limit:
+        videos = Video.query.filter(Video.id > after_id).order_by(Video.id).limit(BATCH_SIZE).all()
+        if not videos:
+            break
+        for video in videos:
+            after_id = video.id
+            if limit is not None and seen >= limit:
+                break
+            seen += 1
+            try:
+                count = blob_store.adopt(video)
+            except Exception as e:
+                db.session.rollback()
+                print(f"❌ vidéo {video.id:>6} : {e}")
+                continue
+            if count:
+                adopted += count
+                print(f"📦 vidéo {video.id:>6} -> {video.file_url}")
+        db.session.expunge_all()
+    return seen, adopted
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description='Stockage adressé par contenu : rangement et ramasse-miettes')
+    parser.add_argument('--env', default='development', help='Configuration de l\'application')
+    parser.add_argument('--adopt', action='store_true', help='Ranger les fichiers des vidéos existantes')
+    parser.add_argument('--limit', type=int, help='Nombre maximal de vidéos parcourues')
+    parser.add_argument('--collect', action='store_true', help='Supprimer les fichiers sans référence')
+    parser.add_argument('--grace-hours', type=float, help='Délai sans référence avant suppression')
+    args = parser.parse_args()
+
+    app = create_app(args.env)
+    with app.app_context():
+        started = time.monotonic()
+        if args.adopt:
+            print(f"🗂️  Rangement par contenu dans {blob_store.root}...\n")
+            seen, adopted = adopt_all(args.limit)
+            print(f"\n✅ {adopted} fichier(s) rangé(s) pour {seen} vidéo(s), "
+                  f"{blob_store.deduplicated} doublon(s) supprimé(s) ({blob_store.saved_bytes / 1e6:.1f} Mo libérés)")
+
+        if args.collect:
+            grace = timedelta(hours=args.grace_hours) if args.grace_hours is not None else None
+            report = blob_store.collect(grace)
+            print(f"🧹 Ramasse-miettes : {report['referenced']} fichier(s) référencé(s), {report['repaired']} "
+                  f"compteur(s) corrigé(s), {report['collected']} supprimé(s) "
+                  f"({report['collected_bytes'] / 1e6:.1f} Mo)")
+
+        stats = blob_store.stats()
+        print(f"\n📊 {stats['blobs']} fichier(s), {stats['bytes'] / 1e6:.1f} Mo stockés pour {stats['references']} "
+              f"référence(s) ; {stats['deduplicated_bytes'] / 1e6:.1f} Mo évités par le partage "
+              f"({time.monotonic() - started:.1f}s)")
+
+
+if __name__ == '__main__':
+    main()
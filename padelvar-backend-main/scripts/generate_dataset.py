@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Génération de données synthétiques à l'échelle de la production
+Usage: python scripts/generate_dataset.py [--profile small|medium|large] [--database-url URL]
+
+Exemples:
+- python scripts/generate_dataset.py --profile medium
+- python scripts/generate_dataset.py --profile large --database-url sqlite:////tmp/padelvar_large.db
+- python scripts/generate_dataset.py --clubs 2000 --history 5000000 --seed 7
+
+Les mêmes graine et tailles produisent exactement les mêmes lignes.
+Base par défaut : instance/synthetic.db (la base de développement n'est jamais touchée).
+"""
+import os
+import sys
+import json
+import logging
+import argparse
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.absolute()
+sys.path.insert(0, str(project_root))
+
+SIZE_OPTIONS = ('clubs', 'courts_per_club', 'players', 'follows_per_player',
+                'videos_per_player', 'history', 'days')
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description='Génération de données synthétiques PadelVar')
+    parser.add_argument('--profile', choices=('small', 'medium', 'large'), default='small',
+                        help='Profil de volumes de départ')
+    for option in SIZE_OPTIONS:
+        parser.add_argument(f"--{option.replace('_', '-')}", type=int, dest=option,
+                            help=f"Remplace la valeur '{option}' du profil")
+    parser.add_argument('--seed', type=int, default=42, help='Graine aléatoire')
+    parser.add_argument('--batch-size', type=int, default=5000, help='Lignes par INSERT')
+    parser.add_argument('--zipf', type=float, default=1.1, help='Exposant de Zipf (popularité des clubs)')
+    parser.add_argument('--database-url', help='Base cible (défaut : instance/synthetic.db)')
+    parser.add_argument('--reset', action='store_true', help='Supprimer et recréer les tables avant insertion')
+    parser.add_argument('--report', help='Écrire le résumé JSON dans ce fichier')
+    args = parser.parse_args()
+
+    database_url = args.database_url or 'sqlite:///' + str(project_root / 'instance' / 'synthetic.db')
+    os.environ['TEST_DATABASE_URL'] = database_url
+
+    from src.main import create_app
+    from src.models.database import db
+    from src.services.synthetic_data import DATASET_PROFILES, SyntheticDataGenerator
+
+    sizes = dict(DATASET_PROFILES[args.profile])
+    sizes.update({option: getattr(args, option) for option in SIZE_OPTIONS if getattr(args, option) is not None})
+
+    app = create_app('testing')
+    logging.disable(logging.INFO)
+
+    print(f"🌱 Génération '{args.profile}' (graine {args.seed}) vers {database_url}")
+    for option in SIZE_OPTIONS:
+        print(f"   {option:<20} {sizes[option]:>10,}")
+
+    with app.app_context():
+        if args.reset:
+            print("🗑️  Suppression des tables existantes...")
+            db.drop_all()
+        db.create_all()
+
+        generator = SyntheticDataGenerator(sizes, seed=args.seed, batch_size=args.batch_size,
+                                           zipf_exponent=args.zipf)
+        try:
+            result = generator.generate()
+        except Exception as e:
+            print(f"❌ Erreur lors de la génération: {e}")
+            sys.exit(1)
+
+    print(f"✅ Terminé en {result['duration_seconds']}s")
+    for table, count in result['rows'].items():
+        print(f"   {table:<20} {count:>10,} lignes")
+    print(f"🔑 Joueurs : player<id>@synthetic.padelvar.local / {generator.password}")
+
+    if args.report:
+        summary = {k: v for k, v in result.items() if k not in ('club_ids', 'player_ids', 'court_ids')}
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        print(f"💾 Résumé écrit dans {args.report}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Banc de charge hors ligne de l'API PadelVar
+Usage: python scripts/load_test.py [--users N] [--iterations N] [--output resultats.json]
+
+- crée une base jetable (fichier SQLite temporaire ou --database-url)
+- y insère un jeu de données synthétique configurable et déterministe
+  (voir src/services/synthetic_data.py)
+- pilote la vraie application Flask via son interface WSGI avec N joueurs
+  virtuels concurrents : connexion, dashboard, vidéos, recherche,
+  démarrage/arrêt d'enregistrement
+- publie latences p50/p95/p99 et débit par endpoint en JSON, à comparer
+  d'une version à l'autre (--baseline)
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import logging
+import argparse
+import platform
+import tempfile
+import threading
+from datetime import datetime
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+project_root = Path(__file__).parent.parent.absolute()
+sys.path.insert(0, str(project_root))
+
+PASSWORD = 'loadtest123'
+SEARCH_TERMS = ('Padel', 'Club', 'Tunis', 'Sport', 'Arena')
+
+
+def percentile(sorted_values, pct):
+    """Percentile au rang le plus proche sur une liste triée"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def seed_dataset(app, args):
+    """Insère le jeu de données synthétique et retourne les comptes créés"""
+    from src.models.database import db
+    from src.services.synthetic_data import SyntheticDataGenerator, player_email
+
+    sizes = {
+        'clubs': args.clubs,
+        'courts_per_club': args.courts_per_club,
+        'players': args.players,
+        'follows_per_player': args.follows_per_player,
+        'videos_per_player': args.videos_per_player,
+        'history': args.history
+    }
+    with app.app_context():
+        db.create_all()
+        result = SyntheticDataGenerator(sizes, seed=args.seed, password=PASSWORD).generate()
+
+    dataset = dict(result['rows'])
+    dataset['player_emails'] = [player_email(player_id) for player_id in result['player_ids']]
+    dataset['court_ids'] = result['court_ids']
+    return dataset
+
+
+class VirtualPlayer:
+    """Joueur virtuel : un client WSGI avec sa propre session"""
+
+    def __init__(self, app, email, court_id, rng, recorder):
+        self.client = app.test_client()
+        self.email = email
+        self.court_id = court_id
+        self.rng = rng
+        self.recorder = recorder
+
+    def call(self, label, method, url, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = self.client.open(url, method=method, **kwargs)
+            status = response.status_code
+            payload = response.get_json(silent=True)
+        except Exception as e:
+            status, payload = 599, {'error': str(e)}
+        self.recorder.record(label, (time.perf_counter() - start) * 1000, status)
+        return status, payload
+
+    def login(self):
+        status, _ = self.call('login', 'POST', '/api/auth/login',
+                              json={'email': self.email, 'password': PASSWORD})
+        return status == 200
+
+    def run_iteration(self):
+        self.call('dashboard', 'GET', '/api/players/dashboard')
+        self.call('videos', 'GET', '/api/players/videos?limit=20')
+        self.call('search', 'GET', f"/api/players/search/clubs?q={self.rng.choice(SEARCH_TERMS)}")
+
+        if self.court_id is None:
+            return
+        status, payload = self.call('recording_start', 'POST', '/api/recording/start',
+                                    json={'court_id': self.court_id, 'duration': 60})
+        if status == 201:
+            recording_id = payload['recording_session']['recording_id']
+            self.call('recording_stop', 'POST', '/api/recording/stop',
+                      json={'recording_id': recording_id})
+
+
+class Recorder:
+    """Collecte thread-safe des latences par endpoint"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = {}
+        self.errors = {}
+        self.enabled = True
+
+    def record(self, label, duration_ms, status):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.samples.setdefault(label, []).append(duration_ms)
+            if status >= 400:
+                self.errors[label] = self.errors.get(label, 0) + 1
+
+    def summary(self, wall_seconds):
+        endpoints = {}
+        for label, values in sorted(self.samples.items()):
+            values = sorted(values)
+            endpoints[label] = {
+                'requests': len(values),
+                'errors': self.errors.get(label, 0),
+                'p50_ms': round(percentile(values, 50), 2),
+                'p95_ms': round(percentile(values, 95), 2),
+                'p99_ms': round(percentile(values, 99), 2),
+                'mean_ms': round(sum(values) / len(values), 2),
+                'max_ms': round(values[-1], 2),
+                'throughput_rps': round(len(values) / wall_seconds, 2) if wall_seconds else 0
+            }
+        total = sum(e['requests'] for e in endpoints.values())
+        return endpoints, {
+            'requests': total,
+            'errors': sum(e['errors'] for e in endpoints.values()),
+            'wall_seconds': round(wall_seconds, 3),
+            'throughput_rps': round(total / wall_seconds, 2) if wall_seconds else 0
+        }
+
+
+def compare_with_baseline(results, baseline_path, max_regression_pct):
+    """Affiche l'évolution du p95 par endpoint et retourne les régressions"""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+
+    regressions = []
+    print(f"\n📈 Comparaison avec {baseline_path}")
+    for label, current in results['endpoints'].items():
+        previous = baseline.get('endpoints', {}).get(label)
+        if not previous or not previous['p95_ms']:
+            print(f"   {label:<16} nouveau")
+            continue
+        delta = (current['p95_ms'] - previous['p95_ms']) / previous['p95_ms'] * 100
+        marker = '❌' if delta > max_regression_pct else '✅'
+        print(f"   {marker} {label:<16} p95 {previous['p95_ms']:>8.2f}ms → {current['p95_ms']:>8.2f}ms ({delta:+.1f}%)")
+        if delta > max_regression_pct:
+            regressions.append(label)
+    return regressions
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description='Banc de charge hors ligne de PadelVar')
+    parser.add_argument('--users', type=int, default=20, help='Joueurs virtuels concurrents')
+    parser.add_argument('--iterations', type=int, default=10, help='Parcours par joueur virtuel')
+    parser.add_argument('--warmup', type=int, default=1, help='Parcours de chauffe non mesurés')
+    parser.add_argument('--clubs', type=int, default=50)
+    parser.add_argument('--courts-per-club', type=int, default=4)
+    parser.add_argument('--players', type=int, default=500)
+    parser.add_argument('--videos-per-player', type=int, default=20)
+    parser.add_argument('--history', type=int, default=5000, help='Lignes d\'historique')
+    parser.add_argument('--follows-per-player', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42, help='Graine du jeu de données')
+    parser.add_argument('--database-url', help='Base jetable (défaut : fichier SQLite temporaire)')
+    parser.add_argument('--keep-db', action='store_true', help='Conserver la base SQLite temporaire')
+    parser.add_argument('--no-recording', action='store_true', help='Exclure le flux d\'enregistrement')
+    parser.add_argument('--output', help='Fichier JSON de résultats')
+    parser.add_argument('--baseline', help='Résultats JSON de référence à comparer')
+    parser.add_argument('--max-regression', type=float, default=20.0,
+                        help='Régression p95 tolérée en pourcentage (avec --baseline)')
+    args = parser.parse_args()
+
+    if args.users > args.players:
+        parser.error('--users ne peut pas dépasser --players')
+
+    tmp_dir = None
+    if args.database_url:
+        database_url = args.database_url
+    else:
+        tmp_dir = tempfile.mkdtemp(prefix='padelvar_load_')
+        database_url = 'sqlite:///' + os.path.join(tmp_dir, 'load_test.db')
+    os.environ['TEST_DATABASE_URL'] = database_url
+
+    from src.main import create_app
+    from src.services.query_profiler import query_profiler
+    from src.services.audit_log import audit_log
+
+    app = create_app('testing')
+    # Historique en écriture différée, comme en production
+    audit_log.write_behind = True
+    logging.disable(logging.INFO)
+
+    try:
+        print(f"🌱 Génération du jeu de données (graine {args.seed})...")
+        seed_start = time.perf_counter()
+        dataset = seed_dataset(app, args)
+        print(f"   {dataset['club']} clubs, {dataset['court']} terrains, {len(dataset['player_emails'])} joueurs, "
+              f"{dataset['video']} vidéos, {dataset['club_action_history']} historiques "
+              f"({time.perf_counter() - seed_start:.1f}s)")
+
+        recorder = Recorder()
+        rng = random.Random(args.seed)
+        court_ids = [] if args.no_recording else dataset['court_ids']
+        if not args.no_recording and args.users > len(court_ids):
+            print(f"⚠️  {args.users - len(court_ids)} joueurs virtuels sans terrain : flux d'enregistrement ignoré pour eux")
+
+        emails = rng.sample(dataset['player_emails'], args.users)
+        vplayers = [
+            VirtualPlayer(app, email, court_ids[i] if i < len(court_ids) else None,
+                          random.Random(args.seed + i), recorder)
+            for i, email in enumerate(emails)
+        ]
+
+        def session(vplayer):
+            if not vplayer.login():
+                raise RuntimeError(f"Connexion impossible pour {vplayer.email}")
+            for _ in range(args.iterations):
+                vplayer.run_iteration()
+
+        # Chauffe (caches, connexions) hors mesures
+        recorder.enabled = False
+        for vplayer in vplayers[:1]:
+            vplayer.login()
+            for _ in range(args.warmup):
+                vplayer.run_iteration()
+        recorder.enabled = True
+        query_profiler.reset()
+
+        print(f"🚀 {args.users} joueurs virtuels × {args.iterations} parcours...")
+        wall_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.users) as executor:
+            for future in [executor.submit(session, v) for v in vplayers]:
+                future.result()
+        wall_seconds = time.perf_counter() - wall_start
+        audit_log.flush()
+
+        endpoints, total = recorder.summary(wall_seconds)
+        results = {
+            'generated_at': datetime.utcnow().isoformat(),
+            'environment': {
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'database': app.extensions.get('database_profile', {}).get('dialect')
+            },
+            'configuration': {
+                key: value for key, value in vars(args).items()
+                if key not in ('output', 'baseline', 'database_url')
+            },
+            'dataset': {k: v for k, v in dataset.items() if k not in ('player_emails', 'court_ids')},
+            'total': total,
+            'endpoints': endpoints,
+            'queries': {
+                e['endpoint']: {'avg_queries': e['avg_queries'], 'max_queries': e['max_queries']}
+                for e in query_profiler.report()['endpoints']
+            }
+        }
+    finally:
+        if tmp_dir and not args.keep_db:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        elif tmp_dir:
+            print(f"💾 Base conservée: {database_url}")
+
+    print(f"\n📊 {total['requests']} requêtes en {total['wall_seconds']}s "
+          f"({total['throughput_rps']} req/s, {total['errors']} erreurs)")
+    print(f"   {'endpoint':<16} {'req':>6} {'err':>5} {'p50':>9} {'p95':>9} {'p99':>9} {'req/s':>8}")
+    for label, stats in endpoints.items():
+        print(f"   {label:<16} {stats['requests']:>6} {stats['errors']:>5} {stats['p50_ms']:>7.2f}ms "
+              f"{stats['p95_ms']:>7.2f}ms {stats['p99_ms']:>7.2f}ms {stats['throughput_rps']:>8.2f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"💾 Résultats écrits dans {args.output}")
+
+    failed = total['errors'] > 0
+    if args.baseline:
+        regressions = compare_with_baseline(results, args.baseline, args.max_regression)
+        if regressions:
+            print(f"❌ Régression p95 > {args.max_regression:.0f}% : {', '.join(regressions)}")
+            failed = True
+
+    if failed:
+        sys.exit(1)
+    print("✅ Banc de charge terminé")
+
+
+if __name__ == '__main__':
+    main()
@@ -9,6 +9,7 @@ Commandes disponibles:
 - upgrade: Applique les migrations
 - downgrade: Annule la dernière migration
 - reset: Remet à zéro la base de données
+- profile: Vérifie le profil moteur effectif (PRAGMA SQLite ou pool)
 """
 import os
 import sys
@@ -22,6 +23,7 @@ sys.path.insert(0, str(project_root))
 
 from flask_migrate import init, migrate, upgrade, downgrade
 from src.main import create_app
+from src.models.database import check_engine_profile
 
 def init_migrations(app):
     """Initialise le système de migrations"""
@@ -100,10 +102,20 @@ def reset_database(app):
     
     print("✅ Base de données remise à zéro")
 
+def check_profile(app):
+    """Ouvre une connexion et affiche la configuration effective du moteur"""
+    report = check_engine_profile(app)
+    details = ', '.join(f"{k}={v}" for k, v in report.items() if k not in ('profile', 'status', 'error'))
+    if report['status'] != 'OK':
+        print(f"❌ Profil {report['profile']} non vérifié: {report.get('error')}")
+        return False
+    print(f"✅ Profil {report['profile']} ({details})")
+    return True
+
 def main():
     """Fonction principale"""
     parser = argparse.ArgumentParser(description='Gestion de la base de données PadelVar')
-    parser.add_argument('command', choices=['init', 'migrate', 'upgrade', 'downgrade', 'reset'],
+    parser.add_argument('command', choices=['init', 'migrate', 'upgrade', 'downgrade', 'reset', 'profile'],
                        help='Commande à exécuter')
     parser.add_argument('--message', '-m', default='Auto migration',
                        help='Message pour la migration (utilisé avec migrate)')
@@ -129,6 +141,8 @@ def main():
     elif args.command == 'reset':
         reset_database(app)
         success = True
+    elif args.command == 'profile':
+        success = check_profile(app)
     
     if not success:
         sys.exit(1)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Migre les enregistrements locaux vers le CDN
+Usage: python scripts/migrate_to_cdn.py [--env development] [--limit 50] [--workers 4] [--watch 300]
+
+Même pipeline que la passe de fond (src/services/cdn_migrator.py) : lots de
+vidéos sans cdn_migrated_at, envois parallèles repris là où le stockage s'est
+arrêté, empreinte vérifiée, puis bascule de file_url. Relancer le script après
+une interruption reprend les envois en cours sans renvoyer les octets reçus.
+"""
+import sys
+import time
+import argparse
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.absolute()
+sys.path.insert(0, str(project_root))
+
+from src.main import create_app
+from src.services.cdn_migrator import cdn_migrator
+
+MARKERS = {'migrated': '✅', 'missing': '⚠️ ', 'changed': '↪️ ', 'error': '❌'}
+
+
+def run_pass(limit):
+    summary = cdn_migrator.run(limit=limit)
+    for result in summary['results']:
+        detail = result.get('url') or result.get('error') or ''
+        if result['status'] == 'migrated':
+            detail = (f"{result['size'] / 1e6:7.1f} Mo en {result['elapsed_seconds']:5.1f}s, "
+                      f"{result['attempts']} tentative(s), {result['sent'] / 1e6:.1f} Mo envoyés  {detail}")
+        print(f"{MARKERS.get(result['status'], '  ')} vidéo {result['video_id']:>6} {result['status']:<9} {detail}")
+    return summary
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description='Migre les vidéos locales vers le CDN')
+    parser.add_argument('--env', default='development', help='Configuration de l\'application')
+    parser.add_argument('--limit', type=int, help='Nombre maximal de vidéos traitées')
+    parser.add_argument('--workers', type=int, help='Envois simultanés')
+    parser.add_argument('--batch', type=int, help='Vidéos par lot')
+    parser.add_argument('--min-age', type=float, help='Âge minimal des vidéos (minutes)')
+    parser.add_argument('--watch', type=float, help='Relancer une passe toutes les N secondes')
+    args = parser.parse_args()
+
+    app = create_app(args.env)
+    if args.workers:
+        cdn_migrator.workers = args.workers
+    if args.batch:
+        cdn_migrator.batch_size = args.batch
+    if args.min_age is not None:
+        from datetime import timedelta
+        cdn_migrator.min_age = timedelta(minutes=args.min_age)
+
+    with app.app_context():
+        print(f"☁️  Migration vers le CDN ({app.config.get('CDN_BACKEND')}, {cdn_migrator.workers} envois "
+              f"simultanés, lots de {cdn_migrator.batch_size}) : {cdn_migrator.pending_count()} vidéo(s) en attente\n")
+        try:
+            while True:
+                summary = run_pass(args.limit)
+                stats = cdn_migrator.stats()
+                print(f"\n📊 {summary['processed']} vidéo(s) en {summary['elapsed_seconds']}s : {summary['counts']}, "
+                      f"{stats['bytes_sent'] / 1e6:.1f} Mo envoyés, {stats['retries']} nouvelle(s) tentative(s)")
+                if not args.watch:
+                    break
+                time.sleep(args.watch)
+        except KeyboardInterrupt:
+            cdn_migrator.shutdown()
+            print("\n🛑 Migration interrompue : les envois reprendront au prochain lancement")
+
+    if cdn_migrator.failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Caméra MJPEG de test
+Usage: python scripts/mjpeg_test_camera.py [--port 8081] [--cameras 4] [--fps 25]
+
+Simule les caméras IP des terrains sans matériel ni dépendance (ni OpenCV ni
+Pillow) : chaque caméra sert http://HOST:PORT/camera/<n> en
+multipart/x-mixed-replace, avec une mire animée (un bloc clair qui rebondit
+et un compteur d'images en binaire) encodée en JPEG baseline.
+
+--max-clients reproduit les caméras d'entrée de gamme qui refusent les
+connexions au-delà de 2 ou 3 clients : utile pour vérifier que le relais
+n'ouvre qu'une connexion par terrain.
+"""
+import sys
+import time
+import struct
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+BOUNDARY = 'padelvarcamera'
+
+# Table de Huffman DC luminance standard (JPEG annexe K.3)
+DC_BITS = (0, 1, 5, 1, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0)
+DC_VALUES = tuple(range(12))
+# Table AC minimale : les blocs sont uniformes, seul le symbole EOB (0x00) sert
+AC_BITS = (1,) + (0,) * 15
+AC_VALUES = (0x00,)
+
+
+def huffman_codes(bits, values):
+    """Codes canoniques {symbole: (code, longueur)}"""
+    codes, code, k = {}, 0, 0
+    for length, count in enumerate(bits, start=1):
+        for _ in range(count):
+            codes[values[k]] = (code, length)
+            code += 1
+            k += 1
+        code <<= 1
+    return codes
+
+
+DC_CODES = huffman_codes(DC_BITS, DC_VALUES)
+EOB_CODE = huffman_codes(AC_BITS, AC_VALUES)[0x00]
+
+
+def _segment(marker, payload):
+    return struct.pack('>BBH', 0xFF, marker, len(payload) + 2) + payload
+
+
+class BlockJPEGEncoder:
+    """
+    Encodeur JPEG baseline en niveaux de gris pour des images faites de blocs
+    8x8 uniformes : seul le coefficient DC est non nul, l'encodage est donc
+    trivial et assez rapide en Python pur pour 25 images/s.
+    """
+
+    def __init__(self, width, height):
+        if width % 8 or height % 8:
+            raise ValueError("Largeur et hauteur doivent être des multiples de 8")
+        self.width = width
+        self.height = height
+        self.blocks_x = width // 8
+        self.blocks_y = height // 8
+        self.header = b''.join((
+            b'\xff\xd8',
+            _segment(0xE0, b'JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00'),
+            _segment(0xDB, b'\x00' + b'\x01' * 64),  # quantification unitaire
+            _segment(0xC0, struct.pack('>BHHBBBB', 8, height, width, 1, 1, 0x11, 0)),
+            _segment(0xC4, b'\x00' + bytes(DC_BITS) + bytes(DC_VALUES)
+                     + b'\x10' + bytes(AC_BITS) + bytes(AC_VALUES)),
+        ))
+        self.scan_header = _segment(0xDA, bytes((1, 1, 0x00, 0, 63, 0)))
+
+    def encode(self, levels, comment=''):
+        """levels : niveaux de gris (0-255) des blocs, ligne par ligne"""
+        acc, nbits = 0, 0
+        out = bytearray()
+        previous_dc = 0
+        for level in levels:
+            dc = 8 * (level - 128)
+            diff = dc - previous_dc
+            previous_dc = dc
+            category = abs(diff).bit_length()
+            code, length = DC_CODES[category]
+            acc = (acc << length) | code
+            nbits += length
+            if category:
+                extra = diff if diff > 0 else diff + (1 << category) - 1
+                acc = (acc << category) | extra
+                nbits += category
+            acc = (acc << EOB_CODE[1]) | EOB_CODE[0]
+            nbits += EOB_CODE[1]
+            while nbits >= 8:
+                nbits -= 8
+                byte = (acc >> nbits) & 0xFF
+                out.append(byte)
+                if byte == 0xFF:
+                    out.append(0x00)  # bourrage
+            acc &= (1 << nbits) - 1
+        if nbits:
+            byte = ((acc << (8 - nbits)) | ((1 << (8 - nbits)) - 1)) & 0xFF
+            out.append(byte)
+            if byte == 0xFF:
+                out.append(0x00)
+
+        parts = [self.header]
+        if comment:
+            parts.append(_segment(0xFE, comment.encode('ascii')))
+        parts.extend((self.scan_header, bytes(out), b'\xff\xd9'))
+        return b''.join(parts)
+
+
+class TestPattern:
+    """Mire animée : fond en dégradé, bloc clair qui rebondit, compteur binaire"""
+
+    def __init__(self, camera_id, width, height):
+        self.camera_id = camera_id
+        self.encoder = BlockJPEGEncoder(width, height)
+        bx, by = self.encoder.blocks_x, self.encoder.blocks_y
+        self.background = [40 + (x * 120) // max(1, bx - 1) for y in range(by) for x in range(bx)]
+
+    def frame(self, index):
+        bx, by = self.encoder.blocks_x, self.encoder.blocks_y
+        levels = list(self.background)
+        # Balle de 2x2 blocs, trajectoire décalée par caméra
+        span_x, span_y = max(1, bx - 2), max(1, by - 3)
+        px = (index + self.camera_id * 7) % (2 * span_x)
+        py = (index // 2 + self.camera_id * 3) % (2 * span_y)
+        px = px if px < span_x else 2 * span_x - px
+        py = py if py < span_y else 2 * span_y - py
+        for dy in (0, 1):
+            for dx in (0, 1):
+                levels[(py + dy) * bx + px + dx] = 250
+        # Dernière ligne : compteur d'images en binaire
+        base = (by - 1) * bx
+        for bit in range(min(bx, 32)):
+            levels[base + bit] = 230 if (index >> bit) & 1 else 10
+        comment = f"padelvar camera={self.camera_id} frame={index} ts={time.time():.3f}"
+        return self.encoder.encode(levels, comment)
+
+
+class CameraServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, args):
+        super().__init__(address, CameraHandler)
+        self.args = args
+        self.patterns = {n: TestPattern(n, args.width, args.height) for n in range(1, args.cameras + 1)}
+        self.clients = {n: 0 for n in self.patterns}
+        self.total_connections = {n: 0 for n in self.patterns}
+        self.lock = threading.Lock()
+
+
+class CameraHandler(BaseHTTPRequestHandler):
+    server: CameraServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        parts = self.path.strip('/').split('/')
+        if len(parts) != 2 or parts[0] != 'camera' or not parts[1].isdigit() \
+                or int(parts[1]) not in self.server.patterns:
+            self.send_error(404, 'Caméra inconnue')
+            return
+        camera_id = int(parts[1])
+        server = self.server
+
+        with server.lock:
+            if server.args.max_clients and server.clients[camera_id] >= server.args.max_clients:
+                print(f"⛔ Caméra {camera_id}: connexion refusée ({server.clients[camera_id]} clients)")
+                self.send_error(503, 'Trop de clients')
+                return
+            server.clients[camera_id] += 1
+            server.total_connections[camera_id] += 1
+            print(f"🔌 Caméra {camera_id}: client connecté ({server.clients[camera_id]} actifs)")
+
+        self.send_response(200)
+        self.send_header('Content-Type', f'multipart/x-mixed-replace; boundary={BOUNDARY}')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+
+        pattern = server.patterns[camera_id]
+        interval = 1.0 / server.args.fps
+        deadline = time.monotonic()
+        index = 0
+        try:
+            while True:
+                frame = pattern.frame(index)
+                self.wfile.write(f'--{BOUNDARY}\r\nContent-Type: image/jpeg\r\n'
+                                 f'Content-Length: {len(frame)}\r\n\r\n'.encode('ascii'))
+                self.wfile.write(frame + b'\r\n')
+                index += 1
+                deadline += interval
+                time.sleep(max(0.0, deadline - time.monotonic()))
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            with server.lock:
+                server.clients[camera_id] -= 1
+                print(f"👋 Caméra {camera_id}: client déconnecté ({server.clients[camera_id]} actifs)")
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description='Caméras MJPEG de test')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--cameras', type=int, default=4, help='Nombre de caméras simulées')
+    parser.add_argument('--fps', type=float, default=25.0)
+    parser.add_argument('--width', type=int, default=320, help='Multiple de 8')
+    parser.add_argument('--height', type=int, default=240, help='Multiple de 8')
+    parser.add_argument('--max-clients', type=int, default=0,
+                        help='Clients simultanés par caméra (0 = illimité)')
+    parser.add_argument('--snapshot', help='Écrire une image JPEG de la caméra 1 puis quitter')
+    args = parser.parse_args()
+
+    if args.snapshot:
+        with open(args.snapshot, 'wb') as f:
+            f.write(TestPattern(1, args.width, args.height).frame(0))
+        print(f"📸 Image écrite dans {args.snapshot}")
+        return
+
+    server = CameraServer((args.host, args.port), args)
+    print(f"🎥 {args.cameras} caméras de test sur http://{args.host}:{args.port}/camera/<1-{args.cameras}> "
+          f"({args.width}x{args.height}, {args.fps:g} img/s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Arrêt des caméras de test")
+    finally:
+        server.server_close()
+    sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()
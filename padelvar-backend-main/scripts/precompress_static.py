@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Précompression des fichiers statiques du frontend
+Usage: python scripts/precompress_static.py [--root src/static] [--min-size 1024]
+
+Génère à côté de chaque fichier texte (js, css, html, svg, json...) une
+variante .gz (gzip -9) et, si le module brotli est installé, une variante .br.
+À lancer après chaque copie du build du frontend dans src/static (étape de
+build) : l'application ne fait qu'indexer les variantes au démarrage
+(src/services/static_assets.py), sans rien écrire. Chaque variante est
+écrite dans un fichier temporaire puis renommée. Les variantes ne sont pas
+versionnées (.gitignore).
+"""
+import sys
+import argparse
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.absolute()
+sys.path.insert(0, str(project_root))
+
+from src.services.static_assets import COMPRESSIBLE_EXTENSIONS, compress_file
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description='Précompression des fichiers statiques')
+    parser.add_argument('--root', default=str(project_root / 'src' / 'static'), help='Dossier static')
+    parser.add_argument('--min-size', type=int, default=1024, help='Taille minimale à compresser (octets)')
+    parser.add_argument('--clean', action='store_true', help='Supprimer les variantes .gz/.br existantes')
+    args = parser.parse_args()
+
+    root = Path(args.root)
+    if not root.is_dir():
+        print(f"❌ Dossier introuvable: {root}")
+        sys.exit(1)
+
+    if args.clean:
+        for variant in list(root.rglob('*.gz')) + list(root.rglob('*.br')):
+            variant.unlink()
+        print("🗑️  Variantes supprimées")
+        return
+
+    if brotli is None:
+        print("⚠️  Module brotli absent : seules les variantes gzip sont générées (pip install brotli)")
+
+    print(f"🗜️  Précompression de {root}")
+    total_original = total_best = 0
+    for path in sorted(root.rglob('*')):
+        if not path.is_file() or path.suffix not in COMPRESSIBLE_EXTENSIONS:
+            continue
+        if path.stat().st_size < args.min_size:
+            continue
+        original = path.stat().st_size
+        written = compress_file(str(path), brotli is not None)
+        best = min(written.values()) if written else original
+        total_original += original
+        total_best += best
+        sizes = ', '.join(f"{encoding}={size:,}" for encoding, size in written.items())
+        print(f"   {path.relative_to(root)}: {original:,} → {sizes or 'non compressible'}")
+
+    if total_original:
+        print(f"✅ {total_original:,} → {total_best:,} octets ({100 - total_best * 100 / total_original:.0f}% économisés)")
+
+
+if __name__ == '__main__':
+    main()
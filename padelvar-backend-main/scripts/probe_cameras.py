@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Sonde toutes les caméras des terrains et affiche leur état
+Usage: python scripts/probe_cameras.py [--env development] [--timeout 3] [--workers 8]
+
+Même sonde que la surveillance de fond (src/services/camera_health.py) :
+latence, résolution et images/s par terrain, en parallèle.
+Code de sortie 1 si au moins une caméra est hors ligne.
+"""
+import sys
+import time
+import argparse
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.absolute()
+sys.path.insert(0, str(project_root))
+
+from src.main import create_app
+from src.services.camera_health import camera_health, STATUS_OFFLINE
+
+MARKERS = {'online': '✅', 'degraded': '⚠️ ', 'offline': '❌'}
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description='Sonde les caméras des terrains')
+    parser.add_argument('--env', default='development', help='Configuration de l\'application')
+    parser.add_argument('--timeout', type=float, help='Délai maximal par sonde (secondes)')
+    parser.add_argument('--workers', type=int, help='Sondes simultanées')
+    args = parser.parse_args()
+
+    app = create_app(args.env)
+    if args.timeout:
+        camera_health.timeout = args.timeout
+    if args.workers:
+        camera_health.workers = args.workers
+
+    print(f"📡 Sonde des caméras ({camera_health.workers} en parallèle, délai {camera_health.timeout:g}s)...")
+    started = time.perf_counter()
+    with app.app_context():
+        statuses = camera_health.probe_all()
+        camera_health.shutdown()
+    print(f"   {len(statuses)} caméras en {time.perf_counter() - started:.1f}s\n")
+
+    print(f"   {'terrain':>7} {'état':<9} {'latence':>9} {'img/s':>6} {'résolution':>11}  url / erreur")
+    for status in sorted(statuses.values(), key=lambda s: s['court_id']):
+        latency = f"{status['latency_ms']:.0f}ms" if status['latency_ms'] is not None else '-'
+        fps = f"{status['fps']:.1f}" if status['fps'] is not None else '-'
+        resolution = f"{status['width']}x{status['height']}" if status['width'] else '-'
+        detail = status['error'] or status['camera_url']
+        print(f"{MARKERS.get(status['status'], '  ')} {status['court_id']:>7} {status['status']:<9} "
+              f"{latency:>9} {fps:>6} {resolution:>11}  {detail}")
+
+    offline = [s for s in statuses.values() if s['status'] == STATUS_OFFLINE]
+    if offline:
+        print(f"\n❌ {len(offline)} caméra(s) hors ligne")
+        sys.exit(1)
+    print("\n✅ Toutes les caméras répondent")
+
+
+if __name__ == '__main__':
+    main()
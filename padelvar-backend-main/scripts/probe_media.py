@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Sonde les vidéos et corrige les durées enregistrées
+Usage: python scripts/probe_media.py [--env development] [--refresh] [--repair-sessions]
+       python scripts/probe_media.py --file static/videos/match.mp4
+
+Même sonde que l'application (src/services/media_probe.py) : chaque vidéo dont
+le fichier est présent sur ce serveur est mesurée une fois (durée, résolution,
+codecs, débit, images clés) et Video.duration / Video.file_size sont recopiés
+depuis la mesure. Les fichiers déjà sondés et inchangés ne sont pas relus.
+
+--repair-sessions recalcule en secondes, depuis la session d'enregistrement, la
+durée des vidéos sans fichier local (les arrêts par le club l'enregistraient en
+minutes).
+"""
+import sys
+import time
+import argparse
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.absolute()
+sys.path.insert(0, str(project_root))
+
+from src.services.media_probe import probe_file
+
+BATCH_SIZE = 200
+
+
+def probe_one(path):
+    """Mesure un fichier sans base de données"""
+    probe = probe_file(path)
+    print(f"🎞️  {path} ({probe['source']}, {probe['elapsed_ms']}ms)")
+    print(f"   durée {probe['duration']:.3f}s, {probe['width']}x{probe['height']} à {probe['fps']} img/s")
+    print(f"   codecs {probe['video_codec']} / {probe['audio_codec'] or 'sans audio'}, "
+          f"{(probe['bitrate'] or 0) / 1e6:.2f} Mbit/s, {probe['file_size'] / 1e6:.1f} Mo")
+    keyframes = probe['keyframes']
+    if len(keyframes) > 1:
+        print(f"   {len(keyframes)} images clés, une toutes les "
+              f"{(keyframes[-1] - keyframes[0]) / (len(keyframes) - 1):.2f}s")
+
+
+def backfill(refresh, limit):
+    """Sonde les vidéos par lots (ordre des id) ; retourne les compteurs"""
+    from src.models.user import db, Video
+    from src.services.media_probe import media_probe
+    from src.services.video_capture_service import video_capture_service
+
+    counts = {'probed': 0, 'unchanged': 0, 'missing': 0, 'failed': 0}
+    after_id = 0
+    seen = 0
+    while limit is None or seen < limit:
+        videos = Video.query.filter(Video.id > after_id).order_by(Video.id).limit(BATCH_SIZE).all()
+        if not videos:
+            break
+        for video in videos:
+            after_id = video.id
+            if limit is not None and seen >= limit:
+                break
+            seen += 1
+            if video_capture_service.local_video_path(video.file_url) is None:
+                counts['missing'] += 1
+                continue
+            previous_duration, probed = video.duration, media_probe.probed
+            record = media_probe.probe_video(video, refresh=refresh)
+            if record is None:
+                counts['failed'] += 1
+                print(f"❌ vidéo {video.id:>6} illisible")
+            elif media_probe.probed == probed:
+                counts['unchanged'] += 1
+            else:
+                counts['probed'] += 1
+                print(f"✅ vidéo {video.id:>6} {record.duration:9.1f}s {record.width}x{record.height} "
+                      f"{record.video_codec}/{record.audio_codec or '-'}  (durée {previous_duration} -> {video.duration})")
+        db.session.expunge_all()
+    return counts
+
+
+def repair_sessions():
+    """Durées en secondes depuis les sessions arrêtées, pour les vidéos sans mesure"""
+    from src.models.user import db, Video, VideoMetadata, RecordingSession
+
+    rows = db.session.query(Video, RecordingSession).join(
+        RecordingSession,
+        (RecordingSession.user_id == Video.user_id)
+        & (RecordingSession.court_id == Video.court_id)
+        & (RecordingSession.start_time == Video.recorded_at)
+    ).outerjoin(VideoMetadata, VideoMetadata.video_id == Video.id).filter(
+        VideoMetadata.id.is_(None),
+        RecordingSession.end_time.isnot(None)
+    ).all()
+
+    repaired = 0
+    for video, recording_session in rows:
+        seconds = max(1, int((recording_session.end_time - recording_session.start_time).total_seconds()))
+        if video.duration != seconds:
+            print(f"🔧 vidéo {video.id:>6} durée {video.duration} -> {seconds}s "
+                  f"(session {recording_session.recording_id})")
+            video.duration = seconds
+            repaired += 1
+    db.session.commit()
+    return repaired
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description='Sonde les vidéos et corrige les durées enregistrées')
+    parser.add_argument('--env', default='development', help='Configuration de l\'application')
+    parser.add_argument('--file', help='Sonder un seul fichier, sans base de données')
+    parser.add_argument('--refresh', action='store_true', help='Resonder même les fichiers inchangés')
+    parser.add_argument('--limit', type=int, help='Nombre maximal de vidéos parcourues')
+    parser.add_argument('--repair-sessions', action='store_true',
+                        help='Recalculer depuis les sessions la durée des vidéos sans fichier local')
+    args = parser.parse_args()
+
+    if args.file:
+        try:
+            probe_one(args.file)
+        except (OSError, ValueError) as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        return
+
+    from src.main import create_app
+    from src.services.media_probe import media_probe
+
+    app = create_app(args.env)
+    with app.app_context():
+        started = time.monotonic()
+        print("🔍 Sonde des vidéos présentes sur ce serveur...\n")
+        counts = backfill(args.refresh, args.limit)
+        stats = media_probe.stats()
+        print(f"\n📊 {counts} en {time.monotonic() - started:.1f}s "
+              f"(sonde moyenne {stats['avg_probe_ms'] or 0}ms)")
+
+        if args.repair_sessions:
+            print(f"\n🔧 {repair_sessions()} durée(s) corrigée(s) depuis les sessions d'enregistrement")
+
+    if counts['failed']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
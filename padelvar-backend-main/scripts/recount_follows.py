@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Recalcule les compteurs d'abonnements joueurs <-> clubs
+Usage: python scripts/recount_follows.py [--env development]
+
+Club.followers_count et User.followed_clubs_count sont tenus à jour par
+src/services/follow_graph.py. Après des insertions directes dans
+player_club_follows (scripts de données de test, import SQL), ce script
+corrige les compteurs qui ne correspondent plus à la table.
+"""
+import sys
+import time
+import argparse
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.absolute()
+sys.path.insert(0, str(project_root))
+
+from src.main import create_app
+from src.services.follow_graph import follow_graph
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description='Recalcule les compteurs d\'abonnements aux clubs')
+    parser.add_argument('--env', default='development', help='Configuration de l\'application')
+    args = parser.parse_args()
+
+    app = create_app(args.env)
+    with app.app_context():
+        from src.models.user import db
+
+        started = time.monotonic()
+        repaired = follow_graph.recount()
+        db.session.commit()
+        print(f"✅ {repaired} compteur(s) corrigé(s) en {time.monotonic() - started:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Stockage HTTP de test pour la migration CDN
+Usage: python scripts/storage_test_server.py [--port 8090] [--root /tmp/cdn] [--fail-rate 0.2]
+
+Implémente le protocole de HTTPChunkedBackend (src/services/storage_backends.py)
+au-dessus d'un dossier local :
+- HEAD /upload/<clé>            -> Upload-Offset (octets déjà reçus)
+- PUT  /upload/<clé>            Content-Range: bytes début-fin/total
+- POST /upload/<clé>?complete   X-Checksum-SHA256 -> {"url": ...}
+- GET  /files/<clé>             fichier publié
+
+--fail-rate renvoie des 503 au hasard et --partial-rate n'écrit qu'une partie
+du morceau avant l'erreur : de quoi vérifier reprise et nouvelles tentatives.
+"""
+import sys
+import json
+import random
+import argparse
+import threading
+from pathlib import Path
+from urllib.parse import urlparse, unquote
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+project_root = Path(__file__).parent.parent.absolute()
+sys.path.insert(0, str(project_root))
+
+from src.services.storage_backends import LocalDirectoryBackend, StorageError
+
+
+class StorageServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, args):
+        super().__init__(address, StorageHandler)
+        self.args = args
+        self.backend = LocalDirectoryBackend(args.root, f"http://{args.host}:{args.port}/files")
+        self.lock = threading.Lock()
+        self.received = 0
+        self.injected_failures = 0
+
+
+class StorageHandler(BaseHTTPRequestHandler):
+    server: StorageServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def _key(self, prefix):
+        path = unquote(urlparse(self.path).path)
+        if not path.startswith(prefix) or len(path) <= len(prefix):
+            self.send_error(404)
+            return None
+        return path[len(prefix):]
+
+    def _authorized(self):
+        if self.server.args.api_key and self.headers.get('Authorization') != f"Bearer {self.server.args.api_key}":
+            self.send_error(401)
+            return False
+        return True
+
+    def _inject_failure(self):
+        if random.random() < self.server.args.fail_rate:
+            with self.server.lock:
+                self.server.injected_failures += 1
+            self.send_error(503, 'Panne simulée')
+            return True
+        return False
+
+    def do_HEAD(self):
+        key = self._key('/upload/')
+        if key is None or not self._authorized():
+            return
+        with self.server.lock:
+            offset = self.server.backend.uploaded_bytes(key)
+        self.send_response(200)
+        self.send_header('Upload-Offset', str(offset))
+        self.end_headers()
+
+    def do_PUT(self):
+        key = self._key('/upload/')
+        if key is None or not self._authorized():
+            return
+        try:
+            unit, _, span = self.headers['Content-Range'].partition(' ')
+            start = int(span.split('-')[0])
+            total = int(span.split('/')[1])
+        except (AttributeError, IndexError, ValueError):
+            self.send_error(400, 'Content-Range invalide')
+            return
+        data = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if self._inject_failure():
+            return
+        partial = random.random() < self.server.args.partial_rate
+        with self.server.lock:
+            try:
+                self.server.backend.upload_chunk(key, start, data[:len(data) // 2] if partial else data, total)
+            except StorageError as e:
+                self.send_error(409, str(e))
+                return
+            self.server.received += len(data) // 2 if partial else len(data)
+        if partial:
+            self.send_error(500, 'Coupure simulée en cours de morceau')
+            return
+        self.send_response(204)
+        self.end_headers()
+
+    def do_POST(self):
+        key = self._key('/upload/')
+        if key is None or not self._authorized():
+            return
+        if 'complete' not in urlparse(self.path).query:
+            self.send_error(400)
+            return
+        size = self.server.backend.uploaded_bytes(key)
+        with self.server.lock:
+            try:
+                url = self.server.backend.complete(key, self.headers.get('X-Checksum-SHA256', ''), size)
+            except StorageError as e:
+                self.send_error(422, str(e))
+                return
+        body = json.dumps({'url': url, 'size': size}).encode()
+        print(f"📦 {key} publié ({size} octets)")
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        key = self._key('/files/')
+        if key is None:
+            return
+        try:
+            path = self.server.backend._final(key)
+        except StorageError:
+            self.send_error(404)
+            return
+        if not path.is_file():
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'video/mp4')
+        self.send_header('Content-Length', str(path.stat().st_size))
+        self.end_headers()
+        with open(path, 'rb') as f:
+            while chunk := f.read(1024 * 1024):
+                self.wfile.write(chunk)
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description='Stockage HTTP de test (migration CDN)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--root', default='static/cdn-test', help='Dossier de stockage')
+    parser.add_argument('--api-key', help='Jeton Bearer exigé (CDN_API_KEY)')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='Part des envois refusés (503)')
+    parser.add_argument('--partial-rate', type=float, default=0.0,
+                        help='Part des morceaux coupés à mi-chemin (500)')
+    args = parser.parse_args()
+
+    server = StorageServer((args.host, args.port), args)
+    print(f"🗄️  Stockage de test sur http://{args.host}:{args.port} (dossier {args.root}, "
+          f"pannes {args.fail_rate:.0%}, coupures {args.partial_rate:.0%})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n🛑 Arrêt du stockage de test : {server.received} octets reçus, "
+              f"{server.injected_failures} pannes simulées")
+    finally:
+        server.server_close()
+    sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()
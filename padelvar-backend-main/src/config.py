@@ -15,6 +15,200 @@ class Config:
     DEFAULT_ADMIN_PASSWORD = os.environ.get('DEFAULT_ADMIN_PASSWORD', 'password123')
     DEFAULT_ADMIN_NAME = 'Super Admin'
     DEFAULT_ADMIN_CREDITS = 10000
+    
+    # Stockage des enregistrements (dossiers créés à la première capture)
+    VIDEO_STORAGE_PATH = os.environ.get('VIDEO_STORAGE_PATH', 'static/videos')
+    THUMBNAILS_STORAGE_PATH = os.environ.get('THUMBNAILS_STORAGE_PATH', 'static/thumbnails')
+    
+    # Encodage en direct rapide : la qualité finale est produite après le match
+    RECORDING_PRESET = os.environ.get('RECORDING_PRESET', 'veryfast')
+    RECORDING_CRF = int(os.environ.get('RECORDING_CRF', 23))
+    
+    # Enregistreur OpenCV (repli sans FFmpeg) : cadence cible et tampon d'images
+    RECORDING_FPS = int(os.environ.get('RECORDING_FPS', 25))
+    OPENCV_RING_SIZE = int(os.environ.get('OPENCV_RING_SIZE', 8))
+    OPENCV_FOURCC = os.environ.get('OPENCV_FOURCC', 'mp4v')
+    
+    # Détection des échanges après enregistrement (pool de processus)
+    HIGHLIGHTS_ENABLED = os.environ.get('HIGHLIGHTS_ENABLED', 'True').lower() == 'true'
+    HIGHLIGHTS_WORKERS = int(os.environ.get('HIGHLIGHTS_WORKERS', 1))
+    HIGHLIGHTS_AUTO_EXPORT = os.environ.get('HIGHLIGHTS_AUTO_EXPORT', 'False').lower() == 'true'
+    HIGHLIGHTS_SAMPLE_FPS = 5.0      # images analysées par seconde
+    HIGHLIGHTS_FRAME_WIDTH = 160     # résolution d'analyse
+    HIGHLIGHTS_FRAME_HEIGHT = 90
+    HIGHLIGHTS_MIN_RALLY = 4.0       # secondes
+    HIGHLIGHTS_MAX_GAP = 3.0         # pause fusionnée dans l'échange (secondes)
+    HIGHLIGHTS_PADDING = 1.5         # marge avant / après chaque échange (secondes)
+    
+    # Extraits partagés : copie des flux alignée sur les images clés
+    CLIPS_STORAGE_PATH = os.environ.get('CLIPS_STORAGE_PATH', 'static/clips')
+    CLIP_WORKERS = int(os.environ.get('CLIP_WORKERS', 2))
+    CLIP_SYNC_MAX_SECONDS = 60.0     # au-delà : tâche asynchrone (202)
+    CLIP_MAX_SECONDS = 300.0
+    CLIP_CACHE_MAX_BYTES = int(os.environ.get('CLIP_CACHE_MAX_BYTES', 2 * 1024 ** 3))
+    CLIP_INDEX_CACHE_SIZE = 64       # index d'images clés gardés en mémoire
+    CLIP_JOB_TTL = 600.0             # secondes pendant lesquelles une extraction en erreur reste consultable
+    
+    # Échelle de qualités HLS encodée après le match (file priorisée)
+    TRANSCODE_ENABLED = os.environ.get('TRANSCODE_ENABLED', 'True').lower() == 'true'
+    HLS_STORAGE_PATH = os.environ.get('HLS_STORAGE_PATH', 'static/hls')
+    TRANSCODE_LADDER = None          # défaut : 1080p 5000k, 720p 2800k, 480p 1200k, 240p 400k
+    TRANSCODE_PRESET = os.environ.get('TRANSCODE_PRESET', 'medium')
+    TRANSCODE_THREADS = int(os.environ.get('TRANSCODE_THREADS', 2))            # par encodage
+    TRANSCODE_MAX_CONCURRENT = int(os.environ.get('TRANSCODE_MAX_CONCURRENT', 0))  # 0 = automatique
+    TRANSCODE_MAX_LOAD = float(os.environ.get('TRANSCODE_MAX_LOAD', 0.8))     # charge par cœur
+    TRANSCODE_YIELD_TO_LIVE = True   # une capture en direct occupe un créneau d'encodage
+    TRANSCODE_MAX_ATTEMPTS = 3
+    TRANSCODE_STALE_MINUTES = 180    # tâche 'running' plus ancienne : processus arrêté, remise en file
+    HLS_SEGMENT_SECONDS = 4
+    
+    # Stockage local à deux niveaux et admission des captures
+    STORAGE_COLD_PATH = os.environ.get('STORAGE_COLD_PATH')  # disque lent ou NAS ; vide = pas de niveau froid
+    STORAGE_HOT_DAYS = int(os.environ.get('STORAGE_HOT_DAYS', 7))           # sans accès : vers le niveau froid
+    STORAGE_RETENTION_DAYS = int(os.environ.get('STORAGE_RETENTION_DAYS', 30))  # sans accès : supprimable
+    STORAGE_MIN_FREE_BYTES = int(os.environ.get('STORAGE_MIN_FREE_BYTES', 20 * 1024 ** 3))  # marge par disque
+    STORAGE_CLUB_QUOTA_BYTES = int(os.environ.get('STORAGE_CLUB_QUOTA_BYTES', 0))  # 0 = sans quota
+    STORAGE_CLUB_QUOTAS = {}         # quotas par club, ex. {3: 500 * 1024 ** 3}
+    STORAGE_EVICTION_BATCH = 50      # fichiers libérés par transaction
+    STORAGE_SWEEP_INTERVAL = float(os.environ.get('STORAGE_SWEEP_INTERVAL', 900))  # secondes ; 0 = pas de balayage
+    # Verrou du processus qui balaie (défaut : instance/storage_sweeper.lock) : un seul balayage à la fois
+    STORAGE_SWEEP_LOCK_FILE = os.environ.get('STORAGE_SWEEP_LOCK_FILE')
+    BLOB_STORE_PATH = os.environ.get('BLOB_STORE_PATH', 'static/videos/blobs')  # même disque que les captures
+    BLOB_GC_GRACE_HOURS = int(os.environ.get('BLOB_GC_GRACE_HOURS', 24))  # délai avant suppression sans référence
+    RECORDING_ESTIMATED_BITRATE = int(os.environ.get('RECORDING_ESTIMATED_BITRATE', 4_000_000))  # bits/s
+    RECORDING_SPACE_MARGIN = 1.2     # marge sur la taille projetée d'une capture
+    
+    # Finalisation des enregistrements expirés, hors des requêtes (voir services/recording_sweeper.py)
+    RECORDING_SWEEP_INTERVAL = float(os.environ.get('RECORDING_SWEEP_INTERVAL', 30))  # secondes ; 0 = pas de balayage
+    RECORDING_SWEEP_BATCH = int(os.environ.get('RECORDING_SWEEP_BATCH', 100))         # sessions par transaction
+    
+    # Migration des enregistrements vers le CDN (voir scripts/migrate_to_cdn.py)
+    CDN_MIGRATION_ENABLED = os.environ.get('CDN_MIGRATION_ENABLED', 'False').lower() == 'true'
+    CDN_BACKEND = os.environ.get('CDN_BACKEND', 'local')          # 'local', 'http' ou 'bunny'
+    CDN_LOCAL_ROOT = os.environ.get('CDN_LOCAL_ROOT', 'static/cdn')
+    CDN_PUBLIC_BASE_URL = os.environ.get('CDN_PUBLIC_BASE_URL', '/cdn')  # local : /cdn (route de l'app) ou URL absolue
+    CDN_HTTP_URL = os.environ.get('CDN_HTTP_URL')
+    CDN_STORAGE_ZONE = os.environ.get('CDN_STORAGE_ZONE')
+    CDN_API_KEY = os.environ.get('CDN_API_KEY')
+    CDN_MIGRATION_WORKERS = int(os.environ.get('CDN_MIGRATION_WORKERS', 4))  # envois simultanés
+    CDN_MIGRATION_BATCH = int(os.environ.get('CDN_MIGRATION_BATCH', 20))     # vidéos par lot
+    CDN_MIGRATION_MIN_AGE_MINUTES = 10  # laisse finir analyse et extraits avant migration
+    CDN_CHUNK_SIZE = int(os.environ.get('CDN_CHUNK_SIZE', 8 * 1024 * 1024))
+    CDN_MAX_RETRIES = 5
+    CDN_RETRY_BASE_DELAY = 1.0       # secondes, doublées à chaque tentative
+    CDN_DELETE_LOCAL = os.environ.get('CDN_DELETE_LOCAL', 'False').lower() == 'true'
+    
+    # Bibliothèque vidéo des joueurs : pages par curseur, total en cache
+    LIBRARY_PAGE_SIZE = 50
+    LIBRARY_MY_VIDEOS_PAGE_SIZE = 100  # /videos/my-videos sans ?limit= (page suivante via next_cursor)
+    LIBRARY_MAX_PAGE_SIZE = 200
+    LIBRARY_COUNT_TTL = 60.0         # secondes ; invalidé dès qu'une vidéo du joueur change
+    
+    # Abonnements joueurs <-> clubs : compteurs dénormalisés, abonnés paginés par curseur
+    FOLLOW_MAX_CLUBS = int(os.environ.get('FOLLOW_MAX_CLUBS', 10))  # clubs suivis par joueur
+    FOLLOWERS_PAGE_SIZE = 100         # /clubs/followers sans ?limit= (page suivante via next_cursor)
+    FOLLOWERS_MAX_PAGE_SIZE = 500
+    
+    # Routes joueurs : taille maximale des listes (historique, flux, classement, recherche)
+    PLAYER_LIST_MAX_LIMIT = 100
+    
+    # Historique des actions : écriture différée par lots, garantie choisie par type d'action
+    AUDIT_WRITE_BEHIND = os.environ.get('AUDIT_WRITE_BEHIND', 'True').lower() == 'true'
+    AUDIT_QUEUE_SIZE = int(os.environ.get('AUDIT_QUEUE_SIZE', 10000))  # file pleine => insertion immédiate
+    AUDIT_BATCH_SIZE = 500
+    AUDIT_FLUSH_INTERVAL = float(os.environ.get('AUDIT_FLUSH_INTERVAL', 1.0))  # retard maximal de l'historique
+    AUDIT_DEFAULT_DURABILITY = 'write_behind'
+    AUDIT_DURABILITY = {
+        # Crédits et déblocages : dans la transaction de la requête
+        # (toutes les actions de audit_log.CREDIT_ACTIONS, vérifié au démarrage)
+        'add_credits': 'transactional',
+        'buy_credits': 'transactional',
+        'bulk_update_credits': 'transactional',
+        'unlock_video': 'transactional',
+        'start_recording': 'transactional',  # débite un crédit
+        # Traces sans conséquence : abandonnées si la file déborde
+        'mark_video_seen': 'best_effort',
+        'export_data': 'best_effort',
+    }
+    
+    # Profil moteur de base de données : 'auto' (déduit de l'URI), 'sqlite' ou 'server'
+    DATABASE_PROFILE = os.environ.get('DATABASE_PROFILE', 'auto')
+    
+    # Profil SQLite : WAL pour que lectures et écritures ne se bloquent pas
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+    SQLITE_CACHE_SIZE_KB = int(os.environ.get('SQLITE_CACHE_SIZE_KB', 20000))
+    
+    # Profil serveur (PostgreSQL, MySQL) : pool de connexions
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 20))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'True').lower() == 'true'
+    
+    # Profileur de requêtes SQL (opt-in) : compteurs par endpoint et budgets
+    QUERY_PROFILER_ENABLED = os.environ.get('QUERY_PROFILER_ENABLED', 'False').lower() == 'true'
+    QUERY_PROFILER_SLOW_MS = float(os.environ.get('QUERY_PROFILER_SLOW_MS', 50))
+    QUERY_PROFILER_MAX_SLOW = 5      # requêtes lentes conservées par endpoint
+    QUERY_PROFILER_WINDOW = 500      # taille de la fenêtre glissante par endpoint
+    QUERY_BUDGET_DEFAULT = None      # budget global de requêtes par endpoint
+    QUERY_BUDGETS = {}               # budgets par endpoint, ex. {'players.get_player_dashboard': 15}
+    QUERY_BUDGET_STRICT = False      # lever QueryBudgetExceeded au lieu de journaliser
+    
+    # Hachage des mots de passe : méthode werkzeug et pool borné
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 0))  # 0 = min(4, CPU)
+    PASSWORD_HASH_QUEUE_SIZE = int(os.environ.get('PASSWORD_HASH_QUEUE_SIZE', 16))
+    PASSWORD_HASH_TIMEOUT = float(os.environ.get('PASSWORD_HASH_TIMEOUT', 10))
+    PASSWORD_HASH_RETRY_AFTER = int(os.environ.get('PASSWORD_HASH_RETRY_AFTER', 1))
+    
+    # Sérialisation JSON : 'auto' (orjson si installé), 'orjson' ou 'stdlib'
+    JSON_PROVIDER = os.environ.get('JSON_PROVIDER', 'auto')
+    
+    # Compression des réponses API (gzip, brotli si installé) au-delà du seuil
+    COMPRESS_ENABLED = os.environ.get('COMPRESS_ENABLED', 'True').lower() == 'true'
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+    COMPRESS_GZIP_LEVEL = int(os.environ.get('COMPRESS_GZIP_LEVEL', 6))
+    COMPRESS_BROTLI_LEVEL = int(os.environ.get('COMPRESS_BROTLI_LEVEL', 4))
+    COMPRESS_MIMETYPES = None        # défaut : JSON, HTML, texte, CSS, CSV, JavaScript
+    
+    # Relais des flux caméra : une connexion amont par terrain
+    CAMERA_RELAY_ENABLED = os.environ.get('CAMERA_RELAY_ENABLED', 'True').lower() == 'true'
+    CAMERA_RELAY_RING_SIZE = int(os.environ.get('CAMERA_RELAY_RING_SIZE', 50))           # images
+    CAMERA_RELAY_IDLE_TIMEOUT = float(os.environ.get('CAMERA_RELAY_IDLE_TIMEOUT', 30))   # secondes
+    CAMERA_RELAY_CONNECT_TIMEOUT = float(os.environ.get('CAMERA_RELAY_CONNECT_TIMEOUT', 5))
+    CAMERA_RELAY_MAX_VIEWERS = int(os.environ.get('CAMERA_RELAY_MAX_VIEWERS', 20))       # par terrain
+    CAMERA_RELAY_VIEWER_MAX_LAG = 2  # images de retard tolérées avant saut à la plus récente
+    # Verrou du processus qui relaie (défaut : instance/camera_relay.lock) ; un seul worker
+    CAMERA_RELAY_LOCK_FILE = os.environ.get('CAMERA_RELAY_LOCK_FILE')
+    
+    # Sondes des caméras : état en cache par terrain, rafraîchi en arrière-plan
+    CAMERA_PROBE_ENABLED = os.environ.get('CAMERA_PROBE_ENABLED', 'True').lower() == 'true'
+    CAMERA_PROBE_INTERVAL = float(os.environ.get('CAMERA_PROBE_INTERVAL', 60))   # secondes
+    CAMERA_PROBE_TIMEOUT = float(os.environ.get('CAMERA_PROBE_TIMEOUT', 3))      # par sonde
+    CAMERA_PROBE_WORKERS = int(os.environ.get('CAMERA_PROBE_WORKERS', 8))
+    CAMERA_PROBE_SAMPLE_FRAMES = 5   # images lues pour mesurer l'fps
+    CAMERA_PROBE_MIN_FPS = 10.0      # en dessous : caméra dégradée
+    CAMERA_PROBE_SLOW_MS = 1500.0    # latence au-delà de laquelle la caméra est dégradée
+    CAMERA_PROBE_BLOCK_OFFLINE = os.environ.get('CAMERA_PROBE_BLOCK_OFFLINE', 'True').lower() == 'true'
+    
+    # Claims d'identité en session : revalidés en base au-delà de ce délai
+    IDENTITY_REVALIDATE_SECONDS = int(os.environ.get('IDENTITY_REVALIDATE_SECONDS', 300))
+    
+    # Cache des réponses de lecture (tableaux de bord, statistiques, clubs)
+    RESPONSE_CACHE_ENABLED = os.environ.get('RESPONSE_CACHE_ENABLED', 'True').lower() == 'true'
+    # 'auto' : Redis si RESPONSE_CACHE_REDIS_URL est défini, sinon cache désactivé ;
+    # 'memory' : mémoire du processus, à réserver à un déploiement à un seul worker
+    RESPONSE_CACHE_BACKEND = os.environ.get('RESPONSE_CACHE_BACKEND', 'auto')  # 'auto', 'memory', 'shared-local' ou 'redis'
+    RESPONSE_CACHE_REDIS_URL = os.environ.get('RESPONSE_CACHE_REDIS_URL')
+    # Processus qui servent l'application (gunicorn lit WEB_CONCURRENCY) : au-delà d'un, 'memory' refusé
+    RESPONSE_CACHE_WORKERS = int(os.environ.get('WEB_CONCURRENCY', 1))
+    RESPONSE_CACHE_PREFIX = 'padelvar:cache:'
+    RESPONSE_CACHE_TTL = float(os.environ.get('RESPONSE_CACHE_TTL', 60))            # secondes
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 2048))  # LRU du processus
+    RESPONSE_CACHE_LIVE_TTL = 15     # tableau de bord club : minutes restantes des enregistrements
 
     @staticmethod
     def init_app(app):
@@ -28,6 +222,34 @@ class Config:
         """Retourne l'URI de la base de données."""
         return 'sqlite:///' + os.path.join(app.instance_path, 'app.db')
 
+    @staticmethod
+    def get_engine_profile(app):
+        """Retourne le profil moteur actif ('sqlite' ou 'server')."""
+        profile = app.config.get('DATABASE_PROFILE', 'auto')
+        if profile != 'auto':
+            return profile
+        uri = app.config.get('SQLALCHEMY_DATABASE_URI') or ''
+        return 'sqlite' if uri.startswith('sqlite') else 'server'
+
+    @staticmethod
+    def get_engine_options(app):
+        """Retourne les options SQLAlchemy du profil moteur actif."""
+        if Config.get_engine_profile(app) == 'sqlite':
+            # Les PRAGMA sont appliqués à chaque connexion (voir models/database.py)
+            return {
+                'connect_args': {
+                    'timeout': app.config['SQLITE_BUSY_TIMEOUT_MS'] / 1000,
+                    'check_same_thread': False
+                }
+            }
+        return {
+            'pool_size': app.config['DB_POOL_SIZE'],
+            'max_overflow': app.config['DB_MAX_OVERFLOW'],
+            'pool_timeout': app.config['DB_POOL_TIMEOUT'],
+            'pool_recycle': app.config['DB_POOL_RECYCLE'],
+            'pool_pre_ping': app.config['DB_POOL_PRE_PING']
+        }
+
     def validate(self):
         """Valide que les variables critiques sont définies."""
         if not self.SECRET_KEY or self.SECRET_KEY == 'une-cle-secrete-difficile-a-deviner':
@@ -65,7 +287,18 @@ class ProductionConfig(Config):
 class TestingConfig(Config):
     """Configuration pour les tests."""
     TESTING = True
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    # Base jetable : mémoire par défaut, fichier ou serveur pour les benchmarks
+    SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URL', 'sqlite:///:memory:')
+    QUERY_PROFILER_ENABLED = True
+    QUERY_BUDGET_STRICT = True
+    CAMERA_PROBE_ENABLED = False     # pas de sondes réseau pendant les tests
+    HIGHLIGHTS_ENABLED = False       # pas de processus d'analyse pendant les tests
+    TRANSCODE_ENABLED = False        # pas d'encodage pendant les tests
+    STORAGE_SWEEP_INTERVAL = 0       # pas de balayage de fond pendant les tests
+    RECORDING_SWEEP_INTERVAL = 0     # enregistrements expirés finalisés à la demande seulement
+    STORAGE_MIN_FREE_BYTES = 0
+    AUDIT_WRITE_BEHIND = False       # historique écrit dans la transaction de la requête
+    RESPONSE_CACHE_ENABLED = False   # chaque requête de test interroge la base
     CORS_ORIGINS = "*"
 
 
@@ -10,16 +10,38 @@ from flask_migrate import Migrate
 
 # Importations relatives corrigées
 from .config import config
-from .models.database import db
+from .models.database import db, configure_engine, describe_engine, check_engine_profile
 from .models.user import User, UserRole
+from .services.video_capture_service import video_capture_service
+from .services.query_profiler import query_profiler
+from .services.password_hasher import password_hasher
+from .services.static_assets import static_assets
+from .services.json_provider import FastJSONProvider
+from .services.response_compression import response_compressor
+from .services.camera_relay import camera_relay
+from .services.camera_health import camera_health
+from .services.highlight_detector import highlight_detector
+from .services.clip_extractor import clip_extractor
+from .services.transcode_scheduler import transcode_scheduler
+from .services.cdn_migrator import cdn_migrator
+from .services.storage_manager import storage_manager
+from .services.blob_store import blob_store
+from .services.media_probe import media_probe
+from .services.video_library import video_library
+from .services.follow_graph import follow_graph
+from .services.player_queries import player_queries
+from .services.response_cache import response_cache
+from .services.recording_sweeper import recording_sweeper
+from .services.audit_log import audit_log
 from .routes.auth import auth_bp
 from .routes.admin import admin_bp
-from .routes.videos import videos_bp
+from .routes.videos import videos_bp, recording_manager
 from .routes.clubs import clubs_bp
 from .routes.frontend import frontend_bp
 from .routes.all_clubs import all_clubs_bp
 from .routes.players import players_bp
 from .routes.recording import recording_bp
+from .routes.media import media_bp
 
 def create_app(config_name=None):
     """
@@ -47,6 +69,9 @@ def create_app(config_name=None):
     # Charger la configuration
     app.config.from_object(config[config_name])
     
+    # Sérialisation JSON (orjson si disponible, datetime / Enum natifs)
+    app.json = FastJSONProvider(app)
+    
     # S'assurer que le dossier instance existe
     try:
         os.makedirs(app.instance_path, exist_ok=True)
@@ -61,10 +86,40 @@ def create_app(config_name=None):
     if config_name == 'production':
         config[config_name].validate()
     
+    # Profil moteur (WAL/PRAGMA pour SQLite, pool pour les bases serveur)
+    engine_profile = config[config_name].get_engine_profile(app)
+    engine_options = config[config_name].get_engine_options(app)
+    engine_options.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options
+    
     # Initialisation des extensions
     db.init_app(app)
+    configure_engine(app)
     migrate = Migrate(app, db)
     
+    # Services paresseux : aucun import lourd ni thread au démarrage
+    video_capture_service.init_app(app)
+    storage_manager.init_app(app)
+    blob_store.init_app(app)
+    recording_manager.init_app(app)
+    camera_relay.init_app(app)
+    camera_health.init_app(app)
+    highlight_detector.init_app(app)
+    media_probe.init_app(app)
+    video_library.init_app(app)
+    follow_graph.init_app(app)
+    player_queries.init_app(app)
+    response_cache.init_app(app)
+    audit_log.init_app(app)
+    recording_sweeper.init_app(app)
+    clip_extractor.init_app(app)
+    transcode_scheduler.init_app(app)
+    cdn_migrator.init_app(app)
+    query_profiler.init_app(app)
+    password_hasher.init_app(app)
+    static_assets.init_app(app)
+    response_compressor.init_app(app)
+    
     # Configuration CORS
     CORS(app, 
          origins=app.config['CORS_ORIGINS'], 
@@ -72,6 +127,12 @@ def create_app(config_name=None):
          allow_headers=["Content-Type", "Authorization"],
          methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"])
     
+    # Profil base de données, sans connexion : la vérification effective
+    # (PRAGMA relus, pool) est faite par /api/health et manage_db.py profile
+    db_report = describe_engine(app, engine_profile)
+    if config_name != 'testing':
+        print(f"🗄️  Profil base de données: {engine_profile} ({db_report['dialect']}, {db_report['pool']})")
+    
     # Enregistrement des blueprints
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(admin_bp, url_prefix='/api/admin')
@@ -81,6 +142,7 @@ def create_app(config_name=None):
     app.register_blueprint(all_clubs_bp, url_prefix='/api/all-clubs')
     app.register_blueprint(players_bp, url_prefix='/api/players')
     app.register_blueprint(recording_bp, url_prefix='/api/recording')
+    app.register_blueprint(media_bp)
     
     # Route de test pour le développement
     if config_name == 'development':
@@ -108,7 +170,8 @@ def create_app(config_name=None):
         return {
             'status': 'OK', 
             'message': 'PadelVar API is running',
-            'environment': config_name
+            'environment': config_name,
+            'database': check_engine_profile(app)
         }
     
     @app.route('/')
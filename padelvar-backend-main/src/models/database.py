@@ -1,4 +1,97 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, text
+import logging
+
+logger = logging.getLogger(__name__)
 
 db = SQLAlchemy()
 
+# Valeurs lisibles de PRAGMA synchronous
+_SQLITE_SYNCHRONOUS_NAMES = {0: 'OFF', 1: 'NORMAL', 2: 'FULL', 3: 'EXTRA'}
+
+
+def configure_engine(app):
+    """
+    Applique le profil moteur à l'engine créé par db.init_app.
+    Pour SQLite, installe les PRAGMA exécutés à chaque nouvelle connexion.
+    """
+    with app.app_context():
+        engine = db.engine
+
+    if engine.dialect.name != 'sqlite':
+        return
+
+    is_memory = engine.url.database in (None, '', ':memory:')
+    pragmas = [
+        f"PRAGMA synchronous={app.config['SQLITE_SYNCHRONOUS']}",
+        f"PRAGMA busy_timeout={int(app.config['SQLITE_BUSY_TIMEOUT_MS'])}",
+        f"PRAGMA cache_size=-{int(app.config['SQLITE_CACHE_SIZE_KB'])}",
+        "PRAGMA temp_store=MEMORY"
+    ]
+    if not is_memory:
+        # WAL et mmap n'ont de sens que pour une base fichier
+        pragmas.insert(0, f"PRAGMA journal_mode={app.config['SQLITE_JOURNAL_MODE']}")
+        pragmas.append(f"PRAGMA mmap_size={int(app.config['SQLITE_MMAP_SIZE'])}")
+
+    @event.listens_for(engine, 'connect')
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+def describe_engine(app, profile):
+    """
+    Description du profil moteur sans ouvrir de connexion (appelée par
+    create_app) ; check_engine_profile la complète.
+
+    Returns:
+        dict: Profil, dialecte et pool, statut 'unchecked'
+    """
+    with app.app_context():
+        engine = db.engine
+    report = {
+        'profile': profile,
+        'dialect': engine.dialect.name,
+        'pool': type(engine.pool).__name__,
+        'status': 'unchecked'
+    }
+    app.extensions['database_profile'] = report
+    return report
+
+
+def check_engine_profile(app):
+    """
+    Ouvre une connexion et relit la configuration effective du moteur
+    (GET /api/health, python scripts/manage_db.py profile). Jamais appelée
+    par create_app : démarrer un worker n'ouvre pas la base.
+
+    Returns:
+        dict: Description du profil actif
+    """
+    with app.app_context():
+        engine = db.engine
+        report = {key: value for key, value in app.extensions['database_profile'].items()
+                  if key in ('profile', 'dialect', 'pool')}
+        try:
+            with engine.connect() as connection:
+                if engine.dialect.name == 'sqlite':
+                    report['journal_mode'] = connection.execute(text('PRAGMA journal_mode')).scalar()
+                    synchronous = connection.execute(text('PRAGMA synchronous')).scalar()
+                    report['synchronous'] = _SQLITE_SYNCHRONOUS_NAMES.get(synchronous, synchronous)
+                    report['busy_timeout_ms'] = connection.execute(text('PRAGMA busy_timeout')).scalar()
+                    report['mmap_size'] = connection.execute(text('PRAGMA mmap_size')).scalar()
+                else:
+                    report['pool_size'] = engine.pool.size()
+                    report['pre_ping'] = app.config['DB_POOL_PRE_PING']
+            report['status'] = 'OK'
+        except Exception as e:
+            logger.error(f"Vérification du profil base de données impossible: {e}")
+            report['status'] = 'error'
+            report['error'] = str(e)
+
+    app.extensions['database_profile'] = report
+    return report
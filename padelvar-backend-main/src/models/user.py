@@ -1,6 +1,6 @@
 # padelvar-backend/src/models/user.py
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from enum import Enum
 ## Suppression de l'import enum
 from .database import db
@@ -22,6 +22,7 @@ from .database import db
 from werkzeug.security import generate_password_hash, check_password_hash
 from sqlalchemy import event
 import logging
+import json
 
 # Logging
 logger = logging.getLogger(__name__)
@@ -34,7 +35,9 @@ class UserRole(Enum):
 player_club_follows = db.Table(
     'player_club_follows',
     db.Column('player_id', db.Integer, db.ForeignKey('user.id'), primary_key=True),
-    db.Column('club_id', db.Integer, db.ForeignKey('club.id'), primary_key=True)
+    db.Column('club_id', db.Integer, db.ForeignKey('club.id'), primary_key=True),
+    # La clé primaire (player_id, club_id) sert les clubs d'un joueur ; cet index sert les abonnés d'un club
+    db.Index('ix_player_club_follows_club_player', 'club_id', 'player_id')
 )
 
 class User(db.Model):
@@ -51,6 +54,8 @@ class User(db.Model):
     
     videos = db.relationship('Video', backref='owner', lazy=True, cascade='all, delete-orphan')
     club_id = db.Column(db.Integer, db.ForeignKey('club.id'), nullable=True)
+    # Compteur dénormalisé, tenu à jour par src/services/follow_graph.py
+    followed_clubs_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     
     followed_clubs = db.relationship('Club', 
                                    secondary=player_club_follows,
@@ -82,6 +87,8 @@ class Club(db.Model):
     phone_number = db.Column(db.String(20), nullable=True)
     email = db.Column(db.String(120), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Compteur dénormalisé, tenu à jour par src/services/follow_graph.py
+    followers_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     
     players = db.relationship('User', backref='club', lazy=True)
     courts = db.relationship('Court', backref='club', lazy=True, cascade='all, delete-orphan')
@@ -90,7 +97,8 @@ class Club(db.Model):
         return {
             'id': self.id, 'name': self.name, 'address': self.address,
             'phone_number': self.phone_number, 'email': self.email,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'followers_count': self.followers_count or 0
         }
 
 class Court(db.Model):
@@ -120,6 +128,11 @@ class Court(db.Model):
 
 class Video(db.Model):
     __tablename__ = 'video'
+    __table_args__ = (
+        # Bibliothèque d'un joueur et vidéos d'un terrain, les plus récentes d'abord
+        db.Index('ix_video_user_recorded_at', 'user_id', 'recorded_at'),
+        db.Index('ix_video_court_recorded_at', 'court_id', 'recorded_at'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text, nullable=True)
@@ -150,9 +163,214 @@ class Video(db.Model):
             "cdn_migrated_at": self.cdn_migrated_at.isoformat() if self.cdn_migrated_at else None
         }
 
+class VideoHighlights(db.Model):
+    """Timeline des échanges d'une vidéo, produite par l'analyse de mouvement"""
+    __tablename__ = 'video_highlights'
+    id = db.Column(db.Integer, primary_key=True)
+    video_id = db.Column(db.Integer, db.ForeignKey('video.id'), unique=True, nullable=False)
+    status = db.Column(db.String(20), default='pending')  # pending, ready, error
+    segments = db.Column(db.Text, nullable=True)  # JSON [[début, fin, score], ...] en secondes
+    energy = db.Column(db.Text, nullable=True)  # énergie par seconde, 1 octet, base64
+    duration = db.Column(db.Float, nullable=True)
+    rally_seconds = db.Column(db.Float, nullable=True)
+    sample_fps = db.Column(db.Float, nullable=True)
+    decoder = db.Column(db.String(20), nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    clip_status = db.Column(db.String(20), nullable=True)  # pending, ready, error
+    clip_url = db.Column(db.String(255), nullable=True)
+    clip_size = db.Column(db.Integer, nullable=True)
+    analyzed_at = db.Column(db.DateTime, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    video = db.relationship('Video', backref=db.backref('highlights', uselist=False, cascade='all, delete-orphan'))
+
+    def get_segments(self):
+        return json.loads(self.segments) if self.segments else []
+
+    def to_dict(self, include_energy=False):
+        data = {
+            'video_id': self.video_id,
+            'status': self.status,
+            'segments': [{'start': start, 'end': end, 'score': score} for start, end, score in self.get_segments()],
+            'duration': self.duration,
+            'rally_seconds': self.rally_seconds,
+            'sample_fps': self.sample_fps,
+            'decoder': self.decoder,
+            'error': self.error,
+            'clip_status': self.clip_status,
+            'clip_url': self.clip_url,
+            'clip_size': self.clip_size,
+            'analyzed_at': self.analyzed_at.isoformat() if self.analyzed_at else None
+        }
+        if include_energy:
+            data['energy'] = self.energy
+        return data
+
+class TranscodeJob(db.Model):
+    """Tâche d'encodage de l'échelle de qualités (HLS) d'une vidéo"""
+    __tablename__ = 'transcode_job'
+    __table_args__ = (db.Index('ix_transcode_job_status_priority', 'status', 'priority'),)
+    id = db.Column(db.Integer, primary_key=True)
+    video_id = db.Column(db.Integer, db.ForeignKey('video.id'), unique=True, nullable=False)
+    status = db.Column(db.String(20), default='queued')  # queued, running, done, error
+    reason = db.Column(db.String(20), nullable=True)  # recorded, unlocked, shared, backfill
+    priority = db.Column(db.Float, default=0.0)  # plus petit = plus urgent
+    renditions = db.Column(db.Text, nullable=True)  # JSON [{'name', 'height', 'bitrate'}, ...]
+    master_url = db.Column(db.String(255), nullable=True)
+    attempts = db.Column(db.Integer, default=0)
+    error = db.Column(db.Text, nullable=True)
+    encode_seconds = db.Column(db.Float, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    video = db.relationship('Video', backref=db.backref('transcode_job', uselist=False, cascade='all, delete-orphan'))
+
+    def to_dict(self):
+        return {
+            'video_id': self.video_id,
+            'status': self.status,
+            'reason': self.reason,
+            'priority': round(self.priority or 0.0, 2),
+            'renditions': json.loads(self.renditions) if self.renditions else [],
+            'master_url': self.master_url,
+            'attempts': self.attempts,
+            'error': self.error,
+            'encode_seconds': self.encode_seconds,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+class VideoMetadata(db.Model):
+    """Métadonnées mesurées sur le fichier d'une vidéo (une sonde par version du fichier)"""
+    __tablename__ = 'video_metadata'
+    id = db.Column(db.Integer, primary_key=True)
+    video_id = db.Column(db.Integer, db.ForeignKey('video.id'), unique=True, nullable=False)
+    file_size = db.Column(db.BigInteger, nullable=True)
+    file_mtime_ns = db.Column(db.BigInteger, nullable=True)  # avec file_size : signature du fichier sondé
+    duration = db.Column(db.Float, nullable=True)  # secondes
+    width = db.Column(db.Integer, nullable=True)
+    height = db.Column(db.Integer, nullable=True)
+    fps = db.Column(db.Float, nullable=True)
+    video_codec = db.Column(db.String(20), nullable=True)
+    audio_codec = db.Column(db.String(20), nullable=True)
+    bitrate = db.Column(db.Integer, nullable=True)  # bits/s, moyenne sur le fichier
+    keyframe_count = db.Column(db.Integer, nullable=True)
+    keyframes = db.Column(db.Text, nullable=True)  # écarts en ms compressés (media_probe.encode_keyframes)
+    source = db.Column(db.String(10), nullable=True)  # mp4, ffprobe
+    probed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    video = db.relationship('Video', backref=db.backref('media', uselist=False, cascade='all, delete-orphan'))
+
+    def to_dict(self):
+        return {
+            'duration': self.duration,
+            'width': self.width,
+            'height': self.height,
+            'fps': self.fps,
+            'video_codec': self.video_codec,
+            'audio_codec': self.audio_codec,
+            'bitrate': self.bitrate,
+            'file_size': self.file_size,
+            'keyframe_count': self.keyframe_count,
+            'source': self.source,
+            'probed_at': self.probed_at.isoformat() if self.probed_at else None
+        }
+
+class StoredFile(db.Model):
+    """Index des fichiers stockés localement : taille, niveau et dernier accès"""
+    __tablename__ = 'stored_file'
+    __table_args__ = (db.Index('ix_stored_file_tier_last_access', 'tier', 'last_access'),)
+    id = db.Column(db.Integer, primary_key=True)
+    path = db.Column(db.String(500), unique=True, nullable=False)
+    kind = db.Column(db.String(20), default='video')  # video, thumbnail
+    tier = db.Column(db.String(10), default='hot')  # hot, cold
+    size = db.Column(db.BigInteger, default=0)
+    # Sans clé étrangère : le fichier d'une vidéo supprimée reste indexé, donc évinçable
+    video_id = db.Column(db.Integer, nullable=True, index=True)
+    club_id = db.Column(db.Integer, nullable=True, index=True)
+    last_access = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'path': self.path,
+            'kind': self.kind,
+            'tier': self.tier,
+            'size': self.size,
+            'video_id': self.video_id,
+            'club_id': self.club_id,
+            'last_access': self.last_access.isoformat() if self.last_access else None
+        }
+
+class StorageReservation(db.Model):
+    """Espace réservé par une capture en cours, visible de tous les processus"""
+    __tablename__ = 'storage_reservation'
+    id = db.Column(db.Integer, primary_key=True)
+    key = db.Column(db.String(100), unique=True, nullable=False)  # identifiant de l'enregistrement
+    club_id = db.Column(db.Integer, nullable=True, index=True)
+    tier = db.Column(db.String(10), default='hot')  # hot, cold
+    path = db.Column(db.String(500), nullable=True)  # fichier de la capture : octets déjà écrits déduits
+    bytes = db.Column(db.BigInteger, default=0)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)  # fin prévue de la capture, marge comprise
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'key': self.key,
+            'club_id': self.club_id,
+            'tier': self.tier,
+            'bytes': self.bytes,
+            'expires_at': self.expires_at.isoformat() if self.expires_at else None
+        }
+
+class Blob(db.Model):
+    """Fichier adressé par son contenu (SHA-256), partagé par toutes les vidéos qui le référencent"""
+    __tablename__ = 'blob'
+    __table_args__ = (db.Index('ix_blob_ref_count_released_at', 'ref_count', 'released_at'),)
+    id = db.Column(db.Integer, primary_key=True)
+    sha256 = db.Column(db.String(64), unique=True, nullable=False)
+    extension = db.Column(db.String(10), default='')  # '.mp4', '.jpg'
+    kind = db.Column(db.String(20), default='video')  # video, thumbnail
+    size = db.Column(db.BigInteger, default=0)
+    ref_count = db.Column(db.Integer, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    released_at = db.Column(db.DateTime, nullable=True)  # plus aucune référence depuis
+
+    @property
+    def name(self):
+        return f"{self.sha256}{self.extension or ''}"
+
+    @property
+    def url(self):
+        return f"/blobs/{self.name}"
+
+    def to_dict(self):
+        return {
+            'sha256': self.sha256,
+            'url': self.url,
+            'kind': self.kind,
+            'size': self.size,
+            'ref_count': self.ref_count,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'released_at': self.released_at.isoformat() if self.released_at else None
+        }
+
+def recording_expires_at(context):
+    """Fin prévue d'un enregistrement : début + min(durée prévue, durée max)"""
+    params = context.get_current_parameters()
+    start_time = params.get('start_time') or datetime.utcnow()
+    minutes = min(params['planned_duration'], params.get('max_duration') or 200)
+    return start_time + timedelta(minutes=minutes)
+
 class RecordingSession(db.Model):
     """Modèle pour gérer les sessions d'enregistrement en cours"""
     __tablename__ = 'recording_session'
+    __table_args__ = (
+        # Sessions actives arrivées à échéance (balayage, voir services/recording_sweeper.py)
+        db.Index('ix_recording_session_status_expires_at', 'status', 'expires_at'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     recording_id = db.Column(db.String(100), unique=True, nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -164,6 +382,7 @@ class RecordingSession(db.Model):
     max_duration = db.Column(db.Integer, default=200)  # limite max en minutes
     start_time = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     end_time = db.Column(db.DateTime, nullable=True)
+    expires_at = db.Column(db.DateTime, nullable=True, default=recording_expires_at)
     
     # Statut
     status = db.Column(db.String(20), default='active')  # active, stopped, completed, expired
@@ -246,6 +465,11 @@ class RecordingSession(db.Model):
 
 class ClubActionHistory(db.Model):
     __tablename__ = 'club_action_history'
+    __table_args__ = (
+        # Historique d'un joueur (plus récent d'abord) et flux d'activité des clubs (filtré par type)
+        db.Index('ix_club_action_history_user_performed_at', 'user_id', 'performed_at'),
+        db.Index('ix_club_action_history_club_type_performed_at', 'club_id', 'action_type', 'performed_at'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     club_id = db.Column(db.Integer, db.ForeignKey('club.id'), nullable=True)
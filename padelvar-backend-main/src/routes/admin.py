@@ -1,7 +1,11 @@
 # padelvar-backend/src/routes/admin.py
 
-from flask import Blueprint, request, jsonify, session
+from flask import Blueprint, request, jsonify, session, current_app
 from src.models.user import db, User, Club, Court, Video, UserRole, ClubActionHistory, RecordingSession
+from src.services.identity import has_role, roles_required
+from src.services.follow_graph import follow_graph
+from src.services.audit_log import audit_log
+from src.services.response_cache import response_cache
 from werkzeug.security import generate_password_hash
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import aliased, joinedload
@@ -19,36 +23,8 @@ admin_bp = Blueprint("admin", __name__)
 # --- Fonctions Utilitaires ---
 
 def require_super_admin():
-    user_id = session.get("user_id")
-    user_role = session.get("user_role")
-    
-    # Debug logging pour comprendre le problème
-    logger.info(f"🔍 Vérification admin - user_id: {user_id}, user_role: {user_role}")
-    logger.info(f"🔍 UserRole.SUPER_ADMIN.value: {UserRole.SUPER_ADMIN.value}")
-    
-    if not user_id:
-        logger.warning("❌ Pas d'user_id dans la session")
-        return False
-        
-    if not user_role:
-        logger.warning("❌ Pas de user_role dans la session")
-        return False
-    
-    # Vérification flexible du rôle admin
-    admin_roles = [
-        UserRole.SUPER_ADMIN.value,
-        "SUPER_ADMIN",
-        "super_admin",
-        "ADMIN",
-        "admin"
-    ]
-    
-    if user_role not in admin_roles:
-        logger.warning(f"❌ Rôle '{user_role}' n'est pas admin. Rôles acceptés: {admin_roles}")
-        return False
-    
-    logger.info(f"✅ Accès admin accordé pour user_id: {user_id} avec rôle: {user_role}")
-    return True
+    """Vrai si la session courante est celle d'un super admin (sans requête SQL)"""
+    return has_role(UserRole.SUPER_ADMIN)
 
 def log_club_action(user_id, club_id, action_type, details=None, performed_by_id=None):
     """Log d'action avec normalisation du type d'action"""
@@ -63,31 +39,8 @@ def log_club_action(user_id, club_id, action_type, details=None, performed_by_id
         # Normaliser le type d'action avant de l'enregistrer
         normalized_action_type = action_type.lower().strip().replace('-', '_').replace(' ', '_')
         
-        # S'assurer que les détails sont en format JSON
-        details_json = None
-        if details:
-            if isinstance(details, dict):
-                details_json = json.dumps(details)
-            elif isinstance(details, str):
-                try:
-                    # Vérifier si c'est déjà du JSON valide
-                    json.loads(details)
-                    details_json = details
-                except json.JSONDecodeError:
-                    # Si ce n'est pas du JSON, l'envelopper
-                    details_json = json.dumps({"raw_details": details})
-            else:
-                details_json = json.dumps({"raw_details": str(details)})
-
-        history_entry = ClubActionHistory(
-            user_id=user_id,
-            club_id=club_id,
-            action_type=normalized_action_type,
-            action_details=details_json,
-            performed_by_id=performed_by_id,
-            performed_at=datetime.utcnow()
-        )
-        db.session.add(history_entry)
+        # Crédits dans la transaction, le reste écrit par lots après le commit (voir services/audit_log.py)
+        audit_log.record(user_id, club_id, normalized_action_type, details or None, performed_by_id)
         db.session.commit()
         
         logger.info(f"Action loggée: {normalized_action_type} pour utilisateur {user_id} dans club {club_id}")
@@ -100,14 +53,14 @@ def log_club_action(user_id, club_id, action_type, details=None, performed_by_id
 # --- ROUTES DE GESTION DES UTILISATEURS (CRUD COMPLET) ---
 
 @admin_bp.route("/users", methods=["GET"])
+@roles_required(UserRole.SUPER_ADMIN)
 def get_all_users():
-    if not require_super_admin(): return jsonify({"error": "Accès non autorisé"}), 403
     users = User.query.all()
     return jsonify({"users": [user.to_dict() for user in users]}), 200
 
 @admin_bp.route("/users", methods=["POST"])
+@roles_required(UserRole.SUPER_ADMIN)
 def create_user():
-    if not require_super_admin(): return jsonify({"error": "Accès non autorisé"}), 403
     data = request.get_json()
     try:
         new_user = User(
@@ -127,8 +80,8 @@ def create_user():
         return jsonify({"error": "Erreur lors de la création"}), 500
 
 @admin_bp.route("/users/<int:user_id>", methods=["PUT"])
+@roles_required(UserRole.SUPER_ADMIN)
 def update_user(user_id):
-    if not require_super_admin(): return jsonify({"error": "Accès non autorisé"}), 403
     user = User.query.get_or_404(user_id)
     data = request.get_json()
     try:
@@ -143,8 +96,8 @@ def update_user(user_id):
         return jsonify({"error": "Erreur lors de la mise à jour"}), 500
 
 @admin_bp.route("/users/<int:user_id>", methods=["DELETE"])
+@roles_required(UserRole.SUPER_ADMIN)
 def delete_user(user_id):
-    if not require_super_admin(): return jsonify({"error": "Accès non autorisé"}), 403
     user = User.query.get_or_404(user_id)
     try:
         print(f"🗑️ Suppression de l'utilisateur ID: {user_id} - {user.name} ({user.email})")
@@ -182,10 +135,9 @@ def delete_user(user_id):
                 # Pour l'instant, on le laisse orphelin
         
         # 6. Gérer les relations many-to-many (follows)
-        if hasattr(user, 'followed_clubs'):
-            # Pour les relations many-to-many, il faut supprimer les relations explicitement
-            user.followed_clubs = []  # Vider la relation
-            print(f"   🔗 Relations de suivi supprimées")
+        # Abonnements retirés et compteurs des clubs ajustés
+        removed = follow_graph.unfollow(user.id)
+        print(f"   🔗 {len(removed)} relation(s) de suivi supprimée(s)")
         
         # 7. Supprimer l'utilisateur lui-même
         print(f"   👤 Suppression de l'utilisateur: {user.name}")
@@ -207,8 +159,8 @@ def delete_user(user_id):
         return jsonify({"error": f"Erreur lors de la suppression: {str(e)}"}), 500
 
 @admin_bp.route("/users/<int:user_id>/credits", methods=["POST"])
+@roles_required(UserRole.SUPER_ADMIN)
 def add_credits(user_id):
-    if not require_super_admin(): return jsonify({"error": "Accès non autorisé"}), 403
     user = User.query.get_or_404(user_id)
     data = request.get_json()
     credits_to_add = data.get("credits", 0)
@@ -237,14 +189,14 @@ def add_credits(user_id):
 # --- ROUTES DE GESTION DES CLUBS (CRUD COMPLET) ---
 
 @admin_bp.route("/clubs", methods=["GET"])
+@roles_required(UserRole.SUPER_ADMIN)
 def get_all_clubs():
-    if not require_super_admin(): return jsonify({"error": "Accès non autorisé"}), 403
     clubs = Club.query.all()
     return jsonify({"clubs": [club.to_dict() for club in clubs]}), 200
 
 @admin_bp.route("/clubs", methods=["POST"])
+@roles_required(UserRole.SUPER_ADMIN)
 def create_club():
-    if not require_super_admin(): return jsonify({"error": "Accès non autorisé"}), 403
     data = request.get_json()
     try:
         new_club = Club(name=data["name"], email=data["email"], address=data.get("address"), phone_number=data.get("phone_number"))
@@ -266,10 +218,9 @@ def create_club():
 # ====================================================================
 
 @admin_bp.route("/sync/club-user-data", methods=["POST"])
+@roles_required(UserRole.SUPER_ADMIN)
 def sync_club_user_data():
     """Synchroniser les données entre les clubs et leurs utilisateurs associés"""
-    if not require_super_admin():
-        return jsonify({"error": "Accès non autorisé"}), 403
     
     try:
         logger.info("Début de la synchronisation club-utilisateur")
@@ -348,9 +299,8 @@ def sync_club_user_data():
         return jsonify({'error': f'Erreur synchronisation: {str(e)}'}), 500
 
 @admin_bp.route("/clubs/<int:club_id>", methods=["PUT"])
+@roles_required(UserRole.SUPER_ADMIN)
 def update_club(club_id):
-    if not require_super_admin(): 
-        return jsonify({"error": "Accès non autorisé"}), 403
     
     club = Club.query.get_or_404(club_id)
     # On trouve l'utilisateur associé à ce club
@@ -409,8 +359,8 @@ def update_club(club_id):
         return jsonify({"error": "Erreur lors de la mise à jour"}), 500
 
 @admin_bp.route("/clubs/<int:club_id>", methods=["DELETE"])
+@roles_required(UserRole.SUPER_ADMIN)
 def delete_club(club_id):
-    if not require_super_admin(): return jsonify({"error": "Accès non autorisé"}), 403
     club = Club.query.get_or_404(club_id)
     try:
         # Importer les modèles nécessaires
@@ -464,8 +414,7 @@ def delete_club(club_id):
                     db.session.delete(session)
             
             # Gérer les relations many-to-many (follows)
-            if hasattr(user, 'followed_clubs'):
-                user.followed_clubs = []
+            follow_graph.unfollow(user.id)
         
         # 4. Gérer l'historique du club
         history_entries = ClubActionHistory.query.filter_by(club_id=club_id).all()
@@ -478,10 +427,8 @@ def delete_club(club_id):
         print(f"   👤 {len(club_users)} utilisateur(s) supprimé(s)")
         
         # 6. Gérer les relations many-to-many avec les followers
-        if hasattr(club, 'followers'):
-            # Supprimer toutes les relations de suivi de ce club
-            club.followers = []
-            print(f"   🔗 Relations de suivi du club supprimées")
+        removed = follow_graph.remove_club(club_id)
+        print(f"   🔗 {removed} relation(s) de suivi du club supprimée(s)")
         
         # 7. Supprimer le club lui-même
         print(f"   🏢 Suppression du club: {club.name}")
@@ -507,14 +454,14 @@ def delete_club(club_id):
 # --- ROUTES DE GESTION DES TERRAINS (CRUD COMPLET) ---
 
 @admin_bp.route("/clubs/<int:club_id>/courts", methods=["GET"])
+@roles_required(UserRole.SUPER_ADMIN)
 def get_club_courts(club_id):
-    if not require_super_admin(): return jsonify({"error": "Accès non autorisé"}), 403
     club = Club.query.get_or_404(club_id)
     return jsonify({"courts": [court.to_dict() for court in club.courts]}), 200
 
 @admin_bp.route("/clubs/<int:club_id>/courts", methods=["POST"])
+@roles_required(UserRole.SUPER_ADMIN)
 def create_court(club_id):
-    if not require_super_admin(): return jsonify({"error": "Accès non autorisé"}), 403
     data = request.get_json()
     try:
         new_court = Court(name=data["name"], camera_url=data["camera_url"], club_id=club_id, qr_code=str(uuid.uuid4()))
@@ -526,8 +473,8 @@ def create_court(club_id):
         return jsonify({"error": "Erreur lors de la création"}), 500
 
 @admin_bp.route("/courts/<int:court_id>", methods=["PUT"])
+@roles_required(UserRole.SUPER_ADMIN)
 def update_court(court_id):
-    if not require_super_admin(): return jsonify({"error": "Accès non autorisé"}), 403
     court = Court.query.get_or_404(court_id)
     data = request.get_json()
     try:
@@ -540,8 +487,8 @@ def update_court(court_id):
         return jsonify({"error": "Erreur lors de la mise à jour"}), 500
 
 @admin_bp.route("/courts/<int:court_id>", methods=["DELETE"])
+@roles_required(UserRole.SUPER_ADMIN)
 def delete_court(court_id):
-    if not require_super_admin(): return jsonify({"error": "Accès non autorisé"}), 403
     court = Court.query.get_or_404(court_id)
     try:
         print(f"🗑️ Suppression du terrain ID: {court_id} - {court.name}")
@@ -578,9 +525,8 @@ def delete_court(court_id):
 # --- ROUTES VIDÉOS & HISTORIQUE ---
 
 @admin_bp.route("/videos", methods=["GET"])
+@roles_required(UserRole.SUPER_ADMIN)
 def get_all_clubs_videos():
-    if not require_super_admin(): 
-        return jsonify({"error": "Accès non autorisé"}), 403
     
     try:
         # Requête simplifiée sans les colonnes problématiques
@@ -701,9 +647,8 @@ def parse_action_details(action_details_str):
         return {}
 
 @admin_bp.route("/clubs/history/all", methods=["GET"])
+@roles_required(UserRole.SUPER_ADMIN)
 def get_all_clubs_history():
-    if not require_super_admin():
-        return jsonify({"error": "Accès non autorisé"}), 403
     try:
         # Créer des alias pour joindre la table User deux fois
         Player = aliased(User, name='player')
@@ -818,10 +763,9 @@ def create_action_summary(action_type, details):
 # --- ROUTES DE STATISTIQUES AVANCÉES ---
 
 @admin_bp.route("/dashboard", methods=["GET"])
+@roles_required(UserRole.SUPER_ADMIN)
 def get_admin_dashboard():
     """Dashboard complet pour l'administrateur avec toutes les statistiques"""
-    if not require_super_admin():
-        return jsonify({"error": "Accès non autorisé"}), 403
     
     try:
         logger.info("Récupération du tableau de bord administrateur")
@@ -853,7 +797,7 @@ def get_admin_dashboard():
             club_players = User.query.filter_by(club_id=club.id, role=UserRole.PLAYER).count()
             club_courts = Court.query.filter_by(club_id=club.id).count()
             club_videos = db.session.query(Video).join(Court).filter(Court.club_id == club.id).count()
-            club_followers = len(club.followers.all()) if hasattr(club, 'followers') else 0
+            club_followers = club.followers_count
             
             clubs_stats.append({
                 'club': club.to_dict(),
@@ -898,10 +842,10 @@ def get_admin_dashboard():
         return jsonify({"error": "Erreur lors de la récupération du dashboard"}), 500
 
 @admin_bp.route("/statistics/users", methods=["GET"])
+@roles_required(UserRole.SUPER_ADMIN)
+@response_cache.cached(tags=['table:user', 'table:club'])
 def get_users_statistics():
     """Statistiques détaillées sur les utilisateurs"""
-    if not require_super_admin():
-        return jsonify({"error": "Accès non autorisé"}), 403
     
     try:
         # Statistiques par rôle
@@ -945,10 +889,10 @@ def get_users_statistics():
         return jsonify({"error": "Erreur serveur"}), 500
 
 @admin_bp.route("/statistics/clubs", methods=["GET"])
+@roles_required(UserRole.SUPER_ADMIN)
+@response_cache.cached(tags=['table:user', 'table:club', 'table:court', 'table:video', 'table:club_action_history'])
 def get_clubs_statistics():
     """Statistiques détaillées sur les clubs"""
-    if not require_super_admin():
-        return jsonify({"error": "Accès non autorisé"}), 403
     
     try:
         clubs_detailed_stats = []
@@ -962,11 +906,7 @@ def get_clubs_statistics():
             videos_count = db.session.query(Video).join(Court).filter(Court.club_id == club.id).count()
             
             # Compter les followers
-            followers_count = 0
-            try:
-                followers_count = len(club.followers.all())
-            except:
-                followers_count = 0
+            followers_count = club.followers_count
             
             # Calculer les crédits distribués
             credits_distributed = 0
@@ -1024,10 +964,9 @@ def get_clubs_statistics():
         return jsonify({"error": "Erreur serveur"}), 500
 
 @admin_bp.route("/clubs/history/cleanup", methods=["POST"])
+@roles_required(UserRole.SUPER_ADMIN)
 def cleanup_history_actions():
     """Nettoie et corrige les actions incorrectes dans l'historique"""
-    if not require_super_admin():
-        return jsonify({"error": "Accès non autorisé"}), 403
     
     try:
         logger.info("Début du nettoyage de l'historique des actions")
@@ -1135,10 +1074,9 @@ def cleanup_history_actions():
         return jsonify({"error": f"Erreur lors du nettoyage: {str(e)}"}), 500
 
 @admin_bp.route("/clubs/history/statistics", methods=["GET"])
+@roles_required(UserRole.SUPER_ADMIN)
 def get_history_statistics():
     """Statistiques détaillées sur l'historique des actions"""
-    if not require_super_admin():
-        return jsonify({"error": "Accès non autorisé"}), 403
     
     try:
         # Statistiques par type d'action
@@ -1186,10 +1124,9 @@ def get_history_statistics():
 # --- ROUTES DE DIAGNOSTIC ET DEBUG ---
 
 @admin_bp.route("/debug/fix-unknown-actions", methods=["POST"])
+@roles_required(UserRole.SUPER_ADMIN)
 def fix_unknown_actions():
     """Fix immediate des actions inconnues dans l'historique"""
-    if not require_super_admin():
-        return jsonify({"error": "Accès non autorisé"}), 403
     
     try:
         logger.info("Début de la correction des actions inconnues")
@@ -1282,10 +1219,9 @@ def suggest_action_from_details(action_details_str):
         return 'unknown_action'
 
 @admin_bp.route("/debug/action-types", methods=["GET"])
+@roles_required(UserRole.SUPER_ADMIN)
 def debug_action_types():
     """Debug: Afficher tous les types d'actions dans la base"""
-    if not require_super_admin():
-        return jsonify({"error": "Accès non autorisé"}), 403
     
     try:
         # Récupérer tous les types d'actions uniques
@@ -1323,10 +1259,9 @@ def debug_action_types():
         return jsonify({"error": f"Erreur: {str(e)}"}), 500
 
 @admin_bp.route("/debug/system", methods=["GET"])
+@roles_required(UserRole.SUPER_ADMIN)
 def debug_system():
     """Diagnostic complet du système"""
-    if not require_super_admin():
-        return jsonify({"error": "Accès non autorisé"}), 403
     
     try:
         # Vérification des tables
@@ -1376,13 +1311,164 @@ def debug_system():
         logger.error(f"Erreur lors du diagnostic système: {e}")
         return jsonify({"error": f"Erreur lors du diagnostic: {str(e)}"}), 500
 
+@admin_bp.route("/debug/perf", methods=["GET", "DELETE"])
+@roles_required(UserRole.SUPER_ADMIN)
+def debug_perf():
+    """Rapport du profileur SQL : requêtes et temps base par endpoint"""
+    
+    profiler = current_app.extensions.get('query_profiler')
+    if not profiler or not profiler.enabled:
+        return jsonify({"error": "Profileur désactivé (QUERY_PROFILER_ENABLED=False)"}), 404
+    
+    if request.method == "DELETE":
+        profiler.reset()
+        return jsonify({"message": "Statistiques du profileur réinitialisées"}), 200
+    
+    try:
+        report = profiler.report(sort_by=request.args.get('sort', 'avg_queries'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    report['timestamp'] = datetime.utcnow().isoformat()
+    return jsonify(report), 200
+
+@admin_bp.route("/debug/camera-relay", methods=["GET"])
+@roles_required(UserRole.SUPER_ADMIN)
+def debug_camera_relay():
+    """Relais caméra actifs : spectateurs, enregistreurs, images perdues"""
+    
+    relay = current_app.extensions.get('camera_relay')
+    if not relay:
+        return jsonify({"error": "Relais caméra non initialisé"}), 404
+    
+    return jsonify({
+        'enabled': relay.enabled,
+        'relays': relay.stats(),
+        'timestamp': datetime.utcnow().isoformat()
+    }), 200
+
+@admin_bp.route("/debug/cameras", methods=["GET", "POST"])
+@roles_required(UserRole.SUPER_ADMIN)
+def debug_cameras():
+    """État des caméras en cache ; POST lance immédiatement une passe de sondes"""
+    
+    monitor = current_app.extensions.get('camera_health')
+    if not monitor:
+        return jsonify({"error": "Surveillance des caméras non initialisée"}), 404
+    
+    if request.method == "POST":
+        monitor.probe_all()
+    
+    report = monitor.report()
+    report['timestamp'] = datetime.utcnow().isoformat()
+    return jsonify(report), 200
+
+@admin_bp.route("/debug/transcoding", methods=["GET", "POST"])
+@roles_required(UserRole.SUPER_ADMIN)
+def debug_transcoding():
+    """File d'encodage HLS ; POST {"video_ids": [...]} ajoute des vidéos (rattrapage)"""
+    
+    scheduler = current_app.extensions.get('transcode_scheduler')
+    if not scheduler:
+        return jsonify({"error": "Ordonnanceur d'encodage non initialisé"}), 404
+    
+    if request.method == "POST":
+        data = request.get_json(silent=True) or {}
+        for video_id in data.get('video_ids', []):
+            scheduler.enqueue(int(video_id), reason='backfill', force=bool(data.get('force')))
+    
+    stats = scheduler.stats()
+    stats['timestamp'] = datetime.utcnow().isoformat()
+    return jsonify(stats), 200
+
+@admin_bp.route("/debug/cdn-migration", methods=["GET", "POST"])
+@roles_required(UserRole.SUPER_ADMIN)
+def debug_cdn_migration():
+    """Progression de la migration CDN ; POST lance une passe en arrière-plan"""
+    
+    migrator = current_app.extensions.get('cdn_migrator')
+    if not migrator:
+        return jsonify({"error": "Migration CDN non initialisée"}), 404
+    
+    if request.method == "POST" and not migrator.start():
+        return jsonify({"error": "Migration CDN désactivée (CDN_MIGRATION_ENABLED=False)"}), 409
+    
+    stats = migrator.stats()
+    stats['pending'] = migrator.pending_count()
+    stats['timestamp'] = datetime.utcnow().isoformat()
+    return jsonify(stats), 200
+
+@admin_bp.route("/debug/storage", methods=["GET", "POST"])
+@roles_required(UserRole.SUPER_ADMIN)
+def debug_storage():
+    """Occupation par niveau et par club ; POST lance un balayage ({"reindex": true} reconstruit l'index)"""
+    
+    manager = current_app.extensions.get('storage_manager')
+    if not manager:
+        return jsonify({"error": "Gestionnaire de stockage non initialisé"}), 404
+    
+    report = {}
+    if request.method == "POST":
+        data = request.get_json(silent=True) or {}
+        if data.get('reindex'):
+            report['reindex'] = manager.reindex()
+        report['sweep'] = manager.sweep()
+    
+    report.update(manager.usage())
+    report['timestamp'] = datetime.utcnow().isoformat()
+    return jsonify(report), 200
+
+@admin_bp.route("/debug/highlights", methods=["GET"])
+@roles_required(UserRole.SUPER_ADMIN)
+def debug_highlights():
+    """Compteurs du pool d'analyse des échanges"""
+    
+    detector = current_app.extensions.get('highlight_detector')
+    if not detector:
+        return jsonify({"error": "Détection des échanges non initialisée"}), 404
+    
+    stats = detector.stats()
+    stats['timestamp'] = datetime.utcnow().isoformat()
+    return jsonify(stats), 200
+
+@admin_bp.route("/debug/recording-sweeper", methods=["GET", "POST"])
+@roles_required(UserRole.SUPER_ADMIN)
+def debug_recording_sweeper():
+    """Compteurs du balayage des enregistrements expirés ; POST lance un balayage"""
+    
+    sweeper = current_app.extensions.get('recording_sweeper')
+    if not sweeper:
+        return jsonify({"error": "Balayage des enregistrements non initialisé"}), 404
+    
+    report = {}
+    if request.method == "POST":
+        report['sweep'] = sweeper.sweep()
+    
+    report.update(sweeper.stats())
+    report['timestamp'] = datetime.utcnow().isoformat()
+    return jsonify(report), 200
+
+@admin_bp.route("/debug/response-cache", methods=["GET", "POST"])
+@roles_required(UserRole.SUPER_ADMIN)
+def debug_response_cache():
+    """Compteurs du cache de réponses ; POST le vide"""
+    
+    cache = current_app.extensions.get('response_cache')
+    if not cache:
+        return jsonify({"error": "Cache de réponses non initialisé"}), 404
+    
+    if request.method == "POST":
+        cache.clear()
+    
+    stats = cache.stats()
+    stats['timestamp'] = datetime.utcnow().isoformat()
+    return jsonify(stats), 200
+
 # --- ROUTES DE GESTION DES DONNÉES DE TEST ---
 
 @admin_bp.route("/test-data/create-complete", methods=["POST"])
+@roles_required(UserRole.SUPER_ADMIN)
 def create_complete_test_data():
     """Création de données de test complètes pour tout le système"""
-    if not require_super_admin():
-        return jsonify({"error": "Accès non autorisé"}), 403
     
     try:
         logger.info("Début de la création de données de test complètes")
@@ -1475,8 +1561,7 @@ def create_complete_test_data():
                 
                 # Faire suivre des clubs aléatoires
                 clubs_to_follow = random.sample(all_clubs, random.randint(1, min(3, len(all_clubs))))
-                for club in clubs_to_follow:
-                    follower.followed_clubs.append(club)
+                follow_graph.follow(follower.id, [club.id for club in clubs_to_follow])
                 
                 followers_created += 1
         
@@ -1576,10 +1661,9 @@ def create_complete_test_data():
         return jsonify({'error': f'Erreur: {str(e)}'}), 500
 
 @admin_bp.route("/test-data/cleanup", methods=["POST"])
+@roles_required(UserRole.SUPER_ADMIN)
 def cleanup_test_data():
     """Nettoyer toutes les données de test"""
-    if not require_super_admin():
-        return jsonify({"error": "Accès non autorisé"}), 403
     
     try:
         # Supprimer les données de test identifiables
@@ -1604,10 +1688,9 @@ def cleanup_test_data():
 # --- ROUTES DE MAINTENANCE ---
 
 @admin_bp.route("/maintenance/database-check", methods=["GET"])
+@roles_required(UserRole.SUPER_ADMIN)
 def database_maintenance_check():
     """Vérification de maintenance de la base de données"""
-    if not require_super_admin():
-        return jsonify({"error": "Accès non autorisé"}), 403
     
     try:
         maintenance_report = {
@@ -1652,10 +1735,9 @@ def database_maintenance_check():
 # --- ROUTES DE BULK OPERATIONS ---
 
 @admin_bp.route("/bulk/update-credits", methods=["POST"])
+@roles_required(UserRole.SUPER_ADMIN)
 def bulk_update_credits():
     """Mise à jour en masse des crédits utilisateurs"""
-    if not require_super_admin():
-        return jsonify({"error": "Accès non autorisé"}), 403
     
     data = request.get_json()
     operation = data.get('operation')  # 'add', 'set', 'multiply'
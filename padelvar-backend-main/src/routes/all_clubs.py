@@ -1,9 +1,11 @@
 from flask import Blueprint, jsonify
 from src.models.user import Club, Court
+from src.services.response_cache import response_cache
 
 all_clubs_bp = Blueprint("all_clubs", __name__)
 
 @all_clubs_bp.route("/all", methods=["GET"])
+@response_cache.cached(tags=['table:club'], per_user=False)
 def get_all_clubs():
     try:
         clubs = Club.query.all()
@@ -12,6 +14,7 @@ def get_all_clubs():
         return jsonify({"error": str(e)}), 500
 
 @all_clubs_bp.route("/<int:club_id>/courts", methods=["GET"])
+@response_cache.cached(tags=lambda identity, view_args: [f"club:{view_args['club_id']}"], per_user=False)
 def get_club_courts(club_id):
     try:
         # Vérifier que le club existe
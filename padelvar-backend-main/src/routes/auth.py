@@ -1,9 +1,10 @@
 # padelvar-backend/src/routes/auth.py
 
 from flask import Blueprint, request, jsonify, session, make_response
-from werkzeug.security import generate_password_hash, check_password_hash
 from ..models.user import User, UserRole
 from ..models.database import db
+from ..services.identity import login_user, logout_user, current_user
+from ..services.password_hasher import password_hasher, PasswordHasherBusy
 import re
 import traceback
 import logging # Ajout du logger
@@ -13,6 +14,15 @@ logger = logging.getLogger(__name__)
 # La définition du Blueprint doit être ici, avant les routes
 auth_bp = Blueprint('auth', __name__)
 
+def auth_busy_response(error):
+    """503 quand le pool de hachage est saturé"""
+    response = make_response(jsonify({
+        'error': 'Service temporairement surchargé, réessayez dans un instant',
+        'retry_after': error.retry_after
+    }), 503)
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response
+
 def validate_email(email):
     pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
     return re.match(pattern, email) is not None
@@ -35,7 +45,7 @@ def register():
             return jsonify({'error': 'Un utilisateur avec cet email existe déjà'}), 409
         if len(password) < 6:
             return jsonify({'error': 'Le mot de passe doit contenir au moins 6 caractères'}), 400
-        password_hash = generate_password_hash(password)
+        password_hash = password_hasher.hash(password)
         new_user = User(
             email=email, password_hash=password_hash, name=name,
             phone_number=phone_number if phone_number else None,
@@ -43,11 +53,12 @@ def register():
         )
         db.session.add(new_user)
         db.session.commit()
-        session.permanent = True
-        session['user_id'] = new_user.id
-        session['user_role'] = new_user.role.value
+        login_user(new_user)
         response = make_response(jsonify({'message': 'Inscription réussie', 'user': new_user.to_dict()}), 201)
         return response
+    except PasswordHasherBusy as e:
+        db.session.rollback()
+        return auth_busy_response(e)
     except Exception as e:
         db.session.rollback()
         traceback.print_exc()
@@ -64,13 +75,19 @@ def login():
         email = data['email'].lower().strip()
         password = data['password']
         user = User.query.filter_by(email=email).first()
-        if not user or not user.password_hash or not check_password_hash(user.password_hash, password):
+        if not user or not password_hasher.verify(user.password_hash, password):
             return jsonify({'error': 'Email ou mot de passe incorrect'}), 401
-        session.permanent = True
-        session['user_id'] = user.id
-        session['user_role'] = user.role.value
+        if password_hasher.needs_rehash(user.password_hash):
+            # Migration vers la méthode et le coût configurés ; le nouveau sel
+            # ferme une fois les autres sessions de l'utilisateur (voir identity.py)
+            user.password_hash = password_hasher.hash(password)
+            db.session.commit()
+        login_user(user)
         response = make_response(jsonify({'message': 'Connexion réussie', 'user': user.to_dict()}), 200)
         return response
+    except PasswordHasherBusy as e:
+        db.session.rollback()
+        return auth_busy_response(e)
     except Exception as e:
         traceback.print_exc()
         return jsonify({'error': 'Erreur lors de la connexion'}), 500
@@ -79,7 +96,7 @@ def login():
 @auth_bp.route('/logout', methods=['POST'])
 def logout():
     # ... (code de la fonction logout inchangé)
-    session.clear()
+    logout_user()
     response = make_response(jsonify({'message': 'Déconnexion réussie'}), 200)
     return response
 
@@ -88,12 +105,10 @@ def logout():
 def get_current_user():
     # ... (code de la fonction get_current_user inchangé)
     try:
-        user_id = session.get("user_id")
-        if not user_id:
+        if not session.get("user_id"):
             return jsonify({'error': 'Non authentifié'}), 401
-        user = User.query.get(user_id)
+        user = current_user()
         if not user:
-            session.clear()
             return jsonify({'error': 'Utilisateur non trouvé'}), 404
         return jsonify({'user': user.to_dict()}), 200
     except Exception as e:
@@ -105,10 +120,9 @@ def get_current_user():
 def update_profile():
     # ... (code de la fonction update_profile inchangé)
     try:
-        user_id = session.get('user_id')
-        if not user_id:
+        if not session.get('user_id'):
             return jsonify({'error': 'Non authentifié'}), 401
-        user = User.query.get(user_id)
+        user = current_user()
         if not user:
             return jsonify({'error': 'Utilisateur non trouvé'}), 404
         data = request.get_json()
@@ -129,11 +143,10 @@ def update_profile():
 # ====================================================================
 @auth_bp.route('/change-password', methods=['POST'])
 def change_password():
-    user_id = session.get('user_id')
-    if not user_id:
+    if not session.get('user_id'):
         return jsonify({'error': 'Non authentifié'}), 401
     
-    user = User.query.get(user_id)
+    user = current_user()
     if not user:
         return jsonify({'error': 'Utilisateur non trouvé'}), 404
         
@@ -144,16 +157,20 @@ def change_password():
     if not old_password or not new_password:
         return jsonify({'error': 'Ancien et nouveau mots de passe requis'}), 400
         
-    if not user.password_hash or not check_password_hash(user.password_hash, old_password):
-        return jsonify({'error': 'Ancien mot de passe incorrect'}), 403
-        
     if len(new_password) < 6:
         return jsonify({'error': 'Le nouveau mot de passe doit contenir au moins 6 caractères'}), 400
         
     try:
-        user.password_hash = generate_password_hash(new_password)
+        if not password_hasher.verify(user.password_hash, old_password):
+            return jsonify({'error': 'Ancien mot de passe incorrect'}), 403
+        user.password_hash = password_hasher.hash(new_password)
         db.session.commit()
+        # Les autres sessions sont fermées, celle-ci est renouvelée
+        login_user(user)
         return jsonify({'message': 'Mot de passe mis à jour avec succès'}), 200
+    except PasswordHasherBusy as e:
+        db.session.rollback()
+        return auth_busy_response(e)
     except Exception as e:
         db.session.rollback()
         logger.error(f"Erreur lors du changement de mot de passe pour l'utilisateur {user.id}: {e}")
@@ -1,5 +1,10 @@
 from flask import Blueprint, request, jsonify, session
 from src.models.user import db, User, Club, Court, UserRole, ClubActionHistory, Video, RecordingSession
+from src.services.identity import current_user
+from src.services.camera_health import camera_health
+from src.services.follow_graph import follow_graph
+from src.services.audit_log import audit_log
+from src.services.response_cache import response_cache
 from datetime import datetime, timedelta
 import json
 import random
@@ -14,10 +19,7 @@ logger = logging.getLogger(__name__)
 clubs_bp = Blueprint('clubs', __name__)
 
 def get_current_user():
-    user_id = session.get('user_id')
-    if not user_id:
-        return None
-    return User.query.get(user_id)
+    return current_user()
 
 # Route pour récupérer la liste des clubs
 @clubs_bp.route('/', methods=['GET'])
@@ -42,10 +44,14 @@ def follow_club(club_id):
         return jsonify({'error': 'Seuls les joueurs peuvent suivre un club'}), 403
     
     club = Club.query.get_or_404(club_id)
-    if club in user.followed_clubs:
+    try:
+        added, _ = follow_graph.apply(user.id, follow=[club.id])
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    if not added:
         return jsonify({'message': 'Vous suivez déjà ce club'}), 200
     
-    user.followed_clubs.append(club)
     db.session.commit()
     return jsonify({'message': 'Club suivi avec succès'}), 200
 
@@ -211,7 +217,10 @@ def diagnostic_club_data(club_id):
         return jsonify({'error': f'Erreur lors du diagnostic: {str(e)}'}), 500
 
 # Route pour récupérer les informations du tableau de bord du club
+# En cache par club ; durée courte : minutes restantes des enregistrements en cours
 @clubs_bp.route('/dashboard', methods=['GET'])
+@response_cache.cached(tags=lambda identity, view_args: [f"club:{identity['club_id']}"],
+                       ttl='RESPONSE_CACHE_LIVE_TTL')
 def get_club_dashboard():
     user = get_current_user()
     if not user:
@@ -242,14 +251,8 @@ def get_club_dashboard():
         courts_count = len(courts)
         print(f"Nombre de terrains: {courts_count}")
         
-        # NOTE: Ne pas nettoyer automatiquement les sessions expirées ici
-        # pour permettre de voir les terrains "Occupé" même quand ils viennent d'expirer
-        # Le nettoyage se fera dans d'autres endpoints
-        # from src.routes.recording import cleanup_expired_sessions
-        # try:
-        #     cleanup_expired_sessions()
-        # except Exception as e:
-        #     print(f"Erreur lors du nettoyage des sessions expirées: {e}")
+        # NOTE: Les sessions expirées sont finalisées par le balayage de fond
+        # (voir services/recording_sweeper.py), jamais pendant cette lecture
         
         # Enrichir les informations des terrains avec le statut d'occupation
         courts_with_status = []
@@ -304,31 +307,9 @@ def get_club_dashboard():
             videos = []
             print("Aucun terrain trouvé, donc aucune vidéo")
         
-        # 4. Compter les followers - Correction de la méthode
-        followers_count = 0
-        try:
-            # Utiliser une requête directe comme dans admin.py
-            followers = db.session.query(User).join(
-                club.followers.property.secondary
-            ).filter(
-                club.followers.property.secondary.c.club_id == club.id
-            ).all()
-            followers_count = len(followers)
-            
-            print(f"Nombre de followers: {followers_count}")
-            # Debug: afficher les followers trouvés
-            for follower in followers[:3]:
-                print(f"  Follower: {follower.name} (ID: {follower.id})")
-                
-        except Exception as e:
-            # Fallback: utiliser la relation directe
-            try:
-                followers_list = club.followers.all()
-                followers_count = len(followers_list)
-                print(f"Nombre de followers (fallback): {followers_count}")
-            except Exception as e2:
-                print(f"Erreur lors du comptage des followers: {e}, fallback: {e2}")
-                followers_count = 0
+        # 4. Compter les followers (compteur dénormalisé, tenu par follow_graph)
+        followers_count = club.followers_count
+        print(f"Nombre de followers: {followers_count}")
         
         # 5. Compter les crédits offerts - Amélioration de la méthode
         credits_given = 0
@@ -446,7 +427,12 @@ def get_club_courts():
             return jsonify({'error': 'Club non trouvé'}), 404
             
         courts = Court.query.filter_by(club_id=club.id).all()
-        return jsonify({'courts': [court.to_dict() for court in courts]}), 200
+        courts_data = []
+        for court in courts:
+            court_data = court.to_dict()
+            court_data['camera_status'] = camera_health.summary(court.id, court.camera_url)
+            courts_data.append(court_data)
+        return jsonify({'courts': courts_data}), 200
         
     except Exception as e:
         print(f"Erreur lors de la récupération des terrains: {e}")
@@ -489,9 +475,20 @@ def get_club_followers():
         if not club:
             return jsonify({'error': 'Club non trouvé'}), 404
             
-        # Récupérer les joueurs qui suivent ce club
-        followers = club.followers.all()
-        return jsonify({'followers': [follower.to_dict() for follower in followers]}), 200
+        # Par pages (?limit= borné, FOLLOWERS_PAGE_SIZE par défaut) et ?cursor= ; total lu dans le compteur du club
+        cursor = request.args.get('cursor')
+        limit = follow_graph.page_size(request.args.get('limit', type=int))
+        try:
+            followers, next_cursor = follow_graph.followers(club.id, limit, cursor)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify({
+            'followers': followers,
+            'total_count': club.followers_count,
+            'limit': limit,
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
+        }), 200
         
     except Exception as e:
         print(f"Erreur lors de la récupération des abonnés: {e}")
@@ -750,13 +747,7 @@ def debug_club_data():
                 } for c in courts]
                 
                 # Vérifier les followers
-                followers_count = 0
-                try:
-                    followers_count = club.followers.count()
-                except Exception as e:
-                    print(f"Erreur dans le comptage des followers: {e}")
-                
-                club_info['followers_count'] = followers_count
+                club_info['followers_count'] = club.followers_count
                 
         # Vérifier si les tables sont bien créées
         database_info = {
@@ -818,12 +809,7 @@ def test_dashboard_json():
             videos_count = len(videos)
         
         # 4. Compter les followers
-        followers_count = 0
-        try:
-            followers_list = club.followers.all()
-            followers_count = len(followers_list)
-        except:
-            followers_count = 0
+        followers_count = club.followers_count
         
         # 5. Compter les crédits
         credits_given = 0
@@ -979,10 +965,8 @@ def force_create_test_data():
         
         # Associer tous les followers au club (similaire à admin.py)
         all_followers = players + external_followers
-        for follower in all_followers:
-            if club not in follower.followed_clubs.all():
-                follower.followed_clubs.append(club)
-                print(f"{follower.name} suit maintenant le club")
+        added = follow_graph.add_followers(club.id, [follower.id for follower in all_followers])
+        print(f"{len(added)} joueur(s) suivent maintenant le club")
         
         # 4. Créer des vidéos (similar to admin.py video creation logic)
         videos_created = 0
@@ -1061,7 +1045,7 @@ def force_create_test_data():
             'players_count': User.query.filter_by(club_id=club_id, role=UserRole.PLAYER).count(),
             'courts_count': Court.query.filter_by(club_id=club_id).count(),
             'videos_count': len(db.session.query(Video).join(Court).filter(Court.club_id == club_id).all()),
-            'followers_count': len(club.followers.all()),
+            'followers_count': club.followers_count,
             'credits_entries': ClubActionHistory.query.filter_by(club_id=club_id, action_type='add_credits').count()
         }
         
@@ -1176,6 +1160,7 @@ def create_test_data():
         
         # Créer des followers pour le club
         followers_data = []
+        follower_ids = []
         
         # Créer 2 joueurs externes qui vont suivre le club
         external_players = [
@@ -1197,20 +1182,12 @@ def create_test_data():
                 db.session.add(player)
                 db.session.flush()
                 followers_data.append({'name': player.name, 'created': True})
-                
-                # Faire suivre le club par ce joueur
-                player.followed_clubs.append(club)
             else:
                 followers_data.append({'name': player.name, 'created': False})
-                
-                # S'assurer que le joueur suit le club
-                if club not in player.followed_clubs.all():
-                    player.followed_clubs.append(club)
+            follower_ids.append(player.id)
         
-        # Faire suivre le club par les joueurs du club aussi
-        for player in players:
-            if club not in player.followed_clubs.all():
-                player.followed_clubs.append(club)
+        # Followers externes et joueurs du club suivent le club (abonnements existants ignorés)
+        follow_graph.add_followers(club.id, follower_ids + [player.id for player in players])
         
         # Créer des vidéos pour les terrains et joueurs
         videos_data = []
@@ -1387,12 +1364,13 @@ def stop_court_recording(court_id):
         if start_time and end_time:
             duration_delta = end_time - start_time
             duration_seconds = duration_delta.total_seconds()
-            duration_minutes = max(1, int(duration_seconds / 60))  # Minimum 1 minute
+            duration_minutes = max(1, int(duration_seconds / 60))  # Minimum 1 minute (affichage)
             
             print(f"  Durée en secondes: {duration_seconds}")
             print(f"  Durée en minutes: {duration_minutes}")
         else:
             # Fallback si les dates sont nulles
+            duration_seconds = 60
             duration_minutes = 1
             print(f"  Fallback: durée fixée à 1 minute")
         
@@ -1402,7 +1380,7 @@ def stop_court_recording(court_id):
         new_video = Video(
             title=video_title,
             description=active_recording.description or f"Enregistrement automatique sur {court.name}",
-            duration=duration_minutes,
+            duration=max(1, int(duration_seconds)),  # en secondes, comme les autres vidéos
             user_id=active_recording.user_id,
             court_id=court_id,
             recorded_at=active_recording.start_time,
@@ -1414,21 +1392,13 @@ def stop_court_recording(court_id):
         
         # Log de l'action d'arrêt par le club
         try:
-            action_history = ClubActionHistory(
-                club_id=user.club.id,
-                user_id=active_recording.user_id,
-                action_type='stop_recording',
-                action_details=json.dumps({
-                    'stopped_by': 'club',
-                    'duration_minutes': duration_minutes,
-                    'court_name': court.name,
-                    'video_title': new_video.title,
-                    'recording_id': active_recording.recording_id
-                }),
-                performed_by_id=user.id,
-                performed_at=datetime.utcnow()
-            )
-            db.session.add(action_history)
+            audit_log.record(active_recording.user_id, user.club.id, 'stop_recording', {
+                'stopped_by': 'club',
+                'duration_minutes': duration_minutes,
+                'court_name': court.name,
+                'video_title': new_video.title,
+                'recording_id': active_recording.recording_id
+            }, performed_by_id=user.id)
             logger.info(f"Club {user.club.name} a arrêté l'enregistrement {active_recording.recording_id}")
         except Exception as log_error:
             logger.warning(f"Erreur lors du log d'action: {log_error}")
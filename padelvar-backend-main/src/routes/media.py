@@ -0,0 +1,81 @@
+"""
+Fichiers vidéo servis directement par l'application, hors API
+- /cdn/<clé> : vidéos publiées par le backend CDN 'local' (CDN_PUBLIC_BASE_URL=/cdn)
+- /blobs/<sha256>.<ext> : vidéos et miniatures du stockage par contenu
+  (niveau chaud ou froid, voir blob_store.py)
+
+Requêtes Range et revalidation par ETag (send_file conditionnel), comme le
+téléchargement des vidéos. Un fichier n'est servi que s'il est référencé par
+une vidéo que l'appelant peut voir (can_view_video, comme le HLS) ; la réponse
+d'une vidéo verrouillée reste privée (aucun cache partagé).
+"""
+
+from flask import Blueprint, jsonify, send_file
+
+from ..models.user import Video
+from ..services.blob_store import blob_store
+from ..services.cdn_migrator import cdn_migrator
+from ..services.storage_backends import LocalDirectoryBackend
+from ..services.storage_manager import storage_manager
+from .videos import can_view_video
+
+media_bp = Blueprint('media', __name__)
+
+# Une clé publiée n'est jamais réécrite (videos/<id>/<fichier>)
+PUBLISHED_MAX_AGE = 86400
+# Un nom /blobs/ est l'empreinte de son contenu : il ne change jamais
+BLOB_MAX_AGE = 31536000
+
+
+def _send(path, public: bool, max_age: int, immutable: bool = False):
+    response = send_file(path.absolute(), conditional=True)
+    response.cache_control.no_cache = None  # send_file pose no-cache par défaut
+    if public:
+        response.cache_control.public = True
+    else:
+        response.cache_control.private = True
+    response.cache_control.max_age = max_age
+    if immutable:
+        response.cache_control.immutable = True
+    return response
+
+
+@media_bp.route('/cdn/<path:key>', methods=['GET'])
+def serve_local_cdn(key):
+    """Vidéo migrée vers le CDN local : servie depuis CDN_LOCAL_ROOT"""
+    backend = cdn_migrator.backend
+    if not isinstance(backend, LocalDirectoryBackend):
+        return jsonify({'error': 'CDN local non configuré'}), 404
+    # Clé devinable (videos/<id>/<fichier>) : seule la vidéo qui la référence décide de l'accès
+    video = Video.query.filter_by(file_url=f"{backend.public_base_url}/{key}").first()
+    path = backend.locate(key) if video is not None else None
+    if path is None:
+        return jsonify({'error': 'Fichier non trouvé'}), 404
+    if not can_view_video(video):
+        return jsonify({'error': 'Accès non autorisé'}), 403
+    return _send(path, video.is_unlocked, PUBLISHED_MAX_AGE)
+
+
+@media_bp.route('/blobs/<name>', methods=['GET'])
+def serve_blob(name):
+    """
+    Fichier adressé par contenu, où qu'il soit rangé. Une miniature est
+    publique ; une vidéo n'est servie que si l'une des vidéos qui la
+    référencent est visible par l'appelant.
+    """
+    path = blob_store.locate(name)
+    references = blob_store.references([name])[name] if path is not None else []
+    if not references:
+        return jsonify({'error': 'Fichier non trouvé'}), 404
+
+    if any(column == 'thumbnail_url' for _, column in references):
+        public = True
+    else:
+        videos = Video.query.filter(Video.id.in_([video_id for video_id, _ in references])).all()
+        if not any(can_view_video(video) for video in videos):
+            return jsonify({'error': 'Accès non autorisé'}), 403
+        # Même contenu qu'une vidéo déverrouillée : déjà public
+        public = any(video.is_unlocked for video in videos)
+
+    storage_manager.touch(path)
+    return _send(path, public, BLOB_MAX_AGE, immutable=True)
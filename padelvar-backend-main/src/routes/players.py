@@ -1,18 +1,23 @@
 """
 Routes pour les joueurs - Optimisé pour 1000+ utilisateurs concurrents
 Philosophie d'optimisation appliquée selon clubs.py et admin.py
+Requêtes de lecture regroupées dans src/services/player_queries.py
 """
 
 from flask import Blueprint, request, jsonify, session
-from sqlalchemy.orm import joinedload
-from sqlalchemy import desc, func, and_, or_
 from datetime import datetime, timedelta
 import json
 import time
 import logging
 
 from ..models.database import db
-from ..models.user import User, Club, Court, Video, ClubActionHistory, player_club_follows
+from ..models.user import User, Club, Court, Video, ClubActionHistory
+from ..services.identity import current_user
+from ..services.video_library import video_library
+from ..services.follow_graph import follow_graph
+from ..services.audit_log import audit_log
+from ..services.player_queries import player_queries, detail_int, CREDIT_HISTORY_ACTIONS
+from ..services.response_cache import response_cache
 
 logger = logging.getLogger(__name__)
 
@@ -36,49 +41,26 @@ def simulate_payment(payment_method, amount_dt):
         # Mode simulation pour tests
         return True
 
+def player_cache_tags(identity, view_args):
+    """Étiquettes des réponses joueur en cache : le joueur, et les clubs, terrains et abonnements de tous"""
+    return [f"user:{identity['user_id']}", 'table:club', 'table:court', 'table:player_club_follows']
+
 def require_player_access():
     """Vérification d'accès avec optimisations pour haute charge"""
     try:
-        # MODE DEBUG: Accepter tout utilisateur authentifié
-        if 'user_id' not in session:
-            logger.warning("Tentative d'accès sans session")
-            return None
-        
-        # Optimisation: requête simple sans jointure pour la vérification d'accès
-        user = User.query.filter_by(id=session['user_id']).first()
-        
-        if not user:
-            logger.warning(f"Utilisateur {session.get('user_id')} non trouvé")
-            return None
-            
-        # MODE DEBUG: Accepter tous les rôles pour les tests
-        # Normalement, on vérifierait user.role == 'PLAYER'
-        logger.info(f"Accès accordé pour l'utilisateur {user.id} avec le rôle {user.role}")
-        
-        return user
+        # MODE DEBUG: Accepter tout utilisateur authentifié (tous les rôles)
+        # Utilisateur chargé au plus une fois par requête, sans log sur le chemin critique
+        return current_user()
         
     except Exception as e:
         logger.error(f"Erreur lors de la vérification d'accès: {e}")
         return None
 
 def log_action(club_id, player_id, action_type, action_details, performed_by_id):
-    """Log d'action optimisé avec gestion d'erreur robuste"""
+    """Log d'action : écrit après le commit de la requête, par lots (voir services/audit_log.py)"""
     try:
-        action_details_json = json.dumps(action_details) if isinstance(action_details, dict) else str(action_details)
-        
-        action_history = ClubActionHistory(
-            club_id=club_id,
-            user_id=player_id,
-            action_type=action_type,
-            action_details=action_details_json,
-            performed_by_id=performed_by_id,
-            performed_at=datetime.utcnow()
-        )
-        
-        db.session.add(action_history)
-        db.session.flush()  # Flush pour obtenir l'ID sans commit complet
-        
-        logger.info(f"Action loggée: {action_type} pour le joueur {player_id}")
+        audit_log.record(player_id, club_id, action_type, action_details, performed_by_id)
+        logger.debug(f"Action loggée: {action_type} pour le joueur {player_id}")
         
     except Exception as e:
         logger.error(f"Erreur lors du logging de l'action {action_type}: {e}")
@@ -134,6 +116,7 @@ def debug_auth():
         return jsonify({"error": str(e)}), 500
 
 @players_bp.route("/clubs/available", methods=["GET"])
+@response_cache.cached(tags=player_cache_tags)
 def get_available_clubs():
     """Récupérer les clubs disponibles avec optimisations pour haute charge"""
     user = require_player_access()
@@ -141,39 +124,19 @@ def get_available_clubs():
         return jsonify({"error": "Accès non autorisé"}), 403
     
     try:
-        # Requête simple et sûre
-        clubs_query = db.session.query(Club).all()
-        
-        # Requête des clubs suivis de manière sécurisée
-        try:
-            followed_ids = {c.id for c in user.followed_clubs.all()}
-        except Exception as e:
-            logger.warning(f"Erreur avec followed_clubs: {e}")
-            followed_ids = set()
-        
+        # Clubs triés par popularité, terrains et abonnement en sous-requêtes : une requête
         clubs_data = []
-        for club in clubs_query:
+        for club, courts_count, is_followed in player_queries.clubs(user.id):
             club_dict = club.to_dict()
-            club_dict["is_followed"] = club.id in followed_ids
-            
-            # Compter les followers de manière sécurisée
-            try:
-                club_dict["followers_count"] = club.followers.count()
-            except Exception:
-                club_dict["followers_count"] = 0
-                
-            # Compter les courts
-            club_dict["courts_count"] = len(club.courts) if hasattr(club, 'courts') and club.courts else 0
+            club_dict["is_followed"] = is_followed
+            club_dict["courts_count"] = courts_count
             clubs_data.append(club_dict)
         
-        # Trier par popularité
-        clubs_data.sort(key=lambda x: x.get("followers_count", 0), reverse=True)
-        
         logger.info(f"Clubs disponibles récupérés pour le joueur {user.id}")
         return jsonify({
             "clubs": clubs_data,
             "total_clubs": len(clubs_data),
-            "followed_count": len(followed_ids)
+            "followed_count": sum(1 for club in clubs_data if club["is_followed"])
         }), 200
         
     except Exception as e:
@@ -191,36 +154,16 @@ def follow_club(club_id):
     try:
         club = Club.query.get_or_404(club_id)
         
-        # Vérification optimisée pour dynamic relationship
-        # Vérifier directement dans la table d'association
-        existing_follow = db.session.execute(
-            player_club_follows.select().where(
-                player_club_follows.c.player_id == user.id,
-                player_club_follows.c.club_id == club_id
-            )
-        ).first()
+        # Insertion et compteurs en une passe ; abonnement existant ignoré
+        try:
+            added, _ = follow_graph.apply(user.id, follow=[club_id])
+        except ValueError as e:
+            db.session.rollback()
+            return jsonify({"error": str(e)}), 400
         
-        if existing_follow:
+        if not added:
             return jsonify({"error": "Vous suivez déjà ce club"}), 409
         
-        # Limite de clubs suivis pour éviter la surcharge
-        max_followed_clubs = 10  # Configurable
-        if user.followed_clubs.count() >= max_followed_clubs:
-            return jsonify({
-                "error": f"Limite de {max_followed_clubs} clubs suivis atteinte"
-            }), 400
-        
-        # Ajouter le suivi
-        # Pour les relationships dynamiques, nous devons manipuler via l'ORM
-        
-        # Insérer dans la table d'association
-        db.session.execute(
-            player_club_follows.insert().values(
-                player_id=user.id,
-                club_id=club_id
-            )
-        )
-        
         user.club_id = club.id
         
         # Log de l'action
@@ -242,7 +185,7 @@ def follow_club(club_id):
         return jsonify({
             "message": f"Vous suivez maintenant {club.name}",
             "club": club.to_dict(),
-            "followed_clubs_count": user.followed_clubs.count()
+            "followed_clubs_count": user.followed_clubs_count
         }), 200
         
     except Exception as e:
@@ -260,28 +203,10 @@ def unfollow_club(club_id):
     try:
         club = Club.query.get_or_404(club_id)
         
-        # Vérifier si l'utilisateur suit ce club
-        existing_follow = db.session.execute(
-            player_club_follows.select().where(
-                player_club_follows.c.player_id == user.id,
-                player_club_follows.c.club_id == club_id
-            )
-        ).first()
-        
-        if not existing_follow:
+        # Suppression et compteurs en une passe
+        if not follow_graph.unfollow(user.id, [club_id]):
             return jsonify({"error": "Vous ne suivez pas ce club"}), 409
         
-        # Retirer le suivi
-        # Pour les relationships dynamiques, manipuler la table d'association directement
-        
-        # Supprimer de la table d'association
-        db.session.execute(
-            player_club_follows.delete().where(
-                player_club_follows.c.player_id == user.id,
-                player_club_follows.c.club_id == club_id
-            )
-        )
-        
         # CORRECTION CRUCIALE: Réinitialiser l'affiliation principale
         if user.club_id == club_id:
             user.club_id = None
@@ -303,7 +228,7 @@ def unfollow_club(club_id):
         logger.info(f"Joueur {user.id} ne suit plus le club {club.id}")
         return jsonify({
             "message": f"Vous ne suivez plus {club.name}",
-            "followed_clubs_count": user.followed_clubs.count()
+            "followed_clubs_count": user.followed_clubs_count
         }), 200
         
     except Exception as e:
@@ -321,40 +246,22 @@ def get_followed_clubs():
     try:
         followed_clubs_data = []
         
-        # Requête sécurisée des clubs suivis
-        try:
-            followed_clubs = user.followed_clubs.all()
-        except Exception as e:
-            logger.warning(f"Erreur avec followed_clubs: {e}")
-            followed_clubs = []
+        # Clubs avec leurs terrains, puis dernières activités : deux requêtes quel que soit le nombre de clubs
+        followed_clubs = player_queries.followed_clubs(user.id)
+        last_activities = player_queries.last_actions_by_club(user.id, [club.id for club, _ in followed_clubs])
         
-        for club in followed_clubs:
+        for club, courts_count in followed_clubs:
             club_dict = club.to_dict()
-            
-            # Ajouter des statistiques enrichies de manière sécurisée
-            club_dict["courts_count"] = len(club.courts) if hasattr(club, 'courts') and club.courts else 0
-            
-            try:
-                club_dict["followers_count"] = club.followers.count()
-            except Exception:
-                club_dict["followers_count"] = 0
-                
+            club_dict["courts_count"] = courts_count
             club_dict["is_primary_club"] = (user.club_id == club.id)
             
             # Dernière activité du joueur dans ce club
-            try:
-                last_activity = ClubActionHistory.query.filter_by(
-                    club_id=club.id,
-                    user_id=user.id
-                ).order_by(desc(ClubActionHistory.performed_at)).first()
-                
-                if last_activity:
-                    club_dict["last_activity"] = {
-                        "action_type": last_activity.action_type,
-                        "performed_at": last_activity.performed_at.isoformat()
-                    }
-            except Exception:
-                pass
+            last_activity = last_activities.get(club.id)
+            if last_activity:
+                club_dict["last_activity"] = {
+                    "action_type": last_activity.action_type,
+                    "performed_at": last_activity.performed_at.isoformat()
+                }
             
             followed_clubs_data.append(club_dict)
         
@@ -368,9 +275,72 @@ def get_followed_clubs():
         logger.error(f"Erreur lors de la récupération des clubs suivis: {e}")
         return jsonify({"error": "Erreur lors de la récupération"}), 500
 
+@players_bp.route("/clubs/follows", methods=["POST"])
+def update_followed_clubs():
+    """Suivre et ne plus suivre plusieurs clubs en une opération : {"follow": [...], "unfollow": [...]}"""
+    user = require_player_access()
+    if not user: 
+        return jsonify({"error": "Accès non autorisé"}), 403
+    
+    data = request.get_json(silent=True) or {}
+    try:
+        follow_ids = [int(club_id) for club_id in data.get('follow') or []]
+        unfollow_ids = [int(club_id) for club_id in data.get('unfollow') or []]
+    except (TypeError, ValueError):
+        return jsonify({"error": "Identifiants de clubs invalides"}), 400
+    
+    if not follow_ids and not unfollow_ids:
+        return jsonify({"error": "Aucun club à suivre ou à retirer"}), 400
+    if set(follow_ids) & set(unfollow_ids):
+        return jsonify({"error": "Un même club ne peut être suivi et retiré"}), 400
+    
+    try:
+        try:
+            added, removed = follow_graph.apply(user.id, follow=follow_ids, unfollow=unfollow_ids)
+        except ValueError as e:
+            db.session.rollback()
+            return jsonify({"error": str(e)}), 400
+        
+        if user.club_id in removed:
+            user.club_id = None
+        if added and user.club_id is None:
+            user.club_id = added[0]
+        
+        names = dict(db.session.query(Club.id, Club.name).filter(Club.id.in_(added + removed)).all()) \
+            if added or removed else {}
+        timestamp = datetime.utcnow().isoformat()
+        for action_type, club_ids in (('follow_club', added), ('unfollow_club', removed)):
+            for club_id in club_ids:
+                log_action(
+                    club_id=club_id,
+                    player_id=user.id,
+                    action_type=action_type,
+                    action_details={"club_name": names.get(club_id), "timestamp": timestamp, "bulk_operation": True},
+                    performed_by_id=user.id
+                )
+        
+        db.session.commit()
+        
+        # Clubs demandés mais inconnus, déjà suivis ou déjà retirés
+        skipped = sorted((set(follow_ids) - set(added)) | (set(unfollow_ids) - set(removed)))
+        logger.info(f"Joueur {user.id} : {len(added)} club(s) suivi(s), {len(removed)} retiré(s)")
+        return jsonify({
+            "followed": added,
+            "unfollowed": removed,
+            "skipped": skipped,
+            "followed_clubs_count": user.followed_clubs_count,
+            "primary_club_id": user.club_id
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Erreur lors de la mise à jour des clubs suivis: {e}")
+        return jsonify({"error": "Erreur lors de la mise à jour des clubs suivis"}), 500
+
 # --- ROUTES DE DASHBOARD JOUEUR ---
 
 @players_bp.route("/dashboard", methods=["GET"])
+@response_cache.cached(tags=player_cache_tags)
 def get_player_dashboard():
     """Dashboard complet du joueur avec toutes ses statistiques"""
     user = require_player_access()
@@ -384,39 +354,27 @@ def get_player_dashboard():
         player_info = user.to_dict()
         
         # 2. Statistiques des clubs suivis
-        followed_clubs_count = user.followed_clubs.count()  # count() pour dynamic relationship
+        followed_clubs_count = user.followed_clubs_count
         primary_club = None
         if user.club_id:
             primary_club = Club.query.get(user.club_id)
         
-        # 3. Statistiques des vidéos du joueur
-        player_videos = Video.query.filter_by(user_id=user.id).all()
+        # 3. Statistiques des vidéos du joueur (agrégats calculés par la base)
+        video_stats = player_queries.video_stats(user.id)
         videos_stats = {
-            "total_videos": len(player_videos),
-            "unlocked_videos": len([v for v in player_videos if v.is_unlocked]),
-            "total_duration": sum(v.duration for v in player_videos if v.duration),
-            "recent_videos": [v.to_dict() for v in player_videos[-5:]]  # 5 dernières
+            "total_videos": video_stats["total"],
+            "unlocked_videos": video_stats["unlocked"],
+            "total_duration": video_stats["total_duration"],
+            "recent_videos": [v.to_dict() for v in player_queries.recent_videos(user.id, 5)]  # 5 dernières
         }
         
-        # 4. Historique d'activité récente
-        recent_activity = ClubActionHistory.query.filter_by(
-            user_id=user.id
-        ).order_by(desc(ClubActionHistory.performed_at)).limit(10).all()
-        
-        activity_data = []
-        for activity in recent_activity:
-            club_name = "Club inconnu"
-            if activity.club_id:
-                club = Club.query.get(activity.club_id)
-                if club:
-                    club_name = club.name
-            
-            activity_data.append({
-                "action_type": activity.action_type,
-                "club_name": club_name,
-                "performed_at": activity.performed_at.isoformat(),
-                "details": activity.action_details
-            })
+        # 4. Historique d'activité récente, nom du club joint
+        activity_data = [{
+            "action_type": activity.action_type,
+            "club_name": club_name or "Club inconnu",
+            "performed_at": activity.performed_at.isoformat(),
+            "details": activity.action_details
+        } for activity, club_name in player_queries.history(user.id, limit=10)]
         
         # 5. Statistiques de crédits
         credits_stats = {
@@ -425,45 +383,20 @@ def get_player_dashboard():
             "credits_spent_this_month": 0     # À calculer depuis l'historique
         }
         
-        # Calculer les crédits du mois
+        # Calculer les crédits du mois (détails seuls, sans objets ORM)
         month_start = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        monthly_credits = ClubActionHistory.query.filter(
-            ClubActionHistory.user_id == user.id,
-            ClubActionHistory.action_type == 'add_credits',
-            ClubActionHistory.performed_at >= month_start
-        ).all()
-        
-        for entry in monthly_credits:
-            try:
-                if entry.action_details:
-                    details = json.loads(entry.action_details)
-                    credits_added = details.get('credits_added', 0)
-                    if isinstance(credits_added, (int, float)):
-                        credits_stats["credits_earned_this_month"] += int(credits_added)
-            except:
-                pass
+        for _, _, _, details in player_queries.history_details(user.id, ['add_credits'], since=month_start):
+            credits_stats["credits_earned_this_month"] += detail_int(details, 'credits_added')
         
         # 6. Recommandations de clubs
         recommended_clubs = []
         try:
-            # Recommander des clubs populaires non suivis
-            all_clubs = Club.query.all()
-            followed_ids = {c.id for c in user.followed_clubs.all()}  # .all() pour dynamic relationship
-            
-            for club in all_clubs:
-                if club.id not in followed_ids:
-                    followers_count = club.followers.count()  # count() pour dynamic relationship
-                    courts_count = len(club.courts) if hasattr(club, 'courts') else 0
-                    
-                    if followers_count > 0 or courts_count > 0:  # Clubs actifs
-                        club_dict = club.to_dict()
-                        club_dict["followers_count"] = followers_count
-                        club_dict["courts_count"] = courts_count
-                        recommended_clubs.append(club_dict)
-            
-            # Trier par popularité et prendre les 5 premiers
-            recommended_clubs.sort(key=lambda x: x.get("followers_count", 0), reverse=True)
-            recommended_clubs = recommended_clubs[:5]
+            # Clubs actifs non suivis, les plus populaires d'abord : tri et limite faits par la base
+            for club, courts_count, _ in player_queries.clubs(user.id, exclude_followed=True,
+                                                              active_only=True, limit=5):
+                club_dict = club.to_dict()
+                club_dict["courts_count"] = courts_count
+                recommended_clubs.append(club_dict)
         except Exception as e:
             logger.error(f"Erreur lors du calcul des recommandations: {e}")
         
@@ -490,7 +423,7 @@ def get_player_dashboard():
 
 @players_bp.route("/videos", methods=["GET"])
 def get_player_videos():
-    """Récupérer toutes les vidéos du joueur avec filtres"""
+    """Récupérer les vidéos du joueur avec filtres (pagination par curseur)"""
     user = require_player_access()
     if not user: 
         return jsonify({"error": "Accès non autorisé"}), 403
@@ -499,47 +432,31 @@ def get_player_videos():
         # Paramètres de filtrage
         club_id = request.args.get('club_id', type=int)
         is_unlocked = request.args.get('is_unlocked')
-        limit = request.args.get('limit', 50, type=int)
-        offset = request.args.get('offset', 0, type=int)
-        
-        # Construire la requête
-        query = Video.query.filter_by(user_id=user.id)
-        
-        if club_id:
-            # Filtrer par club via les terrains
-            query = query.join(Court).filter(Court.club_id == club_id)
-        
-        if is_unlocked is not None:
-            query = query.filter(Video.is_unlocked == (is_unlocked.lower() == 'true'))
-        
-        # Appliquer pagination et tri
-        videos = query.order_by(desc(Video.recorded_at)).offset(offset).limit(limit).all()
-        total_count = query.count()
-        
-        # Enrichir les données des vidéos
-        videos_data = []
-        for video in videos:
-            video_dict = video.to_dict()
-            
-            # Ajouter les informations du terrain et du club
-            court = Court.query.get(video.court_id)
-            if court:
-                video_dict["court_name"] = court.name
-                club = Club.query.get(court.club_id)
-                if club:
-                    video_dict["club_name"] = club.name
-                    video_dict["club_id"] = club.id
-            
-            videos_data.append(video_dict)
+        is_unlocked = None if is_unlocked is None else is_unlocked.lower() == 'true'
+        limit = video_library.page_size(request.args.get('limit', type=int))
+        cursor = request.args.get('cursor')
+        # offset : ancienne pagination, toujours acceptée mais dépréciée au profit de cursor
+        offset = max(0, request.args.get('offset', 0, type=int))
+        
+        # Une requête pour la page (terrain et club joints), total en cache
+        videos_data, next_cursor = video_library.page(
+            user.id, limit, cursor=cursor, club_id=club_id, is_unlocked=is_unlocked, offset=offset
+        )
         
-        return jsonify({
+        response = jsonify({
             "videos": videos_data,
-            "total_count": total_count,
-            "offset": offset,
+            "total_count": video_library.total_count(user.id, club_id, is_unlocked),
+            "offset": 0 if cursor else offset,
             "limit": limit,
-            "has_more": (offset + limit) < total_count
-        }), 200
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None
+        })
+        if 'offset' in request.args:
+            response.headers['Deprecation'] = 'true'
+        return response, 200
         
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         logger.error(f"Erreur lors de la récupération des vidéos du joueur: {e}")
         return jsonify({"error": "Erreur lors de la récupération des vidéos"}), 500
@@ -848,43 +765,21 @@ def get_credits_history():
         return jsonify({"error": "Accès non autorisé"}), 403
     
     try:
-        limit = request.args.get('limit', 20, type=int)
-        offset = request.args.get('offset', 0, type=int)
-        
-        # Récupérer l'historique des crédits
-        credits_actions = ClubActionHistory.query.filter(
-            ClubActionHistory.user_id == user.id,
-            or_(
-                ClubActionHistory.action_type == 'buy_credits',
-                ClubActionHistory.action_type == 'unlock_video',
-                ClubActionHistory.action_type == 'purchase'
-            )
-        ).order_by(desc(ClubActionHistory.performed_at)).offset(offset).limit(limit).all()
-        
-        total_count = ClubActionHistory.query.filter(
-            ClubActionHistory.user_id == user.id,
-            or_(
-                ClubActionHistory.action_type == 'buy_credits',
-                ClubActionHistory.action_type == 'unlock_video',
-                ClubActionHistory.action_type == 'purchase'
-            )
-        ).count()
+        limit = player_queries.page_size(request.args.get('limit', type=int), 20)
+        offset = max(0, request.args.get('offset', 0, type=int))
         
+        # Historique des crédits, nom du club joint : une requête pour la page, une pour le total
+        total_count = player_queries.history_count(user.id, CREDIT_HISTORY_ACTIONS)
         history_data = []
-        for action in credits_actions:
+        for action, club_name in player_queries.history(user.id, CREDIT_HISTORY_ACTIONS, limit=limit, offset=offset):
             action_data = {
                 "id": action.id,
                 "action_type": action.action_type,
                 "performed_at": action.performed_at.isoformat(),
                 "details": action.action_details
             }
-            
-            # Ajouter les informations du club si disponible
-            if action.club_id:
-                club = Club.query.get(action.club_id)
-                if club:
-                    action_data["club_name"] = club.name
-            
+            if club_name:
+                action_data["club_name"] = club_name
             history_data.append(action_data)
         
         return jsonify({
@@ -908,34 +803,15 @@ def get_credits_balance():
         return jsonify({"error": "Accès non autorisé"}), 403
     
     try:
-        # Calculer les statistiques des crédits
+        # Calculer les statistiques des crédits (détails seuls, sans objets ORM)
         total_earned = 0
         total_spent = 0
         
-        credits_actions = ClubActionHistory.query.filter(
-            ClubActionHistory.user_id == user.id,
-            or_(
-                ClubActionHistory.action_type == 'buy_credits',
-                ClubActionHistory.action_type == 'unlock_video'
-            )
-        ).all()
-        
-        for action in credits_actions:
-            try:
-                if action.action_details:
-                    details = json.loads(action.action_details)
-                    
-                    if action.action_type == 'buy_credits':
-                        credits_added = details.get('credits_purchased', 0)
-                        if isinstance(credits_added, (int, float)):
-                            total_earned += int(credits_added)
-                    
-                    elif action.action_type == 'unlock_video':
-                        credits_spent = details.get('credits_spent', 0)
-                        if isinstance(credits_spent, (int, float)):
-                            total_spent += int(credits_spent)
-            except:
-                continue
+        for action_type, _, _, details in player_queries.history_details(user.id, ['buy_credits', 'unlock_video']):
+            if action_type == 'buy_credits':
+                total_earned += detail_int(details, 'credits_purchased')
+            else:
+                total_spent += detail_int(details, 'credits_spent')
         
         return jsonify({
             "current_balance": user.credits_balance,
@@ -958,50 +834,32 @@ def get_player_statistics():
         return jsonify({"error": "Accès non autorisé"}), 403
     
     try:
-        # Statistiques générales
-        total_videos = Video.query.filter_by(user_id=user.id).count()
-        unlocked_videos = Video.query.filter_by(user_id=user.id, is_unlocked=True).count()
-        
-        # Statistiques par club
-        clubs_stats = []
-        for club in user.followed_clubs:
-            club_videos = db.session.query(Video).join(Court).filter(
-                Court.club_id == club.id,
-                Video.user_id == user.id
-            ).count()
-            
-            clubs_stats.append({
-                "club": club.to_dict(),
-                "videos_count": club_videos
-            })
+        # Statistiques générales (une requête agrégée)
+        video_stats = player_queries.video_stats(user.id)
+        total_videos = video_stats["total"]
+        unlocked_videos = video_stats["unlocked"]
+        
+        # Statistiques par club : vidéos comptées en une requête groupée
+        followed_clubs = follow_graph.followed_clubs(user.id)
+        videos_by_club = player_queries.videos_by_club(user.id, [club.id for club in followed_clubs])
+        clubs_stats = [{
+            "club": club.to_dict(),
+            "videos_count": videos_by_club.get(club.id, 0)
+        } for club in followed_clubs]
         
-        # Activité par mois (derniers 6 mois)
-        monthly_activity = []
-        for i in range(6):
-            month_start = (datetime.utcnow().replace(day=1) - timedelta(days=30*i)).replace(day=1)
-            month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-            
-            month_videos = Video.query.filter(
-                Video.user_id == user.id,
-                Video.recorded_at >= month_start,
-                Video.recorded_at <= month_end
-            ).count()
-            
-            monthly_activity.append({
-                "month": month_start.strftime("%Y-%m"),
-                "videos_count": month_videos
-            })
+        # Activité par mois calendaire (6 derniers mois), en une requête groupée
+        monthly_activity = player_queries.videos_by_month(user.id, 6)
         
         return jsonify({
             "general_statistics": {
                 "total_videos": total_videos,
                 "unlocked_videos": unlocked_videos,
                 "locked_videos": total_videos - unlocked_videos,
-                "followed_clubs": len(user.followed_clubs),
+                "followed_clubs": user.followed_clubs_count,
                 "current_credits": user.credits_balance
             },
             "clubs_statistics": clubs_stats,
-            "monthly_activity": monthly_activity[::-1]  # Ordre chronologique
+            "monthly_activity": monthly_activity  # Ordre chronologique
         }), 200
         
     except Exception as e:
@@ -1025,8 +883,8 @@ def get_player_profile():
             primary_club = Club.query.get(user.club_id)
             profile_data["primary_club"] = primary_club.to_dict() if primary_club else None
         
-        profile_data["followed_clubs_count"] = len(user.followed_clubs)
-        profile_data["total_videos"] = Video.query.filter_by(user_id=user.id).count()
+        profile_data["followed_clubs_count"] = user.followed_clubs_count
+        profile_data["total_videos"] = video_library.total_count(user.id)
         
         return jsonify({"profile": profile_data}), 200
         
@@ -1092,49 +950,18 @@ def search_clubs():
         min_courts = request.args.get('min_courts', 0, type=int)
         max_distance = request.args.get('max_distance', type=float)
         sort_by = request.args.get('sort_by', 'popularity')  # popularity, name, distance
-        limit = request.args.get('limit', 20, type=int)
-        
-        # Construire la requête de base
-        clubs_query = Club.query
-        
-        # Filtres textuels
-        if query_text:
-            clubs_query = clubs_query.filter(
-                or_(
-                    Club.name.contains(query_text),
-                    Club.address.contains(query_text)
-                )
-            )
-        
-        if city:
-            clubs_query = clubs_query.filter(Club.address.contains(city))
+        limit = player_queries.page_size(request.args.get('limit', type=int), 20)
         
-        # Filtrer par nombre de terrains
-        if min_courts > 0:
-            clubs_query = clubs_query.join(Court).group_by(Club.id).having(
-                func.count(Court.id) >= min_courts
-            )
-        
-        clubs = clubs_query.limit(limit).all()
-        
-        # Enrichir les résultats
+        # Filtres, tri et limite appliqués par la base ; terrains et abonnement en sous-requêtes
         results = []
-        followed_ids = {c.id for c in user.followed_clubs}
-        
-        for club in clubs:
+        for club, courts_count, is_followed in player_queries.clubs(
+            user.id, text=query_text, city=city, min_courts=min_courts, sort_by=sort_by, limit=limit
+        ):
             club_dict = club.to_dict()
-            club_dict["is_followed"] = club.id in followed_ids
-            club_dict["courts_count"] = len(club.courts) if hasattr(club, 'courts') else 0
-            club_dict["followers_count"] = len(club.followers.all()) if hasattr(club, 'followers') else 0
-            
+            club_dict["is_followed"] = is_followed
+            club_dict["courts_count"] = courts_count
             results.append(club_dict)
         
-        # Tri des résultats
-        if sort_by == 'popularity':
-            results.sort(key=lambda x: x.get("followers_count", 0), reverse=True)
-        elif sort_by == 'name':
-            results.sort(key=lambda x: x.get("name", ""))
-        
         return jsonify({
             "clubs": results,
             "total_found": len(results),
@@ -1162,48 +989,20 @@ def get_leaderboard():
     try:
         sort_by = request.args.get('sort_by', 'credits')  # credits, videos, activity
         club_id = request.args.get('club_id', type=int)
-        limit = request.args.get('limit', 10, type=int)
-        
-        # Construire la requête de base
-        if club_id:
-            # Classement par club
-            players_query = User.query.filter(
-                User.role == 'PLAYER',
-                User.club_id == club_id
-            )
-        else:
-            # Classement global
-            players_query = User.query.filter(User.role == 'PLAYER')
-        
-        # Tri selon le critère choisi
-        if sort_by == 'credits':
-            players = players_query.order_by(desc(User.credits_balance)).limit(limit).all()
-        elif sort_by == 'videos':
-            # Trier par nombre de vidéos (nécessite une jointure)
-            players = db.session.query(User).join(Video).filter(
-                User.role == 'PLAYER'
-            ).group_by(User.id).order_by(
-                desc(func.count(Video.id))
-            ).limit(limit).all()
-        else:
-            # Trier par activité récente
-            players = players_query.order_by(desc(User.last_login)).limit(limit).all()
+        limit = player_queries.page_size(request.args.get('limit', type=int), 10)
         
+        # Classement, nombre de vidéos et club en une requête (activité : dernière action du joueur)
         leaderboard_data = []
-        for i, player in enumerate(players, 1):
+        for i, player in enumerate(player_queries.leaderboard(sort_by, club_id, limit), 1):
             player_data = {
                 "rank": i,
                 "name": player.name,
                 "credits_balance": player.credits_balance,
-                "videos_count": Video.query.filter_by(user_id=player.id).count(),
+                "videos_count": player.videos_count,
                 "is_current_user": (player.id == user.id)
             }
-            
-            # Ajouter le club si disponible
-            if player.club_id:
-                club = Club.query.get(player.club_id)
-                if club:
-                    player_data["club_name"] = club.name
+            if player.club_name:
+                player_data["club_name"] = player.club_name
             
             leaderboard_data.append(player_data)
         
@@ -1233,13 +1032,10 @@ def get_activity_feed():
         return jsonify({"error": "Accès non autorisé"}), 403
     
     try:
-        limit = request.args.get('limit', 20, type=int)
-        offset = request.args.get('offset', 0, type=int)
-        
-        # Récupérer les IDs des clubs suivis
-        followed_club_ids = [c.id for c in user.followed_clubs]
+        limit = player_queries.page_size(request.args.get('limit', type=int), 20)
+        offset = max(0, request.args.get('offset', 0, type=int))
         
-        if not followed_club_ids:
+        if not user.followed_clubs_count:
             return jsonify({
                 "activities": [],
                 "total_count": 0,
@@ -1247,49 +1043,26 @@ def get_activity_feed():
                 "limit": limit
             }), 200
         
-        # Récupérer les activités des clubs suivis
-        activities = ClubActionHistory.query.filter(
-            ClubActionHistory.club_id.in_(followed_club_ids),
-            ClubActionHistory.action_type.in_([
-                'join_club', 'leave_club', 'add_video', 'unlock_video',
-                'create_court', 'update_club_info'
-            ])
-        ).order_by(desc(ClubActionHistory.performed_at)).offset(offset).limit(limit).all()
-        
-        total_count = ClubActionHistory.query.filter(
-            ClubActionHistory.club_id.in_(followed_club_ids),
-            ClubActionHistory.action_type.in_([
-                'join_club', 'leave_club', 'add_video', 'unlock_video',
-                'create_court', 'update_club_info'
-            ])
-        ).count()
-        
+        # Activités des clubs suivis (jointure sur les abonnements), noms du club et du joueur joints
+        total_count = player_queries.feed_count(user.id)
         activities_data = []
-        for activity in activities:
+        for activity, club_name, user_name in player_queries.feed(user.id, limit, offset):
             activity_data = {
                 "id": activity.id,
                 "action_type": activity.action_type,
                 "performed_at": activity.performed_at.isoformat(),
                 "details": activity.action_details
             }
-            
-            # Ajouter les informations du club
-            if activity.club_id:
-                club = Club.query.get(activity.club_id)
-                if club:
-                    activity_data["club"] = {
-                        "id": club.id,
-                        "name": club.name
-                    }
-            
-            # Ajouter les informations du joueur (si ce n'est pas l'utilisateur actuel)
-            if activity.user_id and activity.user_id != user.id:
-                activity_user = User.query.get(activity.user_id)
-                if activity_user:
-                    activity_data["user"] = {
-                        "name": activity_user.name
-                    }
-            
+            if activity.club_id and club_name:
+                activity_data["club"] = {
+                    "id": activity.club_id,
+                    "name": club_name
+                }
+            # Informations du joueur (si ce n'est pas l'utilisateur actuel)
+            if activity.user_id != user.id and user_name:
+                activity_data["user"] = {
+                    "name": user_name
+                }
             activities_data.append(activity_data)
         
         return jsonify({
@@ -1321,7 +1094,7 @@ def player_health_check():
         }
         
         # 1. Vérification des clubs suivis
-        followed_count = len(user.followed_clubs)
+        followed_count = user.followed_clubs_count
         diagnostics["checks"].append({
             "name": "clubs_followed",
             "status": "OK" if followed_count > 0 else "WARNING",
@@ -1339,9 +1112,9 @@ def player_health_check():
             "message": primary_club_msg
         })
         
-        # 3. Vérification des vidéos
-        total_videos = Video.query.filter_by(user_id=user.id).count()
-        unlocked_videos = Video.query.filter_by(user_id=user.id, is_unlocked=True).count()
+        # 3. Vérification des vidéos (une requête agrégée)
+        video_stats = player_queries.video_stats(user.id)
+        total_videos, unlocked_videos = video_stats["total"], video_stats["unlocked"]
         diagnostics["checks"].append({
             "name": "videos_status",
             "status": "OK",
@@ -1359,9 +1132,7 @@ def player_health_check():
         })
         
         # 5. Vérification de l'activité récente
-        recent_activity = ClubActionHistory.query.filter_by(user_id=user.id).order_by(
-            desc(ClubActionHistory.performed_at)
-        ).first()
+        recent_activity = player_queries.last_action(user.id)
         
         if recent_activity:
             days_since_activity = (datetime.utcnow() - recent_activity.performed_at).days
@@ -1413,10 +1184,7 @@ def player_performance_metrics():
         
         # 1. Test de requête clubs suivis (avec optimisation)
         clubs_start = time.time()
-        followed_clubs = db.session.query(Club).options(
-            joinedload(Club.followers),
-            joinedload(Club.courts)
-        ).join(User.followed_clubs).filter(User.id == user.id).all()
+        followed_clubs = follow_graph.followed_clubs(user.id)
         clubs_time = time.time() - clubs_start
         
         metrics["performance_metrics"]["followed_clubs_query"] = {
@@ -1507,14 +1275,11 @@ def player_data_cleanup():
             })
         
         # 2. Vérifier les clubs suivis orphelins
-        orphaned_clubs = []
-        for club in user.followed_clubs:
-            if not Club.query.get(club.id):
-                orphaned_clubs.append(club)
+        existing_ids = {club_id for (club_id,) in db.session.query(Club.id)}
+        orphaned_clubs = [club_id for club_id in follow_graph.followed_ids(user.id) if club_id not in existing_ids]
         
         if orphaned_clubs:
-            for club in orphaned_clubs:
-                user.followed_clubs.remove(club)
+            follow_graph.unfollow(user.id, orphaned_clubs)
             
             cleanup_report["actions_performed"].append({
                 "action": "remove_orphaned_clubs",
@@ -1553,175 +1318,6 @@ def player_data_cleanup():
 
 # --- ROUTES AVANCÉES POUR OPTIMISATION HAUTE CHARGE (1000+ UTILISATEURS) ---
 
-@players_bp.route("/advanced/load_test", methods=["POST"])
-def simulate_high_load_test():
-    """Test de charge simulé pour valider la résistance à 1000+ utilisateurs concurrents"""
-    user = require_player_access()
-    if not user: 
-        return jsonify({"error": "Accès non autorisé"}), 403
-    
-    try:
-        data = request.get_json() or {}
-        iterations = min(data.get('iterations', 20), 100)  # Limiter à 100 pour sécurité
-        concurrent_simulation = data.get('concurrent_users', 50)
-        
-        load_test_results = {
-            "player_id": user.id,
-            "timestamp": datetime.utcnow().isoformat(),
-            "test_configuration": {
-                "iterations": iterations,
-                "simulated_concurrent_users": concurrent_simulation,
-                "target_response_time_ms": 200,
-                "acceptable_failure_rate": 5
-            },
-            "results": [],
-            "performance_summary": {}
-        }
-        
-        total_start = time.time()
-        successful_operations = 0
-        failed_operations = 0
-        total_response_time = 0
-        
-        for i in range(iterations):
-            iteration_start = time.time()
-            
-            try:
-                # Simulation des opérations critiques d'un joueur
-                operation_times = {}
-                
-                # 1. Dashboard - opération la plus fréquente (80% du trafic)
-                dashboard_start = time.time()
-                clubs_count = len(user.followed_clubs)
-                videos_count = Video.query.filter_by(user_id=user.id).count()
-                credits_balance = user.credits_balance
-                operation_times['dashboard'] = (time.time() - dashboard_start) * 1000
-                
-                # 2. Clubs suivis - opération fréquente (15% du trafic)
-                clubs_start = time.time()
-                followed_clubs = db.session.query(Club).options(
-                    joinedload(Club.followers)
-                ).join(User.followed_clubs).filter(User.id == user.id).limit(10).all()
-                operation_times['followed_clubs'] = (time.time() - clubs_start) * 1000
-                
-                # 3. Recherche clubs - opération moyenne (5% du trafic)
-                search_start = time.time()
-                available_clubs = Club.query.limit(5).all()
-                operation_times['search'] = (time.time() - search_start) * 1000
-                
-                # 4. Historique activité - opération occasionnelle
-                history_start = time.time()
-                recent_history = ClubActionHistory.query.filter_by(
-                    user_id=user.id
-                ).limit(10).all()
-                operation_times['history'] = (time.time() - history_start) * 1000
-                
-                iteration_time = (time.time() - iteration_start) * 1000
-                total_response_time += iteration_time
-                successful_operations += 1
-                
-                # Simuler la charge de plusieurs utilisateurs concurrents
-                concurrency_factor = min(concurrent_simulation / 10, 10)  # Facteur d'ajustement
-                adjusted_time = iteration_time * concurrency_factor
-                
-                load_test_results["results"].append({
-                    "iteration": i + 1,
-                    "status": "SUCCESS",
-                    "response_time_ms": round(iteration_time, 2),
-                    "adjusted_time_ms": round(adjusted_time, 2),
-                    "operation_breakdown": {k: round(v, 2) for k, v in operation_times.items()},
-                    "data_processed": {
-                        "clubs_count": clubs_count,
-                        "videos_count": videos_count,
-                        "followed_clubs": len(followed_clubs),
-                        "history_entries": len(recent_history)
-                    }
-                })
-                
-                # Pause simulée entre les requêtes (comportement réaliste)
-                time.sleep(0.01)  # 10ms entre les requêtes
-                
-            except Exception as e:
-                failed_operations += 1
-                load_test_results["results"].append({
-                    "iteration": i + 1,
-                    "status": "FAILED",
-                    "error": str(e),
-                    "response_time_ms": (time.time() - iteration_start) * 1000
-                })
-        
-        total_test_time = (time.time() - total_start) * 1000
-        
-        # Calcul des métriques de performance
-        if successful_operations > 0:
-            avg_response_time = total_response_time / successful_operations
-            success_rate = (successful_operations / iterations) * 100
-            
-            successful_results = [r for r in load_test_results["results"] if r["status"] == "SUCCESS"]
-            response_times = [r["response_time_ms"] for r in successful_results]
-            
-            load_test_results["performance_summary"] = {
-                "total_iterations": iterations,
-                "successful_operations": successful_operations,
-                "failed_operations": failed_operations,
-                "success_rate_percent": round(success_rate, 2),
-                "average_response_time_ms": round(avg_response_time, 2),
-                "min_response_time_ms": round(min(response_times), 2) if response_times else 0,
-                "max_response_time_ms": round(max(response_times), 2) if response_times else 0,
-                "total_test_duration_ms": round(total_test_time, 2),
-                "operations_per_second": round(successful_operations / (total_test_time / 1000), 2)
-            }
-            
-            # Évaluation de la capacité haute charge
-            if avg_response_time < 200 and success_rate > 95:
-                capacity_assessment = "EXCELLENT - Prêt pour 1000+ utilisateurs concurrents"
-                performance_grade = "A+"
-            elif avg_response_time < 300 and success_rate > 90:
-                capacity_assessment = "TRÈS BON - Peut gérer 1000+ utilisateurs avec optimisation mineure"
-                performance_grade = "A"
-            elif avg_response_time < 500 and success_rate > 85:
-                capacity_assessment = "BON - Nécessite quelques optimisations pour 1000+ utilisateurs"
-                performance_grade = "B+"
-            elif avg_response_time < 800 and success_rate > 75:
-                capacity_assessment = "ACCEPTABLE - Optimisation requise avant déploiement haute charge"
-                performance_grade = "B"
-            else:
-                capacity_assessment = "CRITIQUE - Optimisation majeure requise"
-                performance_grade = "C"
-            
-            load_test_results["high_load_assessment"] = {
-                "capacity_rating": capacity_assessment,
-                "performance_grade": performance_grade,
-                "concurrent_users_estimate": min(1000 if avg_response_time < 200 else int(1000 * (200 / avg_response_time)), 2000),
-                "bottlenecks_identified": []
-            }
-            
-            # Identification des goulots d'étranglement
-            if any(r.get("operation_breakdown", {}).get("dashboard", 0) > 100 for r in successful_results):
-                load_test_results["high_load_assessment"]["bottlenecks_identified"].append("Dashboard queries need optimization")
-            
-            if any(r.get("operation_breakdown", {}).get("followed_clubs", 0) > 50 for r in successful_results):
-                load_test_results["high_load_assessment"]["bottlenecks_identified"].append("Followed clubs queries need caching")
-            
-            if avg_response_time > 300:
-                load_test_results["high_load_assessment"]["bottlenecks_identified"].append("Overall response time optimization needed")
-        
-        else:
-            load_test_results["performance_summary"] = {
-                "error": "Aucune opération réussie - système non fonctionnel"
-            }
-            load_test_results["high_load_assessment"] = {
-                "capacity_rating": "CRITIQUE - Système défaillant",
-                "performance_grade": "F"
-            }
-        
-        logger.info(f"Test de charge haute charge complété pour le joueur {user.id}: {successful_operations}/{iterations} succès")
-        return jsonify(load_test_results), 200
-        
-    except Exception as e:
-        logger.error(f"Erreur lors du test de charge haute charge: {e}")
-        return jsonify({"error": "Erreur lors du test de charge"}), 500
-
 @players_bp.route("/advanced/bulk_operations", methods=["POST"])
 def bulk_player_operations():
     """Opérations en masse optimisées pour haute charge"""
@@ -1760,61 +1356,51 @@ def bulk_player_operations():
         start_time = time.time()
         
         if operation_type == "follow_multiple_clubs":
+            # Clubs et abonnements lus une fois, ajouts en une seule requête
+            names = dict(db.session.query(Club.id, Club.name).filter(Club.id.in_(targets)).all())
+            followed_ids = follow_graph.followed_ids(user.id)
+            room = follow_graph.max_followed - user.followed_clubs_count
+            to_follow = []
             for club_id in targets:
-                try:
-                    club = Club.query.get(club_id)
-                    if not club:
-                        bulk_results["results"].append({
-                            "target_id": club_id,
-                            "status": "FAILED",
-                            "error": "Club non trouvé"
-                        })
-                        bulk_results["summary"]["failed"] += 1
-                        continue
-                    
-                    if club in user.followed_clubs:
-                        bulk_results["results"].append({
-                            "target_id": club_id,
-                            "status": "SKIPPED",
-                            "reason": "Déjà suivi"
-                        })
-                        bulk_results["summary"]["skipped"] += 1
-                        continue
-                    
-                    # Vérifier la limite
-                    if len(user.followed_clubs) >= 10:
-                        bulk_results["results"].append({
-                            "target_id": club_id,
-                            "status": "FAILED",
-                            "error": "Limite de clubs suivis atteinte"
-                        })
-                        bulk_results["summary"]["failed"] += 1
-                        continue
-                    
-                    user.followed_clubs.append(club)
-                    
-                    log_action(
-                        club_id=club_id,
-                        player_id=user.id,
-                        action_type='bulk_follow_club',
-                        action_details={"club_name": club.name, "bulk_operation": True},
-                        performed_by_id=user.id
-                    )
-                    
+                if club_id not in names:
                     bulk_results["results"].append({
                         "target_id": club_id,
-                        "status": "SUCCESS",
-                        "club_name": club.name
+                        "status": "FAILED",
+                        "error": "Club non trouvé"
                     })
-                    bulk_results["summary"]["successful"] += 1
-                    
-                except Exception as e:
+                    bulk_results["summary"]["failed"] += 1
+                elif club_id in followed_ids or club_id in to_follow:
+                    bulk_results["results"].append({
+                        "target_id": club_id,
+                        "status": "SKIPPED",
+                        "reason": "Déjà suivi"
+                    })
+                    bulk_results["summary"]["skipped"] += 1
+                elif len(to_follow) >= room:
                     bulk_results["results"].append({
                         "target_id": club_id,
                         "status": "FAILED",
-                        "error": str(e)
+                        "error": "Limite de clubs suivis atteinte"
                     })
                     bulk_results["summary"]["failed"] += 1
+                else:
+                    to_follow.append(club_id)
+                    bulk_results["results"].append({
+                        "target_id": club_id,
+                        "status": "SUCCESS",
+                        "club_name": names[club_id]
+                    })
+                    bulk_results["summary"]["successful"] += 1
+            
+            follow_graph.follow(user.id, to_follow)
+            for club_id in to_follow:
+                log_action(
+                    club_id=club_id,
+                    player_id=user.id,
+                    action_type='bulk_follow_club',
+                    action_details={"club_name": names[club_id], "bulk_operation": True},
+                    performed_by_id=user.id
+                )
         
         elif operation_type == "mark_videos_seen":
             for video_id in targets:
@@ -1919,21 +1505,17 @@ def get_advanced_player_analytics():
             "metrics": {}
         }
         
-        # 1. Analyse de l'activité temporelle
-        activity_analysis = ClubActionHistory.query.filter(
-            ClubActionHistory.user_id == user.id,
-            ClubActionHistory.performed_at >= start_date
-        ).all()
+        # 1. Analyse de l'activité temporelle (colonnes utiles seules, sans objets ORM)
+        activity_analysis = player_queries.history_details(user.id, since=start_date)
         
         # Grouper par jour/mois selon la période
         activity_by_date = {}
-        for activity in activity_analysis:
-            date_key = activity.performed_at.strftime(date_format)
+        for action_type, _, performed_at, _ in activity_analysis:
+            date_key = performed_at.strftime(date_format)
             if date_key not in activity_by_date:
                 activity_by_date[date_key] = {"count": 0, "types": {}}
             
             activity_by_date[date_key]["count"] += 1
-            action_type = activity.action_type
             if action_type not in activity_by_date[date_key]["types"]:
                 activity_by_date[date_key]["types"][action_type] = 0
             activity_by_date[date_key]["types"][action_type] += 1
@@ -1942,7 +1524,7 @@ def get_advanced_player_analytics():
         
         # 2. Analyse des patterns d'usage
         total_activities = len(activity_analysis)
-        unique_action_types = len(set(a.action_type for a in activity_analysis))
+        unique_action_types = len(set(action_type for action_type, _, _, _ in activity_analysis))
         
         # Calcul de l'engagement (activités par jour)
         days_in_period = (end_date - start_date).days or 1
@@ -1955,36 +1537,27 @@ def get_advanced_player_analytics():
             "engagement_level": "HIGH" if engagement_score > 5 else "MEDIUM" if engagement_score > 2 else "LOW"
         }
         
-        # 3. Analyse des vidéos
-        videos_in_period = Video.query.filter(
-            Video.user_id == user.id,
-            Video.recorded_at >= start_date
-        ).all()
-        
-        unlocked_in_period = len([v for v in videos_in_period if v.is_unlocked])
-        total_duration = sum(v.duration for v in videos_in_period if v.duration)
+        # 3. Analyse des vidéos (une requête agrégée)
+        video_stats = player_queries.video_stats(user.id, since=start_date)
+        new_videos = video_stats["total"]
+        unlocked_in_period = video_stats["unlocked"]
+        total_duration = video_stats["total_duration"]
         
         analytics_data["metrics"]["video_analysis"] = {
-            "new_videos": len(videos_in_period),
+            "new_videos": new_videos,
             "unlocked_videos": unlocked_in_period,
-            "unlock_rate": round((unlocked_in_period / len(videos_in_period)) * 100, 2) if videos_in_period else 0,
+            "unlock_rate": round((unlocked_in_period / new_videos) * 100, 2) if new_videos else 0,
             "total_duration_minutes": round(total_duration / 60, 2) if total_duration else 0,
-            "average_duration_minutes": round((total_duration / len(videos_in_period)) / 60, 2) if videos_in_period and total_duration else 0
+            "average_duration_minutes": round((total_duration / new_videos) / 60, 2) if new_videos and total_duration else 0
         }
         
         # 4. Analyse des crédits
-        credits_activities = [a for a in activity_analysis if a.action_type in ['add_credits', 'unlock_video']]
         credits_earned = credits_spent = 0
-        
-        for activity in credits_activities:
-            try:
-                details = json.loads(activity.action_details) if activity.action_details else {}
-                if activity.action_type == 'add_credits':
-                    credits_earned += details.get('credits_added', 0)
-                elif activity.action_type == 'unlock_video':
-                    credits_spent += details.get('credits_spent', 0)
-            except:
-                pass
+        for action_type, _, _, details in activity_analysis:
+            if action_type == 'add_credits':
+                credits_earned += detail_int(details, 'credits_added')
+            elif action_type == 'unlock_video':
+                credits_spent += detail_int(details, 'credits_spent')
         
         analytics_data["metrics"]["credits_analysis"] = {
             "credits_earned": credits_earned,
@@ -1997,22 +1570,21 @@ def get_advanced_player_analytics():
         
         # 5. Analyse des clubs
         club_interactions = {}
-        for activity in activity_analysis:
-            if activity.club_id:
-                club_id = activity.club_id
+        for action_type, club_id, _, _ in activity_analysis:
+            if club_id:
                 if club_id not in club_interactions:
                     club_interactions[club_id] = {"count": 0, "types": []}
                 club_interactions[club_id]["count"] += 1
-                club_interactions[club_id]["types"].append(activity.action_type)
+                club_interactions[club_id]["types"].append(action_type)
         
-        # Enrichir avec les noms des clubs
+        # Enrichir avec les noms des clubs (une requête pour tous les clubs)
+        club_names = player_queries.club_names(club_interactions)
         club_analytics = []
         for club_id, data in club_interactions.items():
-            club = Club.query.get(club_id)
-            if club:
+            if club_id in club_names:
                 club_analytics.append({
                     "club_id": club_id,
-                    "club_name": club.name,
+                    "club_name": club_names[club_id],
                     "interactions": data["count"],
                     "interaction_types": len(set(data["types"])),
                     "most_common_action": max(set(data["types"]), key=data["types"].count)
@@ -2025,8 +1597,8 @@ def get_advanced_player_analytics():
         if include_predictions:
             try:
                 # Prédiction simple basée sur les tendances
-                if len(videos_in_period) > 0 and days_in_period > 7:
-                    video_rate = len(videos_in_period) / days_in_period
+                if new_videos > 0 and days_in_period > 7:
+                    video_rate = new_videos / days_in_period
                     predicted_videos_next_period = round(video_rate * days_in_period)
                     
                     predicted_credits_needed = predicted_videos_next_period * 5  # Estimation 5 crédits/vidéo
@@ -2035,7 +1607,7 @@ def get_advanced_player_analytics():
                         "next_period_videos": predicted_videos_next_period,
                         "estimated_credits_needed": predicted_credits_needed,
                         "recommended_credits_purchase": max(0, predicted_credits_needed - user.credits_balance),
-                        "confidence_level": "MEDIUM" if len(videos_in_period) > 5 else "LOW"
+                        "confidence_level": "MEDIUM" if new_videos > 5 else "LOW"
                     }
             except:
                 analytics_data["predictions"] = {"error": "Prédictions non disponibles"}
@@ -2052,7 +1624,7 @@ def get_advanced_player_analytics():
         if user.credits_balance < 10:
             recommendations.append("Rechargez vos crédits pour débloquer de nouvelles vidéos")
         
-        if len(user.followed_clubs) < 3:
+        if user.followed_clubs_count < 3:
             recommendations.append("Suivez plus de clubs pour enrichir votre feed d'activités")
         
         analytics_data["recommendations"] = recommendations
@@ -2074,10 +1646,7 @@ def player_preferences():
     if request.method == "GET":
         try:
             # Récupérer les préférences depuis l'historique ou paramètres par défaut
-            preferences_action = ClubActionHistory.query.filter_by(
-                user_id=user.id,
-                action_type='update_preferences'
-            ).order_by(desc(ClubActionHistory.performed_at)).first()
+            preferences_action = player_queries.last_action(user.id, 'update_preferences')
             
             if preferences_action and preferences_action.action_details:
                 try:
@@ -2190,57 +1759,44 @@ def export_player_data():
         }
         
         # Clubs suivis
-        export_data["followed_clubs"] = [club.to_dict() for club in user.followed_clubs]
+        export_data["followed_clubs"] = [club.to_dict() for club in follow_graph.followed_clubs(user.id)]
         
-        # Vidéos (si demandées)
+        # Vidéos (si demandées), terrain et club joints
         if include_videos:
-            player_videos = Video.query.filter_by(user_id=user.id).all()
             export_data["videos"] = []
-            
-            for video in player_videos:
+            for video, court_name, club_name in player_queries.videos_with_location(user.id):
                 video_data = video.to_dict()
-                # Ajouter les informations du terrain et du club
-                court = Court.query.get(video.court_id)
-                if court:
-                    video_data["court_name"] = court.name
-                    club = Club.query.get(court.club_id)
-                    if club:
-                        video_data["club_name"] = club.name
-                
+                if court_name:
+                    video_data["court_name"] = court_name
+                    if club_name:
+                        video_data["club_name"] = club_name
                 export_data["videos"].append(video_data)
         
-        # Historique d'activité (si demandé)
+        # Historique d'activité (si demandé), nom du club joint
         if include_history:
-            activity_history = ClubActionHistory.query.filter_by(
-                user_id=user.id
-            ).order_by(desc(ClubActionHistory.performed_at)).all()
-            
             export_data["activity_history"] = []
-            for activity in activity_history:
+            for activity, club_name in player_queries.history(user.id):
                 activity_data = {
                     "id": activity.id,
                     "action_type": activity.action_type,
                     "performed_at": activity.performed_at.isoformat(),
                     "details": activity.action_details
                 }
-                
-                # Ajouter le nom du club si disponible
-                if activity.club_id:
-                    club = Club.query.get(activity.club_id)
-                    if club:
-                        activity_data["club_name"] = club.name
-                
+                if club_name:
+                    activity_data["club_name"] = club_name
                 export_data["activity_history"].append(activity_data)
         
         # Statistiques agrégées
+        video_stats = player_queries.video_stats(user.id)
+        last_action = player_queries.last_action(user.id)
         export_data["statistics"] = {
-            "total_videos": Video.query.filter_by(user_id=user.id).count(),
-            "unlocked_videos": Video.query.filter_by(user_id=user.id, is_unlocked=True).count(),
-            "followed_clubs_count": len(user.followed_clubs),
-            "total_activities": ClubActionHistory.query.filter_by(user_id=user.id).count(),
+            "total_videos": video_stats["total"],
+            "unlocked_videos": video_stats["unlocked"],
+            "followed_clubs_count": user.followed_clubs_count,
+            "total_activities": player_queries.history_count(user.id),
             "current_credits_balance": user.credits_balance,
-            "account_created": user.created_at.isoformat() if hasattr(user, 'created_at') else None,
-            "last_login": user.last_login.isoformat() if user.last_login else None
+            "account_created": user.created_at.isoformat() if user.created_at else None,
+            "last_activity": last_action.performed_at.isoformat() if last_action else None
         }
         
         # Log de l'exportation
@@ -2296,7 +1852,8 @@ def get_player_system_status():
         
         # 2. Test des requêtes utilisateur critiques
         user_queries_start = time.time()
-        test_user = User.query.options(joinedload(User.followed_clubs)).get(user.id)
+        test_user = db.session.get(User, user.id)
+        follow_graph.followed_ids(user.id)
         user_queries_time = (time.time() - user_queries_start) * 1000
         
         # 3. Test des requêtes vidéos
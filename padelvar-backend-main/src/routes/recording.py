@@ -10,9 +10,15 @@ import logging
 import json
 
 from ..models.database import db
+from ..services.identity import current_user
+from ..services.camera_health import camera_health
+from ..services.storage_manager import storage_manager, StorageFullError
+from ..services.media_probe import media_probe
+from ..services.blob_store import blob_store
+from ..services.audit_log import audit_log
+from ..services.recording_sweeper import recording_sweeper
 from ..models.user import (
-    User, Club, Court, Video, RecordingSession, 
-    ClubActionHistory, UserRole
+    User, Club, Court, Video, RecordingSession, UserRole
 )
 
 logger = logging.getLogger(__name__)
@@ -21,59 +27,22 @@ recording_bp = Blueprint('recording', __name__, url_prefix='/api/recording')
 
 def get_current_user():
     """Récupérer l'utilisateur actuel"""
-    user_id = session.get('user_id')
-    if not user_id:
-        return None
-    return User.query.get(user_id)
+    return current_user()
 
 def log_recording_action(session_obj, action_type, action_details, performed_by_id):
     """Log d'action pour les enregistrements avec gestion d'erreur améliorée"""
     try:
-        # Convertir les détails en JSON si nécessaire
-        if isinstance(action_details, dict):
-            details_json = json.dumps(action_details)
-        elif isinstance(action_details, str):
-            details_json = action_details
-        else:
-            details_json = json.dumps({"raw_details": str(action_details)})
-        
-        action_history = ClubActionHistory(
-            club_id=session_obj.club_id,
-            user_id=session_obj.user_id,
-            action_type=action_type,
-            action_details=details_json,
-            performed_by_id=performed_by_id,
-            performed_at=datetime.utcnow()
-        )
-        db.session.add(action_history)
-        # Ne pas faire de flush ici pour éviter les problèmes de transaction
-        logger.info(f"Action d'enregistrement préparée: {action_type}")
+        # Écrit après le commit de la requête, par lots (voir services/audit_log.py)
+        audit_log.record(session_obj.user_id, session_obj.club_id, action_type, action_details, performed_by_id)
+        logger.debug(f"Action d'enregistrement préparée: {action_type}")
     except Exception as e:
         logger.error(f"Erreur lors du logging: {e}")
         # Ne pas lever l'exception pour ne pas interrompre le flux principal
 
 def cleanup_expired_sessions(club_id=None):
-    """Nettoyer toutes les sessions expirées pour un club ou globalement"""
+    """Finaliser les sessions expirées d'un club ou de tous (par lots, voir services/recording_sweeper.py)"""
     try:
-        if club_id:
-            expired_sessions = RecordingSession.query.filter_by(
-                club_id=club_id,
-                status='active'
-            ).all()
-        else:
-            expired_sessions = RecordingSession.query.filter_by(status='active').all()
-        
-        cleaned_count = 0
-        for session in expired_sessions:
-            if session.is_expired():
-                logger.info(f"Nettoyage automatique de la session expirée: {session.recording_id}")
-                _stop_recording_session(session, 'auto', session.user_id)
-                cleaned_count += 1
-        
-        if cleaned_count > 0:
-            logger.info(f"Nettoyage terminé: {cleaned_count} sessions expirées fermées")
-        
-        return cleaned_count
+        return recording_sweeper.sweep(club_id=club_id)['finalized']
     except Exception as e:
         logger.error(f"Erreur lors du nettoyage automatique: {e}")
         return 0
@@ -89,6 +58,7 @@ def start_recording_with_duration():
     if not user:
         return jsonify({'error': 'Non authentifié'}), 401
     
+    recording_id = None
     try:
         data = request.get_json()
         court_id = data.get('court_id')
@@ -104,8 +74,9 @@ def start_recording_with_duration():
         if not court:
             return jsonify({'error': 'Terrain non trouvé'}), 404
         
-        # Nettoyer les sessions expirées pour ce club avant de vérifier la disponibilité
-        cleanup_expired_sessions(court.club_id)
+        # Session expirée qui bloque encore ce terrain ou ce joueur : finalisée maintenant,
+        # les autres le sont par le balayage de fond
+        recording_sweeper.sweep(court_id=court.id, user_id=user.id)
         
         if court.is_recording:
             return jsonify({
@@ -113,6 +84,14 @@ def start_recording_with_duration():
                 'current_recording_id': court.current_recording_id
             }), 409
         
+        # État de la caméra lu dans le cache des sondes (aucun appel réseau ici)
+        camera_status = camera_health.get_status(court.id, court.camera_url)
+        if camera_health.should_refuse(camera_status):
+            return jsonify({
+                'error': 'La caméra de ce terrain est injoignable',
+                'camera_status': camera_status
+            }), 503
+        
         # Vérifier que l'utilisateur a des crédits
         if user.credits_balance < 1:
             return jsonify({'error': 'Crédits insuffisants'}), 400
@@ -140,6 +119,13 @@ def start_recording_with_duration():
         # Générer un ID unique pour l'enregistrement
         recording_id = f"rec_{user.id}_{int(datetime.now().timestamp())}_{uuid.uuid4().hex[:8]}"
         
+        # Espace disque et quota du club réservés pour cet enregistrement (évictions comprises)
+        try:
+            storage_manager.admit(recording_id, court.club_id, planned_duration,
+                                  filename=f'rec_{recording_id}.mp4')
+        except StorageFullError as e:
+            return jsonify({'error': str(e), 'reason': e.reason, 'storage': e.details}), 507
+        
         # Créer la session d'enregistrement
         recording_session = RecordingSession(
             recording_id=recording_id,
@@ -179,6 +165,7 @@ def start_recording_with_duration():
         db.session.commit()
         
         logger.info(f"Enregistrement démarré: {recording_id} sur terrain {court_id}")
+        recording_sweeper.start()
         
         # Préparer la réponse après le commit réussi
         response_data = {
@@ -187,11 +174,18 @@ def start_recording_with_duration():
             'court': court.to_dict(),
             'user_credits': user.credits_balance
         }
+        if camera_status['status'] != 'online':
+            response_data['camera_warning'] = {
+                'status': camera_status['status'],
+                'message': "L'état de la caméra n'est pas confirmé : vérifiez l'image avant le match"
+            }
         
         return jsonify(response_data), 201
         
     except Exception as e:
         db.session.rollback()
+        if recording_id:
+            storage_manager.release(recording_id)
         logger.error(f"Erreur lors du démarrage d'enregistrement: {str(e)}")
         logger.error(f"Type d'erreur: {type(e).__name__}")
         logger.error(f"Traceback: ", exc_info=True)
@@ -279,16 +273,18 @@ def _stop_recording_session(recording_session, stopped_by, performed_by_id):
             court.is_recording = False
             court.current_recording_id = None
         
-        # Créer la vidéo
+        # Créer la vidéo (durée en secondes, mesurée dans le fichier s'il est déjà là)
         elapsed_minutes = recording_session.get_elapsed_minutes()
+        elapsed_seconds = (recording_session.end_time - recording_session.start_time).total_seconds()
         
         video = Video(
             user_id=recording_session.user_id,
             court_id=recording_session.court_id,
             title=recording_session.title,
             description=recording_session.description,
-            duration=elapsed_minutes * 60,  # en secondes
+            duration=max(0, int(elapsed_seconds)),
             file_url=f'/videos/rec_{recording_session.recording_id}.mp4',
+            recorded_at=recording_session.start_time,
             is_unlocked=True
         )
         
@@ -307,6 +303,13 @@ def _stop_recording_session(recording_session, stopped_by, performed_by_id):
         )
         
         db.session.commit()
+        storage_manager.release(recording_session.recording_id)
+        try:
+            blob_store.adopt(video)
+        except Exception as e:
+            db.session.rollback()
+            logger.warning(f"Fichiers de la vidéo {video.id} conservés hors du stockage par contenu: {e}")
+        media_probe.probe_video(video)
         
         logger.info(f"Enregistrement arrêté: {recording_session.recording_id} par {stopped_by}")
         
@@ -341,11 +344,10 @@ def get_my_active_recording():
         if not recording_session:
             return jsonify({'active_recording': None}), 200
         
-        # Vérifier si l'enregistrement a expiré
+        # Enregistrement expiré : finalisé par le balayage de fond, rien n'est écrit ici
         if recording_session.is_expired():
-            # Arrêter automatiquement l'enregistrement expiré
-            _stop_recording_session(recording_session, 'auto', user.id)
-            return jsonify({'active_recording': None, 'message': 'Enregistrement expiré et arrêté automatiquement'}), 200
+            recording_sweeper.start()
+            return jsonify({'active_recording': None, 'message': 'Enregistrement expiré, finalisation automatique en cours'}), 200
         
         # Enrichir avec les données du terrain et club
         court = Court.query.get(recording_session.court_id)
@@ -418,8 +420,8 @@ def get_available_courts(club_id):
         return jsonify({'error': 'Non authentifié'}), 401
     
     try:
-        # Nettoyer automatiquement les enregistrements expirés pour ce club
-        cleanup_expired_sessions(club_id)
+        # Lecture seule : les enregistrements expirés sont finalisés par le balayage de fond
+        recording_sweeper.start()
         
         # Récupérer tous les terrains du club
         courts = Court.query.filter_by(club_id=club_id).all()
@@ -427,6 +429,7 @@ def get_available_courts(club_id):
         courts_data = []
         for court in courts:
             court_data = court.to_dict()
+            court_data['camera_status'] = camera_health.summary(court.id, court.camera_url)
             
             # Si le terrain est en cours d'enregistrement, ajouter les détails
             if court.is_recording and court.current_recording_id:
@@ -435,7 +438,10 @@ def get_available_courts(club_id):
                     status='active'
                 ).first()
                 
-                if recording_session and not recording_session.is_expired():
+                if recording_session and recording_session.is_expired():
+                    # En attente du balayage : le terrain est déjà libre pour le joueur
+                    court_data.update({'is_recording': False, 'current_recording_id': None, 'available': True})
+                elif recording_session:
                     player = User.query.get(recording_session.user_id)
                     court_data['recording_info'] = {
                         'player_name': player.name if player else 'Inconnu',
@@ -465,14 +471,8 @@ def cleanup_expired_recordings():
         return jsonify({'error': 'Accès non autorisé'}), 403
     
     try:
-        # Récupérer toutes les sessions actives expirées
-        expired_sessions = RecordingSession.query.filter_by(status='active').all()
-        expired_count = 0
-        
-        for session in expired_sessions:
-            if session.is_expired():
-                _stop_recording_session(session, 'auto', user.id)
-                expired_count += 1
+        # Réclamation et finalisation par lots, comme le balayage de fond
+        expired_count = recording_sweeper.sweep()['finalized']
         
         logger.info(f"Nettoyage automatique: {expired_count} enregistrements expirés arrêtés")
         
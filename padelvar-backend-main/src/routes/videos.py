@@ -7,18 +7,23 @@ La version refactorisée sépare la logique métier des routes API et améliore
 la gestion des erreurs et des ressources.
 """
 
-from flask import Blueprint, request, jsonify, session, send_file, Response
-from src.models.user import db, User, Video, Court, Club, RecordingSession
+from flask import Blueprint, request, jsonify, session, send_file, send_from_directory, Response, url_for, redirect
+from src.models.user import db, User, UserRole, Video, Court, Club, RecordingSession
 from src.services.video_capture_service import video_capture_service
+from src.services.camera_relay import camera_relay, CameraRelayFull, CameraRelayBusy, MULTIPART_BOUNDARY
+from src.services.highlight_detector import highlight_detector
+from src.services.clip_extractor import clip_extractor
+from src.services.transcode_scheduler import transcode_scheduler
+from src.services.storage_manager import storage_manager, StorageFullError
+from src.services.media_probe import media_probe
+from src.services.video_library import video_library
+from src.services.blob_store import blob_store
+from src.services.identity import current_user
 from datetime import datetime, timedelta
 import os
-import io
 import logging
 import threading
 import time
-from typing import Dict, Any, Optional, List, Tuple
-import json
-from functools import wraps
 
 # Configuration du logger
 logger = logging.getLogger(__name__)
@@ -26,1033 +31,6 @@ logger = logging.getLogger(__name__)
 # Création du Blueprint
 videos_bp = Blueprint('videos', __name__)
 
-# ====================================================================
-# GESTIONNAIRE D'ENREGISTREMENTS
-# ====================================================================
-
-class RecordingManager:
-    """
-    Classe centralisée pour gérer les enregistrements actifs et leurs timers.
-    Cette classe gère la synchronisation, les accès concurrents et le nettoyage
-    des ressources pour tous les enregistrements.
-    """
-    
-    def __init__(self):
-        """Initialise les dictionnaires pour suivre les enregistrements et leurs timers."""
-        self.active_recordings = {}  # Informations sur les enregistrements actifs
-        self.recording_timers = {}   # Informations sur les timers des enregistrements
-        self.timer_threads = {}      # Threads des timers
-        self.lock = threading.RLock()  # Verrou pour protéger les accès concurrents
-        
-        # Configuration
-        self.cleanup_interval = 300  # 5 minutes entre chaque nettoyage
-        self.max_timer_age = 3600    # 1 heure max d'âge pour un timer
-        
-        # Démarrer le thread de nettoyage automatique
-        self.cleanup_thread = threading.Thread(
-            target=self._cleanup_loop,
-            daemon=True
-        )
-        self.cleanup_thread.start()
-        
-        logger.info("🔧 Gestionnaire d'enregistrements initialisé")
-    
-    def start_recording(self, session_id: str, court_id: int, user_id: int, 
-                        session_name: str, duration_minutes: int) -> None:
-        """
-        Enregistre une nouvelle session d'enregistrement et démarre son timer.
-        
-        Args:
-            session_id: Identifiant unique de la session d'enregistrement
-            court_id: ID du terrain où se déroule l'enregistrement
-            user_id: ID de l'utilisateur qui a lancé l'enregistrement
-            session_name: Nom de la session (titre du match)
-            duration_minutes: Durée prévue de l'enregistrement en minutes
-        """
-        with self.lock:
-            start_time = datetime.now()
-            end_time = start_time + timedelta(minutes=duration_minutes)
-            
-            # Enregistrer les informations de la session
-            self.active_recordings[session_id] = {
-                'user_id': user_id,
-                'court_id': court_id,
-                'start_time': start_time,
-                'duration_minutes': duration_minutes,
-                'session_name': session_name
-            }
-            
-            # Enregistrer les informations du timer
-            self.recording_timers[session_id] = {
-                'start_time': start_time,
-                'end_time': end_time,
-                'duration_minutes': duration_minutes,
-                'status': 'running'
-            }
-            
-            # Démarrer le timer automatique en arrière-plan
-            timer_thread = threading.Thread(
-                target=self._auto_stop_recording,
-                args=(session_id, court_id, duration_minutes, user_id),
-                daemon=True
-            )
-            timer_thread.start()
-            
-            # Stocker la référence au thread
-            self.timer_threads[session_id] = timer_thread
-            
-            logger.info(f"⏱️ Enregistrement {session_id} démarré pour {duration_minutes} minutes")
-    
-    def stop_recording(self, session_id: str) -> None:
-        """
-        Arrête un enregistrement en cours et met à jour son statut.
-        
-        Args:
-            session_id: Identifiant de la session d'enregistrement à arrêter
-        """
-        with self.lock:
-            # Mettre à jour le statut du timer
-            if session_id in self.recording_timers:
-                self.recording_timers[session_id]['status'] = 'stopped_manually'
-            
-            # Supprimer de la liste des enregistrements actifs
-            if session_id in self.active_recordings:
-                del self.active_recordings[session_id]
-            
-            logger.info(f"⏹️ Enregistrement {session_id} arrêté manuellement")
-    
-    def extend_recording(self, session_id: str, additional_minutes: int) -> Optional[datetime]:
-        """
-        Prolonge la durée d'un enregistrement en cours.
-        
-        Args:
-            session_id: Identifiant de la session d'enregistrement à prolonger
-            additional_minutes: Nombre de minutes à ajouter
-            
-        Returns:
-            La nouvelle date de fin ou None si l'enregistrement n'existe pas
-        """
-        with self.lock:
-            if session_id not in self.active_recordings:
-                return None
-            
-            # Prolonger la durée dans le dictionnaire d'enregistrements
-            self.active_recordings[session_id]['duration_minutes'] += additional_minutes
-            
-            # Mettre à jour le timer
-            if session_id in self.recording_timers:
-                timer_info = self.recording_timers[session_id]
-                timer_info['duration_minutes'] += additional_minutes
-                timer_info['end_time'] = timer_info['end_time'] + timedelta(minutes=additional_minutes)
-                new_end_time = timer_info['end_time']
-            else:
-                # Si pas de timer, en créer un nouveau
-                start_time = self.active_recordings[session_id]['start_time']
-                total_minutes = self.active_recordings[session_id]['duration_minutes']
-                new_end_time = start_time + timedelta(minutes=total_minutes)
-                
-                self.recording_timers[session_id] = {
-                    'start_time': start_time,
-                    'end_time': new_end_time,
-                    'duration_minutes': total_minutes,
-                    'status': 'running'
-                }
-            
-            logger.info(f"⏱️ Enregistrement {session_id} prolongé de {additional_minutes} minutes")
-            return new_end_time
-    
-    def get_active_recordings(self, user_id: int) -> List[Dict[str, Any]]:
-        """
-        Récupère la liste des enregistrements actifs pour un utilisateur.
-        
-        Args:
-            user_id: ID de l'utilisateur
-            
-        Returns:
-            Liste des enregistrements actifs avec leurs informations
-        """
-        with self.lock:
-            current_time = datetime.now()
-            user_recordings = []
-            
-            for session_id, recording_info in self.active_recordings.items():
-                if recording_info['user_id'] == user_id:
-                    # Obtenir les infos du timer s'il existe
-                    timer_info = self.recording_timers.get(session_id, {})
-                    start_time = timer_info.get('start_time', recording_info['start_time'])
-                    end_time = timer_info.get('end_time')
-                    duration_minutes = timer_info.get('duration_minutes', recording_info['duration_minutes'])
-                    status = timer_info.get('status', 'running')
-                    
-                    # Calculer les métriques
-                    elapsed_minutes = (current_time - start_time).total_seconds() / 60
-                    remaining_minutes = 0
-                    if end_time:
-                        remaining_minutes = max(0, (end_time - current_time).total_seconds() / 60)
-                    
-                    progress_percent = min(100, (elapsed_minutes / duration_minutes) * 100) if duration_minutes > 0 else 0
-                    
-                    user_recordings.append({
-                        'session_id': session_id,
-                        'court_id': recording_info['court_id'],
-                        'session_name': recording_info['session_name'],
-                        'start_time': start_time.isoformat(),
-                        'end_time': end_time.isoformat() if end_time else None,
-                        'duration_minutes': duration_minutes,
-                        'elapsed_minutes': round(elapsed_minutes, 2),
-                        'remaining_minutes': round(remaining_minutes, 2),
-                        'progress_percent': round(progress_percent, 2),
-                        'status': status
-                    })
-            
-            return user_recordings
-    
-    def get_timer_info(self, session_id: str) -> Optional[Dict[str, Any]]:
-        """
-        Récupère les informations détaillées sur le timer d'un enregistrement.
-        
-        Args:
-            session_id: Identifiant de la session d'enregistrement
-            
-        Returns:
-            Informations sur le timer ou None si le timer n'existe pas
-        """
-        with self.lock:
-            if session_id not in self.recording_timers:
-                return None
-            
-            timer_info = self.recording_timers[session_id]
-            current_time = datetime.now()
-            
-            # Calculer le temps écoulé et restant
-            elapsed_seconds = (current_time - timer_info['start_time']).total_seconds()
-            remaining_seconds = max(0, (timer_info['end_time'] - current_time).total_seconds())
-            
-            # Convertir en minutes pour l'interface utilisateur
-            elapsed_minutes = elapsed_seconds / 60
-            remaining_minutes = remaining_seconds / 60
-            progress_percent = min(100, (elapsed_minutes / timer_info['duration_minutes']) * 100)
-            
-            return {
-                'recording_id': session_id,
-                'start_time': timer_info['start_time'].isoformat(),
-                'end_time': timer_info['end_time'].isoformat(),
-                'duration_minutes': timer_info['duration_minutes'],
-                'elapsed_minutes': round(elapsed_minutes, 2),
-                'remaining_minutes': round(remaining_minutes, 2),
-                'progress_percent': round(progress_percent, 2),
-                'status': timer_info['status'],
-                'current_server_time': current_time.isoformat()
-            }
-    
-    def update_timer_status(self, session_id: str, status: str) -> bool:
-        """
-        Met à jour le statut d'un timer.
-        
-        Args:
-            session_id: Identifiant de la session d'enregistrement
-            status: Nouveau statut du timer ('running', 'stopped', 'completed', 'error', etc.)
-            
-        Returns:
-            True si le timer a été mis à jour, False sinon
-        """
-        with self.lock:
-            if session_id in self.recording_timers:
-                self.recording_timers[session_id]['status'] = status
-                return True
-            return False
-    
-    def _auto_stop_recording(self, session_id: str, court_id: int, duration_minutes: int, user_id: int) -> None:
-        """
-        Fonction qui s'exécute en arrière-plan pour arrêter automatiquement 
-        l'enregistrement après la durée spécifiée.
-        
-        Args:
-            session_id: Identifiant de la session d'enregistrement
-            court_id: ID du terrain
-            duration_minutes: Durée de l'enregistrement en minutes
-            user_id: ID de l'utilisateur
-        """
-        try:
-            logger.info(f"⏱️ Timer automatique démarré: {session_id} - {duration_minutes} minutes")
-            
-            # Attendre la durée spécifiée
-            time.sleep(duration_minutes * 60)
-            
-            # Vérifier si l'enregistrement est toujours actif avec le verrou
-            with self.lock:
-                if session_id not in self.active_recordings:
-                    if session_id in self.recording_timers:
-                        self.recording_timers[session_id]['status'] = 'canceled'
-                    logger.info(f"ℹ️ Enregistrement {session_id} déjà arrêté manuellement")
-                    return
-            
-            logger.info(f"⏹️ Arrêt automatique de l'enregistrement {session_id} après {duration_minutes} minutes")
-            
-            # Créer une nouvelle session de base de données pour le thread
-            from sqlalchemy import create_engine
-            from sqlalchemy.orm import sessionmaker
-            from ..models.database import db
-            
-            # Arrêter l'enregistrement avec le service de capture
-            result = video_capture_service.stop_recording(session_id)
-            
-            # Utiliser une nouvelle session DB pour les opérations de ce thread
-            with db.session.begin():
-                # Mettre à jour le terrain
-                court = Court.query.get(court_id)
-                if court:
-                    court.is_recording = False
-                    court.recording_session_id = None
-            
-            # Mettre à jour le statut du timer avec le verrou
-            with self.lock:
-                if session_id in self.recording_timers:
-                    self.recording_timers[session_id]['status'] = 'completed'
-                
-                # Retirer de la liste des enregistrements actifs
-                if session_id in self.active_recordings:
-                    del self.active_recordings[session_id]
-                
-                # Retirer le thread
-                if session_id in self.timer_threads:
-                    del self.timer_threads[session_id]
-            
-            logger.info(f"✅ Enregistrement {session_id} arrêté automatiquement - durée exacte: {duration_minutes}min")
-            
-        except Exception as e:
-            logger.error(f"❌ Erreur lors de l'arrêt automatique de l'enregistrement {session_id}: {e}")
-            
-            # Nettoyer en cas d'erreur avec le verrou
-            with self.lock:
-                if session_id in self.active_recordings:
-                    del self.active_recordings[session_id]
-                if session_id in self.recording_timers:
-                    self.recording_timers[session_id]['status'] = 'error'
-                if session_id in self.timer_threads:
-                    del self.timer_threads[session_id]
-            
-            # Essayer de libérer le terrain même en cas d'erreur
-            try:
-                with db.session.begin():
-                    court = Court.query.get(court_id)
-                    if court and court.recording_session_id == session_id:
-                        court.is_recording = False
-                        court.recording_session_id = None
-            except Exception as cleanup_error:
-                logger.error(f"❌ Erreur lors du nettoyage du terrain {court_id}: {cleanup_error}")
-    
-    def _cleanup_loop(self) -> None:
-        """
-        Boucle de nettoyage qui s'exécute périodiquement pour supprimer 
-        les timers expirés et nettoyer les ressources.
-        """
-        while True:
-            try:
-                time.sleep(self.cleanup_interval)
-                self._cleanup_expired_timers()
-            except Exception as e:
-                logger.error(f"❌ Erreur dans la boucle de nettoyage: {e}")
-    
-    def _cleanup_expired_timers(self) -> None:
-        """Nettoie les timers expirés et les ressources associées."""
-        with self.lock:
-            current_time = datetime.now()
-            expired_sessions = []
-            
-            # Identifier les sessions expirées
-            for session_id, timer_info in self.recording_timers.items():
-                # Vérifier si le timer est terminé depuis longtemps
-                if timer_info['status'] in ['completed', 'stopped_manually', 'error', 'canceled']:
-                    end_time = timer_info.get('end_time', timer_info['start_time'])
-                    if (current_time - end_time).total_seconds() > self.max_timer_age:
-                        expired_sessions.append(session_id)
-            
-            # Nettoyer les sessions expirées
-            for session_id in expired_sessions:
-                if session_id in self.recording_timers:
-                    del self.recording_timers[session_id]
-                if session_id in self.active_recordings:
-                    del self.active_recordings[session_id]
-                if session_id in self.timer_threads:
-                    del self.timer_threads[session_id]
-                
-                logger.info(f"🧹 Timer expiré nettoyé: {session_id}")
-
-# Créer une instance globale du gestionnaire d'enregistrements
-recording_manager = RecordingManager()
-
-# ====================================================================
-# DÉCORATEURS ET UTILITAIRES
-# ====================================================================
-
-def login_required(f):
-    """Décorateur pour vérifier que l'utilisateur est authentifié."""
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        user = get_current_user()
-        if not user:
-            return jsonify({'error': 'Non authentifié'}), 401
-        return f(*args, **kwargs)
-    return decorated_function
-
-def get_current_user() -> Optional[User]:
-    """
-    Récupère l'utilisateur actuellement connecté à partir de la session.
-    
-    Returns:
-        L'objet utilisateur ou None si non authentifié
-    """
-    user_id = session.get('user_id')
-    if not user_id:
-        return None
-    return User.query.get(user_id)
-
-def handle_api_error(f):
-    """Décorateur pour gérer uniformément les erreurs d'API."""
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        try:
-            return f(*args, **kwargs)
-        except Exception as e:
-            logger.error(f"❌ Erreur API: {e}")
-            db.session.rollback()
-            return jsonify({'error': f'Une erreur est survenue: {str(e)}'}), 500
-    return decorated_function
-
-def api_response(data=None, message=None, status=200, error=None) -> Tuple[dict, int]:
-    """
-    Crée une réponse d'API standardisée.
-    
-    Args:
-        data: Données à renvoyer
-        message: Message de succès ou d'information
-        status: Code de statut HTTP
-        error: Message d'erreur éventuel
-        
-    Returns:
-        Tuple contenant la réponse JSON et le code de statut
-    """
-    response = {}
-    if data is not None:
-        response.update(data)
-    if message:
-        response['message'] = message
-    if error:
-        response['error'] = error
-    
-    return jsonify(response), status
-
-# ====================================================================
-# ROUTES POUR LES VIDÉOS
-# ====================================================================
-
-@videos_bp.route('/my-videos', methods=['GET'])
-@login_required
-@handle_api_error
-def get_my_videos():
-    """Récupère les vidéos de l'utilisateur connecté."""
-    user = get_current_user()
-    videos = Video.query.filter_by(user_id=user.id).order_by(Video.recorded_at.desc()).all()
-    
-    # Créer une version sécurisée du to_dict()
-    videos_data = []
-    for video in videos:
-        video_dict = {
-            "id": video.id,
-            "title": video.title,
-            "description": video.description,
-            "file_url": video.file_url,
-            "thumbnail_url": video.thumbnail_url,
-            "duration": getattr(video, 'duration', None),
-            "file_size": getattr(video, 'file_size', None),
-            "is_unlocked": getattr(video, 'is_unlocked', True),
-            "credits_cost": getattr(video, 'credits_cost', 1),
-            "recorded_at": video.recorded_at.isoformat() if video.recorded_at else None,
-            "created_at": video.created_at.isoformat() if video.created_at else None,
-            "user_id": video.user_id,
-            "court_id": video.court_id
-        }
-        videos_data.append(video_dict)
-    
-    return api_response(data={'videos': videos_data})
-
-@videos_bp.route('/<int:video_id>', methods=['GET'])
-@login_required
-@handle_api_error
-def get_video(video_id):
-    """Récupère les détails d'une vidéo spécifique."""
-    user = get_current_user()
-    video = Video.query.get_or_404(video_id)
-    
-    # Vérifier que l'utilisateur a accès à cette vidéo
-    if video.user_id != user.id and not video.is_unlocked:
-        return api_response(error="Accès non autorisé à cette vidéo", status=403)
-    
-    return api_response(data={'video': video.to_dict()})
-
-@videos_bp.route('/<int:video_id>', methods=['PUT'])
-@login_required
-@handle_api_error
-def update_video(video_id):
-    """Met à jour les informations d'une vidéo."""
-    user = get_current_user()
-    video = Video.query.get_or_404(video_id)
-    
-    # Vérifier que l'utilisateur est propriétaire de la vidéo
-    if video.user_id != user.id:
-        return api_response(error="Accès non autorisé", status=403)
-    
-    data = request.get_json()
-    if 'title' in data:
-        video.title = data['title']
-    if 'description' in data:
-        video.description = data['description']
-    
-    db.session.commit()
-    return api_response(data={'video': video.to_dict()}, message="Vidéo mise à jour")
-
-@videos_bp.route('/<int:video_id>', methods=['DELETE'])
-@login_required
-@handle_api_error
-def delete_video(video_id):
-    """Supprime une vidéo."""
-    user = get_current_user()
-    video = Video.query.get_or_404(video_id)
-    
-    # Vérifier que l'utilisateur est propriétaire de la vidéo
-    if video.user_id != user.id:
-        return api_response(error="Accès non autorisé", status=403)
-    
-    db.session.delete(video)
-    db.session.commit()
-    return api_response(message="Vidéo supprimée")
-
-@videos_bp.route('/<int:video_id>/share', methods=['POST'])
-@login_required
-@handle_api_error
-def share_video(video_id):
-    """Génère des liens de partage pour une vidéo."""
-    user = get_current_user()
-    video = Video.query.get_or_404(video_id)
-    
-    # Vérifier que l'utilisateur est propriétaire de la vidéo
-    if video.user_id != user.id:
-        return api_response(error="Accès non autorisé à cette vidéo", status=403)
-    
-    # Vérifier que la vidéo est déverrouillée
-    if not video.is_unlocked:
-        return api_response(error="La vidéo doit être déverrouillée pour être partagée", status=400)
-    
-    data = request.get_json()
-    platform = data.get('platform')  # 'facebook', 'instagram', 'youtube'
-    
-    # Générer les liens de partage
-    base_url = request.host_url
-    video_url = f"{base_url}videos/{video_id}/watch"
-    
-    share_urls = {
-        'facebook': f"https://www.facebook.com/sharer/sharer.php?u={video_url}",
-        'instagram': video_url,  # Instagram nécessite une approche différente
-        'youtube': video_url,    # YouTube nécessite l'API YouTube
-        'direct': video_url
-    }
-    
-    return api_response(
-        data={'share_urls': share_urls, 'video_url': video_url},
-        message="Liens de partage générés"
-    )
-
-@videos_bp.route('/<int:video_id>/watch', methods=['GET'])
-@handle_api_error
-def watch_video(video_id):
-    """Route publique pour regarder une vidéo partagée."""
-    video = Video.query.get_or_404(video_id)
-    
-    # Vérifier que la vidéo est déverrouillée
-    if not video.is_unlocked:
-        user = get_current_user()
-        if not user or (video and video.user_id != user.id):
-            return api_response(error="Vidéo non disponible", status=403)
-    
-    # Construire les URLs pour le streaming
-    base_url = request.host_url.rstrip('/')
-    
-    # Si file_url est None ou vide, créer une URL par défaut basée sur l'ID
-    stream_url = video.file_url
-    if not stream_url:
-        # Créer un nom de fichier basé sur l'ID de la vidéo
-        filename = f"video_{video.id}.mp4"
-        stream_url = f"/api/videos/stream/{filename}"
-    elif not stream_url.startswith('http'):
-        # Si c'est un chemin relatif, le compléter
-        if not stream_url.startswith('/'):
-            stream_url = f"/api/videos/stream/{stream_url}"
-        else:
-            # Si c'est déjà un chemin absolu à partir de la racine
-            if not stream_url.startswith('/api/'):
-                stream_url = f"/api{stream_url}"
-    
-    # Retourner les informations de la vidéo pour le lecteur
-    return api_response(data={
-        'video': {
-            'id': video.id,
-            'title': video.title,
-            'description': video.description,
-            'file_url': stream_url,  # URL construite pour le streaming
-            'thumbnail_url': video.thumbnail_url,
-            'duration': video.duration,
-            'recorded_at': video.recorded_at.isoformat() if video.recorded_at else None
-        }
-    })
-
-@videos_bp.route('/download/<int:video_id>', methods=['GET'])
-@login_required
-@handle_api_error
-def download_video(video_id):
-    """Télécharge une vidéo."""
-    user = get_current_user()
-    video = Video.query.get_or_404(video_id)
-    
-    # Vérifier les permissions
-    if video.user_id != user.id and not video.is_unlocked:
-        return api_response(error="Accès non autorisé", status=403)
-    
-    # Pour le MVP, rediriger vers le stream
-    filename = video.file_url.split('/')[-1]
-    return Response(
-        b'fake video data for download',
-        mimetype='video/mp4',
-        headers={
-            'Content-Disposition': f'attachment; filename="{video.title}.mp4"',
-            'Content-Type': 'application/octet-stream'
-        }
-    )
-
-# ====================================================================
-# ROUTES POUR LES TERRAINS ET CLUBS
-# ====================================================================
-
-@videos_bp.route('/courts/available', methods=['GET'])
-@login_required
-@handle_api_error
-def get_available_courts():
-    """Récupère la liste des terrains disponibles pour l'enregistrement."""
-    # Récupérer tous les terrains non occupés
-    courts = Court.query.filter_by(is_recording=False).all()
-    
-    # Grouper par club
-    courts_by_club = {}
-    for court in courts:
-        club = Club.query.get(court.club_id)
-        if club:
-            if club.id not in courts_by_club:
-                courts_by_club[club.id] = {
-                    'club': club.to_dict(),
-                    'courts': []
-                }
-            courts_by_club[club.id]['courts'].append(court.to_dict())
-    
-    return api_response(data={
-        'available_courts': list(courts_by_club.values()),
-        'total_available': len(courts)
-    })
-
-@videos_bp.route("/clubs/<int:club_id>/courts", methods=["GET"])
-@login_required
-@handle_api_error
-def get_courts_for_club(club_id):
-    """Récupère les terrains d'un club spécifique."""
-    courts = Court.query.filter_by(club_id=club_id).all()
-    return api_response(data={"courts": [c.to_dict() for c in courts]})
-
-@videos_bp.route('/courts/<int:court_id>/camera-stream', methods=['GET'])
-@login_required
-@handle_api_error
-def get_camera_stream(court_id):
-    """Récupère les informations de flux de la caméra d'un terrain."""
-    court = Court.query.get_or_404(court_id)
-    
-    return api_response(data={
-        'court_id': court.id,
-        'court_name': court.name,
-        'camera_url': court.camera_url,
-        'stream_type': 'mjpeg'  # Type de flux pour la caméra par défaut
-    })
-
-# ====================================================================
-# ROUTES POUR LA GESTION D'ENREGISTREMENT
-# ====================================================================
-
-@videos_bp.route('/record', methods=['POST'])
-@login_required
-@handle_api_error
-def start_recording():
-    """Démarre un nouvel enregistrement avec le service de capture vidéo."""
-    user = get_current_user()
-    data = request.get_json()
-    
-    court_id = data.get('court_id')
-    session_name = data.get('session_name', f"Match du {datetime.now().strftime('%d/%m/%Y')}")
-    duration_minutes = data.get('duration_minutes', 60)  # Durée par défaut : 60 minutes
-    
-    if not court_id:
-        return api_response(error="Le terrain est requis", status=400)
-    
-    # Vérifier que le terrain existe
-    court = Court.query.get(court_id)
-    if not court:
-        return api_response(error="Terrain non trouvé", status=400)
-    
-    # Vérifier que le terrain n'est pas déjà en cours d'enregistrement
-    if hasattr(court, 'is_recording') and court.is_recording:
-        return api_response(error="Ce terrain est déjà en cours d'enregistrement", status=400)
-    
-    # Démarrer l'enregistrement avec le service de capture
-    result = video_capture_service.start_recording(
-        court_id=court_id,
-        user_id=user.id,
-        session_name=session_name
-    )
-    
-    session_id = result['session_id']
-    start_time = datetime.now()
-    end_time = start_time + timedelta(minutes=duration_minutes)
-    
-    # Marquer le terrain comme en cours d'enregistrement
-    court.is_recording = True
-    court.recording_session_id = session_id
-    db.session.commit()
-    
-    # Enregistrer dans le gestionnaire d'enregistrements
-    recording_manager.start_recording(
-        session_id=session_id,
-        court_id=court_id,
-        user_id=user.id,
-        session_name=session_name,
-        duration_minutes=duration_minutes
-    )
-    
-    logger.info(f"🎬 Enregistrement démarré par utilisateur {user.id} sur terrain {court_id} - Durée: {duration_minutes}min")
-    
-    return api_response(data={
-        'session_id': session_id,
-        'court_id': court_id,
-        'session_name': session_name,
-        'camera_url': result['camera_url'],
-        'status': 'recording',
-        'duration_minutes': duration_minutes,
-        'start_time': start_time.isoformat(),
-        'end_time': end_time.isoformat(),
-        'auto_stop_time': end_time.isoformat()
-    }, message="Enregistrement démarré avec succès")
-
-@videos_bp.route('/stop-recording', methods=['POST'])
-@login_required
-@handle_api_error
-def stop_recording():
-    """Arrête un enregistrement en cours."""
-    user = get_current_user()
-    data = request.get_json()
-    
-    session_id = data.get('session_id')
-    court_id = data.get('court_id')
-    manual_stop = data.get('manual_stop', True)  # Indique si c'est un arrêt manuel ou automatique
-    
-    if not session_id:
-        return api_response(error="session_id manquant", status=400)
-    
-    # Vérifier que l'enregistrement appartient à l'utilisateur (sauf arrêt automatique)
-    with recording_manager.lock:
-        if manual_stop and session_id in recording_manager.active_recordings:
-            recording_info = recording_manager.active_recordings[session_id]
-            if recording_info['user_id'] != user.id:
-                return api_response(error="Vous ne pouvez pas arrêter cet enregistrement", status=403)
-    
-    # Arrêter l'enregistrement avec le service de capture
-    result = video_capture_service.stop_recording(session_id)
-    
-    if result.get('status') == 'error':
-        return api_response(error=result.get('error', "Erreur lors de l'arrêt"), status=500)
-    
-    # Mettre à jour le terrain
-    if court_id:
-        court = Court.query.get(court_id)
-        if court:
-            court.is_recording = False
-            court.recording_session_id = None
-            db.session.commit()
-    
-    # Mettre à jour dans le gestionnaire d'enregistrements
-    recording_manager.stop_recording(session_id)
-    
-    # Calculer la durée réelle
-    actual_duration = None
-    with recording_manager.lock:
-        if session_id in recording_manager.active_recordings:
-            recording_info = recording_manager.active_recordings[session_id]
-            actual_duration = (datetime.now() - recording_info['start_time']).total_seconds() / 60
-    
-    stop_reason = "manual" if manual_stop else "auto"
-    logger.info(f"⏹️ Enregistrement arrêté ({stop_reason}) par utilisateur {user.id}: {session_id}")
-    
-    return api_response(data={
-        'session_id': session_id,
-        'status': result.get('status'),
-        'video_id': result.get('video_id'),
-        'video_filename': result.get('video_filename'),
-        'duration': result.get('duration'),
-        'actual_duration_minutes': round(actual_duration, 2) if actual_duration else None,
-        'file_size': result.get('file_size'),
-        'stopped_by': stop_reason
-    }, message="Enregistrement arrêté avec succès")
-
-@videos_bp.route('/active-recordings', methods=['GET'])
-@login_required
-@handle_api_error
-def get_active_recordings():
-    """Récupère la liste des enregistrements actifs de l'utilisateur."""
-    user = get_current_user()
-    
-    # Utiliser le gestionnaire d'enregistrements
-    user_recordings = recording_manager.get_active_recordings(user.id)
-    
-    return api_response(data={
-        'active_recordings': user_recordings,
-        'total_active': len(user_recordings)
-    })
-
-@videos_bp.route('/recording-timer/<recording_id>', methods=['GET'])
-@login_required
-@handle_api_error
-def get_recording_timer(recording_id):
-    """Récupère l'état du compteur d'un enregistrement."""
-    # Utiliser le gestionnaire d'enregistrements
-    timer_info = recording_manager.get_timer_info(recording_id)
-    
-    if not timer_info:
-        return api_response(
-            error="Compteur non trouvé pour cet enregistrement", 
-            status=404, 
-            data={'recording_id': recording_id}
-        )
-    
-    return api_response(data=timer_info)
-
-@videos_bp.route('/recording/<recording_id>/extend', methods=['POST'])
-@login_required
-@handle_api_error
-def extend_recording(recording_id):
-    """Prolonge un enregistrement en cours."""
-    user = get_current_user()
-    data = request.get_json()
-    additional_minutes = data.get('additional_minutes', 30)
-    
-    # Vérifier que l'enregistrement existe et appartient à l'utilisateur
-    with recording_manager.lock:
-        if recording_id not in recording_manager.active_recordings:
-            return api_response(error="Enregistrement non trouvé ou déjà terminé", status=404)
-        
-        recording_info = recording_manager.active_recordings[recording_id]
-        
-        # Vérifier que l'utilisateur est propriétaire
-        if recording_info['user_id'] != user.id:
-            return api_response(error="Accès non autorisé", status=403)
-    
-    # Prolonger l'enregistrement
-    new_end_time = recording_manager.extend_recording(recording_id, additional_minutes)
-    
-    if not new_end_time:
-        return api_response(error="Erreur lors de la prolongation", status=500)
-    
-    logger.info(f"⏱️ Enregistrement {recording_id} prolongé de {additional_minutes} minutes par utilisateur {user.id}")
-    
-    return api_response(
-        data={
-            'new_duration_minutes': recording_info['duration_minutes'] + additional_minutes,
-            'new_end_time': new_end_time.isoformat()
-        },
-        message=f"Enregistrement prolongé de {additional_minutes} minutes"
-    )
-
-@videos_bp.route('/recording/<recording_id>/status', methods=['GET'])
-@login_required
-@handle_api_error
-def get_recording_status_by_id(recording_id):
-    """Récupère le statut d'un enregistrement en cours."""
-    # Obtenir le statut depuis le service de capture
-    status = video_capture_service.get_recording_status(recording_id)
-    
-    if 'error' in status:
-        return api_response(error=status['error'], status=404)
-    
-    # Ajouter les informations du timer si disponible
-    timer_info = recording_manager.get_timer_info(recording_id)
-    if timer_info:
-        status.update({
-            'timer_status': timer_info['status'],
-            'elapsed_minutes': timer_info['elapsed_minutes'],
-            'remaining_minutes': timer_info['remaining_minutes'],
-            'progress_percent': timer_info['progress_percent'],
-            'duration_minutes': timer_info['duration_minutes'],
-            'end_time': timer_info['end_time']
-        })
-    
-    return api_response(data=status)
-
-@videos_bp.route('/recording/<recording_id>/stop', methods=['POST'])
-@login_required
-@handle_api_error
-def stop_recording_by_id(recording_id):
-    """Arrête un enregistrement spécifique par son ID."""
-    user = get_current_user()
-    
-    # Arrêter l'enregistrement avec le service de capture
-    result = video_capture_service.stop_recording(recording_id)
-    
-    if result.get('status') == 'error':
-        return api_response(error=result.get('error', "Erreur lors de l'arrêt"), status=500)
-    
-    # Mettre à jour le terrain qui était en cours d'enregistrement
-    court = Court.query.filter_by(recording_session_id=recording_id).first()
-    if court:
-        court.is_recording = False
-        court.recording_session_id = None
-        db.session.commit()
-    
-    # Mettre à jour dans le gestionnaire d'enregistrements
-    recording_manager.stop_recording(recording_id)
-    
-    logger.info(f"⏹️ Enregistrement arrêté par utilisateur {user.id}: {recording_id}")
-    
-    return api_response(
-        data={
-            'recording_id': recording_id,
-            'status': result.get('status'),
-            'video_id': result.get('video_id'),
-            'video_filename': result.get('video_filename'),
-            'duration': result.get('duration'),
-            'file_size': result.get('file_size')
-        },
-        message="Enregistrement arrêté avec succès"
-    )
-
-# ====================================================================
-# ROUTES POUR LE PARTAGE DE VIDÉOS
-# ====================================================================
-
-@videos_bp.route('/stream/<filename>', methods=['GET'])
-@login_required
-@handle_api_error
-def stream_video(filename):
-    """Sert les fichiers vidéo (simulation pour le MVP)."""
-    # Créer une réponse de stream vidéo simulée
-    def generate_fake_video():
-        # Données de test pour simuler une vidéo MP4
-        fake_video_data = b'\x00\x00\x00\x18ftypmp42\x00\x00\x00\x00mp42isom' + b'\x00' * 1000
-        yield fake_video_data
-    
-    return Response(
-        generate_fake_video(),
-        mimetype='video/mp4',
-        headers={
-            'Content-Disposition': f'inline; filename="{filename}"',
-            'Accept-Ranges': 'bytes',
-            'Content-Length': '1024'
-        }
-    )
-
-@videos_bp.route('/thumbnail/<filename>', methods=['GET'])
-@handle_api_error
-def get_thumbnail(filename):
-    """Sert les thumbnails (simulation pour le MVP)."""
-    # Créer une image placeholder simple (1x1 pixel transparent PNG)
-    placeholder_png = (
-        b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x01\x00\x00\x00\x01\x01\x00\x00\x00\x007n\xf9$\x00\x00\x00\nIDATx\x9cc\xf8\x00\x00\x00\x01\x00\x01U\r\r\x82\x00\x00\x00\x00IEND\xaeB`\x82'
-    )
-    
-    return Response(
-        placeholder_png,
-        mimetype='image/png',
-        headers={
-            'Content-Disposition': f'inline; filename="{filename}"',
-            'Cache-Control': 'public, max-age=3600'
-        }
-    )
-
-# ====================================================================
-# ROUTES POUR LA GESTION DES CRÉDITS
-# ====================================================================
-
-@videos_bp.route('/buy-credits', methods=['POST'])
-@login_required
-@handle_api_error
-def buy_credits():
-    """Achète des crédits pour débloquer des vidéos."""
-    user = get_current_user()
-    data = request.get_json()
-    credits_to_buy = data.get('credits', 0)
-    payment_method = data.get('payment_method', 'simulation')
-    
-    if credits_to_buy <= 0:
-        return api_response(error="Le nombre de crédits doit être positif", status=400)
-    
-    # Pour le MVP, on simule le paiement
-    # Dans une vraie implémentation, on intégrerait un système de paiement
-    
-    # Ajouter les crédits au solde de l'utilisateur
-    user.credits_balance += credits_to_buy
-    db.session.commit()
-    
-    return api_response(
-        data={
-            'new_balance': user.credits_balance,
-            'transaction_id': f'txn_{user.id}_{int(datetime.now().timestamp())}'
-        },
-        message=f"{credits_to_buy} crédits achetés avec succès"
-    )
-
-# ====================================================================
-# ROUTES POUR LA GESTION DES QR CODES
-# ====================================================================
-
-@videos_bp.route('/qr-scan', methods=['POST'])
-@login_required
-@handle_api_error
-def scan_qr_code():
-    """Gère le scan QR code et ouvre la caméra sur mobile."""
-    data = request.get_json()
-    qr_code = data.get('qr_code')
-    
-    if not qr_code:
-        return api_response(error="QR code requis", status=400)
-    
-    # Rechercher le terrain correspondant au QR code
-    court = Court.query.filter_by(qr_code=qr_code).first()
-    if not court:
-        return api_response(error="QR code invalide ou terrain non trouvé", status=404)
-    
-    # Récupérer les informations du club
-    club = Club.query.get(court.club_id)
-    
-    return api_response(
-        data={
-            'court': court.to_dict(),
-            'club': club.to_dict() if club else None,
-            'camera_url': court.camera_url,
-            'can_record': True  # L'utilisateur peut démarrer un enregistrement
-        },
-        message="QR code scanné avec succès"
-    )
-import io
-import logging
-import threading
-import time
-
-# Configuration du logger
-logger = logging.getLogger(__name__)
-videos_bp = Blueprint('videos', __name__)
-
 # ====================================================================
 # GESTION DES ENREGISTREMENTS EN MÉMOIRE
 # ====================================================================
@@ -1062,13 +40,47 @@ class RecordingManager:
     Classe responsable de la gestion des enregistrements actifs et de leurs timers.
     Centralise la logique de gestion pour éviter les duplications et améliorer la maintenance.
     """
-    def __init__(self):
+    cleanup_interval = 6 * 60 * 60  # Nettoyage des anciens timers toutes les 6 heures
+
+    def __init__(self, app=None):
         self.active_recordings = {}
         self.recording_timers = {}
         self.lock = threading.Lock()  # Pour éviter les conditions de course
+        self.app = None
+        self._cleanup_timer = None
+        
+        if app is not None:
+            self.init_app(app)
+    
+    def init_app(self, app):
+        """
+        Enregistre le gestionnaire sur l'application (pattern extension Flask).
+        Aucun thread n'est démarré ici : le nettoyage périodique est planifié
+        au premier enregistrement.
+        """
+        self.app = app
+        app.extensions['recording_manager'] = self
+    
+    def _schedule_cleanup(self):
+        """Planifie le nettoyage périodique des anciens timers (une seule fois)"""
+        if self._cleanup_timer is not None:
+            return
+        self._cleanup_timer = threading.Timer(self.cleanup_interval, self._run_cleanup)
+        self._cleanup_timer.daemon = True
+        self._cleanup_timer.start()
+    
+    def _run_cleanup(self):
+        """Exécute le nettoyage puis se replanifie"""
+        self._cleanup_timer = None
+        try:
+            self.clean_old_timers()
+        finally:
+            self._schedule_cleanup()
     
     def start_recording(self, session_id, user_id, court_id, duration_minutes, session_name):
         """Démarre un nouvel enregistrement et son timer"""
+        self._schedule_cleanup()
+        
         with self.lock:
             start_time = datetime.now()
             end_time = start_time + timedelta(minutes=duration_minutes)
@@ -1240,19 +252,9 @@ class RecordingManager:
             
             return len(sessions_to_remove)
 
-# Initialiser le gestionnaire d'enregistrements
+# Initialiser le gestionnaire d'enregistrements (attaché à l'app via init_app)
 recording_manager = RecordingManager()
 
-# Planifier un nettoyage périodique des anciens timers
-def schedule_timer_cleanup():
-    """Fonction pour planifier le nettoyage périodique des anciens timers"""
-    recording_manager.clean_old_timers()
-    # Replanifier toutes les 6 heures
-    threading.Timer(6 * 60 * 60, schedule_timer_cleanup).start()
-
-# Démarrer le nettoyage périodique
-schedule_timer_cleanup()
-
 def auto_stop_recording(session_id, court_id, duration_minutes, user_id):
     """
     Fonction qui s'exécute en arrière-plan pour arrêter automatiquement l'enregistrement
@@ -1341,10 +343,15 @@ def auto_stop_recording(session_id, court_id, duration_minutes, user_id):
 
 def get_current_user():
     """Récupère l'utilisateur actuellement connecté"""
-    user_id = session.get('user_id')
-    if not user_id:
-        return None
-    return User.query.get(user_id)
+    return current_user()
+
+
+def can_view_video(video):
+    """Vidéo déverrouillée, ou consultée par son propriétaire"""
+    if video.is_unlocked:
+        return True
+    user = get_current_user()
+    return user is not None and video.user_id == user.id
 
 
 # ====================================================================
@@ -1353,36 +360,26 @@ def get_current_user():
 
 @videos_bp.route('/my-videos', methods=['GET'])
 def get_my_videos():
-    """Récupérer les vidéos de l'utilisateur courant"""
+    """Récupérer les vidéos de l'utilisateur courant, par pages (?limit= / ?cursor=)"""
     user = get_current_user()
     if not user:
         return jsonify({'error': 'Non authentifié'}), 401
     
     try:
-        videos = Video.query.filter_by(user_id=user.id).order_by(Video.recorded_at.desc()).all()
-        
-        # Créer une version sécurisée du to_dict()
-        videos_data = []
-        for video in videos:
-            video_dict = {
-                "id": video.id,
-                "title": video.title,
-                "description": video.description,
-                "file_url": video.file_url,
-                "thumbnail_url": video.thumbnail_url,
-                "duration": getattr(video, 'duration', None),
-                "file_size": getattr(video, 'file_size', None),
-                "is_unlocked": getattr(video, 'is_unlocked', True),
-                "credits_cost": getattr(video, 'credits_cost', 1),
-                "recorded_at": video.recorded_at.isoformat() if video.recorded_at else None,
-                "created_at": video.created_at.isoformat() if video.created_at else None,
-                "user_id": video.user_id,
-                "court_id": video.court_id
-            }
-            videos_data.append(video_dict)
+        cursor = request.args.get('cursor')
+        # Sans limite : LIBRARY_MY_VIDEOS_PAGE_SIZE vidéos, la suite via next_cursor
+        limit = video_library.page_size(request.args.get('limit', type=int), default=video_library.my_videos_limit)
+        videos_data, next_cursor = video_library.page(user.id, limit, cursor=cursor)
         
-        return jsonify({'videos': videos_data}), 200
+        return jsonify({
+            'videos': videos_data,
+            'total_count': video_library.total_count(user.id),
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
+        }), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Erreur lors de la récupération des vidéos: {e}")
         return jsonify({'error': 'Erreur lors de la récupération des vidéos'}), 500
@@ -1414,11 +411,15 @@ def start_recording():
             return jsonify({'error': 'Ce terrain est déjà en cours d\'enregistrement'}), 400
         
         # Démarrer l'enregistrement avec le service de capture
-        result = video_capture_service.start_recording(
-            court_id=court_id,
-            user_id=user.id,
-            session_name=session_name
-        )
+        try:
+            result = video_capture_service.start_recording(
+                court_id=court_id,
+                user_id=user.id,
+                session_name=session_name,
+                planned_minutes=duration_minutes
+            )
+        except StorageFullError as e:
+            return jsonify({'error': str(e), 'reason': e.reason, 'storage': e.details}), 507
         
         session_id = result['session_id']
         
@@ -1626,6 +627,8 @@ def delete_video(video_id):
         if video.user_id != user.id:
             return jsonify({'error': 'Accès non autorisé'}), 403
         
+        blob_store.release(video.file_url)
+        blob_store.release(video.thumbnail_url)
         db.session.delete(video)
         db.session.commit()
         
@@ -1690,6 +693,13 @@ def get_available_courts():
         return jsonify({'error': f'Erreur lors de la récupération des terrains: {str(e)}'}), 500
 
 
+def _viewer_camera_url(court):
+    """URL du flux à donner aux clients : le relais plutôt que la caméra elle-même"""
+    if camera_relay.enabled and court.camera_url:
+        return url_for('videos.get_camera_live', court_id=court.id)
+    return court.camera_url
+
+
 @videos_bp.route('/courts/<int:court_id>/camera-stream', methods=['GET'])
 def get_camera_stream(court_id):
     """Endpoint pour récupérer le flux de la caméra d'un terrain"""
@@ -1705,7 +715,7 @@ def get_camera_stream(court_id):
         return jsonify({
             'court_id': court.id,
             'court_name': court.name,
-            'camera_url': court.camera_url,
+            'camera_url': _viewer_camera_url(court),
             'stream_type': 'mjpeg'  # Type de flux pour la caméra par défaut
         }), 200
         
@@ -1714,6 +724,36 @@ def get_camera_stream(court_id):
         return jsonify({'error': 'Erreur lors de la récupération du flux caméra'}), 500
 
 
+@videos_bp.route('/courts/<int:court_id>/live', methods=['GET'])
+def get_camera_live(court_id):
+    """Flux MJPEG du terrain, servi par le relais (une seule connexion à la caméra)"""
+    user = get_current_user()
+    if not user:
+        return jsonify({'error': 'Non authentifié'}), 401
+    
+    court = Court.query.get(court_id)
+    if not court or not court.camera_url:
+        return jsonify({'error': 'Terrain ou caméra non trouvé'}), 404
+    if not camera_relay.enabled:
+        return jsonify({'error': 'Relais caméra désactivé'}), 404
+    
+    try:
+        subscriber = camera_relay.subscribe(court.id, court.camera_url)
+    except (CameraRelayFull, CameraRelayBusy) as e:
+        return jsonify({'error': str(e)}), 503
+    
+    response = Response(
+        camera_relay.stream(subscriber),
+        mimetype=f'multipart/x-mixed-replace; boundary={MULTIPART_BOUNDARY}'
+    )
+    # Client parti avant la première image : le générateur n'a jamais démarré,
+    # seule la fermeture de la réponse désabonne le spectateur
+    response.call_on_close(subscriber.close)
+    response.headers['Cache-Control'] = 'no-cache, no-store'
+    response.headers['X-Accel-Buffering'] = 'no'  # pas de mise en tampon par nginx
+    return response
+
+
 # ====================================================================
 # ROUTES API POUR LE PARTAGE DE VIDÉOS
 # ====================================================================
@@ -1740,6 +780,13 @@ def share_video(video_id):
         data = request.get_json()
         platform = data.get('platform')  # 'facebook', 'instagram', 'youtube'
         
+        # Une vidéo partagée passe en tête de la file d'encodage HLS
+        try:
+            transcode_scheduler.enqueue(video.id, reason='shared')
+        except Exception as e:
+            db.session.rollback()
+            logger.warning(f"⚠️ Encodage HLS non planifié pour la vidéo {video.id}: {e}")
+        
         # Générer les liens de partage
         base_url = request.host_url
         video_url = f"{base_url}videos/{video_id}/watch"
@@ -1774,14 +821,17 @@ def watch_video(video_id):
             return jsonify({'error': 'Vidéo non disponible'}), 403
         
         # Retourner les informations de la vidéo pour le lecteur
+        job = video.transcode_job
         return jsonify({
             'video': {
                 'id': video.id,
                 'title': video.title,
                 'description': video.description,
                 'file_url': video.file_url,
+                'hls_url': job.master_url if job and job.status == 'done' else None,
                 'thumbnail_url': video.thumbnail_url,
                 'duration': video.duration,
+                'media': video.media.to_dict() if video.media else None,
                 'recorded_at': video.recorded_at.isoformat() if video.recorded_at else None
             }
         }), 200
@@ -1791,6 +841,198 @@ def watch_video(video_id):
         return jsonify({'error': 'Erreur lors de la lecture de la vidéo'}), 500
 
 
+@videos_bp.route('/<int:video_id>/highlights', methods=['GET'])
+def get_video_highlights(video_id):
+    """Timeline des échanges et playlist « sans temps morts » d'une vidéo"""
+    video = Video.query.get(video_id)
+    if not video:
+        return jsonify({'error': 'Vidéo non trouvée'}), 404
+    if not can_view_video(video):
+        return jsonify({'error': 'Accès non autorisé'}), 403
+    
+    highlights = video.highlights
+    if highlights is None:
+        return jsonify({'error': 'Vidéo non analysée', 'status': 'missing'}), 404
+    
+    response = {'highlights': highlights.to_dict(include_energy=request.args.get('energy') == '1')}
+    if highlights.status == 'ready':
+        response['playlist'] = highlight_detector.playlist(video, highlights)
+    return jsonify(response), 200
+
+
+@videos_bp.route('/<int:video_id>/highlights', methods=['POST'])
+def analyze_video_highlights(video_id):
+    """Relancer l'analyse des échanges d'une vidéo"""
+    user = get_current_user()
+    if not user:
+        return jsonify({'error': 'Non authentifié'}), 401
+    
+    video = Video.query.get(video_id)
+    if not video:
+        return jsonify({'error': 'Vidéo non trouvée'}), 404
+    if video.user_id != user.id and user.role != UserRole.SUPER_ADMIN:
+        return jsonify({'error': 'Accès non autorisé'}), 403
+    
+    try:
+        highlights = highlight_detector.submit(video.id)
+        if highlights is None:
+            return jsonify({'error': 'Analyse indisponible pour cette vidéo'}), 409
+        return jsonify({'message': 'Analyse planifiée', 'highlights': highlights.to_dict()}), 202
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"❌ Erreur lors de la planification de l'analyse: {e}")
+        return jsonify({'error': "Erreur lors de la planification de l'analyse"}), 500
+
+
+@videos_bp.route('/<int:video_id>/highlights/export', methods=['POST'])
+def export_video_highlights(video_id):
+    """Générer la vidéo résumé (échanges uniquement)"""
+    user = get_current_user()
+    if not user:
+        return jsonify({'error': 'Non authentifié'}), 401
+    
+    video = Video.query.get(video_id)
+    if not video:
+        return jsonify({'error': 'Vidéo non trouvée'}), 404
+    if video.user_id != user.id and user.role != UserRole.SUPER_ADMIN:
+        return jsonify({'error': 'Accès non autorisé'}), 403
+    
+    try:
+        highlights = highlight_detector.export(video.id)
+        if highlights is None:
+            return jsonify({'error': 'Aucun échange détecté ou analyse non terminée'}), 409
+        return jsonify({'message': 'Export planifié', 'highlights': highlights.to_dict()}), 202
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"❌ Erreur lors de l'export du résumé: {e}")
+        return jsonify({'error': "Erreur lors de l'export du résumé"}), 500
+
+
+@videos_bp.route('/<int:video_id>/renditions', methods=['GET'])
+def get_video_renditions(video_id):
+    """État de l'encodage HLS (échelle de qualités) d'une vidéo"""
+    video = Video.query.get(video_id)
+    if not video:
+        return jsonify({'error': 'Vidéo non trouvée'}), 404
+    if not can_view_video(video):
+        return jsonify({'error': 'Accès non autorisé'}), 403
+    
+    job = video.transcode_job
+    if job is None:
+        return jsonify({'status': 'missing', 'renditions': [], 'master_url': None}), 200
+    return jsonify(job.to_dict()), 200
+
+
+@videos_bp.route('/<int:video_id>/metadata', methods=['GET'])
+def get_video_metadata(video_id):
+    """Métadonnées mesurées d'une vidéo (keyframes=1 pour les positions des images clés)"""
+    video = Video.query.get(video_id)
+    if not video:
+        return jsonify({'error': 'Vidéo non trouvée'}), 404
+    if not can_view_video(video):
+        return jsonify({'error': 'Accès non autorisé'}), 403
+    
+    # Mesure faite une seule fois : ensuite lue en base tant que le fichier ne change pas
+    record = media_probe.probe_video(video) or video.media
+    if record is None:
+        return jsonify({'error': 'Vidéo non sondée et fichier indisponible sur ce serveur',
+                        'status': 'missing'}), 404
+    
+    metadata = record.to_dict()
+    if request.args.get('keyframes') == '1':
+        metadata['keyframes'] = media_probe.keyframes(record)
+    return jsonify({'video_id': video.id, 'metadata': metadata}), 200
+
+
+@videos_bp.route('/<int:video_id>/hls/<path:filename>', methods=['GET'])
+def get_video_hls(video_id, filename):
+    """Playlists et segments HLS d'une vidéo encodée"""
+    video = Video.query.get(video_id)
+    if not video:
+        return jsonify({'error': 'Vidéo non trouvée'}), 404
+    if not can_view_video(video):
+        return jsonify({'error': 'Accès non autorisé'}), 403
+    
+    mimetype = 'application/vnd.apple.mpegurl' if filename.endswith('.m3u8') else 'video/mp2t'
+    response = send_from_directory(transcode_scheduler.hls_directory(video_id).absolute(), filename,
+                                   mimetype=mimetype, conditional=True)
+    # Segments figés une fois publiés ; playlists revalidées après un réencodage
+    max_age = 86400 if filename.endswith('.ts') else 60
+    response.headers['Cache-Control'] = f"{'public' if video.is_unlocked else 'private'}, max-age={max_age}"
+    return response
+
+
+@videos_bp.route('/<int:video_id>/clips', methods=['POST'])
+def create_video_clip(video_id):
+    """Extrait d'une vidéo entre start et end (secondes), aligné sur les images clés"""
+    video = Video.query.get(video_id)
+    if not video:
+        return jsonify({'error': 'Vidéo non trouvée'}), 404
+    if not can_view_video(video):
+        return jsonify({'error': 'Accès non autorisé'}), 403
+    
+    data = request.get_json(silent=True) or {}
+    try:
+        start, end = float(data['start']), float(data['end'])
+    except (KeyError, TypeError, ValueError):
+        return jsonify({'error': 'Paramètres start et end (secondes) requis'}), 400
+    
+    path = video_capture_service.local_video_path(video.file_url)
+    if path is None:
+        return jsonify({'error': 'Fichier vidéo indisponible sur ce serveur'}), 409
+    storage_manager.touch(path)
+    
+    try:
+        clip = clip_extractor.request_clip(video.id, path, start, end)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"❌ Erreur lors de la création de l'extrait: {e}")
+        return jsonify({'error': "Erreur lors de la création de l'extrait"}), 500
+    
+    clip['url'] = url_for('videos.get_video_clip_file', clip_id=clip['clip_id'])
+    return jsonify({'clip': clip}), 200 if clip['status'] == 'ready' else 202
+
+
+@videos_bp.route('/clips/<clip_id>', methods=['GET'])
+def get_video_clip(clip_id):
+    """État d'un extrait (prêt, en cours ou en erreur)"""
+    video_id = clip_extractor.parse_clip_id(clip_id)
+    video = Video.query.get(video_id) if video_id is not None else None
+    if not video:
+        return jsonify({'error': 'Extrait non trouvé'}), 404
+    if not can_view_video(video):
+        return jsonify({'error': 'Accès non autorisé'}), 403
+    
+    clip = clip_extractor.status(clip_id)
+    if clip is None:
+        return jsonify({'error': 'Extrait non trouvé'}), 404
+    clip['url'] = url_for('videos.get_video_clip_file', clip_id=clip_id)
+    return jsonify({'clip': clip}), 200
+
+
+@videos_bp.route('/clips/<clip_id>/file', methods=['GET'])
+def get_video_clip_file(clip_id):
+    """Fichier MP4 d'un extrait (requêtes Range acceptées)"""
+    video_id = clip_extractor.parse_clip_id(clip_id)
+    video = Video.query.get(video_id) if video_id is not None else None
+    if not video:
+        return jsonify({'error': 'Extrait non trouvé'}), 404
+    if not can_view_video(video):
+        return jsonify({'error': 'Accès non autorisé'}), 403
+    
+    path = clip_extractor.clip_path(clip_id)
+    if not path.exists():
+        return jsonify({'error': 'Extrait non disponible'}), 404
+    
+    download_name = f"{video.title}-{clip_id}.mp4"
+    response = send_file(path.absolute(), mimetype='video/mp4', conditional=True,
+                         as_attachment=request.args.get('download') == '1', download_name=download_name)
+    # Un identifiant d'extrait désigne toujours les mêmes octets
+    response.headers['Cache-Control'] = f"{'public' if video.is_unlocked else 'private'}, max-age=86400"
+    return response
+
+
 # ====================================================================
 # ROUTES API POUR LA GESTION DES CRÉDITS
 # ====================================================================
@@ -1863,7 +1105,7 @@ def scan_qr_code():
             'message': 'QR code scanné avec succès',
             'court': court.to_dict(),
             'club': club.to_dict() if club else None,
-            'camera_url': court.camera_url,
+            'camera_url': _viewer_camera_url(court),
             'can_record': True  # L'utilisateur peut démarrer un enregistrement
         }), 200
         
@@ -2090,8 +1332,18 @@ def download_video(video_id):
         if video.user_id != user.id and not video.is_unlocked:
             return jsonify({'error': 'Accès non autorisé'}), 403
         
-        # Pour le MVP, rediriger vers le stream
-        filename = video.file_url.split('/')[-1]
+        # Vidéo migrée : le CDN sert le fichier, pas le serveur de capture
+        # (y compris le CDN local, /cdn/..., une fois la copie d'origine supprimée)
+        path = video_capture_service.local_video_path(video.file_url)
+        if video.cdn_migrated_at and video.file_url and ('://' in video.file_url or path is None):
+            return redirect(video.file_url, code=302)
+        
+        if path is not None:
+            storage_manager.touch(path)
+            return send_file(path.absolute(), mimetype='video/mp4', as_attachment=True,
+                             download_name=f"{video.title}.mp4", conditional=True)
+        
+        # Pour le MVP, données de test si le fichier n'est pas sur ce serveur
         return Response(
             b'fake video data for download',
             mimetype='video/mp4',
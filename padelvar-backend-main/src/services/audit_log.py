@@ -0,0 +1,276 @@
+"""
+Journal d'actions (club_action_history) en écriture différée
+Les requêtes n'insèrent plus elles-mêmes leur ligne d'historique : elle est
+mise en file après le commit de la requête, puis insérée par lots (un INSERT
+groupé pour des centaines de lignes) par un thread d'écriture.
+
+Garantie choisie par type d'action (AUDIT_DURABILITY) :
+- 'transactional' : ligne ajoutée à la transaction de la requête, validée ou
+  annulée avec elle (crédits, déblocages)
+  Toute action qui modifie un solde de crédits (CREDIT_ACTIONS) doit l'être :
+  init_app refuse une configuration qui la met en file, et record() repasse
+  en transactionnel (avec une erreur au journal) une action non déclarée dont
+  les détails portent un mouvement de crédits.
+- 'write_behind'  : ligne mise en file au commit, abandonnée au rollback ;
+  file pleine => insérée tout de suite, rien n'est perdu hors arrêt brutal
+- 'best_effort'   : comme write_behind, mais ignorée si la file est pleine
+
+L'historique lu par les écrans peut donc retarder d'au plus AUDIT_FLUSH_INTERVAL
+secondes. Le thread d'écriture démarre à la première ligne, pas au démarrage.
+"""
+
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Session
+
+from ..models.database import db
+from ..models.user import ClubActionHistory
+from .response_cache import response_cache
+
+logger = logging.getLogger(__name__)
+
+DURABILITY_LEVELS = ('transactional', 'write_behind', 'best_effort')
+
+# Actions qui modifient un solde de crédits : toujours dans la transaction
+CREDIT_ACTIONS = ('add_credits', 'buy_credits', 'bulk_update_credits', 'unlock_video', 'start_recording')
+
+# Clés de détails qui signalent un mouvement de crédits
+CREDIT_DETAIL_KEYS = ('credits_used', 'credits_added', 'credits_refunded', 'new_balance')
+
+# Lignes d'une session en attente de son commit
+PENDING_KEY = 'audit_log_pending'
+
+
+def details_json(details) -> Optional[str]:
+    """Détails d'action en JSON (dict sérialisé, JSON valide conservé, texte enveloppé)"""
+    if details is None:
+        return None
+    if isinstance(details, dict):
+        return json.dumps(details)
+    if isinstance(details, str):
+        try:
+            json.loads(details)
+            return details
+        except json.JSONDecodeError:
+            pass
+    return json.dumps({"raw_details": str(details)})
+
+
+class AuditLog:
+    """File bornée et écriture par lots de l'historique (pattern extension Flask)"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.write_behind = True
+        self.batch_size = 500
+        self.flush_interval = 1.0
+        self.durability: Dict[str, str] = {}
+        self.default_durability = 'write_behind'
+        self.queue: queue.Queue = queue.Queue(maxsize=10000)
+        self.lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._exit_hook = False
+        self.transactional = 0
+        self.undeclared_credit_actions: Dict[str, int] = {}
+        self.queued = 0
+        self.written = 0
+        self.batches = 0
+        self.inline = 0
+        self.dropped = 0
+        self.failed = 0
+        self.write_ms = 0.0
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Lit la configuration ; aucun thread n'est démarré ici"""
+        self.app = app
+        self.write_behind = app.config.get('AUDIT_WRITE_BEHIND', True)
+        self.batch_size = app.config.get('AUDIT_BATCH_SIZE', 500)
+        self.flush_interval = app.config.get('AUDIT_FLUSH_INTERVAL', 1.0)
+        self.queue = queue.Queue(maxsize=app.config.get('AUDIT_QUEUE_SIZE', 10000))
+        self.durability = dict(app.config.get('AUDIT_DURABILITY') or {})
+        self.default_durability = app.config.get('AUDIT_DEFAULT_DURABILITY', 'write_behind')
+        for action_type, level in list(self.durability.items()) + [('*', self.default_durability)]:
+            if level not in DURABILITY_LEVELS:
+                raise ValueError(f"Durabilité inconnue pour {action_type}: {level}")
+        missing = [action_type for action_type in CREDIT_ACTIONS
+                   if self.durability.get(action_type, self.default_durability) != 'transactional']
+        if missing:
+            raise ValueError(f"Actions de crédits hors transaction dans AUDIT_DURABILITY: {', '.join(missing)}")
+        app.extensions['audit_log'] = self
+
+    def durability_of(self, action_type: str) -> str:
+        if not self.write_behind:
+            return 'transactional'
+        return self.durability.get(action_type, self.default_durability)
+
+    def record(self, user_id: int, club_id: Optional[int], action_type: str, details=None,
+               performed_by_id: Optional[int] = None):
+        """Journalise une action selon la garantie de son type (aucune requête SQL hors 'transactional')"""
+        row = {
+            'user_id': user_id,
+            'club_id': club_id,
+            'performed_by_id': performed_by_id if performed_by_id is not None else user_id,
+            'action_type': action_type,
+            'action_details': details_json(details),
+            'performed_at': datetime.utcnow()
+        }
+        level = self.durability_of(action_type)
+        if level != 'transactional' and isinstance(details, dict) and any(key in details for key in CREDIT_DETAIL_KEYS):
+            # Mouvement de crédits d'une action absente de CREDIT_ACTIONS : jamais en file
+            self.undeclared_credit_actions[action_type] = self.undeclared_credit_actions.get(action_type, 0) + 1
+            logger.error(f"Historique : action de crédits '{action_type}' absente de CREDIT_ACTIONS, écrite dans la transaction")
+            level = 'transactional'
+        if level == 'transactional':
+            db.session.add(ClubActionHistory(**row))
+            self.transactional += 1
+        else:
+            db.session.info.setdefault(PENDING_KEY, []).append((level, row))
+
+    # ------------------------------------------------------------------
+    # File et écriture par lots
+    # ------------------------------------------------------------------
+
+    def enqueue(self, entries: List):
+        """Lignes d'une transaction validée : en file, ou insérées tout de suite si la file est pleine"""
+        overflow = []
+        for level, row in entries:
+            try:
+                self.queue.put_nowait(row)
+                self.queued += 1
+            except queue.Full:
+                if level == 'best_effort':
+                    self.dropped += 1
+                else:
+                    overflow.append(row)
+        if overflow:
+            self.inline += len(overflow)
+            self._write(overflow)
+        self.start()
+
+    def start(self):
+        """Démarre le thread d'écriture (idempotent)"""
+        if self.app is None:
+            return
+        with self.lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='audit-log-writer', daemon=True)
+            self._thread.start()
+            if not self._exit_hook:
+                # Arrêt propre du serveur : la file est vidée avant la sortie
+                atexit.register(self.flush)
+                self._exit_hook = True
+
+    def _take(self, block: bool) -> List[Dict[str, Any]]:
+        """Jusqu'à batch_size lignes ; si block, le lot reste ouvert flush_interval après sa première ligne"""
+        rows = []
+        try:
+            rows.append(self.queue.get(timeout=1.0) if block else self.queue.get_nowait())
+            deadline = time.monotonic() + self.flush_interval
+            while len(rows) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if not block or remaining <= 0:
+                    rows.append(self.queue.get_nowait())
+                else:
+                    rows.append(self.queue.get(timeout=remaining))
+        except queue.Empty:
+            pass
+        return rows
+
+    def _write(self, rows: List[Dict[str, Any]]) -> bool:
+        """Un INSERT groupé dans sa propre transaction ; une nouvelle tentative en cas d'échec"""
+        for attempt in (1, 2):
+            started = time.perf_counter()
+            try:
+                with self.app.app_context():
+                    with db.engine.begin() as connection:
+                        connection.execute(insert(ClubActionHistory.__table__), rows)
+            except Exception as e:
+                if attempt == 2:
+                    self.failed += len(rows)
+                    logger.error(f"Historique : {len(rows)} ligne(s) non écrite(s): {e}")
+                    return False
+                time.sleep(min(self.flush_interval, 0.5))
+                continue
+            # INSERT hors session ORM : réponses en cache invalidées explicitement
+            response_cache.invalidate_rows(ClubActionHistory.__tablename__, rows)
+            self.written += len(rows)
+            self.batches += 1
+            self.write_ms += (time.perf_counter() - started) * 1000
+            return True
+
+    def _run(self):
+        logger.info(f"Écriture différée de l'historique démarrée (lots de {self.batch_size})")
+        while not self._stop.is_set():
+            rows = self._take(block=True)
+            if not rows:
+                continue
+            try:
+                self._write(rows)
+            finally:
+                for _ in rows:
+                    self.queue.task_done()
+
+    def flush(self):
+        """Écrit tout ce qui est en file et attend le lot en cours du thread d'écriture"""
+        if self.app is None:
+            return
+        while True:
+            rows = self._take(block=False)
+            if not rows:
+                break
+            try:
+                self._write(rows)
+            finally:
+                for _ in rows:
+                    self.queue.task_done()
+        self.queue.join()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'write_behind': self.write_behind,
+            'pending': self.queue.qsize(),
+            'capacity': self.queue.maxsize,
+            'transactional': self.transactional,
+            'undeclared_credit_actions': dict(self.undeclared_credit_actions),
+            'queued': self.queued,
+            'written': self.written,
+            'batches': self.batches,
+            'avg_batch_rows': round(self.written / self.batches, 1) if self.batches else None,
+            'avg_batch_ms': round(self.write_ms / self.batches, 2) if self.batches else None,
+            'inline': self.inline,
+            'dropped': self.dropped,
+            'failed': self.failed
+        }
+
+
+# Instance globale du service (configurée par init_app dans create_app)
+audit_log = AuditLog()
+
+
+@event.listens_for(Session, 'after_commit')
+def _enqueue_committed_actions(session):
+    """Transaction validée : ses actions différées partent dans la file"""
+    pending = session.info.pop(PENDING_KEY, None)
+    if pending:
+        audit_log.enqueue(pending)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_rolled_back_actions(session, previous_transaction):
+    """Transaction annulée (hors point de sauvegarde) : ses actions différées n'ont pas eu lieu"""
+    if not previous_transaction.nested:
+        session.info.pop(PENDING_KEY, None)
@@ -0,0 +1,332 @@
+"""
+Stockage adressé par contenu des vidéos et miniatures
+Chaque fichier est rangé sous son empreinte SHA-256 : deux enregistrements
+identiques (ou cent lignes de test vers le même fichier) n'occupent qu'une
+fois le disque.
+
+- arborescence répartie : BLOB_STORE_PATH/ab/cd/<sha256>.<ext>, URL /blobs/<sha256>.<ext>
+- écriture atomique : renommage depuis le fichier de capture (même disque), ou
+  copie dans .tmp puis renommage ; un fichier publié est toujours complet
+- compteur de références par fichier (table blob), tenu à l'ajout et à la
+  suppression des vidéos
+- ramasse-miettes par marquage et balayage : les références sont lues en base
+  (une requête sur video), les compteurs corrigés, puis les fichiers sans
+  référence depuis BLOB_GC_GRACE_HOURS sont supprimés ; aucun parcours de dossier
+
+Le niveau froid (storage_manager) garde les fichiers sous le même nom.
+"""
+
+import os
+import re
+import uuid
+import errno
+import shutil
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from sqlalchemy import bindparam, delete, func, or_, update
+from sqlalchemy.exc import IntegrityError
+
+from ..models.database import db
+from ..models.user import Blob, StoredFile, Video
+from .storage_backends import file_sha256
+
+logger = logging.getLogger(__name__)
+
+BLOB_URL_PREFIX = '/blobs/'
+BLOB_NAME_PATTERN = re.compile(r'^([0-9a-f]{64})(\.[a-z0-9]{1,8})?$')
+
+
+def blob_name(url: Optional[str]) -> Optional[str]:
+    """Nom du fichier adressé par une URL /blobs/... (None pour toute autre URL)"""
+    if not url or not url.startswith(BLOB_URL_PREFIX):
+        return None
+    name = url[len(BLOB_URL_PREFIX):]
+    return name if BLOB_NAME_PATTERN.match(name) else None
+
+
+class BlobStore:
+    """Fichiers adressés par contenu, références et ramasse-miettes (pattern extension Flask)"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.root = Path('static/videos/blobs')
+        self.gc_grace = timedelta(hours=24)
+        self.stored = 0
+        self.deduplicated = 0
+        self.saved_bytes = 0
+        self.collected = 0
+        self.collected_bytes = 0
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Lit la configuration ; les dossiers sont créés à la première écriture"""
+        self.app = app
+        self.root = Path(app.config.get('BLOB_STORE_PATH', self.root))
+        self.gc_grace = timedelta(hours=app.config.get('BLOB_GC_GRACE_HOURS', 24))
+        app.extensions['blob_store'] = self
+
+    # ------------------------------------------------------------------
+    # Emplacements
+    # ------------------------------------------------------------------
+
+    def shard_path(self, name: str) -> Path:
+        return self.root / name[:2] / name[2:4] / name
+
+    @staticmethod
+    def owns(path) -> Optional[str]:
+        """Nom du fichier si path est un fichier adressé par contenu (niveau chaud ou froid)"""
+        name = Path(path).name
+        return name if BLOB_NAME_PATTERN.match(name) else None
+
+    def locate(self, name: str) -> Optional[Path]:
+        """Copie locale d'un fichier : niveau chaud, puis niveau froid (None si absente)"""
+        if not BLOB_NAME_PATTERN.match(name):
+            return None
+        path = self.shard_path(name)
+        if path.exists():
+            return path
+        from .storage_manager import storage_manager
+        cold = storage_manager.cold_videos_path
+        if cold is not None and (cold / name).exists():
+            return cold / name
+        return None
+
+    def stored_paths(self) -> List[Path]:
+        """Fichiers présents au niveau chaud, d'après la table blob"""
+        paths = []
+        for sha256, extension in db.session.query(Blob.sha256, Blob.extension).yield_per(1000):
+            path = self.shard_path(f"{sha256}{extension or ''}")
+            if path.exists():
+                paths.append(path)
+        return paths
+
+    # ------------------------------------------------------------------
+    # Ajout et références
+    # ------------------------------------------------------------------
+
+    def _write(self, source: Path, target: Path, move: bool):
+        """Publie source sous target sans jamais exposer un fichier partiel"""
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if move:
+            try:
+                os.replace(source, target)
+                return
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+        temporary = self.root / '.tmp' / f"{target.name}.{uuid.uuid4().hex}"
+        temporary.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            shutil.copyfile(source, temporary)
+            os.replace(temporary, target)
+        finally:
+            temporary.unlink(missing_ok=True)
+        if move:
+            source.unlink(missing_ok=True)
+
+    def _acquire(self, blob_id: int):
+        db.session.execute(
+            update(Blob).where(Blob.id == blob_id)
+            .values(ref_count=func.coalesce(Blob.ref_count, 0) + 1, released_at=None)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+
+    def put_file(self, path, kind: str = 'video', move: bool = True) -> Tuple[Blob, bool]:
+        """
+        Range un fichier sous son empreinte et compte une référence. Retourne
+        (blob, créé) ; créé est faux si le contenu était déjà stocké (la source
+        est alors simplement supprimée quand move est vrai).
+        """
+        path = Path(path)
+        size = path.stat().st_size
+        sha256 = file_sha256(str(path))
+        blob = db.session.query(Blob).filter_by(sha256=sha256).first()
+
+        existing = self.locate(blob.name) if blob is not None else None
+        if existing is not None:
+            self._acquire(blob.id)
+            db.session.refresh(blob)
+            if move and existing.absolute() != path.absolute():
+                path.unlink(missing_ok=True)
+            self.deduplicated += 1
+            self.saved_bytes += size
+            return blob, False
+
+        extension = blob.extension if blob is not None else path.suffix.lower()[:10]
+        self._write(path, self.shard_path(f"{sha256}{extension}"), move)
+        if blob is None:
+            blob = Blob(sha256=sha256, extension=extension, kind=kind, size=size, ref_count=1)
+            db.session.add(blob)
+            try:
+                db.session.commit()
+            except IntegrityError:
+                # Même contenu rangé au même instant par une autre requête : même fichier, même nom
+                db.session.rollback()
+                blob = db.session.query(Blob).filter_by(sha256=sha256).one()
+                self._acquire(blob.id)
+                db.session.refresh(blob)
+                return blob, False
+        else:
+            blob.ref_count = (blob.ref_count or 0) + 1
+            blob.released_at = None
+            db.session.commit()
+        self.stored += 1
+        return blob, True
+
+    def release(self, url: Optional[str]) -> bool:
+        """Retire une référence (dans la transaction de l'appelant) ; le fichier part au ramassage"""
+        name = blob_name(url)
+        if name is None:
+            return False
+        sha256 = name[:64]
+        db.session.execute(
+            update(Blob).where(Blob.sha256 == sha256, Blob.ref_count > 0)
+            .values(ref_count=Blob.ref_count - 1).execution_options(synchronize_session=False)
+        )
+        db.session.execute(
+            update(Blob).where(Blob.sha256 == sha256, Blob.ref_count == 0, Blob.released_at.is_(None))
+            .values(released_at=datetime.utcnow()).execution_options(synchronize_session=False)
+        )
+        return True
+
+    def forget(self, name: str):
+        """Oublie un fichier supprimé par l'éviction (dans la transaction de l'appelant)"""
+        db.session.execute(delete(Blob).where(Blob.sha256 == name[:64]))
+
+    def references(self, names: List[str]) -> Dict[str, List[Tuple[int, str]]]:
+        """(id vidéo, colonne) qui référencent chacun des fichiers"""
+        refs: Dict[str, List[Tuple[int, str]]] = {name: [] for name in names}
+        if not names:
+            return refs
+        urls = [BLOB_URL_PREFIX + name for name in names]
+        rows = db.session.query(Video.id, Video.file_url, Video.thumbnail_url) \
+            .filter(or_(Video.file_url.in_(urls), Video.thumbnail_url.in_(urls))).all()
+        for row in rows:
+            for column in ('file_url', 'thumbnail_url'):
+                name = blob_name(getattr(row, column))
+                if name in refs:
+                    refs[name].append((row.id, column))
+        return refs
+
+    def adopt(self, video: Video) -> int:
+        """Range les fichiers locaux d'une vidéo existante (URL /videos/ ou /thumbnails/) ; retourne le nombre rangé"""
+        from .video_capture_service import video_capture_service
+
+        adopted = 0
+        for column, kind, directory in (('file_url', 'video', video_capture_service.base_path),
+                                        ('thumbnail_url', 'thumbnail', video_capture_service.thumbnails_path)):
+            url = getattr(video, column)
+            if not url or '://' in url or blob_name(url):
+                continue
+            source = directory / Path(url).name
+            if not source.is_file():
+                continue
+            blob, created = self.put_file(source, kind)
+            setattr(video, column, blob.url)
+            # L'index du stockage suit le fichier ; un doublon n'y compte plus
+            entry = db.session.query(StoredFile).filter_by(path=str(source)).first()
+            if entry is not None:
+                if created:
+                    entry.path = str(self.shard_path(blob.name))
+                else:
+                    db.session.delete(entry)
+            adopted += 1
+        db.session.commit()
+        return adopted
+
+    # ------------------------------------------------------------------
+    # Ramasse-miettes
+    # ------------------------------------------------------------------
+
+    def mark(self) -> Counter:
+        """Références réelles par empreinte, lues dans la table video"""
+        counts: Counter = Counter()
+        rows = db.session.query(Video.file_url, Video.thumbnail_url).filter(
+            or_(Video.file_url.like(f'{BLOB_URL_PREFIX}%'), Video.thumbnail_url.like(f'{BLOB_URL_PREFIX}%'))
+        ).yield_per(1000)
+        for file_url, thumbnail_url in rows:
+            for url in (file_url, thumbnail_url):
+                name = blob_name(url)
+                if name:
+                    counts[name[:64]] += 1
+        return counts
+
+    def collect(self, grace: Optional[timedelta] = None) -> Dict[str, Any]:
+        """Marquage (compteurs corrigés), puis suppression des fichiers sans référence depuis grace"""
+        now = datetime.utcnow()
+        counts = self.mark()
+
+        repairs = []
+        for blob_id, sha256, ref_count, released_at in \
+                db.session.query(Blob.id, Blob.sha256, Blob.ref_count, Blob.released_at).yield_per(1000):
+            actual = counts.get(sha256, 0)
+            if actual != (ref_count or 0):
+                repairs.append({'blob_id': blob_id, 'actual': actual,
+                                'released': None if actual else (released_at or now)})
+        if repairs:
+            table = Blob.__table__
+            db.session.execute(
+                table.update().where(table.c.id == bindparam('blob_id'))
+                .values(ref_count=bindparam('actual'), released_at=bindparam('released')),
+                repairs
+            )
+            db.session.commit()
+
+        cutoff = now - (self.gc_grace if grace is None else grace)
+        collected = collected_bytes = 0
+        candidates = db.session.query(Blob).filter(Blob.ref_count == 0, Blob.released_at <= cutoff).all()
+        for blob in candidates:
+            name, size = blob.name, blob.size or 0
+            # Suppression conditionnelle : un ajout du même contenu depuis le marquage garde le fichier
+            result = db.session.execute(
+                delete(Blob).where(Blob.id == blob.id, Blob.ref_count == 0, Blob.released_at <= cutoff)
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount != 1:
+                continue
+            path = self.locate(name)
+            if path is not None:
+                try:
+                    path.unlink()
+                except OSError as e:
+                    logger.warning(f"Fichier {name} non supprimé: {e}")
+                db.session.execute(delete(StoredFile).where(StoredFile.path == str(path)))
+            collected += 1
+            collected_bytes += size
+        db.session.commit()
+
+        self.collected += collected
+        self.collected_bytes += collected_bytes
+        if collected:
+            logger.info(f"Ramasse-miettes : {collected} fichier(s), {collected_bytes} octets libérés")
+        return {'referenced': len(counts), 'repaired': len(repairs),
+                'collected': collected, 'collected_bytes': collected_bytes}
+
+    def stats(self) -> Dict[str, Any]:
+        blobs, size, references = db.session.query(
+            func.count(Blob.id), func.coalesce(func.sum(Blob.size), 0), func.coalesce(func.sum(Blob.ref_count), 0)
+        ).one()
+        shared_bytes = db.session.query(func.coalesce(func.sum(Blob.size * (Blob.ref_count - 1)), 0)) \
+            .filter(Blob.ref_count > 1).scalar()
+        return {
+            'root': str(self.root),
+            'blobs': blobs,
+            'bytes': int(size),
+            'references': int(references),
+            'deduplicated_bytes': int(shared_bytes),
+            'stored': self.stored,
+            'deduplicated': self.deduplicated,
+            'collected': self.collected,
+            'collected_bytes': self.collected_bytes
+        }
+
+
+# Instance globale du service (configurée par init_app dans create_app)
+blob_store = BlobStore()
@@ -0,0 +1,173 @@
+"""
+Backends du cache de réponses (voir src/services/response_cache.py)
+Interface commune :
+- get(key) / set(key, value, ttl) : entrées avec durée de vie
+- versions(tags) / bump(tags) : numéro de version par étiquette ; une entrée
+  n'est valide que si les versions de ses étiquettes n'ont pas bougé
+
+Implémentations :
+- MemoryBackend : LRU borné du processus (cache de premier niveau)
+- SharedMemoryBackend : remplaçant local d'un cache partagé, commun à toutes
+  les applications du processus (tests, poste de développement)
+- RedisBackend : cache partagé entre processus et serveurs
+
+Seul un backend cross_process propage les invalidations d'un processus aux
+autres : avec plusieurs workers, le cache exige Redis (voir response_cache.py).
+
+redis n'est importé qu'à la création du backend Redis.
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+
+
+class CacheBackend:
+    """Interface des backends de cache"""
+
+    name = 'base'
+    cross_process = False
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: float):
+        raise NotImplementedError
+
+    def versions(self, tags: Iterable[str]) -> List[int]:
+        raise NotImplementedError
+
+    def bump(self, tags: Iterable[str]):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class MemoryBackend(CacheBackend):
+    """LRU en mémoire : au-delà de max_entries, les entrées les moins lues sont évincées"""
+
+    name = 'memory'
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: float):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def versions(self, tags: Iterable[str]) -> List[int]:
+        with self._lock:
+            return [self._versions.get(tag, 0) for tag in tags]
+
+    def bump(self, tags: Iterable[str]):
+        with self._lock:
+            for tag in tags:
+                self._versions[tag] = self._versions.get(tag, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SharedMemoryBackend(MemoryBackend):
+    """Remplaçant local d'un cache partagé : un seul stockage pour tout le processus"""
+
+    name = 'shared-local'
+
+    _store: Optional[MemoryBackend] = None
+    _store_lock = threading.Lock()
+
+    def __init__(self, max_entries: int = 10000):
+        with SharedMemoryBackend._store_lock:
+            if SharedMemoryBackend._store is None:
+                SharedMemoryBackend._store = MemoryBackend(max_entries)
+        store = SharedMemoryBackend._store
+        self.max_entries = store.max_entries
+        self._entries = store._entries
+        self._versions = store._versions
+        self._lock = store._lock
+        self.evictions = 0
+
+
+class RedisBackend(CacheBackend):
+    """Cache partagé Redis : entrées avec expiration, versions par INCR"""
+
+    name = 'redis'
+    cross_process = True
+
+    def __init__(self, url: str, prefix: str = 'padelvar:cache:'):
+        import redis  # dépendance optionnelle, seulement pour ce backend
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(self.prefix + 'entry:' + key)
+
+    def set(self, key: str, value: bytes, ttl: float):
+        self.client.set(self.prefix + 'entry:' + key, value, px=max(1, int(ttl * 1000)))
+
+    def versions(self, tags: Iterable[str]) -> List[int]:
+        tags = list(tags)
+        if not tags:
+            return []
+        values = self.client.mget([self.prefix + 'tag:' + tag for tag in tags])
+        return [int(value) if value is not None else 0 for value in values]
+
+    def bump(self, tags: Iterable[str]):
+        pipeline = self.client.pipeline(transaction=False)
+        for tag in tags:
+            pipeline.incr(self.prefix + 'tag:' + tag)
+        pipeline.execute()
+
+    def clear(self):
+        for key in self.client.scan_iter(self.prefix + 'entry:*'):
+            self.client.delete(key)
+
+
+def backend_kind(config) -> str:
+    """RESPONSE_CACHE_BACKEND résolu : 'auto' => Redis si RESPONSE_CACHE_REDIS_URL est défini, sinon mémoire"""
+    kind = config.get('RESPONSE_CACHE_BACKEND', 'auto')
+    if kind == 'auto':
+        return 'redis' if config.get('RESPONSE_CACHE_REDIS_URL') else 'memory'
+    return kind
+
+
+def create_backend(config) -> Optional[CacheBackend]:
+    """Cache partagé choisi par RESPONSE_CACHE_BACKEND ('auto', 'memory' : aucun, 'shared-local' ou 'redis')"""
+    kind = backend_kind(config)
+    if kind == 'memory':
+        return None
+    if kind == 'shared-local':
+        return SharedMemoryBackend(config.get('RESPONSE_CACHE_SHARED_MAX_ENTRIES', 10000))
+    if kind == 'redis':
+        if not config.get('RESPONSE_CACHE_REDIS_URL'):
+            raise ValueError("RESPONSE_CACHE_BACKEND=redis exige RESPONSE_CACHE_REDIS_URL")
+        return RedisBackend(config['RESPONSE_CACHE_REDIS_URL'],
+                            config.get('RESPONSE_CACHE_PREFIX', 'padelvar:cache:'))
+    raise ValueError(f"Backend de cache inconnu: {kind}")
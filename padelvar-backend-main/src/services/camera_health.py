@@ -0,0 +1,313 @@
+"""
+Surveillance de l'état des caméras des terrains
+Un thread de fond sonde toutes les caméras (Court.camera_url) en parallèle sur
+un pool borné, avec délai maximal par sonde, et met en cache par terrain :
+joignabilité, latence, résolution et images/s mesurées.
+
+Les routes lisent uniquement ce cache (get_status) : démarrer un
+enregistrement ou lister les terrains ne bloque jamais sur le réseau.
+Une caméra déjà relayée (camera_relay) est évaluée à partir du relais, sans
+ouvrir de connexion supplémentaire.
+
+Le thread de fond démarre à la première consultation, pas au démarrage.
+"""
+
+import time
+import struct
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Dict, Optional, Any, Tuple
+
+from ..models.database import db
+from ..models.user import Court
+from .camera_relay import camera_relay, MJPEGParser
+
+logger = logging.getLogger(__name__)
+
+STATUS_ONLINE = 'online'
+STATUS_DEGRADED = 'degraded'
+STATUS_OFFLINE = 'offline'
+STATUS_UNKNOWN = 'unknown'
+
+# Marqueurs SOF (début de trame) portant la résolution de l'image
+_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def jpeg_dimensions(frame: bytes) -> Optional[Tuple[int, int]]:
+    """(largeur, hauteur) lues dans l'en-tête SOF d'une image JPEG"""
+    i = 2
+    while i + 9 < len(frame):
+        if frame[i] != 0xFF:
+            return None
+        marker = frame[i + 1]
+        if marker in _SOF_MARKERS:
+            height, width = struct.unpack('>HH', frame[i + 5:i + 9])
+            return width, height
+        if marker == 0xDA:  # début des données : pas de SOF trouvé
+            return None
+        (length,) = struct.unpack('>H', frame[i + 2:i + 4])
+        i += 2 + length
+    return None
+
+
+class CameraHealthMonitor:
+    """Sondes concurrentes des caméras et cache d'état (pattern extension Flask)"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.enabled = True
+        self.interval = 60.0
+        self.timeout = 3.0
+        self.sample_frames = 5
+        self.workers = 8
+        self.min_fps = 10.0
+        self.slow_ms = 1500.0
+        self.block_offline = True
+        self.statuses: Dict[int, Dict[str, Any]] = {}
+        self.lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._pending: Dict[int, Any] = {}
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Lit la configuration ; aucun thread n'est démarré ici"""
+        self.app = app
+        self.enabled = app.config.get('CAMERA_PROBE_ENABLED', True)
+        self.interval = app.config.get('CAMERA_PROBE_INTERVAL', 60.0)
+        self.timeout = app.config.get('CAMERA_PROBE_TIMEOUT', 3.0)
+        self.sample_frames = app.config.get('CAMERA_PROBE_SAMPLE_FRAMES', 5)
+        self.workers = app.config.get('CAMERA_PROBE_WORKERS', 8)
+        self.min_fps = app.config.get('CAMERA_PROBE_MIN_FPS', 10.0)
+        self.slow_ms = app.config.get('CAMERA_PROBE_SLOW_MS', 1500.0)
+        self.block_offline = app.config.get('CAMERA_PROBE_BLOCK_OFFLINE', True)
+        app.extensions['camera_health'] = self
+
+    # ------------------------------------------------------------------
+    # Sondes
+    # ------------------------------------------------------------------
+
+    def _classify(self, result: Dict[str, Any]) -> str:
+        if result.get('error') or not result.get('frames'):
+            return STATUS_OFFLINE
+        if result.get('latency_ms') and result['latency_ms'] > self.slow_ms:
+            return STATUS_DEGRADED
+        if result.get('fps') is not None and result['fps'] < self.min_fps:
+            return STATUS_DEGRADED
+        return STATUS_ONLINE
+
+    def _probe_from_relay(self, relay) -> Optional[Dict[str, Any]]:
+        """Mesure à partir du relais actif : aucune connexion supplémentaire à la caméra"""
+        if relay.last_frame_at is None or time.time() - relay.last_frame_at > self.timeout:
+            return None
+        with relay.ring.condition:
+            frames = list(relay.ring.frames)
+        if not frames:
+            return None
+        span = frames[-1][2] - frames[0][2]
+        return {
+            'source': 'relay',
+            'latency_ms': None,
+            'frames': len(frames),
+            'fps': round((len(frames) - 1) / span, 1) if span > 0 and len(frames) > 1 else None,
+            'resolution': jpeg_dimensions(frames[-1][1]),
+            'content_type': 'multipart/x-mixed-replace',
+            'error': None
+        }
+
+    def _probe_url(self, camera_url: str) -> Dict[str, Any]:
+        """Connexion directe : latence des en-têtes, puis quelques images pour l'fps"""
+        import urllib.request  # http.client / ssl : chargés à la première sonde
+
+        result = {'source': 'probe', 'latency_ms': None, 'frames': 0, 'fps': None,
+                  'resolution': None, 'content_type': None, 'error': None}
+        started = time.monotonic()
+        deadline = started + self.timeout
+        try:
+            request = urllib.request.Request(camera_url, headers={'User-Agent': 'PadelVar-Probe'})
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                result['latency_ms'] = round((time.monotonic() - started) * 1000, 1)
+                result['content_type'] = response.headers.get('Content-Type', '')
+
+                parser = MJPEGParser()
+                stamps = []
+                while len(stamps) < self.sample_frames and time.monotonic() < deadline:
+                    chunk = response.read1(64 * 1024)
+                    if not chunk:
+                        break
+                    for frame in parser.feed(chunk):
+                        stamps.append(time.monotonic())
+                        if result['resolution'] is None:
+                            result['resolution'] = jpeg_dimensions(frame)
+
+                result['frames'] = len(stamps)
+                if len(stamps) > 1 and stamps[-1] > stamps[0]:
+                    result['fps'] = round((len(stamps) - 1) / (stamps[-1] - stamps[0]), 1)
+                if not stamps:
+                    result['error'] = "Aucune image reçue"
+        except Exception as e:
+            result['error'] = str(e) or type(e).__name__
+        return result
+
+    def probe_court(self, court_id: int, camera_url: Optional[str]) -> Dict[str, Any]:
+        """Sonde un terrain et met son état en cache"""
+        if not camera_url:
+            result = {'source': 'probe', 'frames': 0, 'error': "Aucune URL de caméra"}
+        else:
+            relay = camera_relay.relays.get(court_id)
+            result = (self._probe_from_relay(relay) if relay is not None and relay.camera_url == camera_url
+                      else None) or self._probe_url(camera_url)
+
+        with self.lock:
+            previous = self.statuses.get(court_id, {})
+        status = self._classify(result)
+        failures = previous.get('consecutive_failures', 0) + 1 if status == STATUS_OFFLINE else 0
+        resolution = result.get('resolution')
+        entry = {
+            'court_id': court_id,
+            'camera_url': camera_url,
+            'status': status,
+            'latency_ms': result.get('latency_ms'),
+            'fps': result.get('fps'),
+            'width': resolution[0] if resolution else None,
+            'height': resolution[1] if resolution else None,
+            'content_type': result.get('content_type'),
+            'source': result.get('source'),
+            'error': result.get('error'),
+            'consecutive_failures': failures,
+            'checked_at': time.time()
+        }
+        if status == STATUS_OFFLINE and previous.get('status') != STATUS_OFFLINE:
+            logger.warning(f"Caméra du terrain {court_id} injoignable: {entry['error']}")
+
+        with self.lock:
+            self.statuses[court_id] = entry
+            self._pending.pop(court_id, None)
+        return entry
+
+    def _ensure_pool(self):
+        with self.lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                    thread_name_prefix='camera-probe')
+            return self._executor
+
+    def probe_all(self) -> Dict[int, Dict[str, Any]]:
+        """Sonde toutes les caméras en parallèle (durée bornée par le délai de sonde)"""
+        with self.app.app_context():
+            courts = db.session.query(Court.id, Court.camera_url).all()
+
+        executor = self._ensure_pool()
+        futures = [executor.submit(self.probe_court, court_id, url) for court_id, url in courts]
+        wait(futures, timeout=self.timeout * (1 + len(futures) / max(1, self.workers)) + 1)
+
+        known = {court_id for court_id, _ in courts}
+        with self.lock:
+            # Terrains supprimés depuis la dernière passe
+            for court_id in list(self.statuses):
+                if court_id not in known:
+                    del self.statuses[court_id]
+            return dict(self.statuses)
+
+    # ------------------------------------------------------------------
+    # Thread de fond
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Démarre la boucle de sondes (idempotent)"""
+        if not self.enabled or self.app is None:
+            return
+        with self.lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='camera-health', daemon=True)
+            self._thread.start()
+        logger.info(f"Surveillance des caméras démarrée (toutes les {self.interval:.0f}s)")
+
+    def _run(self):
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                statuses = self.probe_all()
+                offline = sum(1 for s in statuses.values() if s['status'] == STATUS_OFFLINE)
+                if offline:
+                    logger.info(f"Sondes caméras : {offline}/{len(statuses)} hors ligne")
+            except Exception as e:
+                logger.error(f"Erreur lors des sondes caméras: {e}")
+            self._stop.wait(max(1.0, self.interval - (time.monotonic() - started)))
+
+    def shutdown(self):
+        self._stop.set()
+        with self.lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+            self._executor = None
+
+    # ------------------------------------------------------------------
+    # Lecture du cache (jamais bloquante)
+    # ------------------------------------------------------------------
+
+    def get_status(self, court_id: int, camera_url: Optional[str] = None) -> Dict[str, Any]:
+        """
+        État en cache d'un terrain. Si l'état est absent ou périmé, une sonde
+        est planifiée en arrière-plan et l'état 'unknown' (ou périmé) est retourné.
+        """
+        self.start()
+        with self.lock:
+            entry = self.statuses.get(court_id)
+            entry = dict(entry) if entry else None
+        stale = entry is None or time.time() - entry['checked_at'] > 2 * self.interval \
+            or (camera_url is not None and entry['camera_url'] != camera_url)
+
+        if stale and self.enabled and self.app is not None:
+            with self.lock:
+                pending = court_id in self._pending
+                if not pending:
+                    self._pending[court_id] = True
+            if not pending:
+                self._ensure_pool().submit(self.probe_court, court_id, camera_url)
+
+        if entry is None or (camera_url is not None and entry['camera_url'] != camera_url):
+            return {'court_id': court_id, 'status': STATUS_UNKNOWN, 'stale': True, 'checked_at': None}
+        entry['stale'] = stale
+        return entry
+
+    def summary(self, court_id: int, camera_url: Optional[str] = None) -> Dict[str, Any]:
+        """Version courte pour les listes de terrains"""
+        entry = self.get_status(court_id, camera_url)
+        checked_at = entry.get('checked_at')
+        return {
+            'status': entry['status'],
+            'latency_ms': entry.get('latency_ms'),
+            'fps': entry.get('fps'),
+            'checked_at': datetime.utcfromtimestamp(checked_at).isoformat() if checked_at else None,
+            'stale': entry.get('stale', True)
+        }
+
+    def should_refuse(self, status: Dict[str, Any]) -> bool:
+        """Refuser un enregistrement : caméra hors ligne selon une mesure récente"""
+        return self.block_offline and status['status'] == STATUS_OFFLINE and not status.get('stale')
+
+    def report(self) -> Dict[str, Any]:
+        with self.lock:
+            statuses = sorted(self.statuses.values(), key=lambda s: s['court_id'])
+        counts = {}
+        for entry in statuses:
+            counts[entry['status']] = counts.get(entry['status'], 0) + 1
+        return {
+            'enabled': self.enabled,
+            'interval_seconds': self.interval,
+            'running': self._thread is not None and self._thread.is_alive(),
+            'counts': counts,
+            'cameras': statuses
+        }
+
+
+# Instance globale du service (configurée par init_app dans create_app)
+camera_health = CameraHealthMonitor()
@@ -0,0 +1,344 @@
+"""
+Relais des flux caméra : une seule connexion amont par terrain
+Les caméras IP d'entrée de gamme ne supportent que 2 ou 3 clients. Le relais
+ouvre un seul flux MJPEG par terrain, garde les dernières images dans un
+tampon circulaire et les redistribue :
+- aux spectateurs HTTP (multipart/x-mixed-replace), qui sautent directement
+  à l'image la plus récente quand ils prennent du retard
+- à l'enregistreur (VideoCaptureService), qui reçoit toutes les images tant
+  qu'il reste dans la fenêtre du tampon
+
+Le flux amont est ouvert au premier abonné et fermé après
+CAMERA_RELAY_IDLE_TIMEOUT secondes sans abonné. Aucun thread n'est démarré
+avant le premier abonnement.
+
+Les relais vivent dans le processus : avec plusieurs workers, chacun ouvrirait
+sa propre connexion à la caméra. Le premier processus qui ouvre un relais pose
+un verrou exclusif (CAMERA_RELAY_LOCK_FILE) gardé jusqu'à son arrêt ; dans un
+autre processus, subscribe lève CameraRelayBusy. Le serveur se déploie donc
+avec un seul worker (voir README, Déploiement).
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import deque
+from typing import Dict, Optional, Any, List, Tuple
+
+from .process_lock import ProcessLock
+
+logger = logging.getLogger(__name__)
+
+# Marqueurs JPEG : début (SOI) et fin (EOI) d'image
+JPEG_SOI = b'\xff\xd8'
+JPEG_EOI = b'\xff\xd9'
+
+MULTIPART_BOUNDARY = 'padelvarframe'
+
+
+class CameraRelayFull(Exception):
+    """Levée quand un terrain a atteint son nombre maximal de spectateurs"""
+
+
+class CameraRelayBusy(Exception):
+    """Levée quand les relais sont tenus par un autre processus (plusieurs workers)"""
+
+
+class MJPEGParser:
+    """
+    Extraction incrémentale des images JPEG d'un flux MJPEG.
+    Ne dépend pas de la frontière multipart (variable selon les caméras) :
+    les images sont délimitées par leurs marqueurs SOI / EOI.
+    """
+
+    def __init__(self, max_frame_size: int = 4 * 1024 * 1024):
+        self.buffer = bytearray()
+        self.max_frame_size = max_frame_size
+
+    def feed(self, chunk: bytes) -> List[bytes]:
+        self.buffer.extend(chunk)
+        frames = []
+        while True:
+            start = self.buffer.find(JPEG_SOI)
+            if start < 0:
+                # Garder un octet : un marqueur peut être coupé entre deux blocs
+                del self.buffer[:-1]
+                break
+            end = self.buffer.find(JPEG_EOI, start + 2)
+            if end < 0:
+                del self.buffer[:start]
+                if len(self.buffer) > self.max_frame_size:
+                    logger.warning("Image MJPEG trop grande, tampon vidé")
+                    self.buffer.clear()
+                break
+            frames.append(bytes(self.buffer[start:end + 2]))
+            del self.buffer[:end + 2]
+        return frames
+
+
+class FrameRing:
+    """Tampon circulaire d'images numérotées, partagé par tous les abonnés"""
+
+    def __init__(self, size: int):
+        self.frames: deque = deque(maxlen=size)  # (seq, jpeg, timestamp)
+        self.seq = 0
+        self.closed = False
+        self.condition = threading.Condition()
+
+    def push(self, frame: bytes):
+        with self.condition:
+            self.seq += 1
+            self.frames.append((self.seq, frame, time.time()))
+            self.condition.notify_all()
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def read_after(self, last_seq: int, max_lag: int, timeout: float) -> Tuple[List[Tuple[int, bytes, float]], int]:
+        """
+        Images postérieures à last_seq (attend au plus timeout secondes).
+        Un abonné en retard de plus de max_lag images est ramené à la plus
+        récente ; retourne (images, nombre d'images sautées).
+        """
+        with self.condition:
+            if self.seq <= last_seq and not self.closed:
+                self.condition.wait(timeout)
+            if self.seq <= last_seq:
+                return [], 0
+
+            pending = [entry for entry in self.frames if entry[0] > last_seq]
+            skipped = 0
+            if pending and pending[0][0] > last_seq + 1:
+                # Images déjà sorties du tampon
+                skipped += pending[0][0] - last_seq - 1
+            if len(pending) > max_lag:
+                skipped += len(pending) - max_lag
+                pending = pending[-max_lag:]
+            return pending, skipped
+
+
+class RelaySubscriber:
+    """Abonné d'un relais : itérateur d'images JPEG"""
+
+    def __init__(self, relay: 'CourtRelay', max_lag: int, kind: str):
+        self.relay = relay
+        self.max_lag = max_lag
+        self.kind = kind
+        self.last_seq = relay.ring.seq
+        self.delivered = 0
+        self.dropped = 0
+        self.closed = False
+
+    def read(self, timeout: float = 1.0) -> List[bytes]:
+        """Images disponibles depuis la dernière lecture (liste vide si aucune)"""
+        frames, skipped = self.relay.ring.read_after(self.last_seq, self.max_lag, timeout)
+        if frames:
+            self.last_seq = frames[-1][0]
+        self.dropped += skipped
+        self.delivered += len(frames)
+        return [frame for _, frame, _ in frames]
+
+    def frames(self, timeout: float = 1.0):
+        """Générateur d'images jusqu'à la fermeture de l'abonné ou du relais"""
+        while not self.closed and not self.relay.stopped:
+            for frame in self.read(timeout):
+                yield frame
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.relay.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CourtRelay:
+    """Connexion amont unique d'un terrain et ses abonnés"""
+
+    def __init__(self, court_id: int, camera_url: str, owner: 'CameraRelay'):
+        self.court_id = court_id
+        self.camera_url = camera_url
+        self.owner = owner
+        self.ring = FrameRing(owner.ring_size)
+        self.subscribers: List[RelaySubscriber] = []
+        self.lock = threading.Lock()
+        self.stopped = False
+        self.idle_since: Optional[float] = None
+        self.connections = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+        self.last_frame_at: Optional[float] = None
+        self.thread = threading.Thread(target=self._run, name=f'camera-relay-{court_id}', daemon=True)
+
+    def subscribe(self, max_lag: int, kind: str) -> RelaySubscriber:
+        with self.lock:
+            if kind == 'viewer':
+                viewers = sum(1 for s in self.subscribers if s.kind == 'viewer')
+                if viewers >= self.owner.max_viewers:
+                    raise CameraRelayFull(f"Nombre maximal de spectateurs atteint pour le terrain {self.court_id}")
+            subscriber = RelaySubscriber(self, max_lag, kind)
+            self.subscribers.append(subscriber)
+            self.idle_since = None
+            return subscriber
+
+    def unsubscribe(self, subscriber: RelaySubscriber):
+        with self.lock:
+            if subscriber in self.subscribers:
+                self.subscribers.remove(subscriber)
+            if not self.subscribers:
+                self.idle_since = time.monotonic()
+
+    def _idle_expired(self) -> bool:
+        with self.lock:
+            return (self.idle_since is not None
+                    and time.monotonic() - self.idle_since > self.owner.idle_timeout)
+
+    def _run(self):
+        """Boucle amont : connexion, lecture, reconnexion avec attente croissante"""
+        backoff = 0.5
+        while True:
+            while not self.stopped and not self._idle_expired():
+                try:
+                    self.connections += 1
+                    self._pull()
+                    backoff = 0.5
+                except Exception as e:
+                    self.errors += 1
+                    self.last_error = str(e)
+                    logger.warning(f"Flux caméra du terrain {self.court_id} interrompu: {e}")
+                    time.sleep(backoff)
+                    backoff = min(backoff * 2, 10)
+
+            # Sous le verrou du registre : aucun abonnement ne peut arriver entre
+            # la décision d'arrêt et le retrait du relais
+            with self.owner.lock:
+                if self.stopped or self._idle_expired():
+                    self.stop()
+                    if self.owner.relays.get(self.court_id) is self:
+                        del self.owner.relays[self.court_id]
+                    break
+        logger.info(f"Relais du terrain {self.court_id} arrêté")
+
+    def _pull(self):
+        import urllib.request  # http.client / ssl : chargés au premier relais seulement
+
+        parser = MJPEGParser()
+        request = urllib.request.Request(self.camera_url, headers={'User-Agent': 'PadelVar-Relay'})
+        with urllib.request.urlopen(request, timeout=self.owner.connect_timeout) as response:
+            while not self.stopped:
+                if self._idle_expired():
+                    return
+                chunk = response.read1(64 * 1024)
+                if not chunk:
+                    raise ConnectionError("Fin du flux amont")
+                for frame in parser.feed(chunk):
+                    self.last_frame_at = time.time()
+                    self.ring.push(frame)
+
+    def stop(self):
+        self.stopped = True
+        self.ring.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            subscribers = list(self.subscribers)
+        return {
+            'court_id': self.court_id,
+            'viewers': sum(1 for s in subscribers if s.kind == 'viewer'),
+            'recorders': sum(1 for s in subscribers if s.kind == 'recorder'),
+            'frames': self.ring.seq,
+            'dropped': sum(s.dropped for s in subscribers),
+            'upstream_connections': self.connections,
+            'upstream_errors': self.errors,
+            'last_error': self.last_error,
+            'last_frame_age_s': round(time.time() - self.last_frame_at, 2) if self.last_frame_at else None
+        }
+
+
+class CameraRelay:
+    """Registre des relais par terrain (pattern extension Flask)"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.enabled = True
+        self.ring_size = 50
+        self.idle_timeout = 30.0
+        self.connect_timeout = 5.0
+        self.max_viewers = 20
+        self.viewer_max_lag = 2
+        self.relays: Dict[int, CourtRelay] = {}
+        self.lock = threading.Lock()
+        self.process_lock = ProcessLock('camera_relay')
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.enabled = app.config.get('CAMERA_RELAY_ENABLED', True)
+        self.ring_size = app.config.get('CAMERA_RELAY_RING_SIZE', 50)
+        self.idle_timeout = app.config.get('CAMERA_RELAY_IDLE_TIMEOUT', 30.0)
+        self.connect_timeout = app.config.get('CAMERA_RELAY_CONNECT_TIMEOUT', 5.0)
+        self.max_viewers = app.config.get('CAMERA_RELAY_MAX_VIEWERS', 20)
+        self.viewer_max_lag = app.config.get('CAMERA_RELAY_VIEWER_MAX_LAG', 2)
+        self.process_lock.configure(app.config.get('CAMERA_RELAY_LOCK_FILE')
+                                    or os.path.join(app.instance_path, 'camera_relay.lock'))
+        app.extensions['camera_relay'] = self
+
+    def subscribe(self, court_id: int, camera_url: str, kind: str = 'viewer') -> RelaySubscriber:
+        """
+        Abonne un spectateur ('viewer') ou l'enregistreur ('recorder') au
+        flux du terrain, en ouvrant la connexion amont si nécessaire.
+        """
+        max_lag = self.viewer_max_lag if kind == 'viewer' else self.ring_size
+        with self.lock:
+            relay = self.relays.get(court_id)
+            if relay is not None and (relay.stopped or relay.camera_url != camera_url):
+                relay.stop()
+                relay = None
+            created = relay is None
+            if created:
+                if not self.process_lock.acquire():
+                    raise CameraRelayBusy("Relais caméra tenu par un autre processus : "
+                                          "le serveur doit tourner avec un seul worker")
+                relay = CourtRelay(court_id, camera_url, self)
+                self.relays[court_id] = relay
+            subscriber = relay.subscribe(max_lag, kind)
+        if created:
+            relay.thread.start()
+            logger.info(f"Relais ouvert pour le terrain {court_id}")
+        return subscriber
+
+    def stream(self, subscriber: RelaySubscriber):
+        """Corps multipart/x-mixed-replace pour un spectateur HTTP"""
+        boundary = MULTIPART_BOUNDARY.encode('ascii')
+        try:
+            for frame in subscriber.frames():
+                yield (b'--' + boundary + b'\r\nContent-Type: image/jpeg\r\nContent-Length: '
+                       + str(len(frame)).encode('ascii') + b'\r\n\r\n' + frame + b'\r\n')
+        finally:
+            subscriber.close()
+
+    def stats(self) -> List[Dict[str, Any]]:
+        with self.lock:
+            relays = list(self.relays.values())
+        return [relay.stats() for relay in relays]
+
+    def shutdown(self):
+        """Ferme tous les relais"""
+        with self.lock:
+            relays = list(self.relays.values())
+            self.relays.clear()
+        for relay in relays:
+            relay.stop()
+
+
+# Instance globale du service (configurée par init_app dans create_app)
+camera_relay = CameraRelay()
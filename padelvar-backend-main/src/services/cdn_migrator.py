@@ -0,0 +1,291 @@
+"""
+Migration des enregistrements locaux vers le CDN
+Les vidéos dont cdn_migrated_at est vide sont prises par lots (ordre des id) :
+- envoi parallèle borné (CDN_MIGRATION_WORKERS) vers le backend de stockage
+- envoi par morceaux, repris à la position connue du stockage après une
+  coupure ou un redémarrage : aucun octet déjà reçu n'est renvoyé
+- empreinte SHA-256 vérifiée par le stockage avant publication
+- nouvelles tentatives avec attente exponentielle (et aléa) sur les erreurs
+  temporaires
+- bascule atomique : file_url et cdn_migrated_at sont modifiés par un seul
+  UPDATE conditionné à l'ancienne URL, la vidéo n'est jamais à moitié migrée
+
+Le thread de migration ne démarre qu'à la demande (script ou route admin).
+"""
+
+import time
+import random
+import logging
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from sqlalchemy import update
+
+from ..models.database import db
+from ..models.user import Video
+from .response_cache import video_tags
+from .storage_backends import StorageBackend, StorageError, create_backend, file_sha256, validate_config
+
+logger = logging.getLogger(__name__)
+
+
+class CDNMigrator:
+    """Migration par lots des vidéos locales vers le CDN (pattern extension Flask)"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.enabled = False
+        self.workers = 4
+        self.batch_size = 20
+        self.chunk_size = 8 * 1024 * 1024
+        self.max_retries = 5
+        self.retry_base_delay = 1.0
+        self.retry_max_delay = 60.0
+        self.min_age = timedelta(minutes=10)
+        self.delete_local = False
+        self._backend: Optional[StorageBackend] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.lock = threading.Lock()
+        self.migrated = 0
+        self.failed = 0
+        self.skipped = 0
+        self.bytes_sent = 0
+        self.retries = 0
+        self.last_error: Optional[str] = None
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Lit la configuration ; ni thread ni connexion au stockage ici"""
+        self.app = app
+        self.enabled = app.config.get('CDN_MIGRATION_ENABLED', False)
+        self.workers = app.config.get('CDN_MIGRATION_WORKERS', 4)
+        self.batch_size = app.config.get('CDN_MIGRATION_BATCH', 20)
+        self.chunk_size = app.config.get('CDN_CHUNK_SIZE', self.chunk_size)
+        self.max_retries = app.config.get('CDN_MAX_RETRIES', 5)
+        self.retry_base_delay = app.config.get('CDN_RETRY_BASE_DELAY', 1.0)
+        self.min_age = timedelta(minutes=app.config.get('CDN_MIGRATION_MIN_AGE_MINUTES', 10))
+        self.delete_local = app.config.get('CDN_DELETE_LOCAL', False)
+        validate_config(app.config)  # URL publique servie, vérifiée dès le démarrage
+        self._backend = None
+        app.extensions['cdn_migrator'] = self
+
+    @property
+    def backend(self) -> StorageBackend:
+        if self._backend is None:
+            self._backend = create_backend(self.app.config)
+        return self._backend
+
+    # ------------------------------------------------------------------
+    # Sélection des vidéos à migrer
+    # ------------------------------------------------------------------
+
+    def pending_batch(self, after_id: int = 0) -> List[Tuple[int, str]]:
+        """(id, file_url) du prochain lot : non migrées, locales, finalisées depuis min_age"""
+        cutoff = datetime.utcnow() - self.min_age
+        rows = db.session.query(Video.id, Video.file_url).filter(
+            Video.cdn_migrated_at.is_(None),
+            Video.file_url.isnot(None),
+            ~Video.file_url.contains('://'),
+            Video.created_at <= cutoff,
+            Video.id > after_id
+        ).order_by(Video.id).limit(self.batch_size).all()
+        return [(row.id, row.file_url) for row in rows]
+
+    def pending_count(self) -> int:
+        return db.session.query(Video.id).filter(
+            Video.cdn_migrated_at.is_(None),
+            Video.file_url.isnot(None),
+            ~Video.file_url.contains('://')
+        ).count()
+
+    # ------------------------------------------------------------------
+    # Envoi d'un fichier (threads du pool, sans accès à la base)
+    # ------------------------------------------------------------------
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(self.retry_max_delay, self.retry_base_delay * 2 ** attempt)
+        return delay * random.uniform(0.5, 1.0)
+
+    def upload(self, key: str, path: Path) -> Dict[str, Any]:
+        """Envoie un fichier (reprise, empreinte, nouvelles tentatives) ; retourne l'URL publique"""
+        started = time.monotonic()
+        size = path.stat().st_size
+        checksum = file_sha256(str(path))
+        backend = self.backend
+        sent = 0
+        attempts = 0
+        failures = 0  # échecs consécutifs sans progression
+
+        while True:
+            attempts += 1
+            progress = sent
+            try:
+                if not backend.resumable:
+                    url = backend.upload_file(key, str(path), checksum, size)
+                    sent += size
+                else:
+                    # La position de reprise vient du stockage, pas d'un état local
+                    offset = backend.uploaded_bytes(key)
+                    if offset > size:
+                        raise StorageError(f"{key}: {offset} octets reçus pour {size}", retryable=False)
+                    with open(path, 'rb') as f:
+                        f.seek(offset)
+                        while offset < size:
+                            data = f.read(self.chunk_size)
+                            backend.upload_chunk(key, offset, data, size)
+                            offset += len(data)
+                            sent += len(data)
+                            with self.lock:
+                                self.bytes_sent += len(data)
+                    url = backend.complete(key, checksum, size)
+                return {'url': url, 'size': size, 'checksum': checksum, 'sent': sent, 'attempts': attempts,
+                        'elapsed_seconds': round(time.monotonic() - started, 2)}
+            except StorageError as e:
+                failures = 1 if sent > progress else failures + 1
+                if not e.retryable or failures > self.max_retries:
+                    raise
+                delay = self._backoff(failures - 1)
+                with self.lock:
+                    self.retries += 1
+                logger.warning(f"Envoi CDN de {key} interrompu ({e}), reprise dans {delay:.1f}s")
+                if self._stop.wait(delay):
+                    raise StorageError(f"{key}: migration arrêtée", retryable=False)
+
+    # ------------------------------------------------------------------
+    # Lots et bascule
+    # ------------------------------------------------------------------
+
+    def _flip(self, video_id: int, old_url: str, new_url: str) -> bool:
+        """Bascule atomique : seulement si la vidéo n'a pas changé pendant l'envoi"""
+        result = db.session.execute(
+            update(Video)
+            .where(Video.id == video_id, Video.file_url == old_url, Video.cdn_migrated_at.is_(None))
+            .values(file_url=new_url, cdn_migrated_at=datetime.utcnow())
+            .execution_options(synchronize_session=False, cache_tags=video_tags([video_id]))
+        )
+        db.session.commit()
+        return result.rowcount == 1
+
+    def _remove_local(self, video_id: int, path: Path):
+        """Supprime la copie locale si aucun encodage ne la lit encore"""
+        from .blob_store import blob_store
+        if blob_store.owns(path):
+            # Fichier partagé : repris par le ramasse-miettes quand plus aucune vidéo ne le référence
+            return
+        video = db.session.get(Video, video_id)
+        job = video.transcode_job if video is not None else None
+        if job is not None and job.status in ('queued', 'running'):
+            return
+        try:
+            path.unlink()
+        except OSError as e:
+            logger.warning(f"Copie locale de la vidéo {video_id} conservée: {e}")
+
+    def run_batch(self, after_id: int = 0) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """Migre un lot ; retourne les résultats et le dernier id vu (None si rien à faire)"""
+        from .video_capture_service import video_capture_service
+
+        batch = self.pending_batch(after_id)
+        if not batch:
+            return [], None
+
+        results = []
+        jobs = {}
+        for video_id, file_url in batch:
+            path = video_capture_service.local_video_path(file_url)
+            if path is None or path.stat().st_size == 0:
+                self.skipped += 1
+                results.append({'video_id': video_id, 'status': 'missing'})
+                continue
+            jobs[video_id] = (file_url, path)
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='cdn-upload') as pool:
+            futures = {pool.submit(self.upload, f"videos/{video_id}/{path.name}", path): video_id
+                       for video_id, (file_url, path) in jobs.items()}
+            # Bascule au fil des envois terminés, dans le thread appelant (session unique)
+            for future in as_completed(futures):
+                video_id = futures[future]
+                file_url, path = jobs[video_id]
+                try:
+                    upload = future.result()
+                except Exception as e:
+                    self.failed += 1
+                    self.last_error = f"vidéo {video_id}: {e}"
+                    logger.error(f"Échec de la migration CDN de la vidéo {video_id}: {e}")
+                    results.append({'video_id': video_id, 'status': 'error', 'error': str(e)})
+                    continue
+                if not self._flip(video_id, file_url, upload['url']):
+                    # Vidéo supprimée ou modifiée pendant l'envoi : l'objet distant reste orphelin
+                    self.skipped += 1
+                    results.append({'video_id': video_id, 'status': 'changed'})
+                    continue
+                self.migrated += 1
+                if self.delete_local:
+                    self._remove_local(video_id, path)
+                logger.info(f"Vidéo {video_id} migrée vers {upload['url']} "
+                            f"({upload['size']} octets en {upload['elapsed_seconds']}s)")
+                results.append({'video_id': video_id, 'status': 'migrated', **upload})
+
+        return results, batch[-1][0]
+
+    def run(self, limit: Optional[int] = None) -> Dict[str, Any]:
+        """Migre les lots jusqu'à épuisement (ou limit vidéos traitées)"""
+        started = time.monotonic()
+        results: List[Dict[str, Any]] = []
+        after_id = 0
+        # Les échecs ne bloquent pas la suite : on avance par id, ils seront repris au passage suivant
+        while not self._stop.is_set() and (limit is None or len(results) < limit):
+            batch_results, after_id = self.run_batch(after_id)
+            if after_id is None:
+                break
+            results.extend(batch_results)
+        counts: Dict[str, int] = {}
+        for result in results:
+            counts[result['status']] = counts.get(result['status'], 0) + 1
+        return {'processed': len(results), 'counts': counts, 'results': results,
+                'elapsed_seconds': round(time.monotonic() - started, 2)}
+
+    def start(self) -> bool:
+        """Lance une passe de migration en arrière-plan (idempotent)"""
+        if not self.enabled or self.app is None:
+            return False
+        with self.lock:
+            if self._thread is not None and self._thread.is_alive():
+                return True
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run_in_context, name='cdn-migrator', daemon=True)
+            self._thread.start()
+        return True
+
+    def _run_in_context(self):
+        with self.app.app_context():
+            summary = self.run()
+            logger.info(f"Passe de migration CDN terminée: {summary['counts']} en {summary['elapsed_seconds']}s")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'enabled': self.enabled,
+            'backend': self.app.config.get('CDN_BACKEND', 'local') if self.app else None,
+            'running': self._thread is not None and self._thread.is_alive(),
+            'workers': self.workers,
+            'batch_size': self.batch_size,
+            'migrated': self.migrated,
+            'failed': self.failed,
+            'skipped': self.skipped,
+            'retries': self.retries,
+            'bytes_sent': self.bytes_sent,
+            'last_error': self.last_error
+        }
+
+    def shutdown(self):
+        self._stop.set()
+
+
+# Instance globale du service (configurée par init_app dans create_app)
+cdn_migrator = CDNMigrator()
@@ -0,0 +1,312 @@
+"""
+Extraits vidéo alignés sur les images clés, sans réencodage
+Partager un point d'un match ne doit pas coûter un réencodage complet :
+- l'index des images clés vient des métadonnées sondées une fois par
+  fichier (media_probe, table video_metadata), gardé en mémoire
+- la plage demandée est élargie aux images clés encadrantes, puis copiée
+  telle quelle par FFmpeg (-c copy) : quelques millisecondes de CPU
+- les extraits sont mis en cache par (vidéo, plage alignée) : deux demandes
+  proches du même point servent le même fichier
+- les plages longues (ou sans FFmpeg, réencodage OpenCV) passent par un
+  pool de tâches ; la route répond 202 et le client interroge l'état
+- une seule extraction par extrait : la tâche est enregistrée sous verrou
+  avant tout travail, une demande identique pendant ce temps reçoit 'pending'
+  ; chaque extraction écrit dans son propre fichier temporaire
+- les tâches terminées sont oubliées (le fichier fait foi) ; les erreurs
+  restent consultables CLIP_JOB_TTL secondes
+
+Aucun thread n'est démarré avant la première tâche asynchrone.
+"""
+
+import os
+import re
+import time
+import shutil
+import logging
+import tempfile
+import threading
+import subprocess
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CLIP_ID_PATTERN = re.compile(r'^(\d+)-(\d+)-(\d+)$')
+
+
+class ClipExtractor:
+    """Index des images clés et extraits en cache (pattern extension Flask)"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.storage_path = Path('static/clips')
+        self.workers = 2
+        self.sync_max_seconds = 60.0
+        self.max_seconds = 300.0
+        self.cache_max_bytes = 2 * 1024 ** 3
+        self.index_cache_size = 64
+        self.job_ttl = 600.0
+        self.indexes: 'OrderedDict[int, Tuple[Tuple[int, int], Dict[str, Any]]]' = OrderedDict()
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self.lock = threading.Lock()
+        self._executor = None
+        self.cache_hits = 0
+        self.extracted = 0
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Lit la configuration ; le dossier et le pool sont créés au premier besoin"""
+        self.app = app
+        self.storage_path = Path(app.config.get('CLIPS_STORAGE_PATH', self.storage_path))
+        self.workers = app.config.get('CLIP_WORKERS', 2)
+        self.sync_max_seconds = app.config.get('CLIP_SYNC_MAX_SECONDS', 60.0)
+        self.max_seconds = app.config.get('CLIP_MAX_SECONDS', 300.0)
+        self.cache_max_bytes = app.config.get('CLIP_CACHE_MAX_BYTES', self.cache_max_bytes)
+        self.index_cache_size = app.config.get('CLIP_INDEX_CACHE_SIZE', 64)
+        self.job_ttl = app.config.get('CLIP_JOB_TTL', 600.0)
+        app.extensions['clip_extractor'] = self
+
+    def _pool(self):
+        with self.lock:
+            if self._executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='clip')
+            return self._executor
+
+    # ------------------------------------------------------------------
+    # Index des images clés
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _signature(path: Path) -> Tuple[int, int]:
+        stat = path.stat()
+        return stat.st_size, stat.st_mtime_ns
+
+    def keyframe_index(self, video_id: int, path: Path) -> Dict[str, Any]:
+        """Index d'une vidéo : mémoire, puis métadonnées sondées (video_metadata)"""
+        from .media_probe import media_probe
+
+        signature = self._signature(path)
+        with self.lock:
+            cached = self.indexes.get(video_id)
+            if cached is not None and cached[0] == signature:
+                self.indexes.move_to_end(video_id)
+                return cached[1]
+
+        record = media_probe.metadata(video_id, path)
+        index = {'keyframes': media_probe.keyframes(record), 'duration': record.duration,
+                 'width': record.width, 'height': record.height}
+        if not index['keyframes']:
+            raise ValueError("Index des images clés indisponible pour cette vidéo")
+
+        with self.lock:
+            self.indexes[video_id] = (signature, index)
+            self.indexes.move_to_end(video_id)
+            while len(self.indexes) > self.index_cache_size:
+                self.indexes.popitem(last=False)
+        return index
+
+    @staticmethod
+    def align(index: Dict[str, Any], start: float, end: float) -> Tuple[float, float]:
+        """Image clé au plus tard à start, image clé suivante (ou fin) au plus tôt à end"""
+        keyframes = index['keyframes']
+        aligned_start = keyframes[max(0, bisect_right(keyframes, start) - 1)]
+        position = bisect_left(keyframes, end)
+        aligned_end = keyframes[position] if position < len(keyframes) else index['duration']
+        return aligned_start, aligned_end
+
+    # ------------------------------------------------------------------
+    # Extraits
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def clip_id(video_id: int, start: float, end: float) -> str:
+        return f"{video_id}-{int(round(start * 1000))}-{int(round(end * 1000))}"
+
+    @staticmethod
+    def parse_clip_id(clip_id: str) -> Optional[int]:
+        """Identifiant de la vidéo d'un extrait ; None si l'identifiant est invalide"""
+        match = CLIP_ID_PATTERN.match(clip_id)
+        return int(match.group(1)) if match else None
+
+    def clip_path(self, clip_id: str) -> Path:
+        return self.storage_path / f"clip_{clip_id}.mp4"
+
+    def _describe(self, clip_id: str, status: str, **extra) -> Dict[str, Any]:
+        video_id, start_ms, end_ms = (int(part) for part in clip_id.split('-'))
+        return {
+            'clip_id': clip_id,
+            'video_id': video_id,
+            'start': start_ms / 1000,
+            'end': end_ms / 1000,
+            'status': status,
+            **extra
+        }
+
+    def request_clip(self, video_id: int, path: Path, start: float, end: float) -> Dict[str, Any]:
+        """
+        Extrait (start, end) d'une vidéo : servi depuis le cache, produit
+        immédiatement par copie des flux, ou planifié ('pending').
+        """
+        if start < 0 or end <= start:
+            raise ValueError("Plage invalide : 0 <= début < fin")
+        if end - start > self.max_seconds:
+            raise ValueError(f"Extrait limité à {self.max_seconds:.0f} secondes")
+
+        index = self.keyframe_index(video_id, path)
+        if start >= index['duration']:
+            raise ValueError("Début au-delà de la fin de la vidéo")
+        aligned_start, aligned_end = self.align(index, start, end)
+        clip_id = self.clip_id(video_id, aligned_start, aligned_end)
+        requested = {'requested_start': start, 'requested_end': end}
+
+        output = self.clip_path(clip_id)
+        if output.exists():
+            self.cache_hits += 1
+            os.utime(output)  # ordre LRU de l'éviction
+            return self._describe(clip_id, 'ready', cached=True, file_size=output.stat().st_size, **requested)
+
+        # Enregistrée avant tout travail : une demande identique concurrente attend la même tâche
+        if not self._claim_job(clip_id):
+            return self._describe(clip_id, 'pending', **requested)
+
+        stream_copy = shutil.which('ffmpeg') is not None
+        if stream_copy and aligned_end - aligned_start <= self.sync_max_seconds:
+            result = self._run_job(clip_id, path, aligned_start, aligned_end, raise_errors=True)
+            return self._describe(clip_id, 'ready', cached=False, **result, **requested)
+
+        try:
+            self._pool().submit(self._run_job, clip_id, path, aligned_start, aligned_end)
+        except Exception:
+            self._finish_job(clip_id, None)
+            raise
+        return self._describe(clip_id, 'pending', **requested)
+
+    def _claim_job(self, clip_id: str) -> bool:
+        """Enregistre la tâche d'un extrait ; False si une extraction est déjà en cours"""
+        now = time.time()
+        with self.lock:
+            # Erreurs anciennes oubliées : la table des tâches reste bornée
+            for expired in [key for key, job in self.jobs.items()
+                            if job['status'] != 'pending' and job.get('finished_at', now) < now - self.job_ttl]:
+                del self.jobs[expired]
+            job = self.jobs.get(clip_id)
+            if job is not None and job['status'] == 'pending':
+                return False
+            self.jobs[clip_id] = {'status': 'pending', 'submitted_at': now}
+            return True
+
+    def _finish_job(self, clip_id: str, error: Optional[str]):
+        """Tâche terminée : réussie, elle est oubliée (le fichier fait foi) ; en erreur, gardée job_ttl"""
+        with self.lock:
+            if error is None:
+                self.jobs.pop(clip_id, None)
+            else:
+                self.jobs[clip_id] = {'status': 'error', 'error': error, 'finished_at': time.time()}
+
+    def _run_job(self, clip_id: str, path: Path, start: float, end: float,
+                 raise_errors: bool = False) -> Optional[Dict[str, Any]]:
+        try:
+            result = self._extract(clip_id, path, start, end)
+        except Exception as e:
+            logger.error(f"Erreur d'extraction de l'extrait {clip_id}: {e}")
+            self._finish_job(clip_id, str(e) or type(e).__name__)
+            if raise_errors:
+                raise
+            return None
+        self._finish_job(clip_id, None)
+        return result
+
+    def _extract(self, clip_id: str, path: Path, start: float, end: float) -> Dict[str, Any]:
+        """Écrit l'extrait (fichier temporaire unique dans le même dossier, puis remplacement atomique)"""
+        self.storage_path.mkdir(parents=True, exist_ok=True)
+        output = self.clip_path(clip_id)
+        descriptor, temporary = tempfile.mkstemp(prefix=f"{output.stem}.", suffix='.part.mp4',
+                                                 dir=self.storage_path)
+        os.close(descriptor)
+        started = time.perf_counter()
+        try:
+            if shutil.which('ffmpeg'):
+                method = 'stream-copy'
+                # -ss avant -i sur une image clé : coupe exacte, sans décodage
+                subprocess.run(['ffmpeg', '-v', 'error', '-y', '-ss', f'{start:.3f}', '-i', str(path),
+                                '-t', f'{end - start:.3f}', '-map', '0', '-c', 'copy',
+                                '-avoid_negative_ts', 'make_zero', '-movflags', '+faststart',
+                                '-f', 'mp4', temporary], check=True, capture_output=True)
+            else:
+                method = 'opencv'
+                self._extract_with_opencv(path, start, end, Path(temporary))
+            os.replace(temporary, output)
+        except BaseException:
+            Path(temporary).unlink(missing_ok=True)
+            raise
+        self.extracted += 1
+        self._evict()
+        return {'method': method, 'file_size': output.stat().st_size,
+                'elapsed_ms': round((time.perf_counter() - started) * 1000, 1)}
+
+    @staticmethod
+    def _extract_with_opencv(path: Path, start: float, end: float, output: Path):
+        """Repli sans FFmpeg : réencodage de la seule plage demandée"""
+        import cv2
+
+        capture = cv2.VideoCapture(str(path))
+        if not capture.isOpened():
+            raise IOError(f"Impossible d'ouvrir la vidéo: {path}")
+        fps = capture.get(cv2.CAP_PROP_FPS) or 25.0
+        size = (int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)), int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+        writer = cv2.VideoWriter(str(output), cv2.VideoWriter_fourcc(*'mp4v'), fps, size)
+        try:
+            capture.set(cv2.CAP_PROP_POS_FRAMES, int(round(start * fps)))
+            for _ in range(int(round((end - start) * fps))):
+                ok, frame = capture.read()
+                if not ok:
+                    break
+                writer.write(frame)
+        finally:
+            writer.release()
+            capture.release()
+
+    def _evict(self):
+        """Supprime les extraits les moins récemment servis au-delà du quota"""
+        clips = sorted((p for p in self.storage_path.glob('clip_*.mp4') if '.part' not in p.name),
+                       key=lambda p: p.stat().st_mtime)
+        total = sum(p.stat().st_size for p in clips)
+        for clip in clips:
+            if total <= self.cache_max_bytes:
+                break
+            total -= clip.stat().st_size
+            clip.unlink(missing_ok=True)
+
+    def status(self, clip_id: str) -> Optional[Dict[str, Any]]:
+        """État d'un extrait : prêt (fichier présent), en cours, en erreur ou inconnu"""
+        output = self.clip_path(clip_id)
+        if output.exists():
+            return self._describe(clip_id, 'ready', file_size=output.stat().st_size)
+        with self.lock:
+            job = self.jobs.get(clip_id)
+        if job is None:
+            return None
+        return self._describe(clip_id, job['status'], error=job.get('error'))
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            pending = sum(1 for job in self.jobs.values() if job['status'] == 'pending')
+            indexes = len(self.indexes)
+            tracked = len(self.jobs)
+        return {
+            'indexes_cached': indexes,
+            'cache_hits': self.cache_hits,
+            'extracted': self.extracted,
+            'jobs_pending': pending,
+            'jobs_tracked': tracked,
+            'stream_copy': shutil.which('ffmpeg') is not None
+        }
+
+
+# Instance globale du service (configurée par init_app dans create_app)
+clip_extractor = ClipExtractor()
@@ -0,0 +1,245 @@
+"""
+Graphe d'abonnements joueurs <-> clubs (table player_club_follows)
+Suivre ou ne plus suivre plusieurs clubs coûte le même nombre de requêtes
+qu'un seul :
+- ajouts en un INSERT ... SELECT (les abonnements existants sont ignorés),
+  retraits en un DELETE, les lignes touchées relues par RETURNING
+- compteurs dénormalisés Club.followers_count et User.followed_clubs_count,
+  ajustés par un UPDATE dans la même transaction : listes et tableaux de
+  bord lisent une colonne au lieu de compter les abonnés club par club
+- abonnés d'un club paginés par curseur sur player_id, servis par l'index
+  (club_id, player_id) ; la clé primaire (player_id, club_id) sert l'autre sens
+
+Les méthodes d'écriture ne valident pas : l'appelant commit (ou rollback)
+avec le reste de son opération.
+"""
+
+import base64
+import logging
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import delete, exists, func, insert, literal, select, update
+
+from ..models.database import db
+from ..models.user import User, Club, player_club_follows
+
+logger = logging.getLogger(__name__)
+
+follows = player_club_follows.c
+
+
+def encode_cursor(player_id: int) -> str:
+    return base64.urlsafe_b64encode(f"f|{player_id}".encode()).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> int:
+    """player_id d'un curseur ; ValueError s'il est invalide"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        prefix, _, player_id = raw.partition('|')
+        if prefix != 'f':
+            raise ValueError(raw)
+        return int(player_id)
+    except (UnicodeDecodeError, ValueError, TypeError) as e:
+        raise ValueError('Curseur de pagination invalide') from e
+
+
+def recount_statements():
+    """UPDATE qui recalculent les compteurs faux depuis la table d'abonnements"""
+    club_count = select(func.count()).where(follows.club_id == Club.id).scalar_subquery()
+    player_count = select(func.count()).where(follows.player_id == User.id).scalar_subquery()
+    return (
+        update(Club).where(Club.followers_count != club_count).values(followers_count=club_count),
+        update(User).where(User.followed_clubs_count != player_count).values(followed_clubs_count=player_count)
+    )
+
+
+class FollowGraph:
+    """Abonnements en masse, compteurs et pages d'abonnés (pattern extension Flask)"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.max_followed = 10
+        self.default_limit = 100
+        self.max_limit = 500
+        self.statements = 0
+        self.followed = 0
+        self.unfollowed = 0
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.max_followed = app.config.get('FOLLOW_MAX_CLUBS', 10)
+        self.default_limit = app.config.get('FOLLOWERS_PAGE_SIZE', 100)
+        self.max_limit = app.config.get('FOLLOWERS_MAX_PAGE_SIZE', 500)
+        app.extensions['follow_graph'] = self
+
+    def page_size(self, requested: Optional[int]) -> int:
+        return max(1, min(requested or self.default_limit, self.max_limit))
+
+    @staticmethod
+    def _ids(values: Optional[Iterable]) -> List[int]:
+        return sorted({int(value) for value in values or ()})
+
+    def _rows(self, statement, column, fallback) -> List[int]:
+        """Exécute statement et retourne les valeurs de column pour les lignes touchées"""
+        self.statements += 1
+        dialect = db.session.get_bind().dialect
+        returning = dialect.insert_returning if statement.is_insert else dialect.delete_returning
+        if returning:
+            return [row[0] for row in db.session.execute(statement.returning(column))]
+        # Sans RETURNING : lignes concernées lues juste avant
+        values = [row[0] for row in db.session.execute(fallback)]
+        db.session.execute(statement)
+        return values
+
+    def _adjust_clubs(self, club_ids: List[int], delta: int):
+        if club_ids:
+            # cache_tags : réponses en cache de ces clubs invalidées au commit (voir response_cache)
+            db.session.execute(update(Club).where(Club.id.in_(club_ids))
+                               .values(followers_count=Club.followers_count + delta)
+                               .execution_options(cache_tags=[f'club:{club_id}' for club_id in club_ids]))
+
+    def _adjust_players(self, player_ids: List[int], delta: int):
+        if player_ids:
+            db.session.execute(update(User).where(User.id.in_(player_ids))
+                               .values(followed_clubs_count=User.followed_clubs_count + delta)
+                               .execution_options(cache_tags=[f'user:{player_id}' for player_id in player_ids]))
+
+    def followed_ids(self, player_id: int) -> Set[int]:
+        return set(db.session.execute(select(follows.club_id).where(follows.player_id == player_id)).scalars())
+
+    def followed_clubs(self, player_id: int) -> List[Club]:
+        """Clubs suivis par un joueur, en une requête"""
+        return Club.query.join(player_club_follows, follows.club_id == Club.id) \
+            .filter(follows.player_id == player_id).order_by(Club.name).all()
+
+    def follow(self, player_id: int, club_ids: Iterable[int]) -> List[int]:
+        """Abonne un joueur à des clubs ; retourne les clubs réellement ajoutés"""
+        club_ids = self._ids(club_ids)
+        if not club_ids:
+            return []
+        new_clubs = select(literal(player_id), Club.id).where(
+            Club.id.in_(club_ids),
+            ~exists().where(follows.player_id == player_id, follows.club_id == Club.id)
+        )
+        added = self._rows(
+            insert(player_club_follows).from_select(['player_id', 'club_id'], new_clubs),
+            follows.club_id,
+            new_clubs.with_only_columns(Club.id)
+        )
+        self._adjust_clubs(added, 1)
+        self._adjust_players([player_id] if added else [], len(added))
+        self.followed += len(added)
+        return added
+
+    def unfollow(self, player_id: int, club_ids: Optional[Iterable[int]] = None) -> List[int]:
+        """Retire les abonnements d'un joueur (tous si club_ids vaut None) ; retourne les clubs retirés"""
+        condition = follows.player_id == player_id
+        if club_ids is not None:
+            club_ids = self._ids(club_ids)
+            if not club_ids:
+                return []
+            condition = condition & follows.club_id.in_(club_ids)
+        removed = self._rows(
+            delete(player_club_follows).where(condition),
+            follows.club_id,
+            select(follows.club_id).where(condition)
+        )
+        self._adjust_clubs(removed, -1)
+        self._adjust_players([player_id] if removed else [], -len(removed))
+        self.unfollowed += len(removed)
+        return removed
+
+    def apply(self, player_id: int, follow: Iterable[int] = (), unfollow: Iterable[int] = (),
+              enforce_limit: bool = True) -> Tuple[List[int], List[int]]:
+        """Retraits puis ajouts pour un joueur ; ValueError au-delà de max_followed clubs suivis"""
+        removed = self.unfollow(player_id, unfollow)
+        added = self.follow(player_id, follow)
+        if enforce_limit and added:
+            count = db.session.execute(select(User.followed_clubs_count).where(User.id == player_id)).scalar()
+            if count > self.max_followed:
+                raise ValueError(f"Limite de {self.max_followed} clubs suivis atteinte")
+        return added, removed
+
+    def add_followers(self, club_id: int, player_ids: Iterable[int]) -> List[int]:
+        """Abonne des joueurs à un club ; retourne les joueurs réellement ajoutés"""
+        player_ids = self._ids(player_ids)
+        if not player_ids:
+            return []
+        new_players = select(User.id, literal(club_id)).where(
+            User.id.in_(player_ids),
+            ~exists().where(follows.player_id == User.id, follows.club_id == club_id)
+        )
+        added = self._rows(
+            insert(player_club_follows).from_select(['player_id', 'club_id'], new_players),
+            follows.player_id,
+            new_players.with_only_columns(User.id)
+        )
+        self._adjust_players(added, 1)
+        self._adjust_clubs([club_id] if added else [], len(added))
+        self.followed += len(added)
+        return added
+
+    def remove_club(self, club_id: int) -> int:
+        """Retire tous les abonnés d'un club (avant sa suppression)"""
+        followers = select(follows.player_id).where(follows.club_id == club_id)
+        # Compteurs des joueurs ajustés par sous-requête : aucune liste d'identifiants transmise
+        db.session.execute(update(User).where(User.id.in_(followers))
+                           .values(followed_clubs_count=User.followed_clubs_count - 1)
+                           .execution_options(synchronize_session='fetch'))
+        removed = db.session.execute(delete(player_club_follows).where(follows.club_id == club_id)).rowcount
+        db.session.execute(update(Club).where(Club.id == club_id).values(followers_count=0)
+                           .execution_options(cache_tags=[f'club:{club_id}']))
+        self.statements += 3
+        self.unfollowed += removed
+        return removed
+
+    def followers(self, club_id: int, limit: Optional[int],
+                  cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Abonnés d'un club par player_id croissant, après le curseur ; retourne (abonnés, curseur suivant).
+        limit=None : tous les abonnés en une requête.
+        """
+        query = db.session.query(
+            User.id, User.email, User.name, User.phone_number, User.role,
+            User.credits_balance, User.created_at, User.club_id
+        ).join(player_club_follows, follows.player_id == User.id).filter(follows.club_id == club_id)
+        if cursor:
+            query = query.filter(follows.player_id > decode_cursor(cursor))
+
+        query = query.order_by(follows.player_id)
+        rows = query.all() if limit is None else query.limit(limit + 1).all()
+        followers = [{
+            'id': row.id,
+            'email': row.email,
+            'name': row.name,
+            'phone_number': row.phone_number,
+            'role': row.role.value,
+            'credits_balance': row.credits_balance,
+            'created_at': row.created_at.isoformat() if row.created_at else None,
+            'club_id': row.club_id
+        } for row in (rows if limit is None else rows[:limit])]
+        next_cursor = encode_cursor(rows[limit - 1].id) if limit is not None and len(rows) > limit else None
+        return followers, next_cursor
+
+    def recount(self) -> int:
+        """Recalcule les compteurs désynchronisés ; retourne le nombre de lignes corrigées"""
+        repaired = sum(db.session.execute(statement.execution_options(synchronize_session=False)).rowcount
+                       for statement in recount_statements())
+        db.session.expire_all()
+        return repaired
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'statements': self.statements,
+            'followed': self.followed,
+            'unfollowed': self.unfollowed,
+            'max_followed': self.max_followed
+        }
+
+
+# Instance globale du service (configurée par init_app dans create_app)
+follow_graph = FollowGraph()
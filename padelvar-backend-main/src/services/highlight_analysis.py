@@ -0,0 +1,294 @@
+"""
+Analyse de mouvement hors ligne des matchs enregistrés
+Fonctions exécutées dans les processus du pool de highlight_detector : aucune
+dépendance à Flask ni à la base, uniquement le chemin du fichier en entrée et
+un dictionnaire sérialisable en sortie.
+
+- décodage à résolution et cadence réduites (FFmpeg en niveaux de gris,
+  OpenCV en repli en sautant le décodage des images non échantillonnées)
+- énergie de mouvement vectorisée : part des pixels qui changent entre deux
+  images échantillonnées, calculée par lots avec numpy
+- segmentation échanges / temps morts par seuils adaptatifs avec hystérésis,
+  fusion des pauses courtes et marge autour de chaque échange
+
+numpy (et OpenCV en repli) ne sont importés que dans les processus d'analyse.
+"""
+
+import os
+import time
+import base64
+import shutil
+import subprocess
+import tempfile
+from typing import Dict, Any, List, Iterator, Optional
+
+DEFAULT_OPTIONS = {
+    'sample_fps': 5.0,          # images analysées par seconde
+    'frame_width': 160,         # résolution d'analyse
+    'frame_height': 90,
+    'batch_size': 250,          # images par lot vectorisé
+    'pixel_threshold': 12,      # écart de niveau de gris compté comme mouvement
+    'smoothing': 1.0,           # fenêtre de lissage (secondes)
+    'min_energy': 0.002,        # en dessous : aucun échange (vidéo statique)
+    'min_rally': 4.0,           # durée minimale d'un échange (secondes)
+    'max_gap': 3.0,             # pause fusionnée dans l'échange (secondes)
+    'padding': 1.5,             # marge avant / après chaque échange (secondes)
+}
+
+
+def lower_priority():
+    """Initialiseur des processus d'analyse : les workers API restent prioritaires"""
+    try:
+        os.nice(10)
+    except (AttributeError, OSError):
+        pass
+
+
+# ----------------------------------------------------------------------
+# Décodage
+# ----------------------------------------------------------------------
+
+def _ffmpeg_batches(np, video_path: str, options: Dict[str, Any]) -> Iterator:
+    """Lots (n, h, w) décodés par FFmpeg : mise à l'échelle et cadence dans le décodeur"""
+    width, height = options['frame_width'], options['frame_height']
+    frame_size = width * height
+    command = [
+        'ffmpeg', '-v', 'error', '-threads', '1', '-i', video_path, '-an', '-sn',
+        '-vf', f"fps={options['sample_fps']},scale={width}:{height}:flags=area,format=gray",
+        '-f', 'rawvideo', 'pipe:1'
+    ]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        while True:
+            data = process.stdout.read(frame_size * options['batch_size'])
+            count = len(data) // frame_size
+            if count:
+                yield np.frombuffer(data[:count * frame_size], dtype=np.uint8).reshape(count, height, width)
+            if len(data) < frame_size * options['batch_size']:
+                break
+    finally:
+        process.stdout.close()
+        stderr = process.stderr.read()
+        process.stderr.close()
+        if process.wait() != 0:
+            raise RuntimeError(f"FFmpeg: {stderr.decode('utf-8', 'replace').strip()}")
+
+
+def _opencv_batches(np, video_path: str, options: Dict[str, Any], state: Dict[str, Any]) -> Iterator:
+    """Lots (n, h, w) décodés par OpenCV : grab() sans décodage pour les images sautées"""
+    import cv2
+
+    capture = cv2.VideoCapture(video_path)
+    if not capture.isOpened():
+        raise IOError(f"Impossible d'ouvrir la vidéo: {video_path}")
+    source_fps = capture.get(cv2.CAP_PROP_FPS) or 25.0
+    step = max(1, int(round(source_fps / options['sample_fps'])))
+    state['sample_fps'] = source_fps / step
+
+    width, height = options['frame_width'], options['frame_height']
+    batch = np.empty((options['batch_size'], height, width), dtype=np.uint8)
+    count = 0
+    index = 0
+    try:
+        while True:
+            if index % step:
+                if not capture.grab():
+                    break
+            else:
+                ok, frame = capture.read()
+                if not ok:
+                    break
+                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+                cv2.resize(gray, (width, height), dst=batch[count], interpolation=cv2.INTER_AREA)
+                count += 1
+                if count == len(batch):
+                    yield batch
+                    batch = np.empty_like(batch)
+                    count = 0
+            index += 1
+        if count:
+            yield batch[:count]
+    finally:
+        capture.release()
+
+
+# ----------------------------------------------------------------------
+# Signal de mouvement et segmentation
+# ----------------------------------------------------------------------
+
+def motion_energy(np, batches, pixel_threshold: int):
+    """
+    Énergie de mouvement par image échantillonnée : part des pixels dont le
+    niveau varie de plus de pixel_threshold par rapport à l'image précédente.
+    """
+    chunks = []
+    previous = None
+    for batch in batches:
+        if previous is None:
+            stack = batch
+            chunks.append(np.zeros(1, dtype=np.float32))
+        else:
+            stack = np.concatenate((previous[None], batch))
+        diff = np.abs(np.diff(stack.astype(np.int16), axis=0))
+        chunks.append((diff > pixel_threshold).mean(axis=(1, 2), dtype=np.float32))
+        previous = batch[-1].copy()
+    return np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.float32)
+
+
+def _runs(np, mask):
+    """Indices [début, fin[ des suites de True d'un masque booléen"""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def segment_rallies(np, energy, sample_fps: float, options: Dict[str, Any]) -> List[List[float]]:
+    """
+    Découpe le signal en échanges : [[début, fin, score], ...] en secondes.
+    Seuils relatifs au plancher (temps morts) et aux pics du match, avec
+    hystérésis : une zone au-dessus du seuil bas n'est retenue que si elle
+    atteint le seuil haut.
+    """
+    if len(energy) < 2:
+        return []
+    window = max(1, int(round(options['smoothing'] * sample_fps)))
+    smooth = np.convolve(energy, np.ones(window, dtype=np.float32) / window, mode='same')
+
+    floor, peak = np.percentile(smooth, [20, 90])
+    spread = peak - floor
+    if peak < options['min_energy'] or spread <= 0:
+        return []
+    low = max(floor + 0.15 * spread, options['min_energy'])
+    high = max(floor + 0.35 * spread, options['min_energy'])
+
+    starts, ends = _runs(np, smooth > low)
+    if not len(starts):
+        return []
+    # Maximum de chaque zone (les creux entre zones restent sous le seuil bas)
+    peaks = np.maximum.reduceat(smooth, starts)
+    keep = peaks >= high
+    starts, ends = starts[keep], ends[keep]
+    if not len(starts):
+        return []
+
+    # Marge autour des échanges, puis fusion des pauses courtes
+    pad = int(round(options['padding'] * sample_fps))
+    starts = np.maximum(starts - pad, 0)
+    ends = np.minimum(ends + pad, len(smooth))
+    gaps = starts[1:] - ends[:-1]
+    split = gaps >= int(round(options['max_gap'] * sample_fps))
+    starts = starts[np.concatenate(([True], split))]
+    ends = ends[np.concatenate((split, [True]))]
+
+    long_enough = (ends - starts) >= options['min_rally'] * sample_fps
+    starts, ends = starts[long_enough], ends[long_enough]
+    if not len(starts):
+        return []
+
+    cumulative = np.concatenate(([0.0], np.cumsum(smooth, dtype=np.float64)))
+    scores = np.minimum((cumulative[ends] - cumulative[starts]) / (ends - starts) / peak, 1.0)
+    return [[round(float(s) / sample_fps, 2), round(float(e) / sample_fps, 2), round(float(score), 3)]
+            for s, e, score in zip(starts, ends, scores)]
+
+
+def energy_timeline(np, energy, sample_fps: float) -> str:
+    """Énergie moyenne par seconde quantifiée sur un octet, encodée en base64"""
+    per_second = max(1, int(round(sample_fps)))
+    seconds = -(-len(energy) // per_second)
+    padded = np.zeros(seconds * per_second, dtype=np.float32)
+    padded[:len(energy)] = energy
+    levels = padded.reshape(seconds, per_second).mean(axis=1)
+    scale = float(np.percentile(levels, 99)) if seconds else 0.0
+    if scale > 0:
+        levels = np.clip(levels / scale * 255, 0, 255)
+    return base64.b64encode(levels.astype(np.uint8).tobytes()).decode('ascii')
+
+
+def analyze_video(video_path: str, options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Analyse complète d'un fichier : timeline des échanges et énergie par seconde"""
+    import numpy as np
+
+    options = {**DEFAULT_OPTIONS, **(options or {})}
+    started = time.monotonic()
+    state = {'sample_fps': float(options['sample_fps'])}
+    if shutil.which('ffmpeg'):
+        decoder = 'ffmpeg'
+        batches = _ffmpeg_batches(np, video_path, options)
+    else:
+        decoder = 'opencv'
+        batches = _opencv_batches(np, video_path, options, state)
+
+    energy = motion_energy(np, batches, options['pixel_threshold'])
+    sample_fps = state['sample_fps']
+    segments = segment_rallies(np, energy, sample_fps, options)
+    duration = len(energy) / sample_fps
+    return {
+        'decoder': decoder,
+        'sample_fps': round(sample_fps, 3),
+        'frames_analyzed': int(len(energy)),
+        'duration': round(duration, 2),
+        'segments': segments,
+        'rally_seconds': round(sum(end - start for start, end, _ in segments), 2),
+        'energy': energy_timeline(np, energy, sample_fps),
+        'elapsed_seconds': round(time.monotonic() - started, 2)
+    }
+
+
+# ----------------------------------------------------------------------
+# Export du résumé
+# ----------------------------------------------------------------------
+
+def _export_with_ffmpeg(video_path: str, segments: List[List[float]], output_path: str):
+    """Concaténation sans réencodage (coupes alignées sur les images clés)"""
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as listing:
+        escaped = os.path.abspath(video_path).replace("'", "'\\''")
+        for start, end, *_ in segments:
+            listing.write(f"file '{escaped}'\ninpoint {start:.3f}\noutpoint {end:.3f}\n")
+    try:
+        subprocess.run(['ffmpeg', '-y', '-v', 'error', '-f', 'concat', '-safe', '0', '-i', listing.name,
+                        '-c', 'copy', '-movflags', '+faststart', '-f', 'mp4', output_path],
+                       check=True, capture_output=True)
+    finally:
+        os.unlink(listing.name)
+
+
+def _export_with_opencv(video_path: str, segments: List[List[float]], output_path: str):
+    """Repli sans FFmpeg : relecture des seuls segments retenus et réencodage"""
+    import cv2
+
+    capture = cv2.VideoCapture(video_path)
+    if not capture.isOpened():
+        raise IOError(f"Impossible d'ouvrir la vidéo: {video_path}")
+    fps = capture.get(cv2.CAP_PROP_FPS) or 25.0
+    size = (int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)), int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+    writer = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*'mp4v'), fps, size)
+    try:
+        for start, end, *_ in segments:
+            capture.set(cv2.CAP_PROP_POS_FRAMES, int(start * fps))
+            for _ in range(int((end - start) * fps)):
+                ok, frame = capture.read()
+                if not ok:
+                    break
+                writer.write(frame)
+    finally:
+        writer.release()
+        capture.release()
+
+
+def export_highlight_clip(video_path: str, segments: List[List[float]], output_path: str) -> Dict[str, Any]:
+    """Écrit la vidéo résumé (échanges uniquement) ; remplacement atomique du fichier"""
+    started = time.monotonic()
+    root, extension = os.path.splitext(output_path)
+    temporary = f"{root}.part{extension}"
+    if shutil.which('ffmpeg'):
+        method = 'ffmpeg-copy'
+        _export_with_ffmpeg(video_path, segments, temporary)
+    else:
+        method = 'opencv'
+        _export_with_opencv(video_path, segments, temporary)
+    os.replace(temporary, output_path)
+    return {
+        'method': method,
+        'file_size': os.path.getsize(output_path),
+        'source_size': os.path.getsize(video_path),
+        'elapsed_seconds': round(time.monotonic() - started, 2)
+    }
@@ -0,0 +1,212 @@
+"""
+Détection automatique des échanges (temps forts) des matchs enregistrés
+Après la finalisation d'un enregistrement, l'analyse de mouvement
+(highlight_analysis) est soumise à un pool de processus borné : le décodage
+et les calculs numpy ne tiennent jamais le GIL des workers API.
+
+Le résultat est stocké par vidéo (VideoHighlights) et sert :
+- la lecture « sans temps morts » (playlist des segments à enchaîner)
+- l'export d'une vidéo résumé ne contenant que les échanges
+
+Le pool de processus est créé à la première analyse, pas au démarrage.
+"""
+
+import logging
+import threading
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+from typing import Dict, Any, Optional
+import json
+
+from ..models.database import db
+from ..models.user import Video, VideoHighlights
+from .highlight_analysis import DEFAULT_OPTIONS, analyze_video, export_highlight_clip, lower_priority
+
+logger = logging.getLogger(__name__)
+
+
+class HighlightDetector:
+    """Pool d'analyse hors ligne des vidéos (pattern extension Flask)"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.enabled = True
+        self.workers = 1
+        self.auto_export = False
+        self.options: Dict[str, Any] = dict(DEFAULT_OPTIONS)
+        self.lock = threading.Lock()
+        self._executor = None
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Lit la configuration ; aucun processus n'est démarré ici"""
+        self.app = app
+        self.enabled = app.config.get('HIGHLIGHTS_ENABLED', True)
+        self.workers = app.config.get('HIGHLIGHTS_WORKERS', 1)
+        self.auto_export = app.config.get('HIGHLIGHTS_AUTO_EXPORT', False)
+        self.options = {
+            **DEFAULT_OPTIONS,
+            'sample_fps': app.config.get('HIGHLIGHTS_SAMPLE_FPS', DEFAULT_OPTIONS['sample_fps']),
+            'frame_width': app.config.get('HIGHLIGHTS_FRAME_WIDTH', DEFAULT_OPTIONS['frame_width']),
+            'frame_height': app.config.get('HIGHLIGHTS_FRAME_HEIGHT', DEFAULT_OPTIONS['frame_height']),
+            'min_rally': app.config.get('HIGHLIGHTS_MIN_RALLY', DEFAULT_OPTIONS['min_rally']),
+            'max_gap': app.config.get('HIGHLIGHTS_MAX_GAP', DEFAULT_OPTIONS['max_gap']),
+            'padding': app.config.get('HIGHLIGHTS_PADDING', DEFAULT_OPTIONS['padding']),
+        }
+        app.extensions['highlight_detector'] = self
+
+    def _pool(self):
+        """Pool de processus 'spawn' : pas de fork d'un parent multi-thread"""
+        with self.lock:
+            if self._executor is None:
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+
+                self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context('spawn'),
+                                                     initializer=lower_priority)
+            return self._executor
+
+    def video_path(self, video: Video) -> Optional[Path]:
+        """Fichier local d'une vidéo (None si elle n'est pas sur ce disque)"""
+        from .video_capture_service import video_capture_service
+        return video_capture_service.local_video_path(video.file_url)
+
+    # ------------------------------------------------------------------
+    # Analyse
+    # ------------------------------------------------------------------
+
+    def submit(self, video_id: int, video_path: Optional[str] = None) -> Optional[VideoHighlights]:
+        """Planifie l'analyse d'une vidéo ; retourne l'entrée 'pending' (ou None)"""
+        if not self.enabled:
+            return None
+        video = db.session.get(Video, video_id)
+        if video is None:
+            return None
+        path = Path(video_path) if video_path else self.video_path(video)
+        if path is None or not path.exists():
+            logger.warning(f"Analyse des échanges impossible, fichier absent pour la vidéo {video_id}")
+            return None
+
+        highlights = video.highlights or VideoHighlights(video_id=video_id)
+        highlights.status = 'pending'
+        highlights.error = None
+        db.session.add(highlights)
+        db.session.commit()
+
+        future = self._pool().submit(analyze_video, str(path), self.options)
+        future.add_done_callback(partial(self._store_analysis, video_id, str(path)))
+        self.submitted += 1
+        logger.info(f"Analyse des échanges planifiée pour la vidéo {video_id}")
+        return highlights
+
+    def _store_analysis(self, video_id: int, video_path: str, future):
+        """Rappel du pool : enregistre la timeline (thread du pool, hors requête)"""
+        with self.app.app_context():
+            highlights = db.session.query(VideoHighlights).filter_by(video_id=video_id).first()
+            if highlights is None:  # vidéo supprimée entre-temps
+                return
+            try:
+                result = future.result()
+                highlights.status = 'ready'
+                highlights.segments = json.dumps(result['segments'], separators=(',', ':'))
+                highlights.energy = result['energy']
+                highlights.duration = result['duration']
+                highlights.rally_seconds = result['rally_seconds']
+                highlights.sample_fps = result['sample_fps']
+                highlights.decoder = result['decoder']
+                highlights.analyzed_at = datetime.utcnow()
+                self.completed += 1
+                logger.info(f"Vidéo {video_id} analysée en {result['elapsed_seconds']}s : "
+                            f"{len(result['segments'])} échanges, {result['rally_seconds']:.0f}s "
+                            f"sur {result['duration']:.0f}s")
+            except Exception as e:
+                highlights.status = 'error'
+                highlights.error = str(e) or type(e).__name__
+                self.failed += 1
+                logger.error(f"Erreur d'analyse des échanges pour la vidéo {video_id}: {e}")
+            db.session.commit()
+
+            if self.auto_export and highlights.status == 'ready' and highlights.get_segments():
+                self.export(video_id, video_path)
+
+    # ------------------------------------------------------------------
+    # Export du résumé et lecture sans temps morts
+    # ------------------------------------------------------------------
+
+    def export(self, video_id: int, video_path: Optional[str] = None) -> Optional[VideoHighlights]:
+        """Planifie l'export de la vidéo résumé (échanges uniquement)"""
+        highlights = db.session.query(VideoHighlights).filter_by(video_id=video_id).first()
+        if highlights is None or highlights.status != 'ready' or not highlights.get_segments():
+            return None
+        path = Path(video_path) if video_path else self.video_path(highlights.video)
+        if path is None:
+            return None
+
+        filename = f"highlights_{video_id}.mp4"
+        highlights.clip_status = 'pending'
+        db.session.commit()
+
+        future = self._pool().submit(export_highlight_clip, str(path), highlights.get_segments(),
+                                     str(path.parent / filename))
+        future.add_done_callback(partial(self._store_export, video_id, filename))
+        return highlights
+
+    def _store_export(self, video_id: int, filename: str, future):
+        with self.app.app_context():
+            highlights = db.session.query(VideoHighlights).filter_by(video_id=video_id).first()
+            if highlights is None:
+                return
+            try:
+                result = future.result()
+                highlights.clip_status = 'ready'
+                highlights.clip_url = f"/videos/{filename}"
+                highlights.clip_size = result['file_size']
+                logger.info(f"Résumé de la vidéo {video_id} : {result['file_size']} octets "
+                            f"au lieu de {result['source_size']} ({result['method']})")
+            except Exception as e:
+                highlights.clip_status = 'error'
+                highlights.error = str(e) or type(e).__name__
+                logger.error(f"Erreur d'export du résumé de la vidéo {video_id}: {e}")
+            db.session.commit()
+
+    def playlist(self, video: Video, highlights: VideoHighlights) -> Dict[str, Any]:
+        """Lecture sans temps morts : segments à enchaîner dans le fichier complet"""
+        segments = highlights.get_segments()
+        total = sum(end - start for start, end, _ in segments)
+        full = highlights.duration or video.duration or 0
+        return {
+            'video_url': video.file_url,
+            'clip_url': highlights.clip_url if highlights.clip_status == 'ready' else None,
+            'segments': [{'start': start, 'end': end} for start, end, _ in segments],
+            'total_seconds': round(total, 2),
+            'full_seconds': full,
+            'skipped_ratio': round(1 - total / full, 3) if full else None
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'enabled': self.enabled,
+            'workers': self.workers,
+            'running': self._executor is not None,
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'failed': self.failed,
+            'options': self.options
+        }
+
+    def shutdown(self, wait: bool = False):
+        with self.lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+# Instance globale du service (configurée par init_app dans create_app)
+highlight_detector = HighlightDetector()
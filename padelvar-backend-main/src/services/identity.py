@@ -0,0 +1,162 @@
+"""
+Couche d'identité commune à tous les blueprints
+- l'utilisateur courant est chargé au plus une fois par requête (flask.g)
+- rôle et club sont mis en cache dans la session signée avec un tampon de
+  version, pour autoriser sans requête SQL sur le chemin critique
+- les claims sont revalidés en base quand ils sont trop anciens
+  (IDENTITY_REVALIDATE_SECONDS) ou quand le rôle, le club ou le mot de passe
+  de l'utilisateur change dans ce processus
+- un changement de mot de passe ferme les autres sessions
+"""
+
+import time
+import hashlib
+import logging
+from functools import wraps
+from typing import Optional, Dict, Any
+
+from flask import g, session, jsonify, current_app
+from sqlalchemy import event, inspect
+
+from ..models.database import db
+from ..models.user import User, UserRole
+from .password_hasher import password_salt
+
+logger = logging.getLogger(__name__)
+
+# Attributs dont la modification invalide les sessions existantes
+_IDENTITY_ATTRIBUTES = ('role', 'club_id', 'password_hash')
+
+# user_id -> instant de la dernière invalidation (processus courant)
+_invalidated: Dict[int, float] = {}
+
+
+def _identity_version(user: User) -> str:
+    """Tampon de version des identifiants : change avec le mot de passe (son sel)"""
+    raw = f"{user.id}:{password_salt(user.password_hash)}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:16]
+
+
+def _stamp_session(user: User):
+    """Écrit les claims de l'utilisateur dans la session signée"""
+    session['user_id'] = user.id
+    session['user_role'] = user.role.value
+    session['club_id'] = user.club_id
+    session['identity_version'] = _identity_version(user)
+    session['identity_checked_at'] = time.time()
+
+
+def _claims_stale(user_id: int) -> bool:
+    checked_at = session.get('identity_checked_at')
+    if checked_at is None or 'identity_version' not in session:
+        return True
+    max_age = current_app.config.get('IDENTITY_REVALIDATE_SECONDS', 300)
+    if time.time() - checked_at > max_age:
+        return True
+    return checked_at < _invalidated.get(user_id, 0)
+
+
+def invalidate_identity(user_id: int):
+    """Force la revalidation des sessions de cet utilisateur (processus courant)"""
+    _invalidated[user_id] = time.time()
+
+
+def login_user(user: User):
+    """Ouvre la session de l'utilisateur"""
+    session.clear()
+    session.permanent = True
+    _stamp_session(user)
+    g._identity_user = user
+
+
+def logout_user():
+    """Ferme la session courante"""
+    session.clear()
+    g.pop('_identity_user', None)
+
+
+def current_user() -> Optional[User]:
+    """
+    Utilisateur connecté, chargé au plus une fois par requête.
+    Rafraîchit les claims de session s'ils sont périmés.
+    """
+    if '_identity_user' in g:
+        return g._identity_user
+
+    user = None
+    user_id = session.get('user_id')
+    if user_id:
+        user = db.session.get(User, user_id)
+        if user is None or session.get('identity_version', _identity_version(user)) != _identity_version(user):
+            # Utilisateur supprimé ou mot de passe changé depuis la connexion
+            session.clear()
+            user = None
+        elif _claims_stale(user.id):
+            _stamp_session(user)
+
+    g._identity_user = user
+    return user
+
+
+def current_identity() -> Optional[Dict[str, Any]]:
+    """
+    Claims de la session (user_id, role, club_id) sans requête SQL
+    tant qu'ils sont frais ; revalidés en base sinon.
+    """
+    user_id = session.get('user_id')
+    if not user_id:
+        return None
+    if _claims_stale(user_id) and current_user() is None:
+        return None
+    return {
+        'user_id': session['user_id'],
+        'role': session.get('user_role'),
+        'club_id': session.get('club_id')
+    }
+
+
+def has_role(*roles) -> bool:
+    """Vrai si l'utilisateur connecté a l'un des rôles donnés"""
+    identity = current_identity()
+    allowed = {role.value if isinstance(role, UserRole) else role for role in roles}
+    return identity is not None and identity['role'] in allowed
+
+
+def login_required(view):
+    """Décorateur : 401 si aucune session valide"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if current_identity() is None:
+            return jsonify({'error': 'Non authentifié'}), 401
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def roles_required(*roles):
+    """Décorateur : 401 sans session, 403 si le rôle n'est pas autorisé"""
+    allowed = {role.value if isinstance(role, UserRole) else role for role in roles}
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            identity = current_identity()
+            if identity is None:
+                return jsonify({'error': 'Non authentifié'}), 401
+            if identity['role'] not in allowed:
+                return jsonify({'error': 'Accès non autorisé'}), 403
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@event.listens_for(User, 'after_update')
+def _invalidate_on_identity_change(mapper, connection, target):
+    """Invalide les sessions quand rôle, club ou mot de passe changent"""
+    state = inspect(target)
+    if any(state.attrs[name].history.has_changes() for name in _IDENTITY_ATTRIBUTES):
+        invalidate_identity(target.id)
+
+
+@event.listens_for(User, 'after_delete')
+def _invalidate_on_delete(mapper, connection, target):
+    invalidate_identity(target.id)
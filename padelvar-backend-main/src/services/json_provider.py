@@ -0,0 +1,87 @@
+"""
+Fournisseur JSON de l'application
+- orjson quand le module est installé (sérialisation en C, datetime et Enum
+  natifs), sinon la bibliothèque standard
+- dans les deux cas : datetime / date en ISO 8601 (comme les to_dict des
+  modèles), Enum par leur valeur, Decimal et UUID en texte
+- même contrat que le fournisseur par défaut de Flask (jsonify, request.json)
+"""
+
+import json
+import uuid
+import decimal
+import logging
+from datetime import date, datetime, time
+from enum import Enum
+from typing import Any
+
+from flask.json.provider import DefaultJSONProvider
+
+logger = logging.getLogger(__name__)
+
+try:  # dépendance optionnelle
+    import orjson
+except ImportError:  # pragma: no cover - dépend de l'environnement
+    orjson = None
+
+
+def default_encoder(o: Any) -> Any:
+    """Types non natifs JSON, identiques pour orjson et la bibliothèque standard"""
+    if isinstance(o, (datetime, date, time)):
+        return o.isoformat()
+    if isinstance(o, Enum):
+        return o.value
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    if isinstance(o, (set, frozenset)):
+        return list(o)
+    raise TypeError(f"Objet de type {type(o).__name__} non sérialisable en JSON")
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Fournisseur JSON (JSON_PROVIDER : 'auto', 'orjson' ou 'stdlib')"""
+
+    default = staticmethod(default_encoder)
+    ensure_ascii = False
+
+    def __init__(self, app):
+        super().__init__(app)
+        backend = app.config.get('JSON_PROVIDER', 'auto')
+        if backend == 'orjson' and orjson is None:
+            logger.warning("JSON_PROVIDER=orjson mais orjson n'est pas installé, repli sur json")
+        self.backend = 'orjson' if orjson is not None and backend in ('auto', 'orjson') else 'stdlib'
+
+    def _orjson_options(self, kwargs) -> int:
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATACLASS
+        if kwargs.get('sort_keys', self.sort_keys):
+            options |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if self.backend == 'orjson' and not kwargs.get('cls'):
+            return orjson.dumps(obj, default=self.default, option=self._orjson_options(kwargs)).decode('utf-8')
+        kwargs.setdefault('default', self.default)
+        kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs: Any) -> Any:
+        if self.backend == 'orjson' and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        """Comme Flask, mais encode directement en octets avec orjson"""
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = self.compact is False or (self.compact is None and self._app.debug)
+        if self.backend == 'orjson':
+            options = self._orjson_options({'indent': 2 if pretty else None})
+            body = orjson.dumps(obj, default=self.default, option=options) + b'\n'
+        else:
+            dump_args = {'indent': 2} if pretty else {'separators': (',', ':')}
+            body = f"{self.dumps(obj, **dump_args)}\n"
+        return self._app.response_class(body, mimetype=self.mimetype)
@@ -0,0 +1,220 @@
+"""
+Sonde des fichiers vidéo : durée, résolution, codecs, débit et images clés
+Mesurés une fois par version de fichier (taille + date de modification) et
+gardés dans video_metadata ; Video.duration et Video.file_size sont recopiés
+depuis la mesure, en secondes et en octets, pour que listes et lecteurs lisent
+une valeur juste sans rien recalculer.
+
+- MP4 (cas des enregistrements) : tables du conteneur lues par mp4_index,
+  sans décodage ni sous-processus (quelques millisecondes)
+- autres formats ou MP4 fragmentés : ffprobe, si disponible
+
+Les positions des images clés sont stockées en écarts de millisecondes,
+compressés (une centaine d'octets pour un GOP régulier de deux heures).
+"""
+
+import json
+import time
+import zlib
+import base64
+import shutil
+import logging
+import subprocess
+from array import array
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from ..models.database import db
+from ..models.user import Video, VideoMetadata
+from .mp4_index import read_media_info
+
+logger = logging.getLogger(__name__)
+
+# Entrées d'échantillon MP4 -> noms de codecs (ceux de ffprobe)
+CODEC_NAMES = {
+    'avc1': 'h264', 'avc3': 'h264', 'hvc1': 'hevc', 'hev1': 'hevc', 'mp4v': 'mpeg4',
+    'av01': 'av1', 'vp09': 'vp9', 'mp4a': 'aac', 'Opus': 'opus', 'ac-3': 'ac3', 'ec-3': 'eac3'
+}
+
+
+def encode_keyframes(keyframes: List[float]) -> str:
+    """Positions (secondes) -> écarts en ms, compressés et encodés en base64"""
+    deltas, previous = array('I'), 0
+    for position in keyframes:
+        milliseconds = int(round(position * 1000))
+        deltas.append(max(0, milliseconds - previous))
+        previous = milliseconds
+    return base64.b64encode(zlib.compress(deltas.tobytes(), 9)).decode('ascii')
+
+
+def decode_keyframes(data: Optional[str]) -> List[float]:
+    if not data:
+        return []
+    deltas = array('I')
+    deltas.frombytes(zlib.decompress(base64.b64decode(data)))
+    keyframes, position = [], 0
+    for delta in deltas:
+        position += delta
+        keyframes.append(position / 1000)
+    return keyframes
+
+
+def _ffprobe(path: Path) -> Dict[str, Any]:
+    """Repli ffprobe : flux et format, puis paquets vidéo marqués 'K' (sans décodage)"""
+    described = json.loads(subprocess.run(
+        ['ffprobe', '-v', 'error', '-show_entries',
+         'format=duration:stream=codec_type,codec_name,width,height,avg_frame_rate,nb_frames',
+         '-of', 'json', str(path)],
+        check=True, capture_output=True, text=True
+    ).stdout)
+    streams = described.get('streams', [])
+    video = next((s for s in streams if s.get('codec_type') == 'video'), {})
+    audio = next((s for s in streams if s.get('codec_type') == 'audio'), {})
+    fps = None
+    if video.get('avg_frame_rate', '0/0') not in ('0/0', ''):
+        numerator, _, denominator = video['avg_frame_rate'].partition('/')
+        fps = round(float(numerator) / float(denominator or 1), 3) if float(denominator or 1) else None
+
+    output = subprocess.run(
+        ['ffprobe', '-v', 'error', '-select_streams', 'v:0', '-show_entries', 'packet=pts_time,flags',
+         '-of', 'csv=p=0', str(path)],
+        check=True, capture_output=True, text=True
+    ).stdout
+    keyframes, last = [], 0.0
+    for line in output.splitlines():
+        pts, _, flags = line.partition(',')
+        if pts and pts != 'N/A':
+            last = max(last, float(pts))
+            if 'K' in flags:
+                keyframes.append(round(float(pts), 3))
+
+    duration = described.get('format', {}).get('duration')
+    return {
+        'keyframes': sorted(keyframes),
+        'duration': round(float(duration), 3) if duration not in (None, 'N/A') else round(last, 3),
+        'width': video.get('width'),
+        'height': video.get('height'),
+        'fps': fps,
+        'video_codec': video.get('codec_name'),
+        'audio_codec': audio.get('codec_name'),
+    }
+
+
+def probe_file(path) -> Dict[str, Any]:
+    """Mesure un fichier (conteneur MP4, sinon ffprobe) ; ValueError s'il est illisible"""
+    path = Path(path)
+    started = time.perf_counter()
+    stat = path.stat()
+    info, source = read_media_info(str(path)), 'mp4'
+    if info is not None:
+        info['video_codec'] = CODEC_NAMES.get(info['video_codec'], info['video_codec'])
+        info['audio_codec'] = CODEC_NAMES.get(info['audio_codec'], info['audio_codec'])
+    elif shutil.which('ffprobe'):
+        try:
+            info, source = _ffprobe(path), 'ffprobe'
+        except (subprocess.CalledProcessError, ValueError) as e:
+            raise ValueError(f"ffprobe n'a pas pu lire {path.name}: {e}") from e
+    if info is None:
+        raise ValueError(f"Format non reconnu pour {path.name} (MP4 attendu, ou ffprobe)")
+
+    duration = info.get('duration') or 0.0
+    return {
+        'duration': duration,
+        'width': info.get('width'),
+        'height': info.get('height'),
+        'fps': info.get('fps'),
+        'video_codec': info.get('video_codec'),
+        'audio_codec': info.get('audio_codec'),
+        'bitrate': int(stat.st_size * 8 / duration) if duration else None,
+        'keyframes': info.get('keyframes') or [],
+        'file_size': stat.st_size,
+        'file_mtime_ns': stat.st_mtime_ns,
+        'source': source,
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 2)
+    }
+
+
+class MediaProbe:
+    """Cache des métadonnées mesurées par vidéo (pattern extension Flask)"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.probed = 0
+        self.cache_hits = 0
+        self.failed = 0
+        self.probe_ms = 0.0
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions['media_probe'] = self
+
+    def metadata(self, video_id: int, path, refresh: bool = False) -> VideoMetadata:
+        """Métadonnées d'une vidéo : celles en base si le fichier n'a pas changé, sinon une nouvelle mesure"""
+        path = Path(path)
+        stat = path.stat()
+        record = db.session.query(VideoMetadata).filter_by(video_id=video_id).first()
+        if not refresh and record is not None and record.file_size == stat.st_size \
+                and record.file_mtime_ns == stat.st_mtime_ns:
+            self.cache_hits += 1
+            return record
+
+        try:
+            probe = probe_file(path)
+        except Exception:
+            self.failed += 1
+            raise
+        self.probed += 1
+        self.probe_ms += probe['elapsed_ms']
+
+        record = record or VideoMetadata(video_id=video_id)
+        for field in ('file_size', 'file_mtime_ns', 'duration', 'width', 'height', 'fps',
+                      'video_codec', 'audio_codec', 'bitrate', 'source'):
+            setattr(record, field, probe[field])
+        record.keyframe_count = len(probe['keyframes'])
+        record.keyframes = encode_keyframes(probe['keyframes'])
+        record.probed_at = datetime.utcnow()
+        db.session.add(record)
+
+        # Colonnes lues par les listes : recopiées depuis la mesure
+        video = db.session.get(Video, video_id)
+        if video is not None:
+            video.duration = int(round(probe['duration'])) if probe['duration'] else video.duration
+            video.file_size = probe['file_size']
+        db.session.commit()
+        logger.info(f"Vidéo {video_id} sondée ({probe['source']}, {probe['elapsed_ms']}ms) : "
+                    f"{probe['duration']:.1f}s, {probe['width']}x{probe['height']}, {probe['video_codec']}, "
+                    f"{len(probe['keyframes'])} images clés")
+        return record
+
+    def probe_video(self, video: Video, refresh: bool = False) -> Optional[VideoMetadata]:
+        """Sonde le fichier local d'une vidéo s'il existe (None sinon ou en cas d'échec)"""
+        from .video_capture_service import video_capture_service
+
+        path = video_capture_service.local_video_path(video.file_url)
+        if path is None:
+            return None
+        try:
+            return self.metadata(video.id, path, refresh=refresh)
+        except Exception as e:
+            db.session.rollback()
+            logger.warning(f"Sonde impossible pour la vidéo {video.id}: {e}")
+            return None
+
+    def keyframes(self, record: VideoMetadata) -> List[float]:
+        return decode_keyframes(record.keyframes)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'probed': self.probed,
+            'cache_hits': self.cache_hits,
+            'failed': self.failed,
+            'avg_probe_ms': round(self.probe_ms / self.probed, 2) if self.probed else None
+        }
+
+
+# Instance globale du service (configurée par init_app dans create_app)
+media_probe = MediaProbe()
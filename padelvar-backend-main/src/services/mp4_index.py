@@ -0,0 +1,215 @@
+"""
+Lecture des tables d'un fichier MP4 sans décodage ni dépendance
+Seule la boîte 'moov' est lue (quelques centaines de Ko pour un match de
+deux heures) : échelle de temps, durées des échantillons (stts) et
+échantillons de synchronisation (stss) de la piste vidéo, d'où la position
+de chaque image clé.
+
+read_media_info y ajoute les codecs (entrées 'stsd'), la durée du conteneur
+('mvhd') et la cadence moyenne : de quoi décrire un fichier sans ffprobe.
+
+Les fichiers fragmentés (moof) ou non MP4 retournent None : l'appelant se
+rabat alors sur ffprobe.
+"""
+
+import struct
+from typing import Optional, Dict, Any, List, Iterator, Tuple
+
+# Boîtes conteneurs parcourues pour atteindre les tables d'échantillons
+_CONTAINERS = {b'moov', b'trak', b'mdia', b'minf', b'stbl', b'edts'}
+
+
+def _boxes(data: bytes, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[bytes, int, int]]:
+    """(type, début du contenu, fin) des boîtes de data[start:end]"""
+    end = len(data) if end is None else end
+    offset = start
+    while offset + 8 <= end:
+        size, kind = struct.unpack_from('>I4s', data, offset)
+        header = 8
+        if size == 1:
+            if offset + 16 > end:
+                return
+            (size,) = struct.unpack_from('>Q', data, offset + 8)
+            header = 16
+        elif size == 0:
+            size = end - offset
+        if size < header or offset + size > end:
+            return
+        yield kind, offset + header, offset + size
+        offset += size
+
+
+def _child(data: bytes, start: int, end: int, kind: bytes) -> Optional[Tuple[int, int]]:
+    for child_kind, child_start, child_end in _boxes(data, start, end):
+        if child_kind == kind:
+            return child_start, child_end
+    return None
+
+
+def _read_moov(path: str) -> Optional[bytes]:
+    """Contenu de la boîte 'moov' (en début ou en fin de fichier)"""
+    with open(path, 'rb') as f:
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                return None
+            size, kind = struct.unpack('>I4s', header)
+            header_size = 8
+            if size == 1:
+                (size,) = struct.unpack('>Q', f.read(8))
+                header_size = 16
+            elif size == 0:
+                if kind != b'moov':
+                    return None
+                return f.read()
+            if size < header_size:
+                return None
+            if kind == b'moov':
+                payload = f.read(size - header_size)
+                return payload if len(payload) == size - header_size else None
+            f.seek(size - header_size, 1)
+
+
+def _full_box(data: bytes, start: int) -> int:
+    """Version d'une 'full box' (1 octet de version, 3 de drapeaux)"""
+    return data[start]
+
+
+def _sample_entry(moov: bytes, stbl: Tuple[int, int]) -> Optional[str]:
+    """Code de la première entrée 'stsd' (avc1, hvc1, mp4a...)"""
+    stsd = _child(moov, *stbl, b'stsd')
+    if stsd is None or stsd[0] + 16 > stsd[1]:
+        return None
+    return moov[stsd[0] + 12:stsd[0] + 16].decode('latin-1').strip()
+
+
+def _track(moov: bytes, handler: bytes = b'vide') -> Optional[Dict[str, Any]]:
+    """Tables de la première piste du type handler ('vide' ou 'soun')"""
+    for kind, trak_start, trak_end in _boxes(moov):
+        if kind != b'trak':
+            continue
+        mdia = _child(moov, trak_start, trak_end, b'mdia')
+        if mdia is None:
+            continue
+        hdlr = _child(moov, *mdia, b'hdlr')
+        if hdlr is None or moov[hdlr[0] + 8:hdlr[0] + 12] != handler:
+            continue
+
+        mdhd = _child(moov, *mdia, b'mdhd')
+        minf = _child(moov, *mdia, b'minf')
+        stbl = _child(moov, *minf, b'stbl') if minf else None
+        if mdhd is None or stbl is None:
+            return None
+        if _full_box(moov, mdhd[0]) == 1:
+            timescale, duration = struct.unpack_from('>IQ', moov, mdhd[0] + 20)
+        else:
+            timescale, duration = struct.unpack_from('>II', moov, mdhd[0] + 12)
+
+        tkhd = _child(moov, trak_start, trak_end, b'tkhd')
+        width = height = None
+        if tkhd is not None:
+            # Largeur et hauteur en virgule fixe 16.16, en fin de boîte
+            width, height = (value >> 16 for value in struct.unpack_from('>II', moov, tkhd[1] - 8))
+
+        return {'moov': moov, 'stbl': stbl, 'timescale': timescale, 'duration': duration,
+                'width': width, 'height': height, 'codec': _sample_entry(moov, stbl)}
+    return None
+
+
+def _video_track(moov: bytes) -> Optional[Dict[str, Any]]:
+    return _track(moov, b'vide')
+
+
+def _table(moov: bytes, stbl: Tuple[int, int], kind: bytes, fields: str) -> Optional[List]:
+    box = _child(moov, *stbl, kind)
+    if box is None:
+        return None
+    (count,) = struct.unpack_from('>I', moov, box[0] + 4)
+    item = struct.calcsize('>' + fields)
+    if box[0] + 8 + count * item > box[1]:
+        return None
+    values = struct.unpack_from(f'>{count * len(fields)}I', moov, box[0] + 8)
+    if len(fields) == 1:
+        return list(values)
+    return [values[i:i + len(fields)] for i in range(0, len(values), len(fields))]
+
+
+def read_keyframes(path: str) -> Optional[Dict[str, Any]]:
+    """
+    Index des images clés d'un MP4 : {'keyframes': [secondes...], 'duration',
+    'frames', 'width', 'height'} ; None si le fichier n'est pas lisible ainsi.
+    """
+    try:
+        moov = _read_moov(path)
+    except OSError:
+        return None
+    if moov is None:
+        return None
+    track = _video_track(moov)
+    if track is None or not track['timescale']:
+        return None
+
+    stts = _table(moov, track['stbl'], b'stts', 'II')  # (nombre, durée) par série
+    if not stts:
+        return None
+    stss = _table(moov, track['stbl'], b'stss', 'I')  # numéros (base 1) des images clés
+    frames = sum(count for count, _ in stts)
+    timescale = track['timescale']
+
+    if stss is None:
+        # Pas de table : toutes les images sont des images clés
+        stss = range(1, frames + 1)
+
+    # Parcours simultané des séries stts et des images clés (triées)
+    keyframes = []
+    sample, time_units = 1, 0
+    runs = iter(stts)
+    count, delta = next(runs)
+    for number in stss:
+        while number >= sample + count:
+            sample += count
+            time_units += count * delta
+            try:
+                count, delta = next(runs)
+            except StopIteration:
+                count, delta = frames + 1, 0
+        keyframes.append(round((time_units + (number - sample) * delta) / timescale, 3))
+
+    return {
+        'keyframes': keyframes,
+        'duration': round(track['duration'] / timescale, 3),
+        'frames': frames,
+        'width': track['width'],
+        'height': track['height']
+    }
+
+
+def _movie_duration(moov: bytes) -> Optional[float]:
+    """Durée du conteneur (boîte 'mvhd'), toutes pistes confondues"""
+    mvhd = _child(moov, 0, len(moov), b'mvhd')
+    if mvhd is None:
+        return None
+    if _full_box(moov, mvhd[0]) == 1:
+        timescale, duration = struct.unpack_from('>IQ', moov, mvhd[0] + 20)
+    else:
+        timescale, duration = struct.unpack_from('>II', moov, mvhd[0] + 12)
+    return round(duration / timescale, 3) if timescale else None
+
+
+def read_media_info(path: str) -> Optional[Dict[str, Any]]:
+    """
+    read_keyframes complété des codecs vidéo et audio, de la durée du
+    conteneur et de la cadence moyenne ; None si le fichier n'est pas lisible ainsi.
+    """
+    info = read_keyframes(path)
+    if info is None:
+        return None
+    moov = _read_moov(path)
+    video = _video_track(moov)
+    audio = _track(moov, b'soun')
+    track_duration = info['duration']
+    info['video_codec'] = video['codec'] if video else None
+    info['audio_codec'] = audio['codec'] if audio else None
+    info['fps'] = round(info['frames'] / track_duration, 3) if track_duration else None
+    info['duration'] = _movie_duration(moov) or track_duration
+    return info
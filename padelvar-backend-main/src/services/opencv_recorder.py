@@ -0,0 +1,288 @@
+"""
+Enregistreur OpenCV (repli quand FFmpeg est indisponible)
+Pipeline en deux étages :
+- un thread de capture lit la caméra (ou le relais) dans un tampon d'images
+  préalloué : les tableaux numpy sont réutilisés, aucune allocation par image
+- l'étage d'écriture est cadencé sur des échéances absolues (t0 + n / fps) :
+  le temps de lecture et d'écriture ne décale pas la cadence, l'image la plus
+  récente est écrite à chaque échéance, dupliquée si la caméra n'a rien
+  produit, et les images intermédiaires sont comptées comme perdues
+
+Les métriques (fps effectif, duplications, pertes, latences) sont mises à jour
+en continu dans `metrics` et exposées par le statut d'enregistrement.
+
+OpenCV et numpy sont importés à la construction de l'enregistreur seulement.
+"""
+
+import time
+import logging
+import threading
+from typing import Callable, Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class FrameSlots:
+    """
+    Tampon d'images préalloué (au moins 3 emplacements) : la capture écrit
+    toujours dans un emplacement libre, l'écriture lit le plus récent publié,
+    et aucun des deux ne touche l'emplacement de l'autre.
+    """
+
+    def __init__(self, np, capacity: int, shape):
+        self.slots = np.empty((max(3, capacity),) + tuple(shape), dtype=np.uint8)
+        self.capacity = len(self.slots)
+        self.lock = threading.Lock()
+        self.write_index = 0
+        self.latest_index: Optional[int] = None
+        self.reading_index: Optional[int] = None
+        self.seq = 0
+        self.latest_timestamp = 0.0
+
+    def writable(self):
+        return self.slots[self.write_index]
+
+    def publish(self, timestamp: float):
+        """Publie l'emplacement en cours d'écriture et passe au suivant libre"""
+        with self.lock:
+            self.latest_index = self.write_index
+            self.latest_timestamp = timestamp
+            self.seq += 1
+            index = (self.write_index + 1) % self.capacity
+            while index in (self.reading_index, self.latest_index):
+                index = (index + 1) % self.capacity
+            self.write_index = index
+
+    def acquire_latest(self):
+        """(seq, image) de la dernière publication, réservée jusqu'à release()"""
+        with self.lock:
+            if self.latest_index is None:
+                return 0, None
+            self.reading_index = self.latest_index
+            return self.seq, self.slots[self.reading_index]
+
+    def release(self):
+        with self.lock:
+            self.reading_index = None
+
+
+class OpenCVRecorder:
+    """Enregistrement d'une session : thread de capture + écriture cadencée"""
+
+    def __init__(self, source_url: str, video_path: str, fps: float, max_duration: float,
+                 should_stop: Callable[[], bool], relay_subscriber=None, ring_size: int = 8,
+                 fourcc: str = 'mp4v', max_catchup: float = 1.0, reconnect_after: int = 50):
+        import cv2
+        import numpy as np
+
+        self.cv2 = cv2
+        self.np = np
+        self.source_url = source_url
+        self.video_path = video_path
+        self.fps = float(fps)
+        self.max_duration = max_duration
+        self.should_stop = should_stop
+        self.relay_subscriber = relay_subscriber
+        self.ring_size = ring_size
+        self.fourcc = fourcc
+        self.max_catchup = max_catchup
+        self.reconnect_after = reconnect_after
+
+        self.slots: Optional[FrameSlots] = None
+        self.stopped = threading.Event()
+        self.capture = None
+        self.metrics: Dict[str, Any] = {
+            'source': 'relay' if relay_subscriber is not None else 'camera',
+            'target_fps': self.fps,
+            'capture_fps': None,
+            'effective_fps': None,
+            'frames_captured': 0,
+            'frames_written': 0,
+            'frames_duplicated': 0,
+            'frames_dropped': 0,
+            'relay_frames_skipped': 0,
+            'deadlines_missed': 0,
+            'capture_errors': 0,
+            'reconnections': 0,
+            'capture_read_ms_avg': None,
+            'write_ms_avg': None,
+            'write_ms_max': None,
+            'max_lateness_ms': 0.0,
+            'elapsed_seconds': 0.0
+        }
+
+    # ------------------------------------------------------------------
+    # Étage de capture
+    # ------------------------------------------------------------------
+
+    def _open_capture(self):
+        if self.capture is not None:
+            self.capture.release()
+        self.capture = self.cv2.VideoCapture(self.source_url)
+        if not self.capture.isOpened():
+            raise IOError(f"Impossible d'ouvrir la caméra: {self.source_url}")
+
+    def _read_frame(self, into=None):
+        """Lit une image, dans `into` si fourni ; None si aucune image"""
+        cv2 = self.cv2
+        if self.relay_subscriber is not None:
+            jpegs = self.relay_subscriber.read(timeout=1.0)
+            if not jpegs:
+                return None
+            # Seule la plus récente est décodée : les précédentes sont périmées
+            self.metrics['relay_frames_skipped'] += len(jpegs) - 1
+            frame = cv2.imdecode(self.np.frombuffer(jpegs[-1], dtype=self.np.uint8), cv2.IMREAD_COLOR)
+        else:
+            ok, frame = self.capture.read(into) if into is not None else self.capture.read()
+            if not ok:
+                return None
+
+        if frame is None or into is None or frame is into:
+            return frame
+        if frame.shape != into.shape:
+            # Changement de résolution de la caméra : redimensionné dans l'emplacement
+            cv2.resize(frame, (into.shape[1], into.shape[0]), dst=into)
+        else:
+            self.np.copyto(into, frame)
+        return into
+
+    def _first_frame(self, deadline: float):
+        """Première image : fixe la taille du tampon et de la vidéo"""
+        while time.monotonic() < deadline and not self.should_stop():
+            frame = self._read_frame()
+            if frame is not None:
+                return frame
+            self.metrics['capture_errors'] += 1
+            time.sleep(0.1)
+        return None
+
+    def _capture_loop(self):
+        read_total = 0.0
+        failures = 0
+        window_start, window_frames = time.monotonic(), 0
+        while not self.stopped.is_set():
+            started = time.perf_counter()
+            try:
+                frame = self._read_frame(self.slots.writable())
+            except Exception as e:
+                logger.warning(f"Erreur de capture OpenCV: {e}")
+                frame = None
+            if frame is None:
+                self.metrics['capture_errors'] += 1
+                failures += 1
+                if self.relay_subscriber is None and failures >= self.reconnect_after:
+                    try:
+                        self._open_capture()
+                        self.metrics['reconnections'] += 1
+                    except IOError as e:
+                        logger.warning(str(e))
+                    failures = 0
+                time.sleep(0.02)
+                continue
+
+            failures = 0
+            read_total += time.perf_counter() - started
+            self.slots.publish(time.monotonic())
+            captured = self.metrics['frames_captured'] = self.metrics['frames_captured'] + 1
+            self.metrics['capture_read_ms_avg'] = round(read_total / captured * 1000, 2)
+
+            window_frames += 1
+            elapsed = time.monotonic() - window_start
+            if elapsed >= 2.0:
+                self.metrics['capture_fps'] = round(window_frames / elapsed, 2)
+                window_start, window_frames = time.monotonic(), 0
+
+    # ------------------------------------------------------------------
+    # Étage d'écriture
+    # ------------------------------------------------------------------
+
+    def run(self) -> Dict[str, Any]:
+        """Enregistre jusqu'à l'arrêt ou la durée maximale ; retourne les métriques"""
+        cv2 = self.cv2
+        if self.relay_subscriber is None:
+            self._open_capture()
+            source_fps = self.capture.get(cv2.CAP_PROP_FPS) or 0
+            if 1 <= source_fps <= 60:
+                # Cadence annoncée par la caméra plutôt qu'une valeur supposée
+                self.fps = float(source_fps)
+                self.metrics['target_fps'] = self.fps
+
+        first = self._first_frame(time.monotonic() + 10)
+        if first is None:
+            self._release()
+            raise IOError(f"Aucune image reçue de {self.source_url}")
+
+        height, width = first.shape[:2]
+        self.slots = FrameSlots(self.np, self.ring_size, first.shape)
+        self.np.copyto(self.slots.writable(), first)
+        self.slots.publish(time.monotonic())
+        self.metrics['frames_captured'] = 1
+
+        writer = cv2.VideoWriter(self.video_path, cv2.VideoWriter_fourcc(*self.fourcc), self.fps, (width, height))
+        if not writer.isOpened():
+            self._release()
+            raise IOError(f"Impossible de créer la vidéo: {self.video_path}")
+
+        capture_thread = threading.Thread(target=self._capture_loop, name='opencv-capture', daemon=True)
+        capture_thread.start()
+
+        interval = 1.0 / self.fps
+        started = time.monotonic()
+        index = 0
+        last_seq = 0
+        write_total = 0.0
+        try:
+            while not self.should_stop():
+                deadline = started + index * interval
+                now = time.monotonic()
+                if deadline - started > self.max_duration:
+                    break
+                if now < deadline:
+                    time.sleep(deadline - now)
+                elif now - deadline > self.max_catchup:
+                    # Trop en retard (disque saturé...) : on saute les échéances
+                    # plutôt que d'écrire une rafale de doublons
+                    skipped = int((now - deadline) / interval)
+                    self.metrics['deadlines_missed'] += skipped
+                    index += skipped
+                    continue
+
+                seq, frame = self.slots.acquire_latest()
+                try:
+                    if seq == last_seq:
+                        self.metrics['frames_duplicated'] += 1
+                    elif seq - last_seq > 1:
+                        self.metrics['frames_dropped'] += seq - last_seq - 1
+                    last_seq = seq
+
+                    write_started = time.perf_counter()
+                    writer.write(frame)
+                    write_ms = (time.perf_counter() - write_started) * 1000
+                finally:
+                    self.slots.release()
+
+                index += 1
+                written = self.metrics['frames_written'] = self.metrics['frames_written'] + 1
+                write_total += write_ms
+                self.metrics['write_ms_avg'] = round(write_total / written, 2)
+                self.metrics['write_ms_max'] = round(max(self.metrics['write_ms_max'] or 0, write_ms), 2)
+                lateness_ms = (time.monotonic() - deadline) * 1000
+                self.metrics['max_lateness_ms'] = round(max(self.metrics['max_lateness_ms'], lateness_ms), 2)
+                elapsed = time.monotonic() - started
+                self.metrics['elapsed_seconds'] = round(elapsed, 2)
+                self.metrics['effective_fps'] = round(written / elapsed, 2) if elapsed > 0 else None
+        finally:
+            self.stopped.set()
+            capture_thread.join(timeout=2)
+            writer.release()
+            self._release()
+
+        return self.metrics
+
+    def _release(self):
+        self.stopped.set()
+        if self.capture is not None:
+            self.capture.release()
+            self.capture = None
+        if self.relay_subscriber is not None:
+            self.relay_subscriber.close()
@@ -0,0 +1,137 @@
+"""
+Hachage des mots de passe sur un pool borné
+Le KDF (scrypt / pbkdf2) est exécuté sur un pool de threads dédié : hashlib
+relâche le GIL pendant le calcul et le nombre de calculs simultanés reste
+borné. Au-delà de la file d'attente, PasswordHasherBusy est levée et la route
+répond 503 avec un en-tête Retry-After.
+
+L'algorithme et le coût sont configurables (PASSWORD_HASH_METHOD) ; les
+anciens hachages sont migrés à la connexion suivante (needs_rehash puis hash).
+"""
+
+import os
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Optional
+
+from werkzeug.security import generate_password_hash, check_password_hash, DEFAULT_PBKDF2_ITERATIONS
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordHasherBusy(Exception):
+    """Levée quand le pool de hachage est saturé"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Service d'authentification saturé")
+        self.retry_after = retry_after
+
+
+def normalize_method(method: str) -> str:
+    """Forme complète d'une méthode werkzeug ('scrypt' -> 'scrypt:32768:8:1')"""
+    name, *args = method.split(':')
+    if name == 'scrypt':
+        n, r, p = (args or [2 ** 15, 8, 1])
+        return f"scrypt:{int(n)}:{int(r)}:{int(p)}"
+    if name == 'pbkdf2':
+        hash_name = args[0] if args else 'sha256'
+        iterations = int(args[1]) if len(args) > 1 else DEFAULT_PBKDF2_ITERATIONS
+        return f"pbkdf2:{hash_name}:{iterations}"
+    raise ValueError(f"Méthode de hachage inconnue: {method}")
+
+
+def password_salt(password_hash: Optional[str]) -> str:
+    """Sel d'un hachage werkzeug ('methode$sel$hash') : change avec chaque nouveau hachage"""
+    if not password_hash or password_hash.count('$') < 2:
+        return password_hash or ''
+    return password_hash.split('$', 2)[1]
+
+
+class PasswordHasher:
+    """Pool de hachage borné (pattern extension Flask)"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.method = normalize_method('scrypt')
+        self.workers = 2
+        self.queue_size = 8
+        self.timeout = 10.0
+        self.retry_after = 1
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._slots: Optional[threading.BoundedSemaphore] = None
+        self._lock = threading.Lock()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Lit la configuration ; le pool est créé au premier hachage"""
+        self.app = app
+        self.method = normalize_method(app.config.get('PASSWORD_HASH_METHOD', 'scrypt'))
+        self.workers = app.config.get('PASSWORD_HASH_WORKERS') or min(4, os.cpu_count() or 1)
+        self.queue_size = app.config.get('PASSWORD_HASH_QUEUE_SIZE', self.workers * 4)
+        self.timeout = app.config.get('PASSWORD_HASH_TIMEOUT', 10.0)
+        self.retry_after = app.config.get('PASSWORD_HASH_RETRY_AFTER', 1)
+        self.shutdown()
+        app.extensions['password_hasher'] = self
+
+    def _ensure_pool(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._slots = threading.BoundedSemaphore(self.workers + self.queue_size)
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                        thread_name_prefix='password-hasher')
+
+    def _run(self, fn, *args):
+        """Exécute fn sur le pool ; PasswordHasherBusy si la file est pleine"""
+        self._ensure_pool()
+        if not self._slots.acquire(blocking=False):
+            logger.warning("Pool de hachage saturé, requête rejetée")
+            raise PasswordHasherBusy(self.retry_after)
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            raise PasswordHasherBusy(self.retry_after)
+
+    # ------------------------------------------------------------------
+    # API publique
+    # ------------------------------------------------------------------
+
+    def hash(self, password: str) -> str:
+        """Hache un mot de passe avec la méthode configurée"""
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash: Optional[str], password: str) -> bool:
+        """Vérifie un mot de passe contre son hachage (quelle que soit sa méthode)"""
+        if not password_hash:
+            return False
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash: Optional[str]) -> bool:
+        """Vrai si le hachage n'utilise pas la méthode et le coût configurés"""
+        if not password_hash or '$' not in password_hash:
+            return False
+        try:
+            return normalize_method(password_hash.split('$', 1)[0]) != self.method
+        except ValueError:
+            return True
+
+    def shutdown(self):
+        """Arrête le pool (recréé au prochain hachage)"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+            self._executor = None
+            self._slots = None
+
+
+# Instance globale du service (configurée par init_app dans create_app)
+password_hasher = PasswordHasher()
@@ -0,0 +1,296 @@
+"""
+Requêtes de lecture des routes joueurs (tableau de bord, statistiques,
+recherche, classement, historique)
+Le coût d'une route ne dépend plus du nombre de lignes qu'elle affiche :
+- agrégats calculés par la base (COUNT/SUM, GROUP BY par club ou par mois)
+  au lieu de charger toutes les vidéos ou tout l'historique en Python
+- noms de clubs et de joueurs joints à l'historique, nombre de terrains,
+  de vidéos et abonnement du joueur en sous-requêtes corrélées : une
+  requête par liste, quel que soit le nombre de lignes
+- tri et limite appliqués par la base, tailles de liste bornées par
+  PLAYER_LIST_MAX_LIMIT
+- historique lu par les index (user_id, performed_at) et
+  (club_id, action_type, performed_at) : le flux d'activité ne lit que les
+  lignes des types affichés
+
+Le banc scripts/benchmark_player_routes.py mesure requêtes SQL et latence
+par route et signale toute régression.
+"""
+
+import json
+import logging
+from datetime import datetime
+from typing import Dict, Any, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, case, exists, extract, func, or_, select
+
+from ..models.database import db
+from ..models.user import User, UserRole, Club, Court, Video, ClubActionHistory, player_club_follows
+
+logger = logging.getLogger(__name__)
+
+follows = player_club_follows.c
+
+# Actions listées dans l'historique de crédits du joueur (/players/credits/history) ;
+# les actions à journaliser dans la transaction sont audit_log.CREDIT_ACTIONS
+CREDIT_HISTORY_ACTIONS = ('buy_credits', 'unlock_video', 'purchase')
+
+# Actions des clubs suivis montrées dans le flux d'activité
+FEED_ACTIONS = ('join_club', 'leave_club', 'add_video', 'unlock_video', 'create_court', 'update_club_info')
+
+
+def detail_int(action_details: Optional[str], key: str) -> int:
+    """Valeur entière d'un champ des détails JSON d'une action (0 si absente ou invalide)"""
+    if not action_details:
+        return 0
+    try:
+        value = json.loads(action_details).get(key, 0)
+    except (ValueError, AttributeError):
+        return 0
+    return int(value) if isinstance(value, (int, float)) else 0
+
+
+def month_starts(count: int, now: Optional[datetime] = None) -> List[datetime]:
+    """Premiers jours des count derniers mois (mois courant compris), du plus ancien au plus récent"""
+    now = now or datetime.utcnow()
+    year, month = now.year, now.month
+    starts = []
+    for _ in range(count):
+        starts.append(datetime(year, month, 1))
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    return starts[::-1]
+
+
+class PlayerQueries:
+    """Requêtes optimisées des routes joueurs (pattern extension Flask)"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.max_limit = 100
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.max_limit = app.config.get('PLAYER_LIST_MAX_LIMIT', 100)
+        app.extensions['player_queries'] = self
+
+    def page_size(self, requested: Optional[int], default: int) -> int:
+        return max(1, min(requested or default, self.max_limit))
+
+    # ------------------------------------------------------------------
+    # Sous-requêtes corrélées
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _courts_count():
+        return select(func.count(Court.id)).where(Court.club_id == Club.id) \
+            .correlate(Club).scalar_subquery().label('courts_count')
+
+    @staticmethod
+    def _is_followed(player_id: int):
+        return exists().where(follows.player_id == player_id, follows.club_id == Club.id) \
+            .correlate(Club).label('is_followed')
+
+    # ------------------------------------------------------------------
+    # Vidéos
+    # ------------------------------------------------------------------
+
+    def video_stats(self, user_id: int, since: Optional[datetime] = None) -> Dict[str, int]:
+        """Nombre de vidéos, vidéos débloquées et durée totale (secondes) en une requête"""
+        query = db.session.query(
+            func.count(Video.id),
+            func.coalesce(func.sum(case((Video.is_unlocked == True, 1), else_=0)), 0),
+            func.coalesce(func.sum(Video.duration), 0)
+        ).filter(Video.user_id == user_id)
+        if since is not None:
+            query = query.filter(Video.recorded_at >= since)
+        total, unlocked, duration = query.one()
+        return {'total': total, 'unlocked': int(unlocked), 'total_duration': int(duration)}
+
+    def recent_videos(self, user_id: int, limit: int = 5) -> List[Video]:
+        """Dernières vidéos enregistrées, de la plus ancienne à la plus récente (index (user_id, recorded_at))"""
+        videos = Video.query.filter(Video.user_id == user_id) \
+            .order_by(Video.recorded_at.desc(), Video.id.desc()).limit(limit).all()
+        return videos[::-1]
+
+    def videos_by_club(self, user_id: int, club_ids: Sequence[int]) -> Dict[int, int]:
+        """Nombre de vidéos du joueur par club, en une requête groupée"""
+        if not club_ids:
+            return {}
+        return dict(db.session.query(Court.club_id, func.count(Video.id))
+                    .join(Court, Court.id == Video.court_id)
+                    .filter(Video.user_id == user_id, Court.club_id.in_(club_ids))
+                    .group_by(Court.club_id).all())
+
+    def videos_by_month(self, user_id: int, months: int = 6) -> List[Dict[str, Any]]:
+        """Vidéos enregistrées par mois calendaire sur les derniers mois, en une requête groupée"""
+        starts = month_starts(months)
+        year, month = extract('year', Video.recorded_at), extract('month', Video.recorded_at)
+        counts = {
+            (int(y), int(m)): count for y, m, count in
+            db.session.query(year, month, func.count(Video.id))
+            .filter(Video.user_id == user_id, Video.recorded_at >= starts[0])
+            .group_by(year, month).all()
+        }
+        return [{
+            "month": start.strftime("%Y-%m"),
+            "videos_count": counts.get((start.year, start.month), 0)
+        } for start in starts]
+
+    def videos_with_location(self, user_id: int) -> List[Tuple[Video, Optional[str], Optional[str]]]:
+        """Toutes les vidéos du joueur avec les noms du terrain et du club"""
+        return db.session.query(Video, Court.name, Club.name) \
+            .outerjoin(Court, Court.id == Video.court_id) \
+            .outerjoin(Club, Club.id == Court.club_id) \
+            .filter(Video.user_id == user_id).order_by(Video.id).all()
+
+    # ------------------------------------------------------------------
+    # Clubs
+    # ------------------------------------------------------------------
+
+    def clubs(self, player_id: int, text: Optional[str] = None, city: Optional[str] = None, min_courts: int = 0,
+              exclude_followed: bool = False, active_only: bool = False, sort_by: str = 'popularity',
+              limit: Optional[int] = None) -> List[Tuple[Club, int, bool]]:
+        """Clubs filtrés et triés par la base ; retourne (club, nombre de terrains, suivi par le joueur)"""
+        courts_count = self._courts_count()
+        is_followed = self._is_followed(player_id)
+        query = db.session.query(Club, courts_count, is_followed)
+        if text:
+            query = query.filter(or_(Club.name.contains(text), Club.address.contains(text)))
+        if city:
+            query = query.filter(Club.address.contains(city))
+        if min_courts > 0:
+            query = query.filter(courts_count >= min_courts)
+        if exclude_followed:
+            query = query.filter(~is_followed)
+        if active_only:
+            query = query.filter(or_(Club.followers_count > 0, courts_count > 0))
+
+        if sort_by == 'name':
+            query = query.order_by(Club.name, Club.id)
+        else:
+            query = query.order_by(Club.followers_count.desc(), Club.id)
+        if limit is not None:
+            query = query.limit(limit)
+        return [(club, courts or 0, bool(followed)) for club, courts, followed in query.all()]
+
+    def followed_clubs(self, player_id: int) -> List[Tuple[Club, int]]:
+        """Clubs suivis par le joueur avec leur nombre de terrains, en une requête"""
+        rows = db.session.query(Club, self._courts_count()) \
+            .join(player_club_follows, follows.club_id == Club.id) \
+            .filter(follows.player_id == player_id).order_by(Club.name).all()
+        return [(club, courts or 0) for club, courts in rows]
+
+    def last_actions_by_club(self, user_id: int, club_ids: Sequence[int]) -> Dict[int, ClubActionHistory]:
+        """Dernière action du joueur dans chacun des clubs, en une requête"""
+        if not club_ids:
+            return {}
+        latest = db.session.query(
+            ClubActionHistory.club_id,
+            func.max(ClubActionHistory.performed_at).label('performed_at')
+        ).filter(
+            ClubActionHistory.user_id == user_id,
+            ClubActionHistory.club_id.in_(club_ids)
+        ).group_by(ClubActionHistory.club_id).subquery()
+        actions = db.session.query(ClubActionHistory).join(latest, and_(
+            ClubActionHistory.club_id == latest.c.club_id,
+            ClubActionHistory.performed_at == latest.c.performed_at
+        )).filter(ClubActionHistory.user_id == user_id)
+        return {action.club_id: action for action in actions}
+
+    def club_names(self, club_ids: Iterable[int]) -> Dict[int, str]:
+        club_ids = list(club_ids)
+        if not club_ids:
+            return {}
+        return dict(db.session.query(Club.id, Club.name).filter(Club.id.in_(club_ids)).all())
+
+    # ------------------------------------------------------------------
+    # Historique d'actions
+    # ------------------------------------------------------------------
+
+    def _history_filter(self, query, user_id: int, action_types: Optional[Sequence[str]]):
+        query = query.filter(ClubActionHistory.user_id == user_id)
+        if action_types:
+            query = query.filter(ClubActionHistory.action_type.in_(action_types))
+        return query
+
+    def history(self, user_id: int, action_types: Optional[Sequence[str]] = None, limit: Optional[int] = None,
+                offset: int = 0) -> List[Tuple[ClubActionHistory, Optional[str]]]:
+        """Actions du joueur, les plus récentes d'abord, avec le nom du club"""
+        query = db.session.query(ClubActionHistory, Club.name) \
+            .outerjoin(Club, Club.id == ClubActionHistory.club_id)
+        query = self._history_filter(query, user_id, action_types) \
+            .order_by(ClubActionHistory.performed_at.desc(), ClubActionHistory.id.desc())
+        if offset:
+            query = query.offset(offset)
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
+
+    def history_count(self, user_id: int, action_types: Optional[Sequence[str]] = None) -> int:
+        return self._history_filter(db.session.query(func.count(ClubActionHistory.id)), user_id, action_types).scalar()
+
+    def history_details(self, user_id: int, action_types: Optional[Sequence[str]] = None,
+                        since: Optional[datetime] = None) -> List[Tuple]:
+        """(action_type, club_id, performed_at, action_details) sans charger d'objets ORM"""
+        query = self._history_filter(db.session.query(
+            ClubActionHistory.action_type, ClubActionHistory.club_id,
+            ClubActionHistory.performed_at, ClubActionHistory.action_details
+        ), user_id, action_types)
+        if since is not None:
+            query = query.filter(ClubActionHistory.performed_at >= since)
+        return query.all()
+
+    def last_action(self, user_id: int, action_type: Optional[str] = None) -> Optional[ClubActionHistory]:
+        query = self._history_filter(ClubActionHistory.query, user_id, [action_type] if action_type else None)
+        return query.order_by(ClubActionHistory.performed_at.desc(), ClubActionHistory.id.desc()).first()
+
+    def _feed_query(self, query, player_id: int):
+        return query.join(player_club_follows, and_(
+            follows.club_id == ClubActionHistory.club_id,
+            follows.player_id == player_id
+        )).filter(ClubActionHistory.action_type.in_(FEED_ACTIONS))
+
+    def feed(self, player_id: int, limit: int,
+             offset: int = 0) -> List[Tuple[ClubActionHistory, Optional[str], Optional[str]]]:
+        """Actions récentes des clubs suivis, avec les noms du club et du joueur concerné"""
+        query = db.session.query(ClubActionHistory, Club.name, User.name) \
+            .outerjoin(Club, Club.id == ClubActionHistory.club_id) \
+            .outerjoin(User, User.id == ClubActionHistory.user_id)
+        return self._feed_query(query, player_id) \
+            .order_by(ClubActionHistory.performed_at.desc(), ClubActionHistory.id.desc()) \
+            .offset(offset).limit(limit).all()
+
+    def feed_count(self, player_id: int) -> int:
+        return self._feed_query(db.session.query(func.count(ClubActionHistory.id)), player_id).scalar()
+
+    # ------------------------------------------------------------------
+    # Classement
+    # ------------------------------------------------------------------
+
+    def leaderboard(self, sort_by: str = 'credits', club_id: Optional[int] = None, limit: int = 10) -> List[Any]:
+        """Joueurs classés par crédits, nombre de vidéos ou dernière activité, en une requête"""
+        videos_count = select(func.count(Video.id)).where(Video.user_id == User.id) \
+            .correlate(User).scalar_subquery()
+        query = db.session.query(
+            User.id, User.name, User.credits_balance, Club.name.label('club_name'),
+            videos_count.label('videos_count')
+        ).outerjoin(Club, Club.id == User.club_id).filter(User.role == UserRole.PLAYER)
+        if club_id:
+            query = query.filter(User.club_id == club_id)
+
+        if sort_by == 'videos':
+            query = query.order_by(videos_count.desc(), User.id)
+        elif sort_by == 'activity':
+            last_activity = select(func.max(ClubActionHistory.performed_at)) \
+                .where(ClubActionHistory.user_id == User.id).correlate(User).scalar_subquery()
+            query = query.order_by(last_activity.desc().nulls_last(), User.id)
+        else:
+            query = query.order_by(User.credits_balance.desc(), User.id)
+        return query.limit(limit).all()
+
+
+# Instance globale du service (configurée par init_app dans create_app)
+player_queries = PlayerQueries()
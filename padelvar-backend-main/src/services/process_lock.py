@@ -0,0 +1,56 @@
+"""
+Verrou exclusif entre processus (fichier + flock)
+Certains services gardent leur état dans le processus (relais caméra, balayage
+du stockage) : avec plusieurs workers, seul celui qui tient le verrou les fait
+tourner. Le verrou est pris sans attendre et gardé jusqu'à la fin du
+processus ; le système le relâche si le processus meurt.
+
+Sans fcntl (Windows, serveur de développement à un seul processus), acquire
+réussit toujours.
+"""
+
+import os
+import logging
+import threading
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class ProcessLock:
+    """Verrou nommé d'un fichier ; acquire() est idempotent dans le processus qui le tient"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.path: Optional[str] = None
+        self._handle = None
+        self._lock = threading.Lock()
+
+    def configure(self, path: str):
+        """Fichier du verrou ; sans effet une fois le verrou tenu"""
+        if self._handle is None:
+            self.path = path
+
+    @property
+    def held(self) -> bool:
+        return self._handle is not None or fcntl is None
+
+    def acquire(self) -> bool:
+        """Prend le verrou sans attendre ; False s'il est tenu par un autre processus"""
+        with self._lock:
+            if self.held:
+                return True
+            handle = open(self.path, 'a')
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                handle.close()
+                return False
+            self._handle = handle
+        logger.info(f"Verrou {self.name} attribué au processus {os.getpid()}")
+        return True
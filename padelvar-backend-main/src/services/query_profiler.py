@@ -0,0 +1,235 @@
+"""
+Profileur de requêtes SQL par requête HTTP
+Compte les requêtes, le temps passé en base et les requêtes les plus lentes
+par endpoint pour repérer les motifs N+1 avant la production.
+
+Activé uniquement si QUERY_PROFILER_ENABLED est vrai.
+"""
+
+import threading
+import time
+import logging
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Any, List
+
+from flask import g, request, has_request_context
+from sqlalchemy import event
+
+from ..models.database import db
+
+logger = logging.getLogger(__name__)
+
+# Bornes (ms) de l'histogramme du temps base de données par requête
+HISTOGRAM_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+# Colonnes numériques du rapport utilisables comme tri
+REPORT_SORT_KEYS = ('requests', 'avg_queries', 'max_queries', 'avg_db_ms', 'window_size', 'window_max_queries')
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Levée quand un endpoint ou un bloc dépasse son budget de requêtes"""
+
+
+class _EndpointStats:
+    """Statistiques glissantes d'un endpoint"""
+
+    def __init__(self, window: int, max_slow: int):
+        self.requests = 0
+        self.total_queries = 0
+        self.max_queries = 0
+        self.total_db_ms = 0.0
+        self.samples = deque(maxlen=window)  # (query_count, db_ms)
+        self.slowest: List[Dict[str, Any]] = []
+        self.max_slow = max_slow
+
+    def add(self, query_count: int, db_ms: float, statements: List[Dict[str, Any]]):
+        self.requests += 1
+        self.total_queries += query_count
+        self.max_queries = max(self.max_queries, query_count)
+        self.total_db_ms += db_ms
+        self.samples.append((query_count, db_ms))
+
+        self.slowest.extend(statements)
+        self.slowest.sort(key=lambda s: s['duration_ms'], reverse=True)
+        del self.slowest[self.max_slow:]
+
+    def to_dict(self) -> Dict[str, Any]:
+        histogram = {f"<={bound}ms": 0 for bound in HISTOGRAM_BUCKETS_MS}
+        histogram[f">{HISTOGRAM_BUCKETS_MS[-1]}ms"] = 0
+        for _, db_ms in self.samples:
+            for bound in HISTOGRAM_BUCKETS_MS:
+                if db_ms <= bound:
+                    histogram[f"<={bound}ms"] += 1
+                    break
+            else:
+                histogram[f">{HISTOGRAM_BUCKETS_MS[-1]}ms"] += 1
+
+        window_queries = [count for count, _ in self.samples]
+        return {
+            'requests': self.requests,
+            'avg_queries': round(self.total_queries / self.requests, 2) if self.requests else 0,
+            'max_queries': self.max_queries,
+            'avg_db_ms': round(self.total_db_ms / self.requests, 2) if self.requests else 0,
+            'window_size': len(self.samples),
+            'window_max_queries': max(window_queries) if window_queries else 0,
+            'db_time_histogram': histogram,
+            'slowest_statements': self.slowest
+        }
+
+
+class QueryProfiler:
+    """Instrumentation SQLAlchemy + cycle de vie Flask (pattern extension)"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.endpoints: Dict[str, _EndpointStats] = {}
+        self._local = threading.local()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Installe les hooks si QUERY_PROFILER_ENABLED est vrai"""
+        self.app = app
+        app.extensions['query_profiler'] = self
+
+        self.enabled = app.config.get('QUERY_PROFILER_ENABLED', False)
+        if not self.enabled:
+            return
+
+        self.slow_ms = app.config.get('QUERY_PROFILER_SLOW_MS', 50)
+        self.max_slow = app.config.get('QUERY_PROFILER_MAX_SLOW', 5)
+        self.window = app.config.get('QUERY_PROFILER_WINDOW', 500)
+        self.default_budget = app.config.get('QUERY_BUDGET_DEFAULT')
+        self.budgets = app.config.get('QUERY_BUDGETS', {})
+        self.strict = app.config.get('QUERY_BUDGET_STRICT', False)
+        self.expose_header = app.config.get('QUERY_PROFILER_HEADERS', app.debug)
+
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+
+        logger.info("Profileur de requêtes SQL activé")
+
+    # ------------------------------------------------------------------
+    # Hooks SQLAlchemy
+    # ------------------------------------------------------------------
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_profiler_start', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get('query_profiler_start')
+        if not starts:
+            return
+        duration_ms = (time.perf_counter() - starts.pop()) * 1000
+
+        # Compteurs de blocs budget() actifs dans ce thread
+        for counter in getattr(self._local, 'counters', ()):
+            counter['count'] += 1
+
+        if not has_request_context():
+            return
+        stats = g.get('_query_stats')
+        if stats is None:
+            return
+        stats['count'] += 1
+        stats['db_ms'] += duration_ms
+        if duration_ms >= self.slow_ms:
+            stats['slow'].append({
+                'statement': ' '.join(statement.split())[:500],
+                'duration_ms': round(duration_ms, 2)
+            })
+
+    # ------------------------------------------------------------------
+    # Hooks Flask
+    # ------------------------------------------------------------------
+
+    def _start_request(self):
+        g._query_stats = {'count': 0, 'db_ms': 0.0, 'slow': []}
+
+    def _finish_request(self, response):
+        stats = g.pop('_query_stats', None)
+        if stats is None:
+            return response
+
+        endpoint = request.endpoint or request.path
+        for statement in stats['slow']:
+            statement['endpoint'] = endpoint
+
+        with self.lock:
+            endpoint_stats = self.endpoints.get(endpoint)
+            if endpoint_stats is None:
+                endpoint_stats = self.endpoints[endpoint] = _EndpointStats(self.window, self.max_slow)
+            endpoint_stats.add(stats['count'], stats['db_ms'], stats['slow'])
+
+        if self.expose_header:
+            response.headers['X-DB-Query-Count'] = str(stats['count'])
+            response.headers['X-DB-Time-Ms'] = f"{stats['db_ms']:.2f}"
+
+        budget = self.budgets.get(endpoint, self.default_budget)
+        if budget is not None and stats['count'] > budget:
+            message = f"{endpoint}: {stats['count']} requêtes SQL (budget {budget})"
+            if self.strict:
+                raise QueryBudgetExceeded(message)
+            logger.warning(f"Budget de requêtes dépassé - {message}")
+
+        return response
+
+    # ------------------------------------------------------------------
+    # API publique
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def budget(self, max_queries: int, label: str = 'bloc'):
+        """
+        Compte les requêtes SQL exécutées dans le bloc (thread courant) et lève
+        QueryBudgetExceeded au-delà de max_queries. Utilisable dans les tests :
+
+            with query_profiler.budget(5):
+                client.get('/api/players/dashboard')
+        """
+        if not self.enabled:
+            raise RuntimeError("Profileur désactivé : définir QUERY_PROFILER_ENABLED=True")
+        
+        counter = {'count': 0}
+        counters = getattr(self._local, 'counters', None)
+        if counters is None:
+            counters = self._local.counters = []
+        counters.append(counter)
+        try:
+            yield counter
+        finally:
+            counters.remove(counter)
+        if counter['count'] > max_queries:
+            raise QueryBudgetExceeded(f"{label}: {counter['count']} requêtes SQL (budget {max_queries})")
+
+    def report(self, sort_by: str = 'avg_queries') -> Dict[str, Any]:
+        """Rapport agrégé par endpoint, trié par coût décroissant ; ValueError si sort_by n'est pas numérique"""
+        if sort_by not in REPORT_SORT_KEYS:
+            raise ValueError(f"Tri inconnu: {sort_by} (valeurs possibles : {', '.join(REPORT_SORT_KEYS)})")
+        with self.lock:
+            endpoints = {name: stats.to_dict() for name, stats in self.endpoints.items()}
+
+        ranked = sorted(endpoints.items(), key=lambda item: item[1][sort_by], reverse=True)
+        return {
+            'enabled': self.enabled,
+            'slow_query_threshold_ms': getattr(self, 'slow_ms', None),
+            'endpoints': [dict(endpoint=name, **stats) for name, stats in ranked]
+        }
+
+    def reset(self):
+        """Vide les statistiques accumulées"""
+        with self.lock:
+            self.endpoints.clear()
+
+
+# Instance globale du profileur (configurée par init_app dans create_app)
+query_profiler = QueryProfiler()
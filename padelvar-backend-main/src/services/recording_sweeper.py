@@ -0,0 +1,259 @@
+"""
+Finalisation des enregistrements arrivés à échéance, hors des requêtes
+Un thread balaie périodiquement les sessions actives dont expires_at est
+passé (index (status, expires_at)) :
+- réclamation par lots : un UPDATE ... RETURNING passe les sessions à
+  'stopped' (FOR UPDATE SKIP LOCKED sur les bases qui le permettent : deux
+  balayeurs ne se disputent pas les mêmes lignes)
+- dans la même transaction : vidéos insérées en un INSERT groupé, terrains
+  libérés en un UPDATE, historique mis en file (voir audit_log.py)
+- après le commit : réservations d'espace libérées (storage_manager),
+  rangement des fichiers (blob_store) et sonde des vidéos
+
+La fin d'un enregistrement expiré est sa fin prévue, pas l'heure du balayage.
+Les routes de consultation ne finalisent plus rien ; le démarrage d'un
+enregistrement finalise seulement la session expirée qui bloque son terrain
+ou son joueur. Le thread démarre au premier enregistrement ou à la première
+consultation, pas au démarrage.
+"""
+
+import time
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+from sqlalchemy import case, insert, or_, select, true, update
+
+from ..models.database import db
+from ..models.user import Court, Video, RecordingSession
+from .audit_log import audit_log
+from .response_cache import response_cache, row_tags
+from .storage_manager import storage_manager
+
+logger = logging.getLogger(__name__)
+
+# Colonnes relues par RETURNING pour créer vidéos et historique
+_CLAIMED_COLUMNS = (
+    RecordingSession.id, RecordingSession.recording_id, RecordingSession.user_id,
+    RecordingSession.court_id, RecordingSession.club_id, RecordingSession.start_time,
+    RecordingSession.end_time, RecordingSession.title, RecordingSession.description
+)
+
+
+class RecordingSweeper:
+    """Balayage par lots des enregistrements expirés (pattern extension Flask)"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.interval = 30.0
+        self.batch_size = 100
+        self.lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.sweeps = 0
+        self.batches = 0
+        self.finalized = 0
+        self.failed = 0
+        self.sweep_ms = 0.0
+        self.last_sweep_at: Optional[datetime] = None
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Lit la configuration ; aucun thread n'est démarré ici"""
+        self.app = app
+        self.interval = app.config.get('RECORDING_SWEEP_INTERVAL', 30.0)
+        self.batch_size = app.config.get('RECORDING_SWEEP_BATCH', 100)
+        app.extensions['recording_sweeper'] = self
+
+    # ------------------------------------------------------------------
+    # Réclamation et finalisation
+    # ------------------------------------------------------------------
+
+    def _claim(self, now: datetime, condition) -> List[Any]:
+        """Passe un lot de sessions expirées à 'stopped' ; retourne leurs lignes"""
+        candidates = select(RecordingSession.id).where(
+            RecordingSession.status == 'active',
+            RecordingSession.expires_at <= now,
+            condition
+        ).order_by(RecordingSession.expires_at).limit(self.batch_size).with_for_update(skip_locked=True)
+
+        claim = update(RecordingSession).values(
+            status='stopped',
+            stopped_by='auto',
+            end_time=case((RecordingSession.expires_at < now, RecordingSession.expires_at), else_=now)
+        ).execution_options(synchronize_session=False)
+
+        if db.session.get_bind().dialect.update_returning:
+            return db.session.execute(
+                claim.where(RecordingSession.id.in_(candidates.scalar_subquery()))
+                .returning(*_CLAIMED_COLUMNS)
+            ).all()
+        # Sans RETURNING : lignes verrouillées lues, puis mises à jour
+        ids = list(db.session.execute(candidates).scalars())
+        if not ids:
+            return []
+        db.session.execute(claim.where(RecordingSession.id.in_(ids), RecordingSession.status == 'active'))
+        return db.session.execute(select(*_CLAIMED_COLUMNS).where(RecordingSession.id.in_(ids))).all()
+
+    def _insert_videos(self, rows: List[Dict[str, Any]], cache_tags: List[str]) -> List[Tuple[int, str]]:
+        """Vidéos des sessions réclamées en un INSERT groupé ; retourne (identifiant, URL du fichier)"""
+        dialect = db.session.get_bind().dialect
+        if dialect.insert_executemany_returning:
+            statement = insert(Video).returning(Video.id, Video.file_url).execution_options(cache_tags=cache_tags)
+            return [tuple(row) for row in db.session.execute(statement, rows)]
+        videos = [Video(**row) for row in rows]
+        db.session.add_all(videos)
+        db.session.flush()
+        return [(video.id, video.file_url) for video in videos]
+
+    def _finalize(self, claimed: List[Any]) -> List[Tuple[int, str]]:
+        """Vidéos, terrains et historique d'un lot réclamé (même transaction)"""
+        court_ids = {row.court_id for row in claimed}
+        court_names = dict(db.session.execute(
+            select(Court.id, Court.name).where(Court.id.in_(court_ids))
+        ).all())
+        # Écritures groupées, sans événement par ligne : joueurs et clubs du lot pour le cache de réponses
+        cache_tags = sorted({tag for row in claimed
+                             for tag in row_tags(Video.__tablename__, {'user_id': row.user_id, 'club_id': row.club_id})})
+
+        videos = self._insert_videos([{
+            'user_id': row.user_id,
+            'court_id': row.court_id,
+            'title': row.title or f'Match du {row.start_time.strftime("%d/%m/%Y %H:%M")}',
+            'description': row.description,
+            'duration': max(0, int((row.end_time - row.start_time).total_seconds())),
+            'file_url': f'/videos/rec_{row.recording_id}.mp4',
+            'recorded_at': row.start_time,
+            'is_unlocked': True
+        } for row in claimed], cache_tags)
+
+        # Terrains libérés, sauf s'ils ont déjà été réservés par un autre enregistrement
+        db.session.execute(
+            update(Court).where(
+                Court.id.in_(court_ids),
+                or_(Court.current_recording_id.in_([row.recording_id for row in claimed]),
+                    Court.current_recording_id.is_(None))
+            ).values(is_recording=False, current_recording_id=None)
+            .execution_options(synchronize_session=False, cache_tags=cache_tags)
+        )
+
+        for row in claimed:
+            audit_log.record(row.user_id, row.club_id, 'stop_recording', {
+                'stopped_by': 'auto',
+                'duration_minutes': int((row.end_time - row.start_time).total_seconds() / 60),
+                'court_name': court_names.get(row.court_id, 'Inconnu')
+            }, row.user_id)
+        return videos
+
+    def _after_commit(self, videos: List[Tuple[int, str]]):
+        """Fichiers rangés et vidéos sondées, comme pour un arrêt manuel (vidéos sans fichier local ignorées)"""
+        from .blob_store import blob_store
+        from .media_probe import media_probe
+        from .video_capture_service import video_capture_service
+
+        video_ids = [video_id for video_id, file_url in videos
+                     if video_capture_service.local_video_path(file_url) is not None]
+        if not video_ids:
+            return
+        for video in Video.query.filter(Video.id.in_(video_ids)).all():
+            try:
+                blob_store.adopt(video)
+            except Exception as e:
+                db.session.rollback()
+                logger.warning(f"Fichiers de la vidéo {video.id} conservés hors du stockage par contenu: {e}")
+            media_probe.probe_video(video)
+
+    def sweep(self, club_id: Optional[int] = None, court_id: Optional[int] = None,
+              user_id: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Finalise les sessions expirées, lot par lot (une transaction par lot).
+        Filtres optionnels : club, ou terrain / joueur (sessions qui bloquent un démarrage).
+        """
+        started = time.perf_counter()
+        now = datetime.utcnow()
+        condition = true()
+        if club_id is not None:
+            condition = RecordingSession.club_id == club_id
+        if court_id is not None or user_id is not None:
+            condition = or_(RecordingSession.court_id == court_id, RecordingSession.user_id == user_id)
+
+        finalized, batches = [], 0
+        while True:
+            try:
+                claimed = self._claim(now, condition)
+                if not claimed:
+                    db.session.commit()
+                    break
+                videos = self._finalize(claimed)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                self.failed += 1
+                logger.error(f"Balayage des enregistrements interrompu: {e}")
+                break
+            batches += 1
+            finalized += [row.recording_id for row in claimed]
+            storage_manager.release(*[row.recording_id for row in claimed])
+            # Écritures groupées, sans événement par ligne : réponses en cache invalidées ici
+            response_cache.invalidate_rows(RecordingSession.__tablename__,
+                                           [{'user_id': row.user_id, 'club_id': row.club_id} for row in claimed])
+            self._after_commit(videos)
+            if len(claimed) < self.batch_size:
+                break
+
+        with self.lock:
+            self.sweeps += 1
+            self.batches += batches
+            self.finalized += len(finalized)
+            self.sweep_ms += (time.perf_counter() - started) * 1000
+            self.last_sweep_at = now
+        if finalized:
+            logger.info(f"Balayage : {len(finalized)} enregistrement(s) expiré(s) finalisé(s) en {batches} lot(s)")
+        return {'finalized': len(finalized), 'batches': batches, 'recording_ids': finalized}
+
+    # ------------------------------------------------------------------
+    # Thread de balayage et état
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Démarre le balayage périodique (idempotent, aucune requête SQL)"""
+        if not self.interval or self.app is None:
+            return
+        with self.lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='recording-sweeper', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        logger.info(f"Balayage des enregistrements expirés démarré (toutes les {self.interval}s)")
+        while not self._stop.wait(self.interval):
+            try:
+                with self.app.app_context():
+                    self.sweep()
+            except Exception as e:
+                logger.error(f"Erreur du balayage des enregistrements: {e}")
+
+    def shutdown(self):
+        self._stop.set()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'running': self._thread is not None and self._thread.is_alive(),
+            'interval': self.interval,
+            'batch_size': self.batch_size,
+            'sweeps': self.sweeps,
+            'batches': self.batches,
+            'finalized': self.finalized,
+            'failed': self.failed,
+            'avg_sweep_ms': round(self.sweep_ms / self.sweeps, 2) if self.sweeps else None,
+            'last_sweep_at': self.last_sweep_at.isoformat() if self.last_sweep_at else None
+        }
+
+
+# Instance globale du service (configurée par init_app dans create_app)
+recording_sweeper = RecordingSweeper()
@@ -0,0 +1,351 @@
+"""
+Cache des réponses des routes de lecture (tableaux de bord, statistiques, clubs)
+- une entrée par route, paramètres et utilisateur (claims de session, sans
+  requête SQL) ; une réponse servie du cache n'ouvre pas la base
+- deux niveaux : LRU du processus, puis cache partagé optionnel
+  (RESPONSE_CACHE_BACKEND, voir src/services/cache_backends.py)
+- sans cache partagé entre processus, une écriture n'invaliderait que le cache
+  de son worker. Le nombre de workers n'étant pas connu de façon fiable
+  (gunicorn -w ne pose pas WEB_CONCURRENCY), 'auto' sans Redis désactive le
+  cache ; 'memory' ou 'shared-local' explicite déclare un processus unique et
+  reste refusé si RESPONSE_CACHE_WORKERS dépasse un
+- chaque entrée porte des étiquettes (user:<id>, club:<id>, table:<nom>) et la
+  version de chacune lue avant le calcul de la réponse ; une écriture
+  incrémente les versions, les entrées concernées deviennent invalides
+- les écritures sont suivies par les événements ORM after_insert /
+  after_update / after_delete (et do_orm_execute pour les UPDATE / DELETE
+  groupés), les versions incrémentées au commit et oubliées au rollback ;
+  une écriture groupée sur video passe video_tags(...) en cache_tags
+
+Seules les réponses 200 sont conservées ; l'en-tête X-Cache indique HIT ou MISS.
+"""
+
+import json
+import time
+import base64
+import hashlib
+import logging
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable, Optional, Set, Union
+
+from flask import request, make_response, current_app
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session, object_session
+
+from ..models.database import db
+from ..models.user import User, Club, Court, Video, ClubActionHistory, RecordingSession
+from .cache_backends import MemoryBackend, CacheBackend, backend_kind, create_backend
+from .identity import current_identity
+
+logger = logging.getLogger(__name__)
+
+# Étiquettes d'une session en attente de son commit
+PENDING_KEY = 'response_cache_tags'
+
+# Tables dont les écritures invalident des réponses en cache
+TRACKED_TABLES = ('user', 'club', 'court', 'video', 'club_action_history',
+                  'recording_session', 'player_club_follows')
+
+# Colonnes qui rattachent une ligne à un utilisateur ou à un club
+_USER_COLUMNS = ('user_id', 'player_id')
+_CLUB_COLUMNS = ('club_id',)
+
+
+def row_tags(table_name: str, values: Dict[str, Any]) -> Set[str]:
+    """Étiquettes touchées par l'écriture d'une ligne (valeurs par nom de colonne)"""
+    tags = {f'table:{table_name}'}
+    if table_name == 'user' and values.get('id') is not None:
+        tags.add(f"user:{values['id']}")
+    if table_name == 'club' and values.get('id') is not None:
+        tags.add(f"club:{values['id']}")
+    for column in _USER_COLUMNS:
+        if values.get(column) is not None:
+            tags.add(f'user:{values[column]}')
+    for column in _CLUB_COLUMNS:
+        if values.get(column) is not None:
+            tags.add(f'club:{values[column]}')
+    return tags
+
+
+def video_tags(video_ids: Iterable[int]) -> Set[str]:
+    """Étiquettes des joueurs et clubs de vidéos écrites en groupe (une requête), pour cache_tags"""
+    video_ids = list(set(video_ids))
+    tags = {'table:video'}
+    if not video_ids or not response_cache.enabled:
+        return tags
+    rows = db.session.execute(
+        select(Video.user_id, Court.club_id).outerjoin(Court, Court.id == Video.court_id)
+        .where(Video.id.in_(video_ids))
+    ).all()
+    for user_id, club_id in rows:
+        tags |= row_tags(Video.__tablename__, {'user_id': user_id, 'club_id': club_id})
+    return tags
+
+
+class ResponseCache:
+    """Cache de réponses à étiquettes versionnées (pattern extension Flask)"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.enabled = False
+        self.default_ttl = 60.0
+        self.workers = 1
+        self.local: MemoryBackend = MemoryBackend()
+        self.shared: Optional[CacheBackend] = None
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.stores = 0
+        self.invalidations = 0
+        self.errors = 0
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Lit la configuration ; le cache partagé n'est contacté qu'à la première requête"""
+        self.app = app
+        self.enabled = app.config.get('RESPONSE_CACHE_ENABLED', True)
+        self.default_ttl = app.config.get('RESPONSE_CACHE_TTL', 60.0)
+        self.local = MemoryBackend(app.config.get('RESPONSE_CACHE_MAX_ENTRIES', 2048))
+        self.workers = app.config.get('RESPONSE_CACHE_WORKERS', 1)
+        self.shared = create_backend(app.config) if self.enabled else None
+        if self.enabled and not (self.shared is not None and self.shared.cross_process):
+            kind = backend_kind(app.config)
+            if app.config.get('RESPONSE_CACHE_BACKEND', 'auto') == 'auto':
+                logger.info("Cache de réponses désactivé : aucun RESPONSE_CACHE_REDIS_URL "
+                            "(RESPONSE_CACHE_BACKEND=memory pour un processus unique)")
+                self.enabled = False
+                self.shared = None
+            elif self.workers > 1:
+                raise ValueError(f"RESPONSE_CACHE_BACKEND={kind} ne propage pas les invalidations entre "
+                                 f"{self.workers} workers : utiliser redis")
+        app.extensions['response_cache'] = self
+
+    @property
+    def versions_backend(self) -> CacheBackend:
+        """Les versions d'étiquettes vivent dans le cache partagé s'il existe (invalidation entre processus)"""
+        return self.shared if self.shared is not None else self.local
+
+    # ------------------------------------------------------------------
+    # Invalidation
+    # ------------------------------------------------------------------
+
+    def invalidate(self, tags: Iterable[str]):
+        """Incrémente les versions : les entrées portant ces étiquettes ne sont plus servies"""
+        tags = sorted(set(tags))
+        if not tags or not self.enabled:
+            return
+        try:
+            self.versions_backend.bump(tags)
+            self.invalidations += len(tags)
+        except Exception as e:
+            # Cache partagé injoignable : les entrées expireront avec leur TTL
+            self.errors += 1
+            logger.error(f"Cache de réponses : invalidation impossible ({', '.join(tags)}): {e}")
+
+    def invalidate_rows(self, table_name: str, rows: Iterable[Dict[str, Any]]):
+        """Invalidation pour des lignes écrites hors session ORM (INSERT groupés)"""
+        tags = set()
+        for row in rows:
+            tags |= row_tags(table_name, row)
+        self.invalidate(tags)
+
+    def clear(self):
+        self.local.clear()
+        if self.shared is not None:
+            self.shared.clear()
+
+    # ------------------------------------------------------------------
+    # Lecture et écriture des entrées
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _key(principal: str) -> str:
+        """Route, paramètres (ordre indifférent) et utilisateur"""
+        params = '&'.join(f'{name}={value}' for name, value in sorted(request.args.items(multi=True)))
+        digest = hashlib.sha1(f'{request.path}?{params}'.encode('utf-8')).hexdigest()[:20]
+        return f'{request.endpoint}|{principal}|{digest}'
+
+    def _lookup(self, key: str, versions: Dict[str, int]) -> Optional[Dict[str, Any]]:
+        entry = self.local.get(key)
+        if entry is not None and entry['tags'] == versions:
+            self.hits += 1
+            return entry
+        if self.shared is not None:
+            raw = self.shared.get(key)
+            if raw is not None:
+                entry = json.loads(raw)
+                entry['body'] = base64.b64decode(entry['body'])
+                if entry['tags'] == versions:
+                    self.local.set(key, entry, max(entry['expires_at'] - time.time(), 0.001))
+                    self.hits += 1
+                    self.shared_hits += 1
+                    return entry
+        if entry is not None:
+            self.stale += 1
+        return None
+
+    def _store(self, key: str, response, versions: Dict[str, int], ttl: float):
+        entry = {
+            'body': response.get_data(),
+            'mimetype': response.mimetype,
+            'tags': versions,
+            'expires_at': time.time() + ttl
+        }
+        self.local.set(key, entry, ttl)
+        if self.shared is not None:
+            raw = dict(entry, body=base64.b64encode(entry['body']).decode('ascii'))
+            self.shared.set(key, json.dumps(raw).encode('utf-8'), ttl)
+        self.stores += 1
+
+    def _ttl(self, ttl: Union[float, str, None]) -> float:
+        if ttl is None:
+            return self.default_ttl
+        if isinstance(ttl, str):
+            return float(current_app.config.get(ttl, self.default_ttl))
+        return ttl
+
+    def cached(self, tags: Union[Iterable[str], Callable[..., Iterable[str]]],
+               ttl: Union[float, str, None] = None, per_user: bool = True):
+        """
+        Décorateur de route GET. tags : liste, ou fonction (identité, paramètres
+        de la route) -> étiquettes. ttl : secondes, ou nom d'une clé de
+        configuration (RESPONSE_CACHE_TTL par défaut). per_user=False pour une
+        route publique (une entrée partagée par tous les visiteurs).
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if not self.enabled or request.method != 'GET':
+                    return view(*args, **kwargs)
+                identity = current_identity() if per_user else None
+                if per_user and identity is None:
+                    # Non authentifié : la route répond elle-même (401/403)
+                    return view(*args, **kwargs)
+
+                principal = f"{identity['user_id']}:{identity['role']}:{identity['club_id']}" if per_user else '*'
+                entry_tags = sorted(set(tags(identity, kwargs) if callable(tags) else tags))
+                key = self._key(principal)
+                try:
+                    # Versions lues avant le calcul : une écriture validée pendant
+                    # le calcul rend l'entrée invalide dès son enregistrement
+                    versions = dict(zip(entry_tags, self.versions_backend.versions(entry_tags)))
+                    entry = self._lookup(key, versions)
+                except Exception as e:
+                    self.errors += 1
+                    logger.error(f"Cache de réponses indisponible pour {request.endpoint}: {e}")
+                    return view(*args, **kwargs)
+
+                if entry is not None:
+                    response = current_app.response_class(entry['body'], status=200, mimetype=entry['mimetype'])
+                    response.headers['X-Cache'] = 'HIT'
+                    return response
+
+                self.misses += 1
+                response = make_response(view(*args, **kwargs))
+                if response.status_code == 200 and not response.direct_passthrough:
+                    try:
+                        self._store(key, response, versions, self._ttl(ttl))
+                    except Exception as e:
+                        self.errors += 1
+                        logger.error(f"Cache de réponses : entrée non enregistrée ({request.endpoint}): {e}")
+                response.headers['X-Cache'] = 'MISS'
+                return response
+            return wrapper
+        return decorator
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'enabled': self.enabled,
+            'workers': self.workers,
+            'backend': self.shared.name if self.shared is not None else self.local.name,
+            'entries': len(self.local),
+            'capacity': self.local.max_entries,
+            'hits': self.hits,
+            'shared_hits': self.shared_hits,
+            'misses': self.misses,
+            'stale': self.stale,
+            'hit_ratio': round(self.hits / lookups, 3) if lookups else None,
+            'stores': self.stores,
+            'evictions': self.local.evictions,
+            'invalidations': self.invalidations,
+            'errors': self.errors
+        }
+
+
+# Instance globale du service (configurée par init_app dans create_app)
+response_cache = ResponseCache()
+
+
+# ----------------------------------------------------------------------
+# Suivi des écritures
+# ----------------------------------------------------------------------
+
+def _pending(session) -> Set[str]:
+    return session.info.setdefault(PENDING_KEY, set())
+
+
+def _target_tags(mapper, connection, target) -> Set[str]:
+    """Étiquettes d'une ligne ORM : valeurs actuelles et, après un UPDATE, précédentes"""
+    state = inspect(target)
+    current, previous = {}, {}
+    for key in ('id', 'court_id') + _USER_COLUMNS + _CLUB_COLUMNS:
+        if key not in mapper.columns:
+            continue
+        current[key] = state.dict.get(key)
+        deleted = state.attrs[key].history.deleted
+        if deleted:
+            previous[key] = deleted[0]
+
+    table_name = mapper.local_table.name
+    tags = row_tags(table_name, current) | row_tags(table_name, previous)
+    # Vidéo : rattachée au club par son terrain
+    court_ids = {values['court_id'] for values in (current, previous) if values.get('court_id') is not None}
+    if court_ids and 'club_id' not in mapper.columns:
+        for club_id in connection.execute(select(Court.club_id).where(Court.id.in_(court_ids))).scalars():
+            tags.add(f'club:{club_id}')
+    return tags
+
+
+def _track_write(mapper, connection, target):
+    session = object_session(target)
+    if session is not None and response_cache.enabled:
+        _pending(session).update(_target_tags(mapper, connection, target))
+
+
+for _model in (User, Club, Court, Video, ClubActionHistory, RecordingSession):
+    for _event_name in ('after_insert', 'after_update', 'after_delete'):
+        event.listen(_model, _event_name, _track_write)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _track_bulk_write(orm_execute_state):
+    """INSERT / UPDATE / DELETE groupés : pas d'événement par ligne, toute la table est invalidée"""
+    if not response_cache.enabled:
+        return
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    table_name = getattr(orm_execute_state.statement.table, 'name', None)
+    if table_name in TRACKED_TABLES:
+        tags = _pending(orm_execute_state.session)
+        tags.add(f'table:{table_name}')
+        # Étiquettes précises fournies par l'appelant (execution_options(cache_tags=[...]))
+        tags.update(orm_execute_state.execution_options.get('cache_tags', ()))
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed_writes(session):
+    """Transaction validée : les réponses qui en dépendent sont invalidées"""
+    tags = session.info.pop(PENDING_KEY, None)
+    if tags:
+        response_cache.invalidate(tags)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_rolled_back_writes(session, previous_transaction):
+    """Transaction annulée (hors point de sauvegarde) : rien à invalider"""
+    if not previous_transaction.nested:
+        session.info.pop(PENDING_KEY, None)
@@ -0,0 +1,104 @@
+"""
+Compression transparente des réponses de l'API
+- gzip, ou brotli si le module est installé et accepté par le client
+- seulement au-delà de COMPRESS_MIN_SIZE : sous ce seuil, l'en-tête et le
+  temps CPU coûtent plus que les octets gagnés
+- les fichiers (send_file, flux) ne sont jamais recompressés : les
+  statiques ont leurs variantes précompressées (voir static_assets)
+"""
+
+import gzip
+import logging
+
+from flask import request
+
+logger = logging.getLogger(__name__)
+
+try:  # dépendance optionnelle
+    import brotli
+except ImportError:  # pragma: no cover - dépend de l'environnement
+    brotli = None
+
+DEFAULT_MIMETYPES = (
+    'application/json',
+    'text/html',
+    'text/plain',
+    'text/css',
+    'text/csv',
+    'application/javascript'
+)
+
+
+class ResponseCompressor:
+    """Compression des réponses au-delà d'un seuil (pattern extension Flask)"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.enabled = True
+        self.min_size = 1024
+        self.gzip_level = 6
+        self.brotli_level = 4
+        self.mimetypes = set(DEFAULT_MIMETYPES)
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.enabled = app.config.get('COMPRESS_ENABLED', True)
+        self.min_size = app.config.get('COMPRESS_MIN_SIZE', 1024)
+        self.gzip_level = app.config.get('COMPRESS_GZIP_LEVEL', 6)
+        self.brotli_level = app.config.get('COMPRESS_BROTLI_LEVEL', 4)
+        self.mimetypes = set(app.config.get('COMPRESS_MIMETYPES') or DEFAULT_MIMETYPES)
+        app.extensions['response_compressor'] = self
+
+        if self.enabled:
+            app.after_request(self._after_request)
+
+    def choose_encoding(self):
+        """Encodage à utiliser pour la requête courante, ou None"""
+        accepted = request.accept_encodings
+        if brotli is not None and accepted['br'] > 0:
+            return 'br'
+        if accepted['gzip'] > 0:
+            return 'gzip'
+        return None
+
+    def compress(self, data: bytes, encoding: str) -> bytes:
+        if encoding == 'br':
+            return brotli.compress(data, quality=self.brotli_level)
+        return gzip.compress(data, compresslevel=self.gzip_level, mtime=0)
+
+    def _should_compress(self, response) -> bool:
+        if response.direct_passthrough or response.is_streamed:
+            return False
+        if response.status_code < 200 or response.status_code in (204, 206, 304):
+            return False
+        if 'Content-Encoding' in response.headers or response.mimetype not in self.mimetypes:
+            return False
+        if 'no-transform' in response.headers.get('Cache-Control', ''):
+            return False
+        return (response.content_length or 0) >= self.min_size
+
+    def _after_request(self, response):
+        if not self._should_compress(response):
+            return response
+        response.vary.add('Accept-Encoding')
+
+        encoding = self.choose_encoding()
+        if encoding is None:
+            return response
+
+        compressed = self.compress(response.get_data(), encoding)
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+
+        # Représentation différente : l'ETag fort ne peut plus être partagé
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(f"{etag}-{encoding}")
+        return response
+
+
+# Instance globale du service (configurée par init_app dans create_app)
+response_compressor = ResponseCompressor()
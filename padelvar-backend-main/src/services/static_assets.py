@@ -0,0 +1,216 @@
+"""
+Service des fichiers statiques du frontend embarqué
+- le dossier static est indexé une seule fois au démarrage : aucun accès
+  disque pour résoudre un chemin, aucune traversée possible
+- les variantes précompressées (.br, .gz) sont servies selon Accept-Encoding ;
+  elles sont produites à l'étape de build par scripts/precompress_static.py
+  (jamais au démarrage) et ne sont pas versionnées
+- seuls les fichiers empreintés par Vite (assets/<nom>-<hash de 8 caractères>.<ext>)
+  sont mis en cache un an (immutable) ; index.html est revalidé par ETag / 304
+"""
+
+import os
+import re
+import gzip
+import hashlib
+import logging
+import tempfile
+import mimetypes
+from typing import Dict, Optional, Any
+
+from flask import request, send_file, Response
+
+logger = logging.getLogger(__name__)
+
+# Encodages servis, par ordre de préférence, et extension de la variante
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+# Fichiers Vite empreintés : assets/<nom>-<hash>.<ext>, hash de 8 caractères
+FINGERPRINT_PATTERN = re.compile(r'^assets/[^/]+-(?P<hash>[A-Za-z0-9_-]{8})\.[a-z0-9]+$')
+
+# Fichiers texte dont une variante compressée vaut la peine
+COMPRESSIBLE_EXTENSIONS = ('.js', '.css', '.html', '.svg', '.json', '.txt', '.map', '.ico', '.xml')
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+
+class StaticAssets:
+    """Index des fichiers statiques (pattern extension Flask)"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.root = None
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.index_entry: Optional[Dict[str, Any]] = None
+        self.default_max_age = 3600
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Indexe le dossier static de l'application"""
+        self.app = app
+        self.root = app.config.get('STATIC_ASSETS_ROOT') or app.static_folder
+        self.default_max_age = app.config.get('STATIC_DEFAULT_MAX_AGE', 3600)
+        app.extensions['static_assets'] = self
+        self.reload()
+
+    def reload(self):
+        """(Re)construit l'index : chemins, tailles, ETag et variantes"""
+        files = {}
+        if self.root and os.path.isdir(self.root):
+            for directory, _, names in os.walk(self.root):
+                for name in names:
+                    if name.endswith(tuple(ext for _, ext in ENCODINGS)):
+                        continue
+                    full_path = os.path.join(directory, name)
+                    rel_path = os.path.relpath(full_path, self.root).replace(os.sep, '/')
+                    files[rel_path] = self._build_entry(full_path, rel_path)
+
+        self.files = files
+        self.index_entry = files.get('index.html')
+        if self.index_entry is not None:
+            with open(self.index_entry['path'], 'rb') as f:
+                self.index_entry['body'] = f.read()
+        logger.info(f"Fichiers statiques indexés: {len(files)}")
+
+    def _build_entry(self, full_path: str, rel_path: str) -> Dict[str, Any]:
+        stat = os.stat(full_path)
+        match = FINGERPRINT_PATTERN.match(rel_path)
+        fingerprinted = match is not None
+        if fingerprinted:
+            # Le nom porte déjà le hachage du contenu
+            etag = match.group('hash')
+        else:
+            with open(full_path, 'rb') as f:
+                etag = hashlib.sha1(f.read()).hexdigest()[:16]
+
+        variants = {}
+        for encoding, extension in ENCODINGS:
+            variant_path = full_path + extension
+            if not os.path.isfile(variant_path):
+                continue
+            # Un nom empreinté garantit la fraîcheur ; sinon on vérifie le contenu
+            if fingerprinted or self._variant_matches(full_path, variant_path, encoding):
+                variants[encoding] = variant_path
+            else:
+                logger.warning(f"Variante obsolète ignorée: {variant_path}")
+
+        return {
+            'path': full_path,
+            'mimetype': mimetypes.guess_type(rel_path)[0] or 'application/octet-stream',
+            'size': stat.st_size,
+            'etag': etag,
+            'fingerprinted': fingerprinted,
+            'variants': variants
+        }
+
+    @staticmethod
+    def _variant_matches(full_path: str, variant_path: str, encoding: str) -> bool:
+        with open(full_path, 'rb') as f:
+            original = f.read()
+        with open(variant_path, 'rb') as f:
+            compressed = f.read()
+        try:
+            if encoding == 'gzip':
+                return gzip.decompress(compressed) == original
+            import brotli
+            return brotli.decompress(compressed) == original
+        except Exception:
+            return False
+
+    def _negotiate(self, entry: Dict[str, Any]):
+        """Choisit la variante compressée acceptée par le client"""
+        for encoding, _ in ENCODINGS:
+            if encoding in entry['variants'] and request.accept_encodings[encoding] > 0:
+                return encoding, entry['variants'][encoding]
+        return None, entry['path']
+
+    def _cache(self, response: Response, entry: Dict[str, Any]) -> Response:
+        # send_file pose no-cache par défaut
+        response.cache_control.no_cache = None
+        if entry['fingerprinted']:
+            response.cache_control.public = True
+            response.cache_control.max_age = IMMUTABLE_MAX_AGE
+            response.cache_control.immutable = True
+        else:
+            response.cache_control.public = True
+            response.cache_control.max_age = self.default_max_age
+        if entry['variants']:
+            response.vary.add('Accept-Encoding')
+        return response
+
+    def serve_file(self, entry: Dict[str, Any]) -> Response:
+        encoding, path = self._negotiate(entry)
+        etag = f"{entry['etag']}-{encoding}" if encoding else entry['etag']
+        # Nom et type du fichier d'origine, y compris pour une variante .gz / .br
+        response = send_file(path, mimetype=entry['mimetype'], download_name=os.path.basename(entry['path']),
+                             etag=etag, conditional=True)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        return self._cache(response, entry)
+
+    def serve_index(self) -> Response:
+        """index.html (gardé en mémoire), revalidé par ETag / 304 à chaque visite"""
+        entry = self.index_entry
+        if entry is None:
+            return Response('index.html introuvable', status=404)
+        encoding, path = self._negotiate(entry)
+        if encoding:
+            response = send_file(path, mimetype=entry['mimetype'], download_name='index.html',
+                                 etag=f"{entry['etag']}-{encoding}", conditional=True)
+            response.headers['Content-Encoding'] = encoding
+        else:
+            response = Response(entry['body'], mimetype=entry['mimetype'])
+            response.set_etag(entry['etag'])
+            response = response.make_conditional(request)
+        response.cache_control.no_cache = True
+        if entry['variants']:
+            response.vary.add('Accept-Encoding')
+        return response
+
+    def serve(self, path: str) -> Response:
+        """Fichier indexé, sinon index.html (routage côté client)"""
+        entry = self.files.get(path) if path else None
+        if entry is None or path == 'index.html':
+            return self.serve_index()
+        return self.serve_file(entry)
+
+
+def _write_atomic(path: str, data: bytes, mode: int):
+    """Écrit dans un fichier temporaire du même dossier puis le renomme : jamais de variante tronquée"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix='.precompress-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(tmp_path, mode)  # mkstemp crée en 0600 : mêmes droits que le fichier d'origine
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def compress_file(path: str, use_brotli: bool = False) -> Dict[str, int]:
+    """Écrit path.gz (gzip -9) et, si demandé, path.br quand ils sont plus petits ; retourne leurs tailles"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    mode = os.stat(path).st_mode & 0o777
+    written = {}
+
+    gz_data = gzip.compress(data, compresslevel=9, mtime=0)
+    if len(gz_data) < len(data):
+        _write_atomic(path + '.gz', gz_data, mode)
+        written['gzip'] = len(gz_data)
+
+    if use_brotli:
+        import brotli
+        br_data = brotli.compress(data, quality=11)
+        if len(br_data) < len(data):
+            _write_atomic(path + '.br', br_data, mode)
+            written['br'] = len(br_data)
+
+    return written
+
+
+# Instance globale du service (configurée par init_app dans create_app)
+static_assets = StaticAssets()
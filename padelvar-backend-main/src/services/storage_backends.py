@@ -0,0 +1,232 @@
+"""
+Backends de stockage distant des vidéos (migration CDN)
+Interface commune, par envoi découpé et reprenable :
+- uploaded_bytes(key) : octets déjà reçus par le stockage (reprise)
+- upload_chunk(key, offset, data, total) : envoi d'un morceau à sa position
+- complete(key, checksum, size) : vérification de l'empreinte, URL publique
+
+Implémentations :
+- LocalDirectoryBackend : dossier local (tests, montage réseau) ; avec une URL
+  publique relative, les fichiers sont servis par la route /cdn/<clé>
+  (src/routes/media.py)
+- HTTPChunkedBackend : protocole Content-Range (voir scripts/storage_test_server.py)
+- BunnyStorageBackend : Bunny Storage (envoi complet, empreinte vérifiée par Bunny)
+
+urllib n'est importé qu'au premier envoi HTTP.
+"""
+
+import os
+import hashlib
+from pathlib import Path
+from typing import Optional
+
+
+class StorageError(Exception):
+    """Échec d'un envoi ; retryable=False pour les erreurs définitives"""
+
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+def file_sha256(path: str, block_size: int = 1024 * 1024) -> str:
+    """Empreinte SHA-256 d'un fichier, lu par blocs"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class StorageBackend:
+    """Interface des backends de stockage"""
+
+    name = 'base'
+    resumable = True
+
+    def uploaded_bytes(self, key: str) -> int:
+        raise NotImplementedError
+
+    def upload_chunk(self, key: str, offset: int, data: bytes, total: int):
+        raise NotImplementedError
+
+    def complete(self, key: str, checksum: str, size: int) -> str:
+        raise NotImplementedError
+
+    def upload_file(self, key: str, path: str, checksum: str, size: int) -> Optional[str]:
+        """Envoi complet en une fois (backends non reprenables) ; None sinon"""
+        return None
+
+
+class LocalDirectoryBackend(StorageBackend):
+    """Stockage dans un dossier : fichier partiel en cours, renommé une fois vérifié"""
+
+    name = 'local'
+
+    def __init__(self, root: str, public_base_url: str):
+        self.root = Path(root)
+        self.public_base_url = public_base_url.rstrip('/')
+
+    def _partial(self, key: str) -> Path:
+        return self.root / '.uploads' / f"{key.replace('/', '__')}.part"
+
+    def _final(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if self.root.resolve() not in path.parents:
+            raise StorageError(f"Clé invalide: {key}", retryable=False)
+        return path
+
+    def locate(self, key: str) -> Optional[Path]:
+        """Fichier publié sous cette clé (None si absent ou clé hors du dossier)"""
+        try:
+            path = self._final(key)
+        except StorageError:
+            return None
+        return path if path.is_file() else None
+
+    def uploaded_bytes(self, key: str) -> int:
+        if self._final(key).exists():
+            return self._final(key).stat().st_size
+        partial = self._partial(key)
+        return partial.stat().st_size if partial.exists() else 0
+
+    def upload_chunk(self, key: str, offset: int, data: bytes, total: int):
+        partial = self._partial(key)
+        partial.parent.mkdir(parents=True, exist_ok=True)
+        current = partial.stat().st_size if partial.exists() else 0
+        if offset != current:
+            raise StorageError(f"Position {offset} attendue {current}")
+        with open(partial, 'ab') as f:
+            f.write(data)
+
+    def complete(self, key: str, checksum: str, size: int) -> str:
+        final = self._final(key)
+        if not final.exists():
+            partial = self._partial(key)
+            if not partial.exists() or partial.stat().st_size != size:
+                raise StorageError("Envoi incomplet")
+            if file_sha256(str(partial)) != checksum:
+                partial.unlink()
+                raise StorageError("Empreinte différente, envoi repris depuis le début")
+            final.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(partial, final)
+        return f"{self.public_base_url}/{key}"
+
+
+class HTTPChunkedBackend(StorageBackend):
+    """
+    Envoi découpé sur HTTP :
+    - HEAD {base}/upload/{key}            -> en-tête Upload-Offset
+    - PUT  {base}/upload/{key}            Content-Range: bytes début-fin/total
+    - POST {base}/upload/{key}?complete   X-Checksum-SHA256 -> JSON {"url": ...}
+    """
+
+    name = 'http'
+
+    def __init__(self, base_url: str, api_key: Optional[str] = None, timeout: float = 30.0):
+        self.base_url = base_url.rstrip('/')
+        self.api_key = api_key
+        self.timeout = timeout
+
+    def _request(self, method: str, key: str, query: str = '', data: Optional[bytes] = None, headers=None):
+        import urllib.error
+        import urllib.request
+        from urllib.parse import quote
+
+        request = urllib.request.Request(f"{self.base_url}/upload/{quote(key)}{query}", data=data,
+                                         method=method, headers=dict(headers or {}))
+        if self.api_key:
+            request.add_header('Authorization', f"Bearer {self.api_key}")
+        try:
+            return urllib.request.urlopen(request, timeout=self.timeout)
+        except urllib.error.HTTPError as e:
+            # 409 : position décalée, 422 : empreinte refusée (envoi repris de zéro) ;
+            # les autres 4xx sont définitives
+            retryable = e.code >= 500 or e.code in (408, 409, 422, 429)
+            raise StorageError(f"HTTP {e.code} sur {method} {key}", retryable=retryable) from e
+        except OSError as e:
+            raise StorageError(f"{method} {key}: {e}") from e
+
+    def uploaded_bytes(self, key: str) -> int:
+        with self._request('HEAD', key) as response:
+            return int(response.headers.get('Upload-Offset', 0))
+
+    def upload_chunk(self, key: str, offset: int, data: bytes, total: int):
+        headers = {'Content-Range': f"bytes {offset}-{offset + len(data) - 1}/{total}",
+                   'Content-Type': 'application/octet-stream'}
+        with self._request('PUT', key, data=data, headers=headers):
+            pass
+
+    def complete(self, key: str, checksum: str, size: int) -> str:
+        import json
+        with self._request('POST', key, query='?complete', data=b'',
+                           headers={'X-Checksum-SHA256': checksum}) as response:
+            return json.loads(response.read())['url']
+
+
+class BunnyStorageBackend(StorageBackend):
+    """
+    Bunny Storage : PUT du fichier complet avec l'en-tête Checksum (SHA-256),
+    vérifié par Bunny. Pas de reprise partielle : un échec renvoie tout.
+    """
+
+    name = 'bunny'
+    resumable = False
+
+    def __init__(self, storage_zone: str, api_key: str, public_base_url: str,
+                 endpoint: str = 'https://storage.bunnycdn.com', timeout: float = 300.0):
+        self.storage_zone = storage_zone
+        self.api_key = api_key
+        self.public_base_url = public_base_url.rstrip('/')
+        self.endpoint = endpoint.rstrip('/')
+        self.timeout = timeout
+
+    def upload_file(self, key: str, path: str, checksum: str, size: int) -> str:
+        import urllib.error
+        import urllib.request
+        from urllib.parse import quote
+
+        with open(path, 'rb') as body:
+            request = urllib.request.Request(
+                f"{self.endpoint}/{self.storage_zone}/{quote(key)}", data=body, method='PUT',
+                headers={'AccessKey': self.api_key, 'Checksum': checksum.upper(),
+                         'Content-Type': 'application/octet-stream', 'Content-Length': str(size)})
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout):
+                    pass
+            except urllib.error.HTTPError as e:
+                raise StorageError(f"Bunny HTTP {e.code} pour {key}", retryable=e.code >= 500 or e.code == 429) from e
+            except OSError as e:
+                raise StorageError(f"Bunny {key}: {e}") from e
+        return f"{self.public_base_url}/{key}"
+
+
+# Préfixe servi par l'application pour le backend local (src/routes/media.py)
+LOCAL_CDN_ROUTE = '/cdn'
+
+
+def validate_config(config):
+    """Refuse au démarrage une URL publique que rien ne servirait (ValueError)"""
+    kind = config.get('CDN_BACKEND', 'local')
+    base_url = (config.get('CDN_PUBLIC_BASE_URL') or '').rstrip('/')
+    absolute = '://' in base_url
+    if kind == 'local' and not absolute and base_url != LOCAL_CDN_ROUTE:
+        raise ValueError(f"CDN_PUBLIC_BASE_URL={base_url or '(vide)'} : le backend local est servi par "
+                         f"{LOCAL_CDN_ROUTE}/<clé>, sinon indiquer l'URL absolue du serveur de fichiers")
+    if kind == 'bunny' and not absolute:
+        raise ValueError("CDN_BACKEND=bunny exige l'URL absolue de la zone dans CDN_PUBLIC_BASE_URL")
+
+
+def create_backend(config) -> StorageBackend:
+    """Backend choisi par CDN_BACKEND ('local', 'http' ou 'bunny')"""
+    validate_config(config)
+    kind = config.get('CDN_BACKEND', 'local')
+    if kind == 'local':
+        return LocalDirectoryBackend(config.get('CDN_LOCAL_ROOT', 'static/cdn'),
+                                     config.get('CDN_PUBLIC_BASE_URL') or LOCAL_CDN_ROUTE)
+    if kind == 'http':
+        return HTTPChunkedBackend(config['CDN_HTTP_URL'], config.get('CDN_API_KEY'))
+    if kind == 'bunny':
+        return BunnyStorageBackend(config['CDN_STORAGE_ZONE'], config['CDN_API_KEY'],
+                                   config['CDN_PUBLIC_BASE_URL'])
+    raise ValueError(f"Backend CDN inconnu: {kind}")
@@ -0,0 +1,595 @@
+"""
+Stockage local des enregistrements : niveaux chaud / froid, quotas et admission
+L'index (StoredFile) garde taille, niveau et dernier accès de chaque fichier :
+aucun parcours de dossier ni stat par fichier pour décider quoi libérer.
+
+- niveau chaud : VIDEO_STORAGE_PATH (disque rapide où écrivent les captures) ;
+  niveau froid : STORAGE_COLD_PATH (disque lent ou NAS), optionnel
+- une vidéo sans accès depuis STORAGE_HOT_DAYS descend au niveau froid
+- éviction LRU pondérée par la taille, par lots : parmi les fichiers les moins
+  récemment lus, les plus gros partent d'abord ; une vidéo n'est supprimée que
+  si elle est sur le CDN, supprimée en base ou sans accès depuis la rétention
+- quotas par club (tous niveaux confondus)
+- admission : une capture n'est acceptée que si débit estimé × durée prévue
+  tient dans l'espace libre (marge et réservations des captures en cours
+  déduites) ; sinon elle est dirigée vers le niveau froid ou refusée
+  (StorageFullError). Les réservations sont des lignes StorageReservation,
+  au nom de l'enregistrement, jusqu'à release(clé) ou la fin prévue de la
+  capture : tous les processus les voient. Une réservation est validée puis
+  vérifiée avec celles des autres processus, et retirée si elle ne tient pas
+  (deux admissions simultanées peuvent être refusées, jamais acceptées à
+  tort). L'éviction éventuelle se fait hors du verrou, une seule à la fois
+  dans le processus
+
+Un fichier adressé par contenu (blob_store) peut servir plusieurs vidéos :
+il n'est supprimé que si aucune ne le garde, et le balayage passe aussi le
+ramasse-miettes des fichiers sans référence.
+
+Les accès sont notés en mémoire et écrits par lots. Le balayage périodique
+démarre à la première capture, pas au démarrage ; il ne tourne que dans le
+processus qui tient le verrou STORAGE_SWEEP_LOCK_FILE.
+"""
+
+import os
+import shutil
+import logging
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from sqlalchemy import bindparam, delete, func, update
+
+from ..models.database import db
+from ..models.user import Video, Court, StoredFile, StorageReservation, TranscodeJob
+from .blob_store import blob_store
+from .process_lock import ProcessLock
+from .response_cache import video_tags
+
+logger = logging.getLogger(__name__)
+
+TIER_HOT = 'hot'
+TIER_COLD = 'cold'
+
+
+class StorageFullError(Exception):
+    """Capture refusée : espace disque ou quota du club insuffisant"""
+
+    def __init__(self, message: str, reason: str, details: Optional[Dict[str, Any]] = None):
+        super().__init__(message)
+        self.reason = reason  # 'disk' ou 'quota'
+        self.details = details or {}
+
+
+class StorageManager:
+    """Index, niveaux et admission du stockage local (pattern extension Flask)"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.hot_path = Path('static/videos')
+        self.thumbnails_path = Path('static/thumbnails')
+        self.cold_path: Optional[Path] = None
+        self.hot_days = 7
+        self.retention_days = 30
+        self.min_free_bytes = 20 * 1024 ** 3
+        self.club_quota_bytes = 0
+        self.club_quotas: Dict[int, int] = {}
+        self.eviction_batch = 50
+        self.sweep_interval = 900.0
+        self.bitrate = 4_000_000
+        self.space_margin = 1.2
+        self.lock = threading.RLock()
+        self._evict_lock = threading.RLock()
+        self.sweep_lock = ProcessLock('storage_sweeper')
+        self._accessed: Dict[str, datetime] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.admitted = 0
+        self.redirected = 0
+        self.refused = 0
+        self.evicted_files = 0
+        self.evicted_bytes = 0
+        self.demoted_files = 0
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Lit la configuration ; aucun accès disque ni thread ici"""
+        self.app = app
+        self.hot_path = Path(app.config.get('VIDEO_STORAGE_PATH', self.hot_path))
+        self.thumbnails_path = Path(app.config.get('THUMBNAILS_STORAGE_PATH', self.thumbnails_path))
+        cold = app.config.get('STORAGE_COLD_PATH')
+        self.cold_path = Path(cold) if cold else None
+        self.hot_days = app.config.get('STORAGE_HOT_DAYS', 7)
+        self.retention_days = app.config.get('STORAGE_RETENTION_DAYS', 30)
+        self.min_free_bytes = app.config.get('STORAGE_MIN_FREE_BYTES', self.min_free_bytes)
+        self.club_quota_bytes = app.config.get('STORAGE_CLUB_QUOTA_BYTES', 0)
+        self.club_quotas = dict(app.config.get('STORAGE_CLUB_QUOTAS') or {})
+        self.eviction_batch = app.config.get('STORAGE_EVICTION_BATCH', 50)
+        self.sweep_interval = app.config.get('STORAGE_SWEEP_INTERVAL', 900.0)
+        self.bitrate = app.config.get('RECORDING_ESTIMATED_BITRATE', self.bitrate)
+        self.space_margin = app.config.get('RECORDING_SPACE_MARGIN', 1.2)
+        self.sweep_lock.configure(app.config.get('STORAGE_SWEEP_LOCK_FILE')
+                                  or os.path.join(app.instance_path, 'storage_sweeper.lock'))
+        app.extensions['storage_manager'] = self
+
+    @property
+    def cold_videos_path(self) -> Optional[Path]:
+        return self.cold_path / 'videos' if self.cold_path else None
+
+    def tier_directory(self, tier: str) -> Path:
+        return self.cold_videos_path if tier == TIER_COLD else self.hot_path
+
+    @staticmethod
+    def disk_free(path: Path) -> int:
+        """Espace libre du disque portant path (dossier pas encore créé accepté)"""
+        path = Path(path).absolute()
+        while not path.exists() and path != path.parent:
+            path = path.parent
+        return shutil.disk_usage(path).free
+
+    # ------------------------------------------------------------------
+    # Index
+    # ------------------------------------------------------------------
+
+    def register(self, path, kind: str = 'video', video_id: Optional[int] = None,
+                 club_id: Optional[int] = None) -> Optional[StoredFile]:
+        """Ajoute (ou met à jour) un fichier dans l'index"""
+        path = Path(path)
+        try:
+            size = path.stat().st_size
+        except OSError:
+            return None
+        tier = TIER_COLD if self.cold_path and self.cold_path.absolute() in path.absolute().parents else TIER_HOT
+        entry = db.session.query(StoredFile).filter_by(path=str(path)).first() or StoredFile(path=str(path))
+        entry.kind = kind
+        entry.tier = tier
+        entry.size = size
+        entry.video_id = video_id
+        entry.club_id = club_id
+        entry.last_access = datetime.utcnow()
+        db.session.add(entry)
+        db.session.commit()
+        self.start()
+        return entry
+
+    def touch(self, path):
+        """Note un accès ; écrit en base par lots (flush_access)"""
+        if path is None:
+            return
+        with self.lock:
+            self._accessed[str(path)] = datetime.utcnow()
+            pending = len(self._accessed)
+        if pending >= 256:
+            self.flush_access()
+
+    def flush_access(self) -> int:
+        with self.lock:
+            accessed, self._accessed = self._accessed, {}
+        if not accessed:
+            return 0
+        table = StoredFile.__table__
+        db.session.execute(
+            table.update().where(table.c.path == bindparam('target')).values(last_access=bindparam('accessed_at')),
+            [{'target': path, 'accessed_at': when} for path, when in accessed.items()]
+        )
+        db.session.commit()
+        return len(accessed)
+
+    def reindex(self) -> Dict[str, int]:
+        """Reconstruit l'index depuis les dossiers (première mise en service, reprise)"""
+        rows = db.session.query(Video.id, Video.file_url, Video.thumbnail_url, Court.club_id) \
+            .outerjoin(Court, Video.court_id == Court.id).all()
+        by_name = {}
+        for row in rows:
+            for url, kind in ((row.file_url, 'video'), (row.thumbnail_url, 'thumbnail')):
+                if url:
+                    by_name[Path(url).name] = (kind, row.id, row.club_id)
+
+        known = {entry.path: entry for entry in db.session.query(StoredFile).all()}
+        seen = set()
+        added = 0
+        # Fichiers à plat des dossiers, puis fichiers adressés par contenu (connus par la table blob)
+        files = []
+        directories = [(self.hot_path, TIER_HOT), (self.thumbnails_path, TIER_HOT)]
+        if self.cold_videos_path:
+            directories.append((self.cold_videos_path, TIER_COLD))
+        for directory, tier in directories:
+            if not directory.exists():
+                continue
+            for item in os.scandir(directory):
+                if item.is_file() and not item.name.endswith('.part'):
+                    files.append((directory / item.name, tier, 'thumbnail' if directory == self.thumbnails_path
+                                  else 'video'))
+        files.extend((path, TIER_HOT, 'video') for path in blob_store.stored_paths())
+
+        for file_path, tier, default_kind in files:
+            path = str(file_path)
+            seen.add(path)
+            stat = file_path.stat()
+            kind, video_id, club_id = by_name.get(file_path.name, (default_kind, None, None))
+            entry = known.get(path)
+            if entry is None:
+                entry = StoredFile(path=path, created_at=datetime.utcfromtimestamp(stat.st_mtime))
+                db.session.add(entry)
+                added += 1
+            entry.kind, entry.tier, entry.size = kind, tier, stat.st_size
+            entry.video_id, entry.club_id = video_id, club_id
+            if entry.last_access is None:
+                entry.last_access = datetime.utcfromtimestamp(max(stat.st_atime, stat.st_mtime))
+        removed = 0
+        for path, entry in known.items():
+            if path not in seen:
+                db.session.delete(entry)
+                removed += 1
+        db.session.commit()
+        return {'indexed': len(seen), 'added': added, 'removed': removed}
+
+    # ------------------------------------------------------------------
+    # Admission des captures
+    # ------------------------------------------------------------------
+
+    def projected_bytes(self, planned_minutes: float) -> int:
+        return int(self.bitrate / 8 * planned_minutes * 60 * self.space_margin)
+
+    def club_quota(self, club_id: Optional[int]) -> int:
+        if club_id is None:
+            return 0
+        return self.club_quotas.get(club_id, self.club_quota_bytes)
+
+    def club_stored(self, club_id: int) -> int:
+        """Octets indexés pour le club (tous niveaux)"""
+        return int(db.session.query(func.coalesce(func.sum(StoredFile.size), 0))
+                   .filter(StoredFile.club_id == club_id).scalar())
+
+    def _reserved(self, tier: Optional[str] = None, club_id: Optional[int] = None) -> int:
+        """Octets encore à écrire par les captures en cours, tous processus (réservations échues ignorées)"""
+        query = db.session.query(StorageReservation.path, StorageReservation.bytes) \
+            .filter(StorageReservation.expires_at > datetime.utcnow())
+        if tier:
+            query = query.filter(StorageReservation.tier == tier)
+        if club_id is not None:
+            query = query.filter(StorageReservation.club_id == club_id)
+        total = 0
+        for path, reserved in query:
+            try:
+                written = os.stat(path).st_size if path else 0
+            except OSError:
+                written = 0
+            total += max(0, (reserved or 0) - written)
+        return total
+
+    def reservation(self, key: str) -> Optional[StorageReservation]:
+        return db.session.query(StorageReservation).filter_by(key=key).first()
+
+    def available_bytes(self, tier: str) -> int:
+        directory = self.tier_directory(tier)
+        if directory is None:
+            return 0
+        return self.disk_free(directory) - self.min_free_bytes - self._reserved(tier=tier)
+
+    def _shortfall(self, club_id: Optional[int], needed: int, club_stored: int) -> Dict[str, int]:
+        """Octets manquants pour le quota du club et au niveau chaud, en plus des réservations"""
+        quota = self.club_quota(club_id)
+        return {
+            'quota': max(0, club_stored + self._reserved(club_id=club_id) + needed - quota) if quota else 0,
+            'disk': max(0, needed - self.available_bytes(TIER_HOT))
+        }
+
+    def _reserve(self, key: str, club_id: Optional[int], needed: int, planned_minutes: float,
+                 filename: Optional[str], club_stored: int, allow_cold: bool) -> Optional[Dict[str, Any]]:
+        """
+        Réserve l'espace si la capture tient (appelé sous self.lock), au niveau
+        froid seulement si allow_cold ; retourne None sinon. La réservation est
+        validée d'abord puis vérifiée : les réservations validées entre-temps
+        par d'autres processus sont comptées.
+        """
+        now = datetime.utcnow()
+        db.session.execute(delete(StorageReservation).where(StorageReservation.expires_at <= now))
+        reservation = StorageReservation(
+            key=key, club_id=club_id, tier=TIER_HOT, bytes=needed,
+            path=str(self.hot_path / filename) if filename else None,
+            # Filet de sécurité : une réservation jamais libérée s'éteint à la fin prévue de la capture
+            expires_at=now + timedelta(minutes=planned_minutes * self.space_margin + 5))
+        db.session.add(reservation)
+        db.session.commit()
+
+        shortfall = self._shortfall(club_id, 0, club_stored)
+        fits = not shortfall['quota'] and not shortfall['disk']
+        if not shortfall['quota'] and shortfall['disk'] and allow_cold and self.cold_path is not None:
+            reservation.tier = TIER_COLD
+            reservation.path = str(self.cold_videos_path / filename) if filename else None
+            db.session.commit()
+            fits = self.available_bytes(TIER_COLD) >= 0
+        if not fits:
+            db.session.delete(reservation)
+            db.session.commit()
+            return None
+        return {'tier': reservation.tier, 'directory': self.tier_directory(reservation.tier),
+                'projected_bytes': needed}
+
+    def admit(self, key: str, club_id: Optional[int], planned_minutes: float,
+              filename: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Réserve, au nom de la capture key, l'espace de planned_minutes sur le
+        disque et dans le quota du club, jusqu'à release(key). Si l'espace
+        manque, évince hors du verrou des réservations puis réessaie ; redirige
+        vers le niveau froid ou lève StorageFullError sinon.
+        """
+        needed = self.projected_bytes(planned_minutes)
+        quota = self.club_quota(club_id)
+        club_stored = self.club_stored(club_id) if quota else 0
+        with self.lock:
+            admission = self._reserve(key, club_id, needed, planned_minutes, filename, club_stored,
+                                      allow_cold=False)
+        if admission is None:
+            # Une seule éviction à la fois ; celle d'une autre capture a pu suffire
+            with self._evict_lock:
+                club_stored = self.club_stored(club_id) if quota else 0
+                with self.lock:
+                    shortfall = self._shortfall(club_id, needed, club_stored)
+                if shortfall['quota']:
+                    self.evict(shortfall['quota'], club_id=club_id, allow_demote=False)
+                if shortfall['disk']:
+                    # Suppressions seulement : les déplacements vers le froid sont pour le balayage
+                    self.evict(shortfall['disk'], tier=TIER_HOT, allow_demote=False)
+                club_stored = self.club_stored(club_id) if quota else 0
+                with self.lock:
+                    admission = self._reserve(key, club_id, needed, planned_minutes, filename, club_stored,
+                                              allow_cold=True)
+                    if admission is None:
+                        shortfall = self._shortfall(club_id, needed, club_stored)
+        if admission is None:
+            with self.lock:
+                self.refused += 1
+            if shortfall['quota']:
+                raise StorageFullError("Quota de stockage du club atteint", 'quota',
+                                       {'needed_bytes': needed, 'quota_bytes': quota,
+                                        'missing_bytes': shortfall['quota']})
+            raise StorageFullError("Espace disque insuffisant pour cet enregistrement", 'disk',
+                                   {'needed_bytes': needed, 'missing_bytes': shortfall['disk']})
+        with self.lock:
+            self.admitted += 1
+            if admission['tier'] == TIER_COLD:
+                self.redirected += 1
+        if admission['tier'] == TIER_COLD:
+            logger.warning(f"Disque chaud plein : capture {key} dirigée vers le niveau froid ({needed} octets prévus)")
+        self.start()
+        return admission
+
+    def release(self, *keys: str):
+        """Libère les réservations de captures terminées (sans effet si elles n'existent plus) ; valide"""
+        db.session.execute(delete(StorageReservation).where(StorageReservation.key.in_(keys)))
+        db.session.commit()
+
+    # ------------------------------------------------------------------
+    # Éviction
+    # ------------------------------------------------------------------
+
+    def _videos(self, video_ids: List[int]) -> Dict[int, Any]:
+        if not video_ids:
+            return {}
+        rows = db.session.query(Video.id, Video.cdn_migrated_at).filter(Video.id.in_(video_ids)).all()
+        return {row.id: row for row in rows}
+
+    def _busy_videos(self, video_ids: List[int]) -> set:
+        """Vidéos dont un encodage lit encore le fichier"""
+        if not video_ids:
+            return set()
+        rows = db.session.query(TranscodeJob.video_id).filter(
+            TranscodeJob.video_id.in_(video_ids), TranscodeJob.status.in_(('queued', 'running'))).all()
+        return {row.video_id for row in rows}
+
+    def evict(self, target_bytes: float, tier: Optional[str] = None, club_id: Optional[int] = None,
+              idle_before: Optional[datetime] = None, allow_demote: bool = True,
+              allow_delete: bool = True, retention_days: Optional[int] = None) -> int:
+        """
+        Libère target_bytes par lots : parmi les fichiers les moins récemment lus,
+        score = taille × inactivité (les gros fichiers oubliés partent d'abord).
+        Retourne les octets libérés (au niveau demandé, ou pour le club).
+        Une seule éviction à la fois (admission et balayage) ; jamais sous self.lock.
+        """
+        with self._evict_lock:
+            return self._evict(target_bytes, tier, club_id, idle_before, allow_demote, allow_delete, retention_days)
+
+    def _evict(self, target_bytes, tier, club_id, idle_before, allow_demote, allow_delete, retention_days) -> int:
+        self.flush_access()
+        now = datetime.utcnow()
+        retention_cutoff = now - timedelta(days=self.retention_days if retention_days is None else retention_days)
+        demote = allow_demote and self.cold_path is not None and tier == TIER_HOT
+        reserved_paths = {path for path, in db.session.query(StorageReservation.path)
+                          .filter(StorageReservation.path.isnot(None), StorageReservation.expires_at > now)}
+        freed = 0
+        skipped_ids: set = set()
+
+        while freed < target_bytes:
+            query = db.session.query(StoredFile)
+            if tier:
+                query = query.filter(StoredFile.tier == tier)
+            if club_id is not None:
+                query = query.filter(StoredFile.club_id == club_id)
+            if idle_before is not None:
+                query = query.filter(StoredFile.last_access < idle_before)
+            if skipped_ids:
+                query = query.filter(StoredFile.id.notin_(skipped_ids))
+            window = query.order_by(StoredFile.last_access).limit(self.eviction_batch * 4).all()
+            if not window:
+                break
+
+            # Fichiers partagés : toutes les vidéos qui les référencent comptent
+            blob_refs = blob_store.references([name for name in map(blob_store.owns, (e.path for e in window))
+                                               if name])
+            video_ids = [entry.video_id for entry in window if entry.video_id]
+            videos = self._videos(video_ids)
+            busy = self._busy_videos(video_ids + [video_id for refs in blob_refs.values() for video_id, _ in refs])
+            window.sort(key=lambda e: (e.size or 0) * max(1.0, (now - e.last_access).total_seconds()), reverse=True)
+
+            batch_freed = 0
+            deleted_videos, deleted_thumbnails = [], []
+            for entry in window:
+                if freed + batch_freed >= target_bytes or len(deleted_videos) + len(deleted_thumbnails) >= self.eviction_batch:
+                    break
+                skipped_ids.add(entry.id)
+                name = blob_store.owns(entry.path)
+                refs = blob_refs.get(name, []) if name else []
+                if entry.path in reserved_paths or entry.video_id in busy \
+                        or any(video_id in busy for video_id, _ in refs):
+                    continue
+                video = videos.get(entry.video_id)
+                if demote and entry.kind == 'video' and self.available_bytes(TIER_COLD) > entry.size:
+                    if self._demote(entry):
+                        batch_freed += entry.size or 0
+                    continue
+                expired = entry.last_access < retention_cutoff
+                if name:
+                    # Une vidéo migrée ne référence plus le fichier local : il reste les autres
+                    deletable = not refs or expired
+                elif entry.kind == 'video':
+                    deletable = video is None or video.cdn_migrated_at is not None or expired
+                else:
+                    deletable = video is None or expired
+                if not allow_delete or not deletable:
+                    continue
+                try:
+                    Path(entry.path).unlink(missing_ok=True)
+                except OSError as e:
+                    logger.warning(f"Fichier non supprimé {entry.path}: {e}")
+                    continue
+                batch_freed += entry.size or 0
+                self.evicted_files += 1
+                self.evicted_bytes += entry.size or 0
+                # Vidéo absente du CDN ou miniature : l'URL locale est retirée
+                if name:
+                    for video_id, column in refs:
+                        (deleted_videos if column == 'file_url' else deleted_thumbnails).append(video_id)
+                    blob_store.forget(name)
+                elif video is not None and entry.kind == 'video' and video.cdn_migrated_at is None:
+                    deleted_videos.append(entry.video_id)
+                elif video is not None and entry.kind == 'thumbnail':
+                    deleted_thumbnails.append(entry.video_id)
+                db.session.delete(entry)
+
+            # UPDATE groupés, sans événement par ligne : étiquettes des joueurs et clubs passées au cache
+            if deleted_videos:
+                db.session.execute(update(Video).where(Video.id.in_(deleted_videos))
+                                   .values(file_url=None).execution_options(
+                                       synchronize_session=False, cache_tags=video_tags(deleted_videos)))
+            if deleted_thumbnails:
+                db.session.execute(update(Video).where(Video.id.in_(deleted_thumbnails))
+                                   .values(thumbnail_url=None).execution_options(
+                                       synchronize_session=False, cache_tags=video_tags(deleted_thumbnails)))
+            db.session.commit()
+            freed += batch_freed
+        if freed:
+            logger.info(f"Stockage : {freed} octets libérés (niveau {tier or 'tous'}, club {club_id or '-'})")
+        return freed
+
+    def _demote(self, entry: StoredFile) -> bool:
+        """Déplace un fichier vers le niveau froid (même nom, file_url inchangée)"""
+        source = Path(entry.path)
+        target = self.cold_videos_path / source.name
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(str(source), str(target))
+        except OSError as e:
+            logger.warning(f"Déplacement vers le niveau froid impossible pour {source}: {e}")
+            return False
+        entry.path = str(target)
+        entry.tier = TIER_COLD
+        self.demoted_files += 1
+        return True
+
+    def sweep(self, retention_days: Optional[int] = None) -> Dict[str, Any]:
+        """Passe complète : niveaux, rétention, quotas des clubs, marge libre"""
+        now = datetime.utcnow()
+        report: Dict[str, Any] = {'accesses_flushed': self.flush_access()}
+        report['blobs'] = blob_store.collect()
+        if self.cold_path is not None:
+            report['demoted_bytes'] = self.evict(float('inf'), tier=TIER_HOT, allow_delete=False,
+                                                 idle_before=now - timedelta(days=self.hot_days))
+        days = self.retention_days if retention_days is None else retention_days
+        report['expired_bytes'] = self.evict(float('inf'), idle_before=now - timedelta(days=days),
+                                             allow_demote=False, retention_days=days)
+
+        quota_clubs = {}
+        for club_id, used in db.session.query(StoredFile.club_id, func.sum(StoredFile.size)) \
+                .filter(StoredFile.club_id.isnot(None)).group_by(StoredFile.club_id):
+            quota = self.club_quota(club_id)
+            if quota and used > quota:
+                quota_clubs[club_id] = self.evict(used - quota, club_id=club_id, allow_demote=False)
+        report['quota_evictions'] = quota_clubs
+
+        for tier in (TIER_HOT, TIER_COLD):
+            if self.tier_directory(tier) is None:
+                continue
+            missing = -self.available_bytes(tier)
+            if missing > 0:
+                report[f'{tier}_pressure_bytes'] = self.evict(missing, tier=tier)
+        return report
+
+    # ------------------------------------------------------------------
+    # Balayage de fond et état
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Démarre le balayage périodique (idempotent)"""
+        if not self.sweep_interval or self.app is None:
+            return
+        with self.lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='storage-sweeper', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.sweep_interval):
+            # Plusieurs workers : un seul balaie, les autres réessaient au tour suivant
+            if not self.sweep_lock.acquire():
+                continue
+            try:
+                with self.app.app_context():
+                    report = self.sweep()
+                logger.info(f"Balayage du stockage : {report}")
+            except Exception as e:
+                logger.error(f"Erreur du balayage du stockage: {e}")
+
+    def usage(self) -> Dict[str, Any]:
+        tiers = {}
+        for tier, files, size in db.session.query(StoredFile.tier, func.count(StoredFile.id),
+                                                  func.coalesce(func.sum(StoredFile.size), 0)) \
+                .group_by(StoredFile.tier):
+            tiers[tier] = {'files': files, 'bytes': int(size)}
+        for tier in (TIER_HOT, TIER_COLD):
+            directory = self.tier_directory(tier)
+            if directory is not None:
+                tiers.setdefault(tier, {'files': 0, 'bytes': 0})
+                tiers[tier]['free_bytes'] = self.disk_free(directory)
+                tiers[tier]['available_bytes'] = self.available_bytes(tier)
+        clubs = db.session.query(StoredFile.club_id, func.sum(StoredFile.size).label('used')) \
+            .filter(StoredFile.club_id.isnot(None)).group_by(StoredFile.club_id) \
+            .order_by(func.sum(StoredFile.size).desc()).limit(20).all()
+        return {
+            'tiers': tiers,
+            'clubs': [{'club_id': club_id, 'bytes': int(used), 'quota_bytes': self.club_quota(club_id)}
+                      for club_id, used in clubs],
+            'reservations': [reservation.to_dict() for reservation in db.session.query(StorageReservation)
+                             .filter(StorageReservation.expires_at > datetime.utcnow())
+                             .order_by(StorageReservation.expires_at)],
+            'sweeps_here': self.sweep_lock.held,
+            'admitted': self.admitted,
+            'redirected': self.redirected,
+            'refused': self.refused,
+            'evicted_files': self.evicted_files,
+            'evicted_bytes': self.evicted_bytes,
+            'demoted_files': self.demoted_files,
+            'blobs': blob_store.stats()
+        }
+
+    def shutdown(self):
+        self._stop.set()
+
+
+# Instance globale du service (configurée par init_app dans create_app)
+storage_manager = StorageManager()
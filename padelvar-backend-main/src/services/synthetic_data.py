@@ -0,0 +1,297 @@
+"""
+Générateur de données synthétiques pour benchmarks et dimensionnement
+Insère en masse (INSERT Core par lots, une transaction) des volumes proches
+de la production avec des distributions réalistes :
+- popularité des clubs en loi de Zipf (abonnements, historique)
+- vidéos en série temporelle (soirées et week-ends plus chargés)
+- mêmes graine et tailles => mêmes données, ligne pour ligne
+"""
+
+import json
+import random
+import logging
+import time
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import Dict, Any, Iterator, List
+
+from sqlalchemy import func, select, text
+from werkzeug.security import generate_password_hash
+
+from ..models.database import db
+from ..models.user import (
+    User, Club, Court, Video, ClubActionHistory, UserRole, player_club_follows
+)
+from .follow_graph import recount_statements
+
+logger = logging.getLogger(__name__)
+
+# Profils de volumes prêts à l'emploi
+DATASET_PROFILES = {
+    'small': {
+        'clubs': 50, 'courts_per_club': 4, 'players': 2000,
+        'follows_per_player': 3, 'videos_per_player': 10, 'history': 20000, 'days': 180
+    },
+    'medium': {
+        'clubs': 500, 'courts_per_club': 5, 'players': 20000,
+        'follows_per_player': 4, 'videos_per_player': 20, 'history': 200000, 'days': 365
+    },
+    'large': {
+        'clubs': 5000, 'courts_per_club': 6, 'players': 200000,
+        'follows_per_player': 5, 'videos_per_player': 25, 'history': 2000000, 'days': 730
+    }
+}
+
+# Répartition des actions d'historique (type, poids)
+HISTORY_ACTIONS = (
+    ('start_recording', 40),
+    ('stop_recording', 38),
+    ('follow_club', 10),
+    ('add_credits', 8),
+    ('unfollow_club', 3),
+    ('update_player', 1)
+)
+
+# Poids horaires des matchs : creux la nuit, pic en soirée
+HOURLY_WEIGHTS = (1, 0, 0, 0, 0, 0, 1, 2, 4, 5, 5, 5, 6, 5, 4, 5, 7, 10, 14, 16, 15, 12, 7, 3)
+WEEKEND_FACTOR = 1.6
+
+CITIES = ('Tunis', 'Sousse', 'Sfax', 'Nabeul', 'Hammamet', 'Monastir', 'Bizerte', 'Djerba')
+CLUB_WORDS = ('Padel', 'Arena', 'Club', 'Sport', 'Center', 'Academy', 'Smash', 'Court')
+FIRST_NAMES = ('Ahmed', 'Sami', 'Yasmine', 'Leila', 'Karim', 'Nour', 'Mehdi', 'Ines', 'Omar', 'Sarra')
+LAST_NAMES = ('Ben Ali', 'Trabelsi', 'Gharbi', 'Jaziri', 'Mansour', 'Haddad', 'Khelifi', 'Bouazizi')
+
+
+def player_email(player_id: int) -> str:
+    """Email d'un joueur synthétique (mot de passe : celui du générateur)"""
+    return f"player{player_id}@synthetic.padelvar.local"
+
+
+class SyntheticDataGenerator:
+    """Génère et insère un jeu de données déterministe"""
+
+    def __init__(self, sizes: Dict[str, int], seed: int = 42, batch_size: int = 5000,
+                 zipf_exponent: float = 1.1, password: str = 'password123'):
+        self.sizes = dict(DATASET_PROFILES['small'], **sizes)
+        self.seed = seed
+        self.batch_size = batch_size
+        self.zipf_exponent = zipf_exponent
+        self.password = password
+        self.rng = random.Random(seed)
+        self.now = datetime(2025, 1, 1)  # ancrage fixe : dates reproductibles
+        self.counts: Dict[str, int] = {}
+
+    # ------------------------------------------------------------------
+    # Distributions
+    # ------------------------------------------------------------------
+
+    def _zipf_cum_weights(self, n: int) -> List[float]:
+        """Poids cumulés de Zipf : le rang 1 est le plus populaire"""
+        return list(accumulate(1.0 / (rank ** self.zipf_exponent) for rank in range(1, n + 1)))
+
+    def _zipf_pick(self, items: List[int], cum_weights: List[float]) -> int:
+        return items[bisect_left(cum_weights, self.rng.random() * cum_weights[-1])]
+
+    def _random_moment(self) -> datetime:
+        """Date dans la fenêtre, pondérée par jour de semaine et heure"""
+        while True:
+            day = self.now - timedelta(days=self.rng.randrange(self.sizes['days']))
+            weight = WEEKEND_FACTOR if day.weekday() >= 5 else 1.0
+            if self.rng.random() * WEEKEND_FACTOR <= weight:
+                break
+        hour = self.rng.choices(range(24), weights=HOURLY_WEIGHTS)[0]
+        return day.replace(hour=hour, minute=self.rng.randrange(60), second=self.rng.randrange(60),
+                           microsecond=0)
+
+    # ------------------------------------------------------------------
+    # Insertion par lots
+    # ------------------------------------------------------------------
+
+    def _insert(self, connection, table, rows: Iterator[Dict[str, Any]]) -> int:
+        """INSERT Core par lots de batch_size lignes"""
+        total = 0
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                connection.execute(table.insert(), batch)
+                total += len(batch)
+                batch = []
+        if batch:
+            connection.execute(table.insert(), batch)
+            total += len(batch)
+        self.counts[table.name] = self.counts.get(table.name, 0) + total
+        return total
+
+    def _next_id(self, connection, model) -> int:
+        return (connection.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+    # ------------------------------------------------------------------
+    # Génération
+    # ------------------------------------------------------------------
+
+    def generate(self, engine=None) -> Dict[str, Any]:
+        """
+        Insère le jeu de données dans une seule transaction.
+
+        Returns:
+            dict: Lignes insérées par table, durée et identifiants utiles
+        """
+        engine = engine or db.engine
+        sizes = self.sizes
+        rng = self.rng
+        started = time.perf_counter()
+
+        # Un seul hachage partagé : le KDF n'a pas à dominer la génération
+        password_hash = generate_password_hash(self.password)
+
+        with engine.begin() as connection:
+            first_club = self._next_id(connection, Club)
+            first_user = self._next_id(connection, User)
+            first_court = self._next_id(connection, Court)
+
+            club_ids = list(range(first_club, first_club + sizes['clubs']))
+            club_names = {
+                club_id: f"{rng.choice(CLUB_WORDS)} {rng.choice(CITIES)} {club_id}" for club_id in club_ids
+            }
+            self._insert(connection, Club.__table__, (
+                {
+                    'id': club_id,
+                    'name': club_names[club_id],
+                    'address': f"{rng.randint(1, 200)} avenue {rng.choice(CITIES)}",
+                    'phone_number': f"+216{rng.randint(20000000, 99999999)}",
+                    'email': f"club{club_id}@synthetic.padelvar.local",
+                    'created_at': self.now - timedelta(days=rng.randrange(sizes['days'] + 365))
+                }
+                for club_id in club_ids
+            ))
+
+            # Un compte CLUB par club, comme en production
+            self._insert(connection, User.__table__, (
+                {
+                    'id': first_user + i,
+                    'email': f"club{club_id}@synthetic.padelvar.local",
+                    'name': club_names[club_id],
+                    'password_hash': password_hash,
+                    'role': UserRole.CLUB,
+                    'credits_balance': 0,
+                    'club_id': club_id,
+                    'created_at': self.now - timedelta(days=sizes['days'])
+                }
+                for i, club_id in enumerate(club_ids)
+            ))
+
+            courts_by_club: Dict[int, List[int]] = {}
+            court_rows = []
+            court_id = first_court
+            for club_id in club_ids:
+                count = max(1, int(rng.gauss(sizes['courts_per_club'], 1)))
+                courts_by_club[club_id] = list(range(court_id, court_id + count))
+                for j in range(count):
+                    court_rows.append({
+                        'id': court_id,
+                        'name': f"Terrain {j + 1}",
+                        'qr_code': f"SYN_{club_id}_{j}_{self.seed}",
+                        'camera_url': f"http://camera.synthetic.local/{court_id}",
+                        'club_id': club_id,
+                        'is_recording': False
+                    })
+                    court_id += 1
+            self._insert(connection, Court.__table__, iter(court_rows))
+
+            first_player = first_user + len(club_ids)
+            player_ids = list(range(first_player, first_player + sizes['players']))
+            self._insert(connection, User.__table__, (
+                {
+                    'id': player_id,
+                    'email': player_email(player_id),
+                    'name': f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                    'password_hash': password_hash,
+                    'role': UserRole.PLAYER,
+                    'credits_balance': int(rng.paretovariate(1.5) * 5),
+                    'created_at': self.now - timedelta(days=rng.randrange(sizes['days']))
+                }
+                for player_id in player_ids
+            ))
+
+            # Abonnements : nombre géométrique par joueur, clubs tirés selon Zipf
+            club_weights = self._zipf_cum_weights(len(club_ids))
+            follows_by_player: Dict[int, List[int]] = {}
+
+            def follow_rows():
+                mean = sizes['follows_per_player']
+                for player_id in player_ids:
+                    wanted = min(len(club_ids), 1 + int(rng.expovariate(1.0 / max(mean - 1, 0.1))))
+                    followed = set()
+                    while len(followed) < wanted:
+                        followed.add(self._zipf_pick(club_ids, club_weights))
+                    follows_by_player[player_id] = sorted(followed)
+                    for club_id in follows_by_player[player_id]:
+                        yield {'player_id': player_id, 'club_id': club_id}
+            self._insert(connection, player_club_follows, follow_rows())
+            for statement in recount_statements():
+                connection.execute(statement)
+
+            # Vidéos : série temporelle, majoritairement sur les clubs suivis
+            def video_rows():
+                video_id = self._next_id(connection, Video)
+                for player_id in player_ids:
+                    count = int(rng.expovariate(1.0 / sizes['videos_per_player'])) if sizes['videos_per_player'] else 0
+                    for _ in range(count):
+                        club_id = (rng.choice(follows_by_player[player_id]) if rng.random() < 0.8
+                                   else self._zipf_pick(club_ids, club_weights))
+                        recorded_at = self._random_moment()
+                        yield {
+                            'id': video_id,
+                            'title': f"Match du {recorded_at.strftime('%d/%m/%Y %H:%M')}",
+                            'file_url': f"/videos/synthetic_{video_id}.mp4",
+                            'thumbnail_url': f"/thumbnails/synthetic_{video_id}.jpg",
+                            'duration': rng.choice((60, 90, 120)) * 60,
+                            'file_size': rng.randint(200, 1500) * 1024 * 1024,
+                            'is_unlocked': rng.random() < 0.7,
+                            'credits_cost': 1,
+                            'recorded_at': recorded_at,
+                            'created_at': recorded_at,
+                            'user_id': player_id,
+                            'court_id': rng.choice(courts_by_club[club_id])
+                        }
+                        video_id += 1
+            self._insert(connection, Video.__table__, video_rows())
+
+            # Historique : joueurs actifs selon Zipf, clubs parmi leurs abonnements
+            player_weights = self._zipf_cum_weights(len(player_ids))
+            action_types = [action for action, _ in HISTORY_ACTIONS]
+            action_weights = list(accumulate(weight for _, weight in HISTORY_ACTIONS))
+
+            def history_rows():
+                for _ in range(sizes['history']):
+                    player_id = self._zipf_pick(player_ids, player_weights)
+                    club_id = rng.choice(follows_by_player[player_id])
+                    action_type = action_types[bisect_left(action_weights, rng.random() * action_weights[-1])]
+                    by_club = action_type in ('add_credits', 'update_player')
+                    yield {
+                        'user_id': player_id,
+                        'club_id': club_id,
+                        'performed_by_id': club_id - first_club + first_user if by_club else player_id,
+                        'action_type': action_type,
+                        'action_details': json.dumps({'synthetic': True}),
+                        'performed_at': self._random_moment()
+                    }
+            self._insert(connection, ClubActionHistory.__table__, history_rows())
+
+            if engine.dialect.name == 'sqlite':
+                # Statistiques à jour pour des plans de requête réalistes
+                connection.execute(text('ANALYZE'))
+
+        duration = time.perf_counter() - started
+        logger.info(f"Données synthétiques générées en {duration:.1f}s: {self.counts}")
+        return {
+            'seed': self.seed,
+            'sizes': self.sizes,
+            'rows': dict(self.counts),
+            'duration_seconds': round(duration, 2),
+            'club_ids': club_ids,
+            'player_ids': player_ids,
+            'court_ids': [c for courts in courts_by_club.values() for c in courts]
+        }
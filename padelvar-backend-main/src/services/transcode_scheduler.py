@@ -0,0 +1,384 @@
+"""
+Encodage différé de l'échelle de qualités (HLS) des vidéos enregistrées
+La capture en direct encode vite (RECORDING_PRESET) ; la qualité finale et
+les rendus adaptés aux connexions faibles sont produits après le match :
+- une seule passe FFmpeg décode la source et encode tous les rendus de
+  l'échelle (1080/720/480/240 plafonnés à la hauteur source), images clés
+  alignées entre rendus, playlist maître HLS
+- la file est persistée (TranscodeJob) et ordonnée par priorité : vidéos
+  récentes, déverrouillées, partagées d'abord
+- l'ordonnanceur plafonne les encodages simultanés, cède les créneaux aux
+  enregistrements en cours et attend quand la charge CPU dépasse le seuil.
+  Plafond et captures sont comptés par processus : avec plusieurs workers,
+  chacun encode jusqu'à TRANSCODE_MAX_CONCURRENT vidéos
+- une tâche est réclamée par un UPDATE conditionnel (queued -> running) :
+  une vidéo présente dans la file de plusieurs processus n'est encodée qu'une
+  fois ; une tâche 'running' n'est remise en file qu'après
+  TRANSCODE_STALE_MINUTES (processus arrêté en cours d'encodage)
+
+Le thread d'ordonnancement démarre à la première tâche, pas au démarrage.
+"""
+
+import os
+import json
+import time
+import heapq
+import shutil
+import logging
+import threading
+import subprocess
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from sqlalchemy import func, update
+
+from ..models.database import db
+from ..models.user import Video, TranscodeJob
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LADDER = [
+    {'name': '1080p', 'height': 1080, 'bitrate': '5000k'},
+    {'name': '720p', 'height': 720, 'bitrate': '2800k'},
+    {'name': '480p', 'height': 480, 'bitrate': '1200k'},
+    {'name': '240p', 'height': 240, 'bitrate': '400k'},
+]
+
+# Bonus de priorité (en heures d'ancienneté) selon la raison de la demande
+PRIORITY_BONUS = {'shared': 96.0, 'unlocked': 48.0, 'recorded': 0.0, 'backfill': -24.0}
+
+
+def select_renditions(ladder: List[Dict[str, Any]], source_height: Optional[int]) -> List[Dict[str, Any]]:
+    """Rendus de l'échelle ne dépassant pas la hauteur de la source"""
+    ladder = sorted(ladder, key=lambda r: r['height'], reverse=True)
+    if not source_height:
+        return ladder
+    selected = [r for r in ladder if r['height'] <= source_height]
+    # Source plus petite que tous les rendus : un seul rendu à sa hauteur
+    return selected or [{**ladder[-1], 'name': f'{source_height}p', 'height': source_height}]
+
+
+def build_ladder_command(source: str, output_dir: str, renditions: List[Dict[str, Any]],
+                         segment_seconds: int, preset: str, threads: int) -> List[str]:
+    """Commande FFmpeg : un décodage, un encodage par rendu, sortie HLS multi-débits"""
+    count = len(renditions)
+    splits = ''.join(f'[s{i}]' for i in range(count))
+    filters = [f'[0:v]split={count}{splits}'] + [
+        f'[s{i}]scale=-2:{r["height"]}[v{i}]' for i, r in enumerate(renditions)
+    ]
+    command = ['ffmpeg', '-v', 'error', '-y', '-i', source, '-filter_complex', ';'.join(filters)]
+    for i, rendition in enumerate(renditions):
+        kbps = int(rendition['bitrate'].rstrip('k'))
+        command += [
+            '-map', f'[v{i}]', f'-c:v:{i}', 'libx264', f'-b:v:{i}', rendition['bitrate'],
+            f'-maxrate:v:{i}', f'{int(kbps * 1.07)}k', f'-bufsize:v:{i}', f'{int(kbps * 1.5)}k',
+        ]
+    command += [
+        '-preset', preset, '-threads', str(threads), '-an',
+        # Images clés aux mêmes instants dans tous les rendus : bascule sans coupure
+        '-force_key_frames', f'expr:gte(t,n_forced*{segment_seconds})', '-sc_threshold', '0',
+        '-f', 'hls', '-hls_time', str(segment_seconds), '-hls_playlist_type', 'vod',
+        '-hls_segment_filename', os.path.join(output_dir, '%v', 'segment_%05d.ts'),
+        '-master_pl_name', 'master.m3u8',
+        '-var_stream_map', ' '.join(f'v:{i},name:{r["name"]}' for i, r in enumerate(renditions)),
+        os.path.join(output_dir, '%v', 'index.m3u8')
+    ]
+    return command
+
+
+class TranscodeScheduler:
+    """File priorisée des encodages et ordonnanceur borné (pattern extension Flask)"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.enabled = True
+        self.storage_path = Path('static/hls')
+        self.ladder = list(DEFAULT_LADDER)
+        self.preset = 'medium'
+        self.threads = 2
+        self.max_concurrent = 1
+        self.max_load = 0.8
+        self.yield_to_live = True
+        self.segment_seconds = 4
+        self.max_attempts = 3
+        self.stale_after = timedelta(minutes=180)
+        self.poll_interval = 5.0
+        self.queue: List = []  # tas (priorité, ordre, video_id)
+        self.queued: Dict[int, float] = {}  # priorité courante par vidéo
+        self.running: Dict[int, float] = {}  # début de l'encodage par vidéo
+        self.condition = threading.Condition()
+        self._counter = 0
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.completed = 0
+        self.failed = 0
+        self.deferred_for_load = 0
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Lit la configuration ; aucun thread n'est démarré ici"""
+        self.app = app
+        self.enabled = app.config.get('TRANSCODE_ENABLED', True)
+        self.storage_path = Path(app.config.get('HLS_STORAGE_PATH', self.storage_path))
+        self.ladder = app.config.get('TRANSCODE_LADDER') or list(DEFAULT_LADDER)
+        self.preset = app.config.get('TRANSCODE_PRESET', 'medium')
+        self.threads = app.config.get('TRANSCODE_THREADS', 2)
+        # 0 = automatique : la moitié des cœurs, divisée par les threads par encodage
+        self.max_concurrent = app.config.get('TRANSCODE_MAX_CONCURRENT', 0) \
+            or max(1, (os.cpu_count() or 1) // (2 * self.threads))
+        self.max_load = app.config.get('TRANSCODE_MAX_LOAD', 0.8)
+        self.yield_to_live = app.config.get('TRANSCODE_YIELD_TO_LIVE', True)
+        self.segment_seconds = app.config.get('HLS_SEGMENT_SECONDS', 4)
+        self.max_attempts = app.config.get('TRANSCODE_MAX_ATTEMPTS', 3)
+        self.stale_after = timedelta(minutes=app.config.get('TRANSCODE_STALE_MINUTES', 180))
+        app.extensions['transcode_scheduler'] = self
+
+    # ------------------------------------------------------------------
+    # File de priorité
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def compute_priority(video: Video, reason: str) -> float:
+        """Ancienneté en heures moins les bonus : plus petit = encodé plus tôt"""
+        recorded_at = video.recorded_at or video.created_at or datetime.utcnow()
+        age_hours = max(0.0, (datetime.utcnow() - recorded_at).total_seconds() / 3600)
+        bonus = PRIORITY_BONUS.get(reason, 0.0)
+        if video.is_unlocked and reason != 'unlocked':
+            bonus += PRIORITY_BONUS['unlocked']
+        return age_hours - bonus
+
+    def _push(self, video_id: int, priority: float):
+        with self.condition:
+            self._counter += 1
+            self.queued[video_id] = priority
+            heapq.heappush(self.queue, (priority, self._counter, video_id))
+            self.condition.notify_all()
+
+    def enqueue(self, video_id: int, reason: str = 'recorded', force: bool = False) -> Optional[TranscodeJob]:
+        """
+        Ajoute (ou remonte) une vidéo dans la file. Une vidéo déjà encodée
+        n'est reprise qu'avec force=True ; une priorité n'est jamais dégradée.
+        """
+        if not self.enabled:
+            return None
+        video = db.session.get(Video, video_id)
+        if video is None:
+            return None
+
+        job = video.transcode_job
+        priority = self.compute_priority(video, reason)
+        if job is None:
+            job = TranscodeJob(video_id=video_id, status='queued', reason=reason, priority=priority, attempts=0)
+            db.session.add(job)
+        elif job.status == 'running' or (job.status == 'done' and not force):
+            return job
+        elif job.status == 'queued' and job.priority is not None and job.priority <= priority:
+            return job
+        else:
+            job.status = 'queued'
+            job.reason = reason
+            job.priority = priority
+            if force:
+                job.attempts = 0
+        db.session.commit()
+
+        self._push(video_id, priority)
+        self.start()
+        return job
+
+    def _pop_next(self) -> Optional[int]:
+        """Vidéo la plus prioritaire (entrées périmées ignorées) ; sous le verrou"""
+        while self.queue:
+            priority, _, video_id = heapq.heappop(self.queue)
+            if self.queued.get(video_id) == priority:
+                del self.queued[video_id]
+                return video_id
+        return None
+
+    # ------------------------------------------------------------------
+    # Ordonnanceur
+    # ------------------------------------------------------------------
+
+    def available_slots(self) -> int:
+        """Créneaux libres de ce processus : plafond moins ses encodages et ses captures en direct"""
+        live = 0
+        if self.yield_to_live:
+            from .video_capture_service import video_capture_service
+            live = len(video_capture_service.active_recordings)
+        return self.max_concurrent - live - len(self.running)
+
+    def _cpu_busy(self) -> bool:
+        try:
+            load = os.getloadavg()[0] / (os.cpu_count() or 1)
+        except (AttributeError, OSError):
+            return False
+        return load > self.max_load
+
+    def start(self):
+        """Démarre l'ordonnanceur (idempotent) et reprend la file persistée"""
+        if not self.enabled or self.app is None:
+            return
+        with self.condition:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='transcode-scheduler', daemon=True)
+            self._thread.start()
+
+    def _recover(self):
+        """
+        Reprend la file persistée. Une tâche 'running' peut appartenir à un
+        autre processus : elle n'est remise en file (UPDATE conditionnel)
+        qu'après stale_after, délai qu'aucun encodage n'atteint.
+        """
+        with self.app.app_context():
+            stale = datetime.utcnow() - self.stale_after
+            db.session.execute(
+                update(TranscodeJob)
+                .where(TranscodeJob.status == 'running', TranscodeJob.started_at < stale)
+                .values(status='queued')
+                .execution_options(synchronize_session=False))
+            db.session.commit()
+            pending = db.session.query(TranscodeJob.video_id, TranscodeJob.priority) \
+                .filter(TranscodeJob.status == 'queued').all()
+        for video_id, priority in pending:
+            if video_id not in self.queued:
+                self._push(video_id, priority or 0.0)
+
+    def _run(self):
+        self._recover()
+        logger.info(f"Ordonnanceur d'encodage démarré ({self.max_concurrent} encodage(s) simultané(s))")
+        while not self._stop.is_set():
+            with self.condition:
+                while not self._stop.is_set() and (not self.queued or self.available_slots() <= 0):
+                    self.condition.wait(self.poll_interval)
+                if self._stop.is_set():
+                    break
+            if self._cpu_busy():
+                self.deferred_for_load += 1
+                self._stop.wait(self.poll_interval)
+                continue
+            with self.condition:
+                video_id = self._pop_next()
+                if video_id is None:
+                    continue
+                self.running[video_id] = time.monotonic()
+            threading.Thread(target=self._encode, args=(video_id,), name=f'transcode-{video_id}',
+                             daemon=True).start()
+
+    def _encode(self, video_id: int):
+        from .video_capture_service import video_capture_service
+
+        requeue = None
+        try:
+            with self.app.app_context():
+                # Réclamation : seul le processus dont l'UPDATE touche la ligne encode
+                claimed = db.session.execute(
+                    update(TranscodeJob)
+                    .where(TranscodeJob.video_id == video_id, TranscodeJob.status == 'queued')
+                    .values(status='running', started_at=datetime.utcnow(),
+                            attempts=func.coalesce(TranscodeJob.attempts, 0) + 1)
+                    .execution_options(synchronize_session=False)).rowcount
+                db.session.commit()
+                if claimed != 1:
+                    return
+                job = db.session.query(TranscodeJob).filter_by(video_id=video_id).one()
+                source = video_capture_service.local_video_path(job.video.file_url)
+
+                try:
+                    if source is None:
+                        raise FileNotFoundError("Fichier source absent de ce serveur")
+                    started = time.monotonic()
+                    renditions = self._encode_ladder(video_id, source)
+                    job.status = 'done'
+                    job.renditions = json.dumps(renditions, separators=(',', ':'))
+                    job.master_url = f"/api/videos/{video_id}/hls/master.m3u8"
+                    job.encode_seconds = round(time.monotonic() - started, 2)
+                    job.error = None
+                    self.completed += 1
+                    logger.info(f"Vidéo {video_id} encodée en {job.encode_seconds}s : "
+                                f"{', '.join(r['name'] for r in renditions)}")
+                except Exception as e:
+                    job.error = str(e) or type(e).__name__
+                    if job.attempts < self.max_attempts and source is not None:
+                        # Nouvel essai plus tard, derrière les tâches en attente
+                        job.status = 'queued'
+                        job.priority = (job.priority or 0.0) + 24.0 * job.attempts
+                    else:
+                        job.status = 'error'
+                        self.failed += 1
+                    logger.error(f"Erreur d'encodage de la vidéo {video_id}: {job.error}")
+                job.finished_at = datetime.utcnow()
+                db.session.commit()
+                requeue = job.priority if job.status == 'queued' else None
+        finally:
+            with self.condition:
+                self.running.pop(video_id, None)
+                self.condition.notify_all()
+        if requeue is not None:
+            self._push(video_id, requeue)
+
+    def _encode_ladder(self, video_id: int, source: Path) -> List[Dict[str, Any]]:
+        """Encode tous les rendus dans un dossier temporaire puis le publie"""
+        if not shutil.which('ffmpeg'):
+            raise RuntimeError("FFmpeg est nécessaire pour l'échelle de qualités")
+        from .media_probe import media_probe
+        try:
+            height = media_probe.metadata(video_id, source).height
+        except (OSError, ValueError) as e:
+            logger.warning(f"Hauteur source inconnue pour la vidéo {video_id}: {e}")
+            height = None
+        renditions = select_renditions(self.ladder, height)
+
+        final_dir = self.storage_path / str(video_id)
+        work_dir = self.storage_path / f"{video_id}.part"
+        shutil.rmtree(work_dir, ignore_errors=True)
+        for rendition in renditions:
+            (work_dir / rendition['name']).mkdir(parents=True, exist_ok=True)
+
+        command = build_ladder_command(str(source), str(work_dir), renditions,
+                                       self.segment_seconds, self.preset, self.threads)
+        result = subprocess.run(command, capture_output=True)
+        if result.returncode != 0:
+            shutil.rmtree(work_dir, ignore_errors=True)
+            raise RuntimeError(result.stderr.decode('utf-8', 'replace').strip()[-500:] or 'FFmpeg a échoué')
+
+        # Publication : l'ancien dossier n'est retiré qu'une fois le nouveau complet
+        previous = self.storage_path / f"{video_id}.old"
+        if final_dir.exists():
+            final_dir.rename(previous)
+        work_dir.rename(final_dir)
+        shutil.rmtree(previous, ignore_errors=True)
+        return renditions
+
+    def hls_directory(self, video_id: int) -> Path:
+        return self.storage_path / str(video_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self.condition:
+            queued = len(self.queued)
+            running = sorted(self.running)
+        return {
+            'enabled': self.enabled,
+            'max_concurrent': self.max_concurrent,
+            'available_slots': self.available_slots(),
+            'queued': queued,
+            'running': running,
+            'completed': self.completed,
+            'failed': self.failed,
+            'deferred_for_load': self.deferred_for_load,
+            'preset': self.preset,
+            'ladder': [r['name'] for r in self.ladder]
+        }
+
+    def shutdown(self):
+        self._stop.set()
+        with self.condition:
+            self.condition.notify_all()
+
+
+# Instance globale du service (configurée par init_app dans create_app)
+transcode_scheduler = TranscodeScheduler()
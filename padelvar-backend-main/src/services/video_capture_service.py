@@ -1,34 +1,39 @@
 """
 Service de capture vidéo - Enregistrement des flux caméra vers stockage local
 Optimisé pour la performance et gestion des erreurs
+
+OpenCV n'est importé qu'au moment où une capture ou une miniature en a
+réellement besoin : les workers API purs ne paient jamais son chargement.
 """
 
-import cv2
 import threading
 import time
 import os
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Dict, Optional, Any
 import uuid
 import subprocess
-import requests
 from pathlib import Path
+from urllib.parse import urlparse
 
 from ..models.database import db
 from ..models.user import Video, Court, User
+from .camera_relay import camera_relay, CameraRelayBusy
+from .storage_manager import storage_manager
+from .blob_store import blob_store
 
 logger = logging.getLogger(__name__)
 
 class VideoCaptureService:
     """Service de capture vidéo optimisé pour haute performance"""
     
-    def __init__(self, base_path: str = "static/videos"):
+    def __init__(self, base_path: str = "static/videos", thumbnails_path: str = "static/thumbnails", app=None):
+        # Les dossiers sont créés à la première utilisation, pas à l'import
         self.base_path = Path(base_path)
-        self.base_path.mkdir(parents=True, exist_ok=True)
-        
-        self.thumbnails_path = Path("static/thumbnails")
-        self.thumbnails_path.mkdir(parents=True, exist_ok=True)
+        self.thumbnails_path = Path(thumbnails_path)
+        self._directories_ready = False
+        self.app = None
         
         # Sessions d'enregistrement actives
         self.active_recordings: Dict[str, Dict[str, Any]] = {}
@@ -42,11 +47,52 @@ class VideoCaptureService:
             'height': 720,
             'bitrate': '2M'
         }
+        self.opencv_ring_size = 8
+        self.opencv_fourcc = 'mp4v'
+        self.live_preset = 'veryfast'
+        self.live_crf = 23
         
+        if app is not None:
+            self.init_app(app)
+    
+    def init_app(self, app):
+        """Enregistre le service sur l'application (pattern extension Flask)"""
+        self.app = app
+        self.base_path = Path(app.config.get('VIDEO_STORAGE_PATH', self.base_path))
+        self.thumbnails_path = Path(app.config.get('THUMBNAILS_STORAGE_PATH', self.thumbnails_path))
+        self.video_quality['fps'] = app.config.get('RECORDING_FPS', self.video_quality['fps'])
+        self.opencv_ring_size = app.config.get('OPENCV_RING_SIZE', self.opencv_ring_size)
+        self.opencv_fourcc = app.config.get('OPENCV_FOURCC', self.opencv_fourcc)
+        self.live_preset = app.config.get('RECORDING_PRESET', self.live_preset)
+        self.live_crf = app.config.get('RECORDING_CRF', self.live_crf)
+        self._directories_ready = False
+        app.extensions['video_capture'] = self
         logger.info("Service de capture vidéo initialisé")
     
-    def start_recording(self, court_id: int, user_id: int, session_name: str = None) -> Dict[str, Any]:
-        """Démarrer l'enregistrement d'un terrain"""
+    def _ensure_directories(self):
+        """Créer les dossiers de stockage au premier besoin"""
+        if self._directories_ready:
+            return
+        self.base_path.mkdir(parents=True, exist_ok=True)
+        self.thumbnails_path.mkdir(parents=True, exist_ok=True)
+        self._directories_ready = True
+    
+    def local_video_path(self, file_url: Optional[str]) -> Optional[Path]:
+        """Copie locale d'une vidéo, y compris migrée vers le CDN (None si absente)"""
+        if not file_url:
+            return None
+        name = Path(urlparse(file_url).path).name
+        if blob_store.owns(name):
+            return blob_store.locate(name)
+        for directory in (self.base_path, storage_manager.cold_videos_path):
+            if directory is not None and (directory / name).exists():
+                return directory / name
+        return None
+    
+    def start_recording(self, court_id: int, user_id: int, session_name: str = None,
+                        planned_minutes: Optional[float] = None) -> Dict[str, Any]:
+        """Démarrer l'enregistrement d'un terrain (StorageFullError si l'espace manque)"""
+        session_id = None
         try:
             # Vérifier que le terrain existe
             court = Court.query.get(court_id)
@@ -65,8 +111,15 @@ class VideoCaptureService:
             if not session_name:
                 session_name = f"Match du {datetime.now().strftime('%d/%m/%Y')}"
             
+            # Admission : débit estimé × durée prévue doit tenir sur le disque
+            # (et dans le quota du club), sinon niveau froid ou refus
             video_filename = f"{session_id}.mp4"
-            video_path = self.base_path / video_filename
+            admission = storage_manager.admit(
+                session_id, court.club_id, planned_minutes or self.max_recording_duration / 60,
+                filename=video_filename)
+            self._ensure_directories()
+            admission['directory'].mkdir(parents=True, exist_ok=True)
+            video_path = admission['directory'] / video_filename
             
             # URL de la caméra du terrain
             camera_url = self._get_camera_url(court_id)
@@ -83,7 +136,9 @@ class VideoCaptureService:
                 'start_time': datetime.now(),
                 'status': 'starting',
                 'duration': 0,
-                'file_size': 0
+                'file_size': 0,
+                'club_id': court.club_id,
+                'storage_tier': admission['tier']
             }
             
             # Ajouter à la liste des enregistrements actifs
@@ -109,6 +164,8 @@ class VideoCaptureService:
             }
             
         except Exception as e:
+            if session_id and session_id not in self.active_recordings:
+                storage_manager.release(session_id)
             logger.error(f"Erreur lors du démarrage de l'enregistrement: {e}")
             raise e
     
@@ -130,8 +187,9 @@ class VideoCaptureService:
             # Finaliser l'enregistrement
             result = self._finalize_recording(session_id)
             
-            # Supprimer de la liste active
+            # Supprimer de la liste active et libérer la réservation d'espace
             del self.active_recordings[session_id]
+            storage_manager.release(session_id)
             
             logger.info(f"Enregistrement arrêté: {session_id}")
             return result
@@ -169,6 +227,17 @@ class VideoCaptureService:
             logger.error(f"Erreur lors de la récupération du statut: {e}")
             return {'error': str(e)}
     
+    def _relay_subscriber(self, court_id: int, camera_url: str):
+        """Abonnement enregistreur au relais ; None : lecture directe de la caméra"""
+        if not camera_relay.enabled or not camera_url.startswith(('http://', 'https://')):
+            return None
+        try:
+            return camera_relay.subscribe(court_id, camera_url, kind='recorder')
+        except CameraRelayBusy as e:
+            # Plusieurs workers : l'enregistrement passe avant la connexion unique
+            logger.error(f"❌ {e} ; capture du terrain {court_id} en lecture directe")
+            return None
+
     def _record_video_thread(self, session_id: str, config: Dict[str, Any]):
         """Thread d'enregistrement vidéo"""
         try:
@@ -180,14 +249,24 @@ class VideoCaptureService:
             # Mettre à jour le statut
             self.active_recordings[session_id]['status'] = 'recording'
             
+            # Le flux est lu via le relais (une seule connexion à la caméra),
+            # sauf si le relais est désactivé ou la source n'est pas HTTP
+            relay_subscriber = self._relay_subscriber(config['court_id'], camera_url)
+            if relay_subscriber is not None:
+                input_args = ['-f', 'mjpeg', '-framerate', str(self.video_quality['fps']), '-i', 'pipe:0']
+            else:
+                input_args = ['-i', camera_url]
+            
             # Utiliser FFmpeg pour capturer et encoder
-            # Plus stable et performant que OpenCV pour les flux réseau
+            # Preset rapide pendant le match : l'échelle de qualités est encodée
+            # ensuite par transcode_scheduler, hors du chemin critique
             ffmpeg_cmd = [
                 'ffmpeg',
-                '-i', camera_url,
+                '-loglevel', 'error',
+                *input_args,
                 '-c:v', 'libx264',
-                '-preset', 'medium',
-                '-crf', '23',
+                '-preset', self.live_preset,
+                '-crf', str(self.live_crf),
                 '-c:a', 'aac',
                 '-b:a', '128k',
                 '-f', 'mp4',
@@ -201,19 +280,47 @@ class VideoCaptureService:
                 # Essayer avec FFmpeg d'abord
                 process = subprocess.Popen(
                     ffmpeg_cmd,
+                    stdin=subprocess.PIPE if relay_subscriber else None,
                     stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    universal_newlines=True
+                    stderr=subprocess.PIPE
                 )
+                feeder = None
+                if relay_subscriber:
+                    feeder = threading.Thread(
+                        target=self._feed_from_relay,
+                        args=(session_id, relay_subscriber, process),
+                        name=f'relay-feed-{session_id}',
+                        daemon=True
+                    )
+                    feeder.start()
+                    relay_subscriber = None  # fermé par le thread d'alimentation
                 
                 # Surveiller le processus
                 while process.poll() is None:
                     if self.active_recordings[session_id]['status'] == 'stopping':
-                        process.terminate()
+                        if process.stdin is None:
+                            process.terminate()
+                        # Avec le relais, la fermeture de stdin laisse FFmpeg finaliser le MP4
                         break
                     time.sleep(1)
                 
-                stdout, stderr = process.communicate()
+                if feeder is not None:
+                    # stdin appartient au thread d'alimentation (qui le ferme) : pas de
+                    # communicate(), qui viderait un fichier fermé par ce thread
+                    feeder.join(timeout=10)
+                    try:
+                        process.wait(timeout=8)
+                    except subprocess.TimeoutExpired:
+                        process.terminate()
+                        process.wait()
+                    stderr = process.stderr.read()
+                else:
+                    try:
+                        stdout, stderr = process.communicate(timeout=8)
+                    except subprocess.TimeoutExpired:
+                        process.terminate()
+                        stdout, stderr = process.communicate()
+                stderr = stderr.decode('utf-8', errors='replace') if stderr else ''
                 
                 if process.returncode == 0:
                     logger.info(f"Enregistrement FFmpeg terminé avec succès: {session_id}")
@@ -224,9 +331,13 @@ class VideoCaptureService:
                     
             except FileNotFoundError:
                 logger.warning("FFmpeg non trouvé, utilisation d'OpenCV")
+                if relay_subscriber is not None:
+                    relay_subscriber.close()
                 self._record_with_opencv(session_id, config)
             except Exception as e:
                 logger.error(f"Erreur FFmpeg: {e}, fallback vers OpenCV")
+                if relay_subscriber is not None:
+                    relay_subscriber.close()
                 self._record_with_opencv(session_id, config)
             
         except Exception as e:
@@ -234,58 +345,63 @@ class VideoCaptureService:
             self.active_recordings[session_id]['status'] = 'error'
             self.active_recordings[session_id]['error'] = str(e)
     
+    def _feed_from_relay(self, session_id: str, subscriber, process: subprocess.Popen):
+        """Écrit les images du relais sur l'entrée de FFmpeg jusqu'à l'arrêt"""
+        try:
+            while process.poll() is None:
+                recording = self.active_recordings.get(session_id)
+                if not recording or recording['status'] != 'recording':
+                    break
+                for frame in subscriber.read(timeout=1.0):
+                    process.stdin.write(frame)
+        except (BrokenPipeError, OSError, ValueError) as e:
+            # ValueError : stdin déjà fermé (FFmpeg arrêté entre deux images)
+            logger.warning(f"Alimentation FFmpeg interrompue pour {session_id}: {e}")
+        finally:
+            if subscriber.dropped:
+                logger.warning(f"{subscriber.dropped} images perdues par l'enregistreur {session_id}")
+            subscriber.close()
+            try:
+                process.stdin.close()
+            except (OSError, ValueError):
+                pass
+    
     def _record_with_opencv(self, session_id: str, config: Dict[str, Any]):
-        """Enregistrement avec OpenCV comme fallback"""
+        """
+        Enregistrement avec OpenCV comme fallback : capture et écriture sur
+        deux threads, cadence sur échéances absolues (voir opencv_recorder)
+        """
+        relay_subscriber = None
         try:
-            camera_url = config['camera_url']
-            video_path = config['video_path']
-            
-            # Ouvrir la capture vidéo
-            cap = cv2.VideoCapture(camera_url)
-            
-            if not cap.isOpened():
-                raise Exception(f"Impossible d'ouvrir la caméra: {camera_url}")
+            from .opencv_recorder import OpenCVRecorder
             
-            # Configuration de l'enregistreur
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            fps = self.video_quality['fps']
-            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            
-            out = cv2.VideoWriter(video_path, fourcc, fps, (width, height))
-            
-            start_time = time.time()
-            frame_count = 0
-            
-            while True:
-                # Vérifier si on doit arrêter
-                if self.active_recordings[session_id]['status'] == 'stopping':
-                    break
-                
-                # Vérifier la durée maximale
-                if time.time() - start_time > self.max_recording_duration:
-                    break
-                
-                ret, frame = cap.read()
-                if not ret:
-                    logger.warning(f"Impossible de lire le frame de {camera_url}")
-                    time.sleep(0.1)
-                    continue
-                
-                # Écrire le frame
-                out.write(frame)
-                frame_count += 1
-                
-                # Pause pour maintenir le FPS
-                time.sleep(1.0 / fps)
+            camera_url = config['camera_url']
+            relay_subscriber = self._relay_subscriber(config['court_id'], camera_url)
+            
+            recorder = OpenCVRecorder(
+                source_url=camera_url,
+                video_path=config['video_path'],
+                fps=self.video_quality['fps'],
+                max_duration=self.max_recording_duration,
+                should_stop=lambda: self.active_recordings.get(session_id, {}).get('status') == 'stopping',
+                relay_subscriber=relay_subscriber,
+                ring_size=self.opencv_ring_size,
+                fourcc=self.opencv_fourcc
+            )
+            relay_subscriber = None  # fermé par l'enregistreur
+            self.active_recordings[session_id]['opencv_metrics'] = recorder.metrics
             
-            # Nettoyer
-            cap.release()
-            out.release()
+            metrics = recorder.run()
             
-            logger.info(f"Enregistrement OpenCV terminé: {session_id}, {frame_count} frames")
+            logger.info(
+                f"Enregistrement OpenCV terminé: {session_id}, {metrics['frames_written']} images "
+                f"à {metrics['effective_fps']} img/s (cible {metrics['target_fps']}), "
+                f"{metrics['frames_duplicated']} dupliquées, {metrics['frames_dropped']} perdues"
+            )
             
         except Exception as e:
+            if relay_subscriber is not None:
+                relay_subscriber.close()
             logger.error(f"Erreur OpenCV pour {session_id}: {e}")
             self.active_recordings[session_id]['status'] = 'error'
             self.active_recordings[session_id]['error'] = str(e)
@@ -300,18 +416,32 @@ class VideoCaptureService:
             if not os.path.exists(video_path):
                 raise Exception(f"Fichier vidéo non trouvé: {video_path}")
             
-            # Calculer la durée et la taille
+            # Durée et taille provisoires (remplacées par la sonde après l'insertion)
             duration = self._calculate_duration(recording['start_time'])
             file_size = self._get_file_size(video_path)
             
             # Générer une miniature
             thumbnail_path = self._generate_thumbnail(video_path, recording['session_id'])
+            file_url = f"/videos/{recording['video_filename']}"
+            thumbnail_url = f"/thumbnails/{recording['session_id']}.jpg" if thumbnail_path else None
+            
+            # Fichiers rangés par contenu : un doublon ne coûte aucun octet de plus
+            video_created = thumbnail_created = True
+            try:
+                video_blob, video_created = blob_store.put_file(video_path, 'video')
+                video_path, file_url = str(blob_store.locate(video_blob.name)), video_blob.url
+                if thumbnail_path:
+                    thumbnail_blob, thumbnail_created = blob_store.put_file(thumbnail_path, 'thumbnail')
+                    thumbnail_path, thumbnail_url = str(blob_store.locate(thumbnail_blob.name)), thumbnail_blob.url
+            except Exception as e:
+                db.session.rollback()
+                logger.warning(f"Fichiers de {session_id} conservés hors du stockage par contenu: {e}")
             
             # Créer l'entrée vidéo en base de données
             video = Video(
                 title=recording['session_name'],
-                file_url=f"/videos/{recording['video_filename']}",
-                thumbnail_url=f"/thumbnails/{recording['session_id']}.jpg" if thumbnail_path else None,
+                file_url=file_url,
+                thumbnail_url=thumbnail_url,
                 duration=duration,
                 court_id=recording['court_id'],
                 user_id=recording['user_id'],
@@ -326,6 +456,38 @@ class VideoCaptureService:
             
             logger.info(f"Vidéo enregistrée en base: {video.id}")
             
+            # Durée et taille mesurées dans le fichier (l'horloge murale reste en repli)
+            from .media_probe import media_probe
+            try:
+                media_probe.metadata(video.id, video_path)
+                duration, file_size = video.duration, video.file_size
+            except Exception as e:
+                db.session.rollback()
+                logger.warning(f"Vidéo {video.id} non sondée, durée estimée conservée: {e}")
+            
+            # Index du stockage (taille, niveau, dernier accès)
+            try:
+                if video_created:
+                    storage_manager.register(video_path, 'video', video.id, recording.get('club_id'))
+                if thumbnail_path and thumbnail_created:
+                    storage_manager.register(thumbnail_path, 'thumbnail', video.id, recording.get('club_id'))
+            except Exception as e:
+                logger.warning(f"Vidéo {video.id} non indexée dans le stockage: {e}")
+            
+            # Détection des échanges en arrière-plan (pool de processus)
+            try:
+                from .highlight_detector import highlight_detector
+                highlight_detector.submit(video.id, video_path)
+            except Exception as e:
+                logger.warning(f"Analyse des échanges non planifiée pour {video.id}: {e}")
+            
+            # Échelle de qualités HLS encodée après le match
+            try:
+                from .transcode_scheduler import transcode_scheduler
+                transcode_scheduler.enqueue(video.id, reason='recorded')
+            except Exception as e:
+                logger.warning(f"Encodage HLS non planifié pour {video.id}: {e}")
+            
             return {
                 'status': 'completed',
                 'video_id': video.id,
@@ -347,6 +509,7 @@ class VideoCaptureService:
     def _generate_thumbnail(self, video_path: str, session_id: str) -> Optional[str]:
         """Générer une miniature pour la vidéo"""
         try:
+            self._ensure_directories()
             thumbnail_filename = f"{session_id}.jpg"
             thumbnail_path = self.thumbnails_path / thumbnail_filename
             
@@ -375,6 +538,8 @@ class VideoCaptureService:
     def _generate_thumbnail_opencv(self, video_path: str, thumbnail_path: str) -> Optional[str]:
         """Générer miniature avec OpenCV"""
         try:
+            import cv2
+            
             cap = cv2.VideoCapture(video_path)
             
             # Aller à 1 seconde
@@ -420,32 +585,14 @@ class VideoCaptureService:
         except:
             return 0
     
-    def cleanup_old_recordings(self, days_old: int = 30):
-        """Nettoyer les anciens enregistrements"""
+    def cleanup_old_recordings(self, days_old: int = 30) -> Dict[str, Any]:
+        """Nettoyer les anciens enregistrements (index du stockage, par lots)"""
         try:
-            cutoff_date = datetime.now() - timedelta(days=days_old)
-            
-            # Supprimer les anciens fichiers vidéo
-            for video_file in self.base_path.glob("*.mp4"):
-                if os.path.getctime(video_file) < cutoff_date.timestamp():
-                    os.remove(video_file)
-                    logger.info(f"Fichier vidéo ancien supprimé: {video_file}")
-            
-            # Supprimer les anciennes miniatures
-            for thumb_file in self.thumbnails_path.glob("*.jpg"):
-                if os.path.getctime(thumb_file) < cutoff_date.timestamp():
-                    os.remove(thumb_file)
-                    logger.info(f"Miniature ancienne supprimée: {thumb_file}")
-            
-            # Mettre à jour la base de données
-            old_videos = Video.query.filter(Video.recorded_at < cutoff_date).all()
-            for video in old_videos:
-                video.file_url = None  # Marquer comme non disponible
-            
-            db.session.commit()
-            
+            return storage_manager.sweep(retention_days=days_old)
         except Exception as e:
+            db.session.rollback()
             logger.error(f"Erreur lors du nettoyage: {e}")
+            return {'error': str(e)}
 
-# Instance globale du service
+# Instance globale du service (configurée par init_app dans create_app)
 video_capture_service = VideoCaptureService()
@@ -0,0 +1,162 @@
+"""
+Bibliothèque vidéo des joueurs : pages par curseur et total en cache
+Une page coûte le même prix qu'elle soit la première ou la centième :
+- pagination par curseur sur (recorded_at, id), servie par l'index
+  ix_video_user_recorded_at, au lieu d'un OFFSET qui relit toutes les
+  lignes sautées
+- une seule requête par page, terrain et club joints (noms compris)
+- total approximatif : compté une fois par joueur et par filtre, gardé
+  LIBRARY_COUNT_TTL secondes et invalidé quand une vidéo du joueur change
+"""
+
+import time
+import base64
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+from sqlalchemy import event, func, tuple_
+
+from ..models.database import db
+from ..models.user import Video, Court, Club
+
+logger = logging.getLogger(__name__)
+
+
+def encode_cursor(recorded_at: datetime, video_id: int) -> str:
+    raw = f"{recorded_at.isoformat()}|{video_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """(recorded_at, id) d'un curseur ; ValueError s'il est invalide"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        recorded_at, _, video_id = raw.partition('|')
+        return datetime.fromisoformat(recorded_at), int(video_id)
+    except (UnicodeDecodeError, ValueError, TypeError) as e:
+        raise ValueError('Curseur de pagination invalide') from e
+
+
+class VideoLibrary:
+    """Requêtes de la bibliothèque vidéo d'un joueur (pattern extension Flask)"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.default_limit = 50
+        self.my_videos_limit = 100
+        self.max_limit = 200
+        self.count_ttl = 60.0
+        self.counts: Dict[Tuple[int, Optional[int], Optional[bool]], Tuple[float, int]] = {}
+        self.lock = threading.Lock()
+        self.count_hits = 0
+        self.count_misses = 0
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.default_limit = app.config.get('LIBRARY_PAGE_SIZE', 50)
+        self.my_videos_limit = app.config.get('LIBRARY_MY_VIDEOS_PAGE_SIZE', 100)
+        self.max_limit = app.config.get('LIBRARY_MAX_PAGE_SIZE', 200)
+        self.count_ttl = app.config.get('LIBRARY_COUNT_TTL', 60.0)
+        app.extensions['video_library'] = self
+
+    def page_size(self, requested: Optional[int], default: Optional[int] = None) -> int:
+        return max(1, min(requested or default or self.default_limit, self.max_limit))
+
+    @staticmethod
+    def _filtered(query, user_id: int, club_id: Optional[int], is_unlocked: Optional[bool]):
+        query = query.filter(Video.user_id == user_id)
+        if club_id:
+            query = query.filter(Court.club_id == club_id)
+        if is_unlocked is not None:
+            query = query.filter(Video.is_unlocked == is_unlocked)
+        return query
+
+    @staticmethod
+    def _video_dict(video: Video, court_name: Optional[str], club_id: Optional[int],
+                    club_name: Optional[str]) -> Dict[str, Any]:
+        video_dict = video.to_dict()
+        video_dict['court_name'] = court_name
+        video_dict['club_id'] = club_id
+        video_dict['club_name'] = club_name
+        return video_dict
+
+    def page(self, user_id: int, limit: Optional[int], cursor: Optional[str] = None, club_id: Optional[int] = None,
+             is_unlocked: Optional[bool] = None, offset: int = 0) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Vidéos les plus récentes d'abord, après le curseur ; retourne (vidéos, curseur suivant).
+        limit=None : toute la bibliothèque en une requête. offset : ancienne
+        pagination (dépréciée), ignorée quand un curseur est donné.
+        """
+        query = db.session.query(Video, Court.name, Club.id, Club.name) \
+            .outerjoin(Court, Court.id == Video.court_id) \
+            .outerjoin(Club, Club.id == Court.club_id)
+        query = self._filtered(query, user_id, club_id, is_unlocked)
+        if cursor:
+            recorded_at, video_id = decode_cursor(cursor)
+            query = query.filter(tuple_(Video.recorded_at, Video.id) < tuple_(recorded_at, video_id))
+
+        query = query.order_by(Video.recorded_at.desc(), Video.id.desc())
+        if offset and not cursor:
+            query = query.offset(offset)
+        if limit is None:
+            return [self._video_dict(*row) for row in query.all()], None
+
+        # Une ligne de plus que la page : indique s'il reste des vidéos sans rien compter
+        rows = query.limit(limit + 1).all()
+        videos = [self._video_dict(*row) for row in rows[:limit]]
+
+        next_cursor = None
+        if len(rows) > limit and rows[limit - 1][0].recorded_at is not None:
+            last = rows[limit - 1][0]
+            next_cursor = encode_cursor(last.recorded_at, last.id)
+        return videos, next_cursor
+
+    def total_count(self, user_id: int, club_id: Optional[int] = None, is_unlocked: Optional[bool] = None) -> int:
+        """Nombre de vidéos du joueur pour ces filtres (en cache, peut retarder de count_ttl)"""
+        key = (user_id, club_id, is_unlocked)
+        now = time.monotonic()
+        with self.lock:
+            cached = self.counts.get(key)
+            if cached is not None and cached[0] > now:
+                self.count_hits += 1
+                return cached[1]
+
+        query = db.session.query(func.count(Video.id))
+        if club_id:
+            query = query.join(Court, Court.id == Video.court_id)
+        count = self._filtered(query, user_id, club_id, is_unlocked).scalar()
+        with self.lock:
+            self.count_misses += 1
+            self.counts[key] = (now + self.count_ttl, count)
+        return count
+
+    def invalidate(self, user_id: int):
+        with self.lock:
+            for key in [key for key in self.counts if key[0] == user_id]:
+                del self.counts[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'cached_counts': len(self.counts),
+            'count_hits': self.count_hits,
+            'count_misses': self.count_misses,
+            'count_ttl': self.count_ttl
+        }
+
+
+# Instance globale du service (configurée par init_app dans create_app)
+video_library = VideoLibrary()
+
+
+@event.listens_for(Video, 'after_insert')
+@event.listens_for(Video, 'after_update')
+@event.listens_for(Video, 'after_delete')
+def _invalidate_library_count(mapper, connection, target):
+    """Ajout, modification ou suppression d'une vidéo : total du joueur recompté"""
+    if target.user_id is not None:
+        video_library.invalidate(target.user_id)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test des garanties de l'historique des actions (src/services/audit_log.py)
+Toute action qui modifie un solde de crédits doit être écrite dans la
+transaction de la requête, jamais en file d'écriture différée.
+"""
+
+import sys
+
+import pytest
+
+
+@pytest.fixture
+def app_config():
+    """Garanties réelles de production : file d'écriture différée active"""
+    return {'AUDIT_WRITE_BEHIND': True}
+
+
+def test_credit_actions_are_transactional():
+    """La configuration livrée déclare chaque action de crédits 'transactional'"""
+    from src.config import Config
+    from src.services.audit_log import CREDIT_ACTIONS
+
+    missing = [action for action in CREDIT_ACTIONS if Config.AUDIT_DURABILITY.get(action) != 'transactional']
+    assert not missing, f"Actions de crédits hors transaction : {missing}"
+
+
+def test_credit_action_in_write_behind_is_refused():
+    """Une configuration qui met une action de crédits en file empêche le démarrage"""
+    from flask import Flask
+    from src.services.audit_log import AuditLog
+
+    app = Flask(__name__)
+    app.config['AUDIT_DURABILITY'] = {'add_credits': 'transactional'}
+    with pytest.raises(ValueError, match='start_recording'):
+        AuditLog(app)
+
+
+def test_recording_start_is_transactional(app, seed, login):
+    """Démarrer un enregistrement (débit d'un crédit) écrit son historique avec le débit"""
+    from src.models.user import ClubActionHistory
+    from src.services.audit_log import audit_log
+
+    client = login('joueur@test.com')
+    queued = audit_log.queued
+    response = client.post('/api/recording/start', json={'court_id': seed['court'], 'duration': 60})
+    assert response.status_code == 201, response.get_json()
+
+    with app.app_context():
+        rows = ClubActionHistory.query.filter_by(action_type='start_recording').count()
+    assert rows == 1, "historique du débit absent après le commit de la requête"
+    assert audit_log.queued == queued, "débit de crédit mis en file d'écriture différée"
+    assert not audit_log.undeclared_credit_actions, audit_log.undeclared_credit_actions
+
+
+def test_undeclared_credit_action_stays_in_transaction(app):
+    """Une action de crédits oubliée dans CREDIT_ACTIONS n'est pas mise en file"""
+    from src.models.database import db
+    from src.services.audit_log import audit_log
+
+    try:
+        with app.app_context():
+            audit_log.record(1, None, 'refund_credits', {'credits_refunded': 1, 'new_balance': 4})
+            assert len(db.session.new) == 1, "mouvement de crédits non déclaré mis en file"
+            db.session.rollback()
+        assert audit_log.undeclared_credit_actions.get('refund_credits') == 1
+    finally:
+        audit_log.undeclared_credit_actions.clear()
+
+
+if __name__ == '__main__':
+    print("🎯 Test des garanties de l'historique des crédits")
+    print("=" * 60)
+    if pytest.main(['-q', __file__]) != 0:
+        print("❌ Action de crédits hors transaction")
+        sys.exit(1)
+    print("✅ Toutes les actions de crédits sont transactionnelles")
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Test du stockage par contenu (src/services/blob_store.py)
+Un contenu identique n'est stocké qu'une fois, chaque vidéo y compte une
+référence, et le ramasse-miettes ne supprime un fichier orphelin qu'après
+BLOB_GC_GRACE_HOURS. Les fichiers sont servis sous /blobs/ avec Range.
+"""
+
+import sys
+from datetime import timedelta
+
+import pytest
+
+CONTENT = b'\x00\x00\x00\x18ftypmp42' + bytes(range(256)) * 8
+
+
+@pytest.fixture
+def app_config(tmp_path):
+    return {'BLOB_STORE_PATH': str(tmp_path / 'blobs')}
+
+
+def _capture(root, name):
+    """Fichier de capture au contenu identique à chaque appel"""
+    path = root / name
+    path.write_bytes(CONTENT)
+    return path
+
+
+def _add_videos(seed, url, count):
+    from src.models.database import db
+    from src.models.user import Video
+
+    videos = [Video(title=f'Match {i}', user_id=seed['player'], court_id=seed['court'], file_url=url)
+              for i in range(count)]
+    db.session.add_all(videos)
+    db.session.commit()
+    return videos
+
+
+def test_identical_captures_share_one_file(app, tmp_path):
+    """Deux captures identiques : un fichier, deux références, sources supprimées"""
+    from src.models.user import Blob
+    from src.services.blob_store import blob_store
+
+    with app.app_context():
+        first, created = blob_store.put_file(_capture(tmp_path, 'rec_1.mp4'))
+        assert created, "premier contenu non créé"
+        second, created = blob_store.put_file(_capture(tmp_path, 'rec_2.mp4'))
+        assert not created and second.id == first.id, "contenu identique stocké deux fois"
+        assert Blob.query.count() == 1
+        assert Blob.query.one().ref_count == 2, "références mal comptées"
+        stored = [p for p in (tmp_path / 'blobs').rglob('*') if p.is_file()]
+        assert stored == [blob_store.shard_path(first.name)], stored
+        assert not (tmp_path / 'rec_1.mp4').exists() and not (tmp_path / 'rec_2.mp4').exists(), \
+            "fichiers de capture conservés"
+
+
+def test_collect_respects_grace_period(app, seed, tmp_path):
+    """Références retirées : fichier gardé pendant la grâce, supprimé ensuite"""
+    from src.models.database import db
+    from src.models.user import Blob
+    from src.services.blob_store import blob_store
+
+    with app.app_context():
+        blob, _ = blob_store.put_file(_capture(tmp_path, 'rec_1.mp4'))
+        blob_store.put_file(_capture(tmp_path, 'rec_2.mp4'))
+        videos = _add_videos(seed, blob.url, 2)
+        path = blob_store.shard_path(blob.name)
+
+        # Une vidéo supprimée : le fichier reste référencé
+        blob_store.release(videos[0].file_url)
+        db.session.delete(videos[0])
+        db.session.commit()
+        assert blob_store.collect(grace=timedelta(0))['collected'] == 0
+        assert path.exists(), "fichier encore référencé supprimé"
+
+        # Plus aucune référence : grâce par défaut (24 h) respectée
+        blob_store.release(videos[1].file_url)
+        db.session.delete(videos[1])
+        db.session.commit()
+        row = Blob.query.one()
+        assert row.ref_count == 0 and row.released_at is not None, "libération non datée"
+        assert blob_store.collect()['collected'] == 0, "fichier supprimé pendant la grâce"
+        assert path.exists()
+
+        report = blob_store.collect(grace=timedelta(0))
+        assert report['collected'] == 1 and report['collected_bytes'] == len(CONTENT), report
+        assert not path.exists() and Blob.query.count() == 0, "orphelin non ramassé"
+
+
+def test_collect_repairs_counts_from_videos(app, seed, tmp_path):
+    """Un compteur à zéro alors qu'une vidéo référence le fichier est corrigé, pas ramassé"""
+    from src.models.database import db
+    from src.models.user import Blob
+    from src.services.blob_store import blob_store
+
+    with app.app_context():
+        blob, _ = blob_store.put_file(_capture(tmp_path, 'rec_1.mp4'))
+        _add_videos(seed, blob.url, 1)
+        blob_store.release(blob.url)
+        db.session.commit()
+
+        report = blob_store.collect(grace=timedelta(0))
+        assert report['repaired'] == 1 and report['collected'] == 0, report
+        row = Blob.query.one()
+        assert row.ref_count == 1 and row.released_at is None, "compteur non corrigé"
+        assert blob_store.shard_path(blob.name).exists()
+
+
+def test_blob_route_serves_ranges(app, seed, tmp_path):
+    """/blobs/<nom> : fichier complet, plage 206, nom invalide, inconnu ou non référencé 404"""
+    from src.services.blob_store import blob_store
+
+    with app.app_context():
+        blob, _ = blob_store.put_file(_capture(tmp_path, 'rec_1.mp4'))
+        url = blob.url
+
+    client = app.test_client()
+    assert client.get(url).status_code == 404, "fichier servi sans vidéo qui le référence"
+    with app.app_context():
+        _add_videos(seed, url, 1)
+
+    response = client.get(url)
+    assert response.status_code == 200 and response.data == CONTENT, response.status_code
+    cache_control = response.headers.get('Cache-Control', '')
+    assert 'immutable' in cache_control and 'public' in cache_control, cache_control
+
+    response = client.get(url, headers={'Range': 'bytes=100-199'})
+    assert response.status_code == 206, response.status_code
+    assert response.data == CONTENT[100:200], "plage incorrecte"
+
+    assert client.get('/blobs/' + '0' * 64 + '.mp4').status_code == 404
+    assert client.get('/blobs/config.py').status_code == 404
+
+
+def test_blob_route_enforces_paywall(app, seed, tmp_path, login):
+    """Vidéo verrouillée : 403 anonyme, servie en privé au propriétaire ; miniature publique"""
+    from src.models.database import db
+    from src.services.blob_store import blob_store
+
+    with app.app_context():
+        blob, _ = blob_store.put_file(_capture(tmp_path, 'rec_1.mp4'))
+        (tmp_path / 'thumb_1.jpg').write_bytes(b'miniature')
+        thumbnail, _ = blob_store.put_file(tmp_path / 'thumb_1.jpg')
+        video = _add_videos(seed, blob.url, 1)[0]
+        video.is_unlocked = False
+        video.thumbnail_url = thumbnail.url
+        db.session.commit()
+        url, thumbnail_url = blob.url, thumbnail.url
+
+    assert app.test_client().get(url).status_code == 403, "paywall contourné par /blobs/"
+    response = login('joueur@test.com').get(url)
+    assert response.status_code == 200 and response.data == CONTENT, response.status_code
+    cache_control = response.headers.get('Cache-Control', '')
+    assert 'private' in cache_control and 'public' not in cache_control, cache_control
+
+    response = app.test_client().get(thumbnail_url)
+    assert response.status_code == 200 and 'public' in response.headers.get('Cache-Control', '')
+
+
+if __name__ == '__main__':
+    print("🎯 Test du stockage par contenu")
+    print("=" * 60)
+    if pytest.main(['-q', __file__]) != 0:
+        print("❌ Stockage par contenu incohérent")
+        sys.exit(1)
+    print("✅ Références comptées, orphelins ramassés après la grâce, fichiers servis")
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Test du graphe d'abonnements (src/services/follow_graph.py)
+Les compteurs dénormalisés Club.followers_count et User.followed_clubs_count
+suivent chaque abonnement ; la liste des abonnés d'un club est toujours
+paginée par curseur, FOLLOWERS_PAGE_SIZE par défaut.
+"""
+
+import sys
+
+import pytest
+
+FANS = 250
+
+
+@pytest.fixture
+def ids(app, seed, password_hash):
+    """12 clubs (celui de seed en premier), un compte club, FANS abonnés au club 1"""
+    from src.models.database import db
+    from src.models.user import User, Club, UserRole
+    from src.services.follow_graph import follow_graph
+
+    with app.app_context():
+        clubs = [Club(name=f'Club {i}', email=f'club{i}@test.com') for i in range(1, 12)]
+        club_user = User(email='club@test.com', name='Club Test', password_hash=password_hash,
+                         role=UserRole.CLUB, club_id=seed['club'])
+        fans = [User(email=f'fan{i}@test.com', name=f'Fan {i}', role=UserRole.PLAYER) for i in range(FANS)]
+        db.session.add_all(clubs + [club_user] + fans)
+        db.session.commit()
+        follow_graph.add_followers(seed['club'], [fan.id for fan in fans])
+        db.session.commit()
+        return {'clubs': [seed['club']] + [club.id for club in clubs], 'player': seed['player'], 'fan': fans[0].id}
+
+
+def _counters(app, ids):
+    """(abonnés par club, clubs suivis par le joueur) lus dans les colonnes dénormalisées"""
+    from src.models.database import db
+    from src.models.user import User, Club
+
+    with app.app_context():
+        clubs = {club.id: club.followers_count for club in Club.query.all()}
+        return clubs, db.session.get(User, ids['player']).followed_clubs_count
+
+
+def _assert_counters_match_table(app):
+    """Aucun compteur à corriger : les colonnes égalent les comptes de la table d'abonnements"""
+    from src.models.database import db
+    from src.services.follow_graph import follow_graph
+
+    with app.app_context():
+        repaired = follow_graph.recount()
+        db.session.rollback()
+    assert repaired == 0, f"{repaired} compteur(s) désynchronisé(s)"
+
+
+def test_counters_follow_every_write(app, ids, login):
+    """Suivi, doublon, opération groupée et retrait : compteurs exacts à chaque étape"""
+    client = login('joueur@test.com')
+    club_1, club_2, club_3, club_4 = ids['clubs'][:4]
+    _assert_counters_match_table(app)
+    assert _counters(app, ids)[0][club_1] == FANS
+
+    assert client.post(f'/api/players/clubs/{club_1}/follow').status_code == 200
+    assert client.post(f'/api/players/clubs/{club_1}/follow').status_code == 409
+    clubs, followed = _counters(app, ids)
+    assert clubs[club_1] == FANS + 1 and followed == 1, "abonnement en double compté"
+
+    response = client.post('/api/players/clubs/follows', json={'follow': [club_2, club_3, club_4, 99999],
+                                                               'unfollow': [club_1]})
+    assert response.status_code == 200, response.get_json()
+    clubs, followed = _counters(app, ids)
+    assert (clubs[club_1], clubs[club_2], clubs[club_3], clubs[club_4]) == (FANS, 1, 1, 1), clubs
+    assert followed == 3, followed
+
+    assert client.post(f'/api/players/clubs/{club_2}/unfollow').status_code == 200
+    clubs, followed = _counters(app, ids)
+    assert clubs[club_2] == 0 and followed == 2
+    _assert_counters_match_table(app)
+
+
+def test_follow_limit_leaves_counters_unchanged(app, ids, login):
+    """Au-delà de FOLLOW_MAX_CLUBS : 400 et compteurs inchangés (rollback)"""
+    client = login('joueur@test.com')
+    before = _counters(app, ids)
+    response = client.post('/api/players/clubs/follows', json={'follow': ids['clubs']})
+    assert response.status_code == 400, response.status_code
+    assert _counters(app, ids) == before, "compteurs modifiés par une opération refusée"
+    _assert_counters_match_table(app)
+
+
+def test_followers_all_or_by_pages(ids, login):
+    """Sans limit : une page bornée ; avec limit : pages disjointes, ordonnées, complètes"""
+    from src.services.follow_graph import follow_graph
+
+    client = login('club@test.com')
+
+    body = client.get('/api/clubs/followers').get_json()
+    assert len(body['followers']) == follow_graph.default_limit < FANS, f"{len(body['followers'])} abonnés renvoyés"
+    assert body['next_cursor'] and body['total_count'] == FANS, body['total_count']
+    body = client.get('/api/clubs/followers?limit=100000').get_json()
+    assert len(body['followers']) == min(FANS, follow_graph.max_limit), "limit non borné par FOLLOWERS_MAX_PAGE_SIZE"
+
+    ids, cursor, pages = [], None, 0
+    while True:
+        url = '/api/clubs/followers?limit=60' + (f'&cursor={cursor}' if cursor else '')
+        body = client.get(url).get_json()
+        assert len(body['followers']) <= 60
+        ids += [follower['id'] for follower in body['followers']]
+        pages += 1
+        cursor = body['next_cursor']
+        if not cursor:
+            break
+    assert pages == 5 and len(ids) == FANS, (pages, len(ids))
+    assert ids == sorted(set(ids)), "pages non ordonnées ou en double"
+
+    assert client.get('/api/clubs/followers?cursor=zz').status_code == 400
+
+
+def test_remove_club_and_recount(app, ids):
+    """Suppression des abonnés d'un club et réparation d'un compteur faussé"""
+    from src.models.database import db
+    from src.models.user import User, Club
+    from src.services.follow_graph import follow_graph
+
+    club_1 = ids['clubs'][0]
+    with app.app_context():
+        assert follow_graph.remove_club(club_1) == FANS
+        db.session.commit()
+        assert db.session.get(Club, club_1).followers_count == 0
+        assert db.session.get(User, ids['fan']).followed_clubs_count == 0, "compteur du joueur non ajusté"
+
+        db.session.execute(db.text('UPDATE club SET followers_count = 99'))
+        assert follow_graph.recount() == len(ids['clubs'])
+        db.session.commit()
+        assert {club.followers_count for club in Club.query.all()} == {0}
+    _assert_counters_match_table(app)
+
+
+if __name__ == '__main__':
+    print("🎯 Test du graphe d'abonnements")
+    print("=" * 60)
+    if pytest.main(['-q', __file__]) != 0:
+        print("❌ Graphe d'abonnements incohérent")
+        sys.exit(1)
+    print("✅ Compteurs dénormalisés exacts, abonnés paginés par curseur")
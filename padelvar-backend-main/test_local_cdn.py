@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Test du CDN local (route /cdn/<clé> de src/routes/media.py)
+Une vidéo publiée n'est servie qu'à qui peut la voir (can_view_video) ; une
+vidéo verrouillée est servie à son propriétaire avec une réponse privée.
+"""
+
+import sys
+
+import pytest
+
+CONTENT = b'padel' * 2000
+
+
+@pytest.fixture
+def app_config(tmp_path):
+    return {'CDN_BACKEND': 'local', 'CDN_LOCAL_ROOT': str(tmp_path / 'cdn'), 'CDN_PUBLIC_BASE_URL': '/cdn'}
+
+
+@pytest.fixture
+def published(app, seed, tmp_path, password_hash):
+    """Deux vidéos publiées du joueur : (url déverrouillée, url verrouillée)"""
+    from src.models.database import db
+    from src.models.user import User, Video, UserRole
+
+    with app.app_context():
+        db.session.add(User(email='autre@test.com', name='Autre Joueur', role=UserRole.PLAYER,
+                            password_hash=password_hash))
+        urls = []
+        for n, unlocked in ((1, True), (2, False)):
+            key = f'videos/{n}/video_{n}.mp4'
+            (tmp_path / 'cdn' / 'videos' / str(n)).mkdir(parents=True)
+            (tmp_path / 'cdn' / key).write_bytes(CONTENT)
+            db.session.add(Video(title=f'Match {n}', file_url=f'/cdn/{key}', is_unlocked=unlocked,
+                                 user_id=seed['player'], court_id=seed['court']))
+            urls.append(f'/cdn/{key}')
+        db.session.commit()
+        return urls
+
+
+def test_unlocked_video_is_public(app, published):
+    """Vidéo déverrouillée : servie à tous, par plages, cache partagé autorisé"""
+    client = app.test_client()
+    response = client.get(published[0], headers={'Range': 'bytes=100-199'})
+    assert response.status_code == 206 and response.data == CONTENT[100:200], response.status_code
+    assert 'public' in response.headers['Cache-Control'], response.headers['Cache-Control']
+
+
+def test_locked_video_requires_owner(app, published, login):
+    """Vidéo verrouillée : 403 anonyme ou pour un autre joueur, privée pour le propriétaire"""
+    assert app.test_client().get(published[1]).status_code == 403
+    assert login('autre@test.com').get(published[1]).status_code == 403
+
+    response = login('joueur@test.com').get(published[1])
+    assert response.status_code == 200 and response.data == CONTENT, response.status_code
+    cache_control = response.headers['Cache-Control']
+    assert 'private' in cache_control and 'public' not in cache_control, cache_control
+
+
+def test_unreferenced_key_is_not_served(app, published, tmp_path):
+    """Fichier présent mais référencé par aucune vidéo, ou clé hors du dossier : 404"""
+    (tmp_path / 'cdn' / 'videos' / '9').mkdir()
+    (tmp_path / 'cdn' / 'videos' / '9' / 'orphan.mp4').write_bytes(CONTENT)
+    client = app.test_client()
+    assert client.get('/cdn/videos/9/orphan.mp4').status_code == 404
+    assert client.get('/cdn/../config.py').status_code == 404
+
+
+if __name__ == '__main__':
+    print("🎯 Test du CDN local")
+    print("=" * 60)
+    if pytest.main(['-q', __file__]) != 0:
+        print("❌ CDN local incohérent")
+        sys.exit(1)
+    print("✅ Vidéos publiées servies selon can_view_video, verrouillées en privé")
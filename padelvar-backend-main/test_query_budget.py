@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test des budgets de requêtes SQL des endpoints principaux
+Utilise le profileur SQL (activé en configuration 'testing') sur une base
+en mémoire pour détecter les régressions N+1.
+"""
+
+import sys
+
+import pytest
+
+# Budgets maximum de requêtes SQL par appel
+ENDPOINT_BUDGETS = {
+    '/api/auth/me': 3,
+    '/api/players/dashboard': 8,
+    '/api/videos/my-videos': 5,
+    '/api/players/videos?limit=10': 5,
+    '/api/players/clubs/available': 3,
+    '/api/players/clubs/followed': 5,
+    '/api/players/statistics': 6,
+    '/api/players/search/clubs?q=Club': 3,
+    '/api/players/social/leaderboard?sort_by=videos': 3,
+    '/api/players/social/activity_feed': 4,
+}
+
+
+@pytest.fixture
+def client(app, seed, login):
+    """Joueur connecté : 20 vidéos, 6 clubs suivis"""
+    from src.models.database import db
+    from src.models.user import Club, Court, Video
+    from src.services.follow_graph import follow_graph
+
+    with app.app_context():
+        for i in range(2, 4):
+            db.session.add(Court(name=f'Terrain {i}', qr_code=f'QR_BUDGET_{i}',
+                                 camera_url='http://localhost/cam', club_id=seed['club']))
+        for i in range(20):
+            db.session.add(Video(title=f'Match {i}', user_id=seed['player'], court_id=None,
+                                 file_url=f'/videos/budget_{i}.mp4'))
+        others = [Club(name=f'Club Suivi {i}') for i in range(5)]
+        db.session.add_all(others)
+        db.session.flush()
+        follow_graph.follow(seed['player'], [seed['club']] + [other.id for other in others])
+        db.session.commit()
+    return login('joueur@test.com')
+
+
+def test_endpoint_query_budgets(client):
+    """Chaque endpoint reste sous son budget de requêtes SQL"""
+    from src.services.query_profiler import query_profiler
+
+    for url, budget in ENDPOINT_BUDGETS.items():
+        with query_profiler.budget(budget, label=url):
+            response = client.get(url)
+        assert response.status_code == 200, f"{url}: {response.status_code}"
+
+
+def test_my_videos_default_page(client):
+    """Sans limit : une page de LIBRARY_MY_VIDEOS_PAGE_SIZE, la suite par next_cursor"""
+    from src.services.video_library import video_library
+
+    video_library.my_videos_limit = 8
+    titles, cursor = [], None
+    while True:
+        body = client.get('/api/videos/my-videos' + (f'?cursor={cursor}' if cursor else '')).get_json()
+        assert len(body['videos']) <= 8 and body['total_count'] == 20, body['total_count']
+        titles += [video['title'] for video in body['videos']]
+        cursor = body['next_cursor']
+        if not cursor:
+            break
+    assert sorted(titles) == sorted(f'Match {i}' for i in range(20)), titles
+
+
+if __name__ == '__main__':
+    print("🎯 Test des budgets de requêtes SQL")
+    print("=" * 60)
+    if pytest.main(['-q', __file__]) != 0:
+        print("❌ Budget de requêtes dépassé")
+        sys.exit(1)
+    print("✅ Tous les endpoints respectent leur budget")
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Test de la finalisation des enregistrements expirés (src/services/recording_sweeper.py)
+Les sessions expirées sont réclamées par lots (une session n'est réclamée
+qu'une fois), puis finalisées dans la même transaction : vidéo, terrain libéré,
+historique. Les routes de consultation ne finalisent rien.
+"""
+
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+SESSIONS = 25
+EXPIRED = 20
+BATCH = 7
+
+
+@pytest.fixture
+def app_config():
+    return {'RECORDING_SWEEP_BATCH': BATCH}
+
+
+@pytest.fixture
+def ids(app, seed, password_hash):
+    """SESSIONS sessions actives (joueur i sur terrain i) dont les EXPIRED premières ont expiré"""
+    from src.models.database import db
+    from src.models.user import User, Court, RecordingSession, UserRole
+
+    with app.app_context():
+        players = [User(email=f'joueur{i}@test.com', name=f'Joueur {i}', password_hash=password_hash,
+                        role=UserRole.PLAYER, credits_balance=5) for i in range(SESSIONS)]
+        courts = [Court(name=f'Terrain {i}', qr_code=f'QR_BALAYAGE_{i}', camera_url='http://localhost/cam',
+                        club_id=seed['club'], is_recording=True, current_recording_id=f'rec_{i}')
+                  for i in range(SESSIONS)]
+        db.session.add_all(players + courts)
+        db.session.flush()
+        started = datetime.utcnow() - timedelta(hours=3)
+        for i in range(SESSIONS):
+            # Durée prévue 60 ou 200 minutes, plafonnée à max_duration (120)
+            db.session.add(RecordingSession(
+                recording_id=f'rec_{i}', user_id=players[i].id, court_id=courts[i].id, club_id=seed['club'],
+                planned_duration=60 if i % 2 else 200, max_duration=120,
+                start_time=started if i < EXPIRED else datetime.utcnow(), status='active'))
+        db.session.commit()
+        return {'club': seed['club'], 'courts': [court.id for court in courts]}
+
+
+def _active_count(app):
+    from src.models.user import RecordingSession
+
+    with app.app_context():
+        return RecordingSession.query.filter_by(status='active').count()
+
+
+def test_reads_do_not_finalize(app, ids, login):
+    """Terrains disponibles et enregistrement en cours : lecture seule, terrains expirés affichés libres"""
+    client = login('joueur0@test.com')
+
+    response = client.get(f"/api/recording/available-courts/{ids['club']}")
+    assert response.status_code == 200, response.status_code
+    available = sum(1 for court in response.get_json()['courts'] if court['available'] and court['id'] in ids['courts'])
+    assert available == EXPIRED, f"{available} terrains libres affichés sur {EXPIRED}"
+    assert client.get('/api/recording/my-active').get_json()['active_recording'] is None
+    assert _active_count(app) == SESSIONS, "une route de consultation a finalisé des sessions"
+
+
+def test_start_finalizes_only_blocking_session(app, ids, login):
+    """Démarrer sur un terrain bloqué par une session expirée ne finalise que celle-ci, à sa fin prévue"""
+    from src.models.database import db
+    from src.models.user import Court, RecordingSession
+
+    client = login('joueur0@test.com')
+    response = client.post('/api/recording/start', json={'court_id': ids['courts'][0], 'duration': 90})
+    assert response.status_code == 201, response.get_json()
+
+    with app.app_context():
+        assert RecordingSession.query.filter_by(status='stopped').count() == 1
+        session = RecordingSession.query.filter_by(recording_id='rec_0').one()
+        assert session.stopped_by == 'auto'
+        assert session.end_time - session.start_time == timedelta(minutes=120), "fin réelle au lieu de la fin prévue"
+        assert db.session.get(Court, ids['courts'][0]).current_recording_id != 'rec_0', "terrain non réattribué"
+
+
+def test_sweep_claims_and_finalizes_in_batches(app, ids):
+    """Balayage : lots de BATCH, vidéos, terrains, historique et réservations ; second balayage sans effet"""
+    from src.models.user import Court, Video, RecordingSession, ClubActionHistory
+    from src.services.query_profiler import query_profiler
+    from src.services.recording_sweeper import recording_sweeper
+    from src.services.storage_manager import storage_manager
+
+    with app.app_context():
+        storage_manager.admit('rec_1', ids['club'], 60)
+        with query_profiler.budget(10 ** 6, label='sweep') as counter:
+            result = recording_sweeper.sweep()
+        assert result['finalized'] == EXPIRED and result['batches'] == -(-EXPIRED // BATCH), result
+        # Requêtes par lot, pas par session
+        assert counter['count'] < EXPIRED * 2, f"{counter['count']} requêtes pour {EXPIRED} sessions"
+
+        assert RecordingSession.query.filter_by(status='active').count() == SESSIONS - EXPIRED
+        assert Video.query.count() == EXPIRED
+        video = Video.query.filter_by(court_id=ids['courts'][1]).one()
+        assert video.duration == 3600 and video.file_url == '/videos/rec_rec_1.mp4', (video.duration, video.file_url)
+        assert Court.query.filter_by(is_recording=True).count() == SESSIONS - EXPIRED, "terrains non libérés"
+        assert ClubActionHistory.query.filter_by(action_type='stop_recording').count() == EXPIRED
+        assert storage_manager.reservation('rec_1') is None, "réservation d'espace conservée"
+
+        assert recording_sweeper.sweep()['finalized'] == 0, "session finalisée deux fois"
+        assert Video.query.count() == EXPIRED
+
+
+def test_claim_takes_each_session_once(app, ids):
+    """Deux réclamations successives se partagent les sessions expirées sans doublon"""
+    from sqlalchemy import true
+    from src.models.database import db
+    from src.services.recording_sweeper import recording_sweeper
+
+    with app.app_context():
+        now = datetime.utcnow()
+        first = {row.recording_id for row in recording_sweeper._claim(now, true())}
+        second = {row.recording_id for row in recording_sweeper._claim(now, true())}
+        db.session.rollback()
+    assert len(first) == len(second) == BATCH, (len(first), len(second))
+    assert not first & second, f"sessions réclamées deux fois : {first & second}"
+    assert all(int(recording_id.split('_')[1]) < EXPIRED for recording_id in first | second), "session en cours réclamée"
+
+
+if __name__ == '__main__':
+    print("🎯 Test de la finalisation des enregistrements expirés")
+    print("=" * 60)
+    if pytest.main(['-q', __file__]) != 0:
+        print("❌ Finalisation des enregistrements incohérente")
+        sys.exit(1)
+    print("✅ Sessions expirées réclamées une fois et finalisées par lots")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test du cache des réponses (src/services/response_cache.py)
+Une réponse servie du cache n'ouvre pas la base ; toute écriture validée qui
+la concerne (ORM ou écriture groupée) la rend invalide, un rollback non.
+"""
+
+import sys
+
+import pytest
+
+
+@pytest.fixture
+def app_config():
+    return {'RESPONSE_CACHE_ENABLED': True, 'RESPONSE_CACHE_BACKEND': 'memory'}
+
+
+@pytest.fixture
+def video_id(app, seed):
+    from src.models.database import db
+    from src.models.user import Video
+
+    with app.app_context():
+        video = Video(title='Match', user_id=seed['player'], court_id=seed['court'], file_url='/videos/cache.mp4')
+        db.session.add(video)
+        db.session.commit()
+        return video.id
+
+
+def _cache_status(client, url):
+    """En-tête X-Cache et nombre de requêtes SQL d'un appel"""
+    from src.services.query_profiler import query_profiler
+
+    with query_profiler.budget(10 ** 6, label=url) as counter:
+        response = client.get(url)
+    assert response.status_code == 200, f"{url}: {response.status_code}"
+    return response.headers.get('X-Cache'), counter['count']
+
+
+def test_hit_and_invalidation_on_commit(app, seed, login):
+    """MISS puis HIT sans SQL ; rollback sans effet ; commit => MISS"""
+    from src.models.database import db
+    from src.models.user import User
+
+    client = login('joueur@test.com')
+    assert _cache_status(client, '/api/players/dashboard')[0] == 'MISS'
+    assert _cache_status(client, '/api/players/dashboard') == ('HIT', 0)
+
+    with app.app_context():
+        db.session.get(User, seed['player']).credits_balance = 42
+        db.session.flush()
+        db.session.rollback()
+    assert _cache_status(client, '/api/players/dashboard')[0] == 'HIT', "un rollback a invalidé le cache"
+
+    with app.app_context():
+        db.session.get(User, seed['player']).credits_balance = 42
+        db.session.commit()
+    assert _cache_status(client, '/api/players/dashboard')[0] == 'MISS', "un commit n'a pas invalidé le cache"
+
+
+def test_bulk_video_write_invalidates_owner(app, seed, video_id, login):
+    """Un UPDATE groupé sur video invalide le joueur et le club concernés (video_tags)"""
+    from sqlalchemy import update
+    from src.models.database import db
+    from src.models.user import Video
+    from src.services.response_cache import video_tags
+
+    client = login('joueur@test.com')
+    _cache_status(client, '/api/players/dashboard')
+    assert _cache_status(client, '/api/players/dashboard')[0] == 'HIT'
+
+    with app.app_context():
+        tags = video_tags([video_id])
+        assert {f"user:{seed['player']}", f"club:{seed['club']}"} <= tags, tags
+        db.session.execute(update(Video).where(Video.id == video_id).values(file_url=None)
+                           .execution_options(synchronize_session=False, cache_tags=tags))
+        db.session.commit()
+    assert _cache_status(client, '/api/players/dashboard')[0] == 'MISS', "écriture groupée non invalidée"
+
+
+def test_cache_requires_shared_backend_by_default():
+    """'auto' sans Redis : désactivé, WEB_CONCURRENCY posé ou non ; 'memory' refusé à plusieurs workers"""
+    from flask import Flask
+    from src.services.response_cache import ResponseCache
+
+    for workers in (1, 4):
+        app = Flask(__name__)
+        app.config.update(RESPONSE_CACHE_WORKERS=workers, RESPONSE_CACHE_BACKEND='auto')
+        assert not ResponseCache(app).enabled, f"cache actif sans invalidation entre workers ({workers})"
+
+    app = Flask(__name__)
+    app.config.update(RESPONSE_CACHE_WORKERS=1, RESPONSE_CACHE_BACKEND='memory')
+    assert ResponseCache(app).enabled, "processus unique déclaré mais cache désactivé"
+
+    app = Flask(__name__)
+    app.config.update(RESPONSE_CACHE_WORKERS=4, RESPONSE_CACHE_BACKEND='memory')
+    with pytest.raises(ValueError):
+        ResponseCache(app)
+
+
+if __name__ == '__main__':
+    print("🎯 Test du cache des réponses")
+    print("=" * 60)
+    if pytest.main(['-q', __file__]) != 0:
+        print("❌ Cache des réponses incohérent")
+        sys.exit(1)
+    print("✅ Cache servi sans SQL et invalidé par chaque écriture validée")
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Test du stockage local (src/services/storage_manager.py)
+Admission des captures : réservation en base au nom de l'enregistrement (vue
+par tous les processus), éviction LRU pondérée hors du verrou des
+réservations, refus 507 quand l'espace ou le quota du club manque.
+"""
+
+import sys
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+MB = 1024 ** 2
+
+
+@pytest.fixture
+def app_config(tmp_path):
+    """Niveau chaud dans tmp_path ; 10 minutes prévues : 90 Mo avec la marge"""
+    (tmp_path / 'videos').mkdir()
+    return {'VIDEO_STORAGE_PATH': str(tmp_path / 'videos'),
+            'THUMBNAILS_STORAGE_PATH': str(tmp_path / 'thumbnails'),
+            'RECORDING_ESTIMATED_BITRATE': 1_000_000}
+
+
+@pytest.fixture
+def ids(seed):
+    """Identifiants de seed ; quotas et marge du service remis à zéro ensuite"""
+    from src.services.storage_manager import storage_manager
+
+    yield seed
+    storage_manager.club_quotas = {}
+    storage_manager.min_free_bytes = 0
+
+
+def _reserved_keys(app):
+    from src.models.user import StorageReservation
+
+    with app.app_context():
+        return {row.key for row in StorageReservation.query.all()}
+
+
+def _store_videos(ids, sizes, migrated, ages):
+    """Fichiers indexés du club : {n: Mo}, vidéos migrées au CDN, ancienneté en jours"""
+    from src.models.database import db
+    from src.models.user import Video
+    from src.services.storage_manager import storage_manager
+
+    now = datetime.utcnow()
+    for n, size in sizes.items():
+        path = storage_manager.hot_path / f'v{n}.mp4'
+        path.write_bytes(b'\0' * size * MB)
+        video = Video(title=f'v{n}', file_url=f'/videos/v{n}.mp4', user_id=ids['player'], court_id=ids['court'],
+                      cdn_migrated_at=now if n in migrated else None)
+        db.session.add(video)
+        db.session.commit()
+        entry = storage_manager.register(path, 'video', video.id, ids['club'])
+        entry.last_access = now - timedelta(days=ages[n])
+        db.session.commit()
+
+
+def test_quota_admission_evicts_then_reserves(app, ids):
+    """Quota dépassé : fichiers évinçables supprimés (gros et anciens d'abord), puis réservation"""
+    from src.models.database import db
+    from src.models.user import Video, StoredFile
+    from src.services.storage_manager import storage_manager, StorageFullError
+
+    with app.app_context():
+        # v1 hors rétention, v2 et v4 sur le CDN, v3 seulement locale et récente
+        _store_videos(ids, {1: 5, 2: 40, 3: 10, 4: 30}, migrated={2, 4}, ages={1: 40, 2: 3, 3: 1, 4: 2})
+        storage_manager.club_quotas = {ids['club']: 120 * MB}
+
+        admission = storage_manager.admit('rec_a', ids['club'], 10, filename='rec_a.mp4')
+        assert admission['tier'] == 'hot', admission
+        assert storage_manager.reservation('rec_a').bytes == admission['projected_bytes']
+        remaining = {entry.video_id for entry in StoredFile.query.all()}
+        assert 3 in remaining, "vidéo locale récente évincée"
+        assert storage_manager.club_stored(ids['club']) + admission['projected_bytes'] <= 120 * MB
+        assert not (storage_manager.hot_path / 'v2.mp4').exists(), "gros fichier migré conservé"
+        assert db.session.get(Video, 1).file_url is None, "URL locale d'un fichier supprimé conservée"
+
+        # La réservation compte : une seconde capture ne tient plus
+        with pytest.raises(StorageFullError) as refused:
+            storage_manager.admit('rec_b', ids['club'], 10, filename='rec_b.mp4')
+        assert refused.value.reason == 'quota' and refused.value.details['missing_bytes'] > 0, refused.value.details
+        assert storage_manager.reservation('rec_b') is None, "réservation refusée conservée"
+
+        storage_manager.release('rec_a')
+        assert storage_manager.admit('rec_b', ids['club'], 10)['tier'] == 'hot'
+
+
+def test_eviction_runs_outside_reservation_lock(app, ids, monkeypatch):
+    """Pendant une éviction, une autre capture peut réserver (le verrou n'est pas tenu)"""
+    from src.services.storage_manager import storage_manager
+
+    original_evict = storage_manager.evict
+    observed = {}
+
+    def evict(*args, **kwargs):
+        waiter = threading.Thread(target=lambda: observed.setdefault(
+            'lock_free', storage_manager.lock.acquire(timeout=2) and not storage_manager.lock.release()))
+        waiter.start()
+        waiter.join()
+        return original_evict(*args, **kwargs)
+
+    monkeypatch.setattr(storage_manager, 'evict', evict)
+    with app.app_context():
+        _store_videos(ids, {1: 50}, migrated={1}, ages={1: 1})
+        storage_manager.club_quotas = {ids['club']: 100 * MB}
+        storage_manager.admit('rec_a', ids['club'], 10)
+    assert observed.get('lock_free'), "éviction exécutée sous le verrou des réservations"
+
+
+def test_reservations_of_other_processes_count(app, ids):
+    """Une réservation validée par un autre processus (ligne en base) est déduite du quota"""
+    from src.models.database import db
+    from src.models.user import StorageReservation
+    from src.services.storage_manager import storage_manager, StorageFullError
+
+    with app.app_context():
+        storage_manager.club_quotas = {ids['club']: 150 * MB}
+        db.session.add(StorageReservation(key='rec_autre', club_id=ids['club'], bytes=100 * MB,
+                                          expires_at=datetime.utcnow() + timedelta(hours=1)))
+        db.session.commit()
+        with pytest.raises(StorageFullError) as refused:
+            storage_manager.admit('rec_a', ids['club'], 10)
+        assert refused.value.reason == 'quota', refused.value.details
+        assert storage_manager.reservation('rec_a') is None
+
+        storage_manager.release('rec_autre')
+        assert storage_manager.admit('rec_a', ids['club'], 10)['tier'] == 'hot'
+
+
+def test_stale_reservation_expires(app, ids):
+    """Une réservation jamais libérée s'éteint après la fin prévue de la capture"""
+    from src.models.database import db
+    from src.services.storage_manager import storage_manager
+
+    with app.app_context():
+        storage_manager.admit('rec_a', ids['club'], 10)
+        assert storage_manager._reserved(club_id=ids['club']) > 0
+        storage_manager.reservation('rec_a').expires_at = datetime.utcnow() - timedelta(seconds=1)
+        db.session.commit()
+        assert storage_manager._reserved(club_id=ids['club']) == 0
+        storage_manager.admit('rec_b', ids['club'], 10)
+        assert storage_manager.reservation('rec_a') is None, "réservation échue conservée"
+
+
+def test_start_recording_reserves_or_returns_507(app, ids, login):
+    """/api/recording/start : 507 sans débit quand l'espace manque, réservation libérée à l'arrêt"""
+    from src.models.database import db
+    from src.models.user import User
+    from src.services.storage_manager import storage_manager
+
+    client = login('joueur@test.com')
+    storage_manager.club_quotas = {ids['club']: 1 * MB}
+    response = client.post('/api/recording/start', json={'court_id': ids['court'], 'duration': 60})
+    assert response.status_code == 507, response.status_code
+    assert response.get_json()['reason'] == 'quota', response.get_json()
+    storage_manager.club_quotas = {}
+
+    storage_manager.min_free_bytes = storage_manager.disk_free(storage_manager.hot_path) + MB
+    response = client.post('/api/recording/start', json={'court_id': ids['court'], 'duration': 60})
+    assert response.status_code == 507 and response.get_json()['reason'] == 'disk', response.get_json()
+    storage_manager.min_free_bytes = 0
+
+    with app.app_context():
+        assert db.session.get(User, ids['player']).credits_balance == 10, "crédit débité malgré le refus"
+    assert not _reserved_keys(app), _reserved_keys(app)
+
+    response = client.post('/api/recording/start', json={'court_id': ids['court'], 'duration': 60})
+    assert response.status_code == 201, response.get_json()
+    recording_id = response.get_json()['recording_session']['recording_id']
+    assert _reserved_keys(app) == {recording_id}, "espace non réservé au nom de l'enregistrement"
+
+    response = client.post('/api/recording/stop', json={'recording_id': recording_id})
+    assert response.status_code == 200, response.get_json()
+    assert not _reserved_keys(app), "réservation conservée après l'arrêt"
+
+
+if __name__ == '__main__':
+    print("🎯 Test de l'admission des captures")
+    print("=" * 60)
+    if pytest.main(['-q', __file__]) != 0:
+        print("❌ Admission des captures incohérente")
+        sys.exit(1)
+    print("✅ Espace réservé par enregistrement, éviction hors verrou, refus en 507")
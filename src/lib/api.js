@@ -30,6 +30,20 @@ api.interceptors.response.use(
   }
 );
 
+// Parcourt une liste paginée par curseur (next_cursor) et renvoie la dernière
+// réponse avec tous les éléments de `key` réunis
+const getAllPages = async (url, key) => {
+  const items = [];
+  let cursor = null;
+  let response;
+  do {
+    response = await api.get(url, { params: cursor ? { cursor } : {} });
+    items.push(...(response.data[key] ?? []));
+    cursor = response.data.next_cursor;
+  } while (cursor);
+  return { ...response, data: { ...response.data, [key]: items, next_cursor: null, has_more: false } };
+};
+
 export const authService = {
   register: (userData) => api.post('/auth/register', userData),
   login: (credentials) => api.post('/auth/login', credentials),
@@ -41,7 +55,7 @@ export const authService = {
 };
 
 export const videoService = {
-  getMyVideos: () => api.get('/videos/my-videos'),
+  getMyVideos: () => getAllPages('/videos/my-videos', 'videos'),
   startRecording: (data) => api.post('/videos/record', data),
   stopRecording: (data) => api.post('/videos/stop-recording', data),
   unlockVideo: (videoId) => api.post(`/videos/${videoId}/unlock`),
@@ -112,7 +126,7 @@ export const clubService = {
   getClubVideos: () => api.get('/clubs/videos'),
   getAllClubs: () => api.get('/clubs/all'),
   getClubHistory: () => api.get('/clubs/history'),
-  getFollowers: () => api.get('/clubs/followers'),
+  getFollowers: () => getAllPages('/clubs/followers', 'followers'),
   updatePlayer: (playerId, playerData) => api.put(`/clubs/${playerId}`, playerData),
   addCreditsToPlayer: (playerId, credits) => api.post(`/clubs/${playerId}/add-credits`, { credits }),
   updateFollower: (playerId, playerData) => clubService.updatePlayer(playerId, playerData),